@@ -0,0 +1,110 @@
+"""Attendance ingestion benchmark: a 9:00 badge burst.
+
+Every employee checks in within a few minutes, then checks out. Each wave
+is written two ways:
+
+- per event: one upsert and commit per clock event, ``--concurrency`` at a time;
+- buffered: events go through AttendanceBuffer and are written by flush().
+
+Each run uses days that have no records yet.
+
+    python benchmarks/attendance_bench.py --database-url postgresql://... --employees 50000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "services", "user-service"))
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from shared.config.settings import get_settings
+from shared.database.base import get_async_database_url
+from app.models.attendance import AttendanceRecord
+from app.models.user import Employee
+from app.services.attendance import AttendanceBuffer, WorkSchedule, attendance_figures, write_attendance
+
+def burst(employee_ids: list[int], day, schedule: WorkSchedule, event: str, seed: int) -> list[tuple]:
+    """One clock event per employee around 9:00 (in) or 18:00 (out), in arrival order"""
+    rng = random.Random(seed)
+    clock = schedule.start if event == "in" else schedule.end
+    base = datetime.combine(day, clock, tzinfo=schedule.tz)
+    events = [
+        (employee_id, event, base + timedelta(seconds=rng.randrange(-600, 600)), "Gate A", "10.0.0.1", None)
+        for employee_id in employee_ids
+    ]
+    return sorted(events, key=lambda event: event[2])
+
+async def per_event(session_factory, schedule: WorkSchedule, events: list[tuple], concurrency: int) -> float:
+    queue = iter(events)
+
+    async def worker():
+        for employee_id, event, timestamp, location, ip_address, device_info in queue:
+            check_in, check_out = (timestamp, None) if event == "in" else (None, timestamp)
+            day = schedule.local_date(timestamp)
+            row = {
+                "employee_id": employee_id, "attendance_date": day,
+                "check_in_time": check_in, "check_out_time": check_out,
+                "location": location, "ip_address": ip_address, "device_info": device_info,
+                **attendance_figures(schedule, day, check_in, check_out),
+            }
+            async with session_factory() as db:
+                await write_attendance(db, schedule, [row])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started
+
+async def buffered(buffer: AttendanceBuffer, events: list[tuple], request_size: int) -> tuple[float, float]:
+    """Seconds to accept every event, and to accept and write them"""
+    started = time.perf_counter()
+    for first in range(0, len(events), request_size):
+        buffer.add(events[first:first + request_size])
+    accepted = time.perf_counter() - started
+    await buffer.flush()
+    return accepted, time.perf_counter() - started
+
+async def run(args: argparse.Namespace):
+    engine = create_async_engine(get_async_database_url(args.database_url), pool_size=args.concurrency)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    schedule = WorkSchedule.from_settings(get_settings())
+
+    async with session_factory() as db:
+        employee_ids = (await db.scalars(select(Employee.id).order_by(Employee.id).limit(args.employees))).all()
+        latest = await db.scalar(select(func.max(AttendanceRecord.attendance_date)))
+    day = (latest or datetime.now(schedule.tz).date()) + timedelta(days=1)
+    count = len(employee_ids)
+    naive_ids = employee_ids[:args.per_event_sample]
+    print(f"{count} employees, per-event sample {len(naive_ids)}, concurrency {args.concurrency}")
+
+    for wave, event in enumerate(("in", "out")):
+        seconds = await per_event(session_factory, schedule, burst(naive_ids, day, schedule, event, wave), args.concurrency)
+        print(f"check-{event:<4} per event  {len(naive_ids) / seconds:>9.0f} events/s")
+
+    buffer = AttendanceBuffer(session_factory, schedule, interval=0, max_buffered=count + 1)
+    day += timedelta(days=1)
+    for wave, event in enumerate(("in", "out")):
+        accepted, total = await buffered(buffer, burst(employee_ids, day, schedule, event, wave), args.request_size)
+        print(
+            f"check-{event:<4} buffered   {count / total:>9.0f} events/s written "
+            f"({count / accepted:.0f} events/s accepted, flush {total - accepted:.2f}s)"
+        )
+    await engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Attendance ingestion benchmark")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", "sqlite:///./bench.db"))
+    parser.add_argument("--employees", type=int, default=50_000, help="Employees in the buffered burst")
+    parser.add_argument("--per-event-sample", type=int, default=3000, help="Events written one by one")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--request-size", type=int, default=100, help="Events per buffer.add call")
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Service cold-start benchmark.
+
+For each service, measures in fresh processes:
+
+- import: ``import app.main`` alone;
+- ready: launching uvicorn until the first ``GET /health`` succeeds.
+
+    python benchmarks/cold_start.py --database-url postgresql://... --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVICES = ["auth-service", "user-service"]
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - started)"
+)
+
+def service_env(database_url: str) -> dict:
+    return {**os.environ, "DATABASE_URL": database_url, "PYTHONPATH": ROOT}
+
+def import_seconds(service: str, env: dict) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=os.path.join(ROOT, "services", service), env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+def ready_seconds(service: str, env: dict, port: int, timeout: float = 30.0) -> float:
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.join(ROOT, "services", service), env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.005)
+        raise TimeoutError(f"{service} not ready after {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="Service cold-start benchmark")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", "sqlite:///./bench.db"))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    env = service_env(args.database_url)
+    for service in SERVICES:
+        imports = [import_seconds(service, env) for _ in range(args.runs)]
+        ready = [ready_seconds(service, env, args.port) for _ in range(args.runs)]
+        print(f"{service:<14} import {statistics.median(imports) * 1e3:>6.0f} ms   "
+              f"ready {statistics.median(ready) * 1e3:>6.0f} ms (median of {args.runs})")
+
+if __name__ == "__main__":
+    main()
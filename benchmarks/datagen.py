@@ -0,0 +1,129 @@
+"""Synthetic HR dataset generator.
+
+Populates departments and employees with realistic-looking, reproducible
+data for benchmarks:
+
+    python benchmarks/datagen.py --database-url postgresql://... --employees 500000
+    python benchmarks/datagen.py --size 1m
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from typing import Iterator
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "services", "user-service"))
+
+from sqlalchemy import create_engine, insert, text
+from shared.database.base import Base
+from app.models.user import Employee, Department, EmployeeProfile
+
+LAST_NAMES = [
+    "Nguyen", "Tran", "Le", "Pham", "Hoang", "Huynh", "Phan", "Vu", "Vo", "Dang",
+    "Bui", "Do", "Ho", "Ngo", "Duong", "Ly", "Smith", "Johnson", "Garcia", "Miller",
+]
+FIRST_NAMES = [
+    "An", "Binh", "Chi", "Dung", "Giang", "Ha", "Hai", "Hanh", "Hieu", "Hoa",
+    "Hung", "Huong", "Khanh", "Lan", "Linh", "Long", "Mai", "Minh", "Nam", "Ngoc",
+    "Phuong", "Quang", "Son", "Tam", "Thao", "Thanh", "Trang", "Tuan", "Viet", "Yen",
+    "Alice", "Bob", "Carol", "David", "Emma", "Frank", "Grace", "Henry", "Ivy", "Jack",
+]
+DEPARTMENTS = [
+    "Engineering", "Finance", "Human Resources", "Sales", "Marketing", "Operations",
+    "Legal", "Support", "Product", "Design", "Logistics", "Procurement",
+]
+POSITIONS = ["Engineer", "Senior Engineer", "Analyst", "Manager", "Specialist", "Coordinator", "Director"]
+
+# Standard dataset sizes for benchmark runs and baselines
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+def generate_departments(count: int) -> list[dict]:
+    return [
+        {
+            "id": index,
+            "name": DEPARTMENTS[(index - 1) % len(DEPARTMENTS)] + ("" if index <= len(DEPARTMENTS) else f" {index}"),
+            "description": "Generated department",
+            "budget": 10_000_000_00,
+            "is_active": True,
+        }
+        for index in range(1, count + 1)
+    ]
+
+def generate_employees(count: int, departments: int, seed: int = 42) -> Iterator[dict]:
+    """Yield employee rows; ids are 1..count and managers always precede reports"""
+    rng = random.Random(seed)
+    start = date(2010, 1, 1)
+    for index in range(1, count + 1):
+        first_name = rng.choice(FIRST_NAMES)
+        last_name = rng.choice(LAST_NAMES)
+        yield {
+            "id": index,
+            "employee_id": f"EMP{index:07d}",
+            "first_name": first_name,
+            "last_name": last_name,
+            "email": f"{first_name.lower()}.{last_name.lower()}.{index}@example.com",
+            "phone": f"09{rng.randrange(10**8):08d}",
+            "date_of_birth": start - timedelta(days=rng.randrange(20 * 365, 55 * 365)),
+            "department_id": rng.randrange(1, departments + 1),
+            "position": rng.choice(POSITIONS),
+            "hire_date": start + timedelta(days=rng.randrange(0, 15 * 365)),
+            "salary": rng.randrange(800, 15000) * 100_00,
+            "is_active": rng.random() > 0.05,
+            "manager_id": rng.randrange(1, index) if index > 1 else None,
+        }
+
+def populate(database_url: str, employees: int, departments: int = 50, profiles: bool = True,
+             batch_size: int = 5000, seed: int = 42, reset: bool = True) -> float:
+    """Create the schema and insert the dataset, returning elapsed seconds"""
+    engine = create_engine(database_url)
+    if reset:
+        Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(insert(Department), generate_departments(departments))
+        batch = []
+        for row in generate_employees(employees, departments, seed):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                conn.execute(insert(Employee), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(Employee), batch)
+
+        if profiles:
+            for first in range(1, employees + 1, batch_size):
+                conn.execute(insert(EmployeeProfile), [
+                    {"employee_id": employee_id, "bio": "Generated profile", "skills": "python,sql"}
+                    for employee_id in range(first, min(first + batch_size, employees + 1))
+                ])
+
+        if engine.dialect.name == "postgresql":
+            for table in ("departments", "employees", "employee_profiles"):
+                conn.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))"))
+            conn.execute(text("ANALYZE"))
+    engine.dispose()
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic HRSOFT dataset")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", "sqlite:///./bench.db"))
+    parser.add_argument("--employees", type=int, default=10_000)
+    parser.add_argument("--size", choices=SIZES, help="Standard size; overrides --employees")
+    parser.add_argument("--departments", type=int, default=50)
+    parser.add_argument("--no-profiles", action="store_true")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    if args.size:
+        args.employees = SIZES[args.size]
+
+    elapsed = populate(args.database_url, args.employees, args.departments, not args.no_profiles, seed=args.seed)
+    print(f"Inserted {args.employees} employees in {elapsed:.1f}s")
+
+if __name__ == "__main__":
+    main()
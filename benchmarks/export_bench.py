@@ -0,0 +1,71 @@
+"""Roster export benchmark: streaming export vs. paging the list endpoint.
+
+Runs against a dataset made by datagen.py:
+
+    python benchmarks/export_bench.py --database-url postgresql://... --pages 200
+"""
+import argparse
+import asyncio
+import os
+import time
+import tracemalloc
+
+from datagen import populate
+from app.services.user_service import UserService
+from shared.database.base import get_async_database_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+FORMATS = ["csv", "ndjson", "parquet"]
+
+async def drain(chunks) -> int:
+    size = 0
+    async for chunk in chunks:
+        size += len(chunk)
+    return size
+
+async def run(args: argparse.Namespace):
+    engine = create_async_engine(get_async_database_url(args.database_url))
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    # Baseline: how clients pull the roster today, 100 rows per page with a count
+    async with session_factory() as db:
+        service = UserService(db)
+        started = time.perf_counter()
+        for page in range(1, args.pages + 1):
+            result = await service.list_employees(page=page, page_size=100)
+        elapsed = time.perf_counter() - started
+        rows_per_second = args.pages * 100 / elapsed
+        print(f"list pages:  {rows_per_second:>9.0f} rows/s "
+              f"({args.pages} pages; full roster of {result.total} would take {result.total / rows_per_second:.0f}s)")
+
+    for export_format in FORMATS:
+        for traced in (False, True):
+            async with session_factory() as db:
+                if traced:
+                    tracemalloc.start()
+                started = time.perf_counter()
+                size = await drain(await UserService(db).export_employees(export_format))
+                elapsed = time.perf_counter() - started
+                if traced:
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                    print(f"{'':>13}peak Python memory {peak / 1e6:.1f} MB")
+                else:
+                    print(f"{export_format + ':':<12} {size / 1e6:>7.1f} MB in {elapsed:.1f}s")
+    await engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Employee export benchmark")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", "sqlite:///./bench.db"))
+    parser.add_argument("--employees", type=int, default=500_000)
+    parser.add_argument("--pages", type=int, default=200, help="List pages fetched for the baseline")
+    parser.add_argument("--populate", action="store_true", help="Generate the dataset first")
+    args = parser.parse_args()
+
+    if args.populate:
+        elapsed = populate(args.database_url, args.employees)
+        print(f"Generated {args.employees} employees in {elapsed:.1f}s")
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
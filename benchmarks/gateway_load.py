@@ -0,0 +1,122 @@
+"""Gateway auth modes: end-to-end latency under load.
+
+Loads the same endpoint through each target and reports p50/p90/p99 and
+throughput. Typical targets are the stack in both modes, one behind nginx
+with nginx.conf (every service verifies the JWT) and one with
+docker-compose.gateway.yml (nginx checks each token once, cached):
+
+    python benchmarks/gateway_load.py \
+        --target jwt=http://localhost:8080/api/users/departments/ \
+        --target gateway=http://localhost/api/users/departments/ \
+        --users 500 --concurrency 64 --requests 20000
+
+Requests rotate over ``--users`` tokens minted with this environment's
+JWT_SECRET_KEY, so it must match the services'. Targets are loaded in
+alternating rounds to spread out background noise.
+
+``--emulate LABEL=SECRET`` sends the identity headers nginx would forward
+straight to a service running with AUTH_MODE=gateway, which measures the
+service side alone when no nginx is at hand:
+
+    python benchmarks/gateway_load.py \
+        --target jwt=http://localhost:8002/users/departments/ \
+        --target gateway=http://localhost:8003/users/departments/ --emulate gateway=secret
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from load_test import percentile
+from shared.auth.gateway import GATEWAY_SECRET_HEADER, PERMISSIONS_HEADER, USER_ID_HEADER
+from shared.auth.jwt_handler import create_access_token
+
+PERMISSIONS = ["hr", "admin"]
+
+def user_headers(users: int, emulate_secret: str = None) -> list[dict]:
+    """Request headers per simulated user: a token, plus the gateway's identity when emulating it"""
+    headers = []
+    for user_id in range(1, users + 1):
+        user = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id), 'permissions': PERMISSIONS})}"}
+        if emulate_secret:
+            user.update({
+                USER_ID_HEADER: str(user_id),
+                PERMISSIONS_HEADER: ",".join(PERMISSIONS),
+                GATEWAY_SECRET_HEADER: emulate_secret,
+            })
+        headers.append(user)
+    return headers
+
+async def run_round(client: httpx.AsyncClient, url: str, users: list[dict], concurrency: int, total: int) -> tuple[list[float], int]:
+    latencies: list[float] = []
+    errors = 0
+    remaining = total
+    rotation = itertools.cycle(users)
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            headers = next(rotation)
+            started = time.perf_counter()
+            try:
+                response = await client.get(url, headers=headers)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors
+
+async def main(args: argparse.Namespace):
+    targets = dict(target.split("=", 1) for target in args.target)
+    emulated = dict(item.split("=", 1) for item in args.emulate)
+    users = {label: user_headers(args.users, emulated.get(label)) for label in targets}
+    results = {label: {"latencies": [], "errors": 0, "seconds": 0.0} for label in targets}
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+        # Warm-up also fills the gateway's token cache once per user
+        for label, url in targets.items():
+            await run_round(client, url, users[label], args.concurrency, max(args.warmup, args.users))
+
+        per_round = args.requests // args.rounds
+        for _ in range(args.rounds):
+            for label, url in targets.items():
+                started = time.perf_counter()
+                latencies, errors = await run_round(client, url, users[label], args.concurrency, per_round)
+                results[label]["seconds"] += time.perf_counter() - started
+                results[label]["latencies"] += latencies
+                results[label]["errors"] += errors
+
+    print(f"{'target':<12} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}")
+    for label, result in results.items():
+        latencies = result["latencies"]
+        print(
+            f"{label:<12} {len(latencies):>9} {result['errors']:>7} {len(latencies) / result['seconds']:>9.1f} "
+            f"{percentile(latencies, 50) * 1000:>8.2f} {percentile(latencies, 90) * 1000:>8.2f} "
+            f"{percentile(latencies, 99) * 1000:>8.2f}"
+        )
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Gateway auth modes load test")
+    parser.add_argument("--target", action="append", required=True, help="LABEL=URL; repeat per mode")
+    parser.add_argument("--emulate", action="append", default=[], help="LABEL=SECRET: send gateway identity headers")
+    parser.add_argument("--users", type=int, default=200, help="Distinct tokens to rotate over")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=10000, help="Requests per target")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
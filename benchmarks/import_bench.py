@@ -0,0 +1,89 @@
+"""Employee import benchmark: bulk CSV import vs. one create_employee per row.
+
+Runs against a dataset made by datagen.py (departments must exist). Each run
+imports under a fresh employee ID prefix and leaves the rows in place; rerun
+datagen.py to reset.
+
+    python benchmarks/import_bench.py --database-url postgresql://... --rows 50000
+"""
+import argparse
+import asyncio
+import csv
+import io
+import os
+import time
+
+from datagen import generate_employees
+from app.schemas.user import EmployeeCreate
+from app.services.user_service import UserService
+from shared.database.base import get_async_database_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+COLUMNS = [
+    "employee_id", "first_name", "last_name", "email", "phone", "date_of_birth",
+    "position", "hire_date", "salary", "department_id", "manager_employee_id",
+]
+
+def build_rows(count: int, departments: int, prefix: str) -> list[dict]:
+    rows = []
+    for employee in generate_employees(count, departments, seed=7):
+        index = employee["id"]
+        manager = employee["manager_id"]
+        rows.append({
+            **{column: employee.get(column) for column in COLUMNS},
+            "employee_id": f"{prefix}{index:07d}",
+            "email": f"{prefix.lower()}{index}@import.example.com",
+            "manager_employee_id": f"{prefix}{manager:07d}" if manager else None,
+        })
+    return rows
+
+def to_csv(rows: list[dict]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=COLUMNS)
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+async def chunked(data: bytes, chunk_size: int = 64 * 1024):
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+
+async def run(args: argparse.Namespace):
+    engine = create_async_engine(get_async_database_url(args.database_url))
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    run_id = f"{int(time.time()) % 100000:05d}"
+    try:
+        async with session_factory() as db:
+            service = UserService(db)
+
+            # Row-at-a-time baseline through create_employee
+            rows = build_rows(args.baseline_rows, args.departments, f"R{run_id}")
+            started = time.perf_counter()
+            for row in rows:
+                row = {key: value for key, value in row.items() if key != "manager_employee_id" and value is not None}
+                await service.create_employee(EmployeeCreate(**row))
+            baseline = args.baseline_rows / (time.perf_counter() - started)
+            print(f"create_employee: {baseline:>9.0f} rows/s ({args.baseline_rows} rows)")
+
+            data = to_csv(build_rows(args.rows, args.departments, f"B{run_id}"))
+            started = time.perf_counter()
+            result = await service.import_employees(chunked(data), "csv")
+            elapsed = time.perf_counter() - started
+            print(f"bulk import:     {args.rows / elapsed:>9.0f} rows/s ({result.imported} imported, "
+                  f"{result.failed} failed, {len(data) / 1e6:.1f} MB in {elapsed:.2f}s)")
+            print(f"speedup:         {args.rows / elapsed / baseline:>9.1f}x")
+    finally:
+        await engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Employee import benchmark")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", "sqlite:///./bench.db"))
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--baseline-rows", type=int, default=500)
+    parser.add_argument("--departments", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""HTTP load generator for the HRSOFT services.
+
+Drives an endpoint at several concurrency levels and reports throughput and
+latency percentiles. Results can be saved and compared, e.g. before and after
+a change:
+
+    python benchmarks/load_test.py --url http://localhost:8002/users/employees/ \
+        --login-url http://localhost:8001/auth/login --username admin --password admin \
+        --concurrency 1 10 100 --output before.json
+
+    python benchmarks/load_test.py ... --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Optional
+
+import httpx
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+async def login(client: httpx.AsyncClient, login_url: str, username: str, password: str) -> str:
+    """Obtain an access token from the auth service"""
+    response = await client.post(login_url, json={"username": username, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+async def run_level(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    concurrency: int,
+    total_requests: int,
+    headers: dict,
+    body: Optional[dict] = None
+) -> dict:
+    """Issue ``total_requests`` requests with ``concurrency`` clients in flight"""
+    latencies: list[float] = []
+    errors = 0
+    remaining = total_requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, headers=headers, json=body)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+    }
+
+def print_results(results: list[dict], baseline: Optional[list[dict]] = None):
+    """Print a result table, with the change against a baseline when given"""
+    by_concurrency = {row["concurrency"]: row for row in baseline or []}
+    print(f"{'clients':>8} {'requests':>9} {'errors':>7} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'vs base':>9}")
+    for row in results:
+        base = by_concurrency.get(row["concurrency"])
+        delta = f"{row['rps'] / base['rps']:.2f}x" if base and base["rps"] else "-"
+        print(
+            f"{row['concurrency']:>8} {row['requests']:>9} {row['errors']:>7} {row['rps']:>10.1f} "
+            f"{row['p50_ms']:>9.2f} {row['p99_ms']:>9.2f} {delta:>9}"
+        )
+
+async def main(args: argparse.Namespace):
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+        headers = {}
+        token = args.token
+        if not token and args.login_url:
+            token = await login(client, args.login_url, args.username, args.password)
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+
+        body = json.loads(args.body) if args.body else None
+        if args.warmup:
+            await run_level(client, args.method, args.url, 1, args.warmup, headers, body)
+
+        results = []
+        for concurrency in args.concurrency:
+            results.append(await run_level(client, args.method, args.url, concurrency, args.requests, headers, body))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)["results"]
+    print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump({"url": args.url, "method": args.method, "results": results}, handle, indent=2)
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="HRSOFT HTTP load generator")
+    parser.add_argument("--url", required=True, help="Endpoint to load")
+    parser.add_argument("--method", default="GET")
+    parser.add_argument("--body", help="JSON request body")
+    parser.add_argument("--token", help="Bearer token to send")
+    parser.add_argument("--login-url", help="Auth service login URL used to obtain a token")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,72 @@
+"""Login storm vs. token validation latency.
+
+Runs ``--logins`` concurrent login loops against the auth service while a
+single prober calls ``/auth/me`` and records its latency. With bcrypt on the
+event loop the prober stalls behind every login; with the hashing pool it
+should stay close to its idle latency.
+
+    python benchmarks/login_storm.py --base-url http://localhost:8001 \
+        --username admin --password admin --logins 50 --duration 20
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from load_test import login, percentile
+
+async def login_loop(client: httpx.AsyncClient, url: str, credentials: dict, stop_at: float, counters: dict):
+    while time.perf_counter() < stop_at:
+        response = await client.post(url, json=credentials)
+        key = "logins_ok" if response.status_code == 200 else f"logins_{response.status_code}"
+        counters[key] = counters.get(key, 0) + 1
+
+async def probe_loop(client: httpx.AsyncClient, url: str, headers: dict, stop_at: float, interval: float) -> list[float]:
+    latencies = []
+    while time.perf_counter() < stop_at:
+        started = time.perf_counter()
+        await client.get(url, headers=headers)
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+    return latencies
+
+async def measure(client: httpx.AsyncClient, args: argparse.Namespace, headers: dict, logins: int) -> tuple[list[float], dict]:
+    credentials = {"username": args.username, "password": args.password}
+    stop_at = time.perf_counter() + args.duration
+    counters: dict = {}
+    login_tasks = [
+        asyncio.create_task(login_loop(client, f"{args.base_url}/auth/login", credentials, stop_at, counters))
+        for _ in range(logins)
+    ]
+    latencies = await probe_loop(client, f"{args.base_url}/auth/me", headers, stop_at, args.probe_interval)
+    await asyncio.gather(*login_tasks)
+    return latencies, counters
+
+async def main(args: argparse.Namespace):
+    limits = httpx.Limits(max_connections=args.logins + 10)
+    async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+        token = await login(client, f"{args.base_url}/auth/login", args.username, args.password)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        print(f"{'phase':>8} {'probes':>7} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}  logins")
+        for phase, logins in (("idle", 0), ("storm", args.logins)):
+            latencies, counters = await measure(client, args, headers, logins)
+            print(
+                f"{phase:>8} {len(latencies):>7} {percentile(latencies, 50) * 1000:>9.2f} "
+                f"{percentile(latencies, 99) * 1000:>9.2f} {max(latencies) * 1000:>9.2f}  {counters or '-'}"
+            )
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Concurrent logins vs /auth/me latency")
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin")
+    parser.add_argument("--logins", type=int, default=50, help="Concurrent login loops during the storm")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per phase")
+    parser.add_argument("--probe-interval", type=float, default=0.01)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,83 @@
+"""Per-request cost of the metrics middleware.
+
+Drives a minimal FastAPI app through ASGI directly (no sockets) with and
+without MetricsMiddleware, and reports the difference per request:
+
+    python benchmarks/metrics_overhead.py --requests 20000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from shared.observability.exposition import render_prometheus
+from shared.observability.middleware import MetricsMiddleware, RequestMetrics
+
+def build_app(metrics: RequestMetrics = None) -> FastAPI:
+    app = FastAPI()
+    if metrics is not None:
+        app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return PlainTextResponse("ok")
+
+    return app
+
+async def drive(app, requests: int) -> float:
+    """Seconds per request for ``requests`` sequential GETs"""
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    def scope(index: int) -> dict:
+        return {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": f"/items/{index}", "raw_path": f"/items/{index}".encode(),
+            "root_path": "", "query_string": b"", "headers": [], "server": ("test", 80),
+        }
+
+    for index in range(500):
+        await app(scope(index), receive, send)
+    started = time.perf_counter()
+    for index in range(requests):
+        await app(scope(index), receive, send)
+    return (time.perf_counter() - started) / requests
+
+async def run(args: argparse.Namespace):
+    metrics = RequestMetrics()
+    plain, instrumented = build_app(), build_app(metrics)
+    best_plain = best_instrumented = float("inf")
+    for _ in range(args.rounds):
+        best_plain = min(best_plain, await drive(plain, args.requests))
+        best_instrumented = min(best_instrumented, await drive(instrumented, args.requests))
+
+    overhead = (best_instrumented - best_plain) * 1e6
+    print(f"without middleware: {best_plain * 1e6:7.1f} us/request")
+    print(f"with middleware:    {best_instrumented * 1e6:7.1f} us/request")
+    print(f"overhead:           {overhead:7.1f} us/request (budget {args.budget_us:.0f} us)")
+
+    started = time.perf_counter()
+    body = render_prometheus("bench", metrics)
+    print(f"/metrics render:    {(time.perf_counter() - started) * 1e3:7.2f} ms, {len(body)} bytes")
+    if overhead > args.budget_us:
+        sys.exit(1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Metrics middleware overhead benchmark")
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--budget-us", type=float, default=50.0)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Payroll run benchmark: one monthly cycle over the whole datagen roster.
+
+Sets up a typical component mix once (allowances, a bonus for some
+employees, insurance and tax deductions, employer contributions), runs the
+same cycle with each ``--workers`` value and deletes it afterwards.
+Attendance already in the database for that month (see attendance_bench.py)
+is taken into account.
+
+    python benchmarks/payroll_bench.py --database-url postgresql://... --workers 1 4
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "services", "user-service"))
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from shared.config.settings import get_settings
+from shared.database.base import get_async_database_url
+from app.models.attendance import AttendanceRecord
+from app.models.payroll import SalaryComponent, EmployeeSalaryStructure, PayrollCycle
+from app.models.user import Employee
+from app.services.payroll import PayrollEngine, PayrollPolicy
+
+# code: (type, category, calculation_type, calculation_base, default_value, default_percentage, is_mandatory)
+COMPONENTS = {
+    "BENCH_LUNCH": ("EARNING", "ALLOWANCE", "FIXED", "BASIC_SALARY", 730_000_00, None, True),
+    "BENCH_PHONE": ("EARNING", "ALLOWANCE", "FIXED", "BASIC_SALARY", 200_000_00, None, False),
+    "BENCH_BONUS": ("EARNING", "BONUS", "PERCENTAGE", "BASIC_SALARY", 0, Decimal("10.00"), False),
+    "BENCH_SOCIAL": ("DEDUCTION", "INSURANCE", "PERCENTAGE", "BASIC_SALARY", 0, Decimal("8.00"), True),
+    "BENCH_HEALTH": ("DEDUCTION", "INSURANCE", "PERCENTAGE", "BASIC_SALARY", 0, Decimal("1.50"), True),
+    "BENCH_TAX": ("DEDUCTION", "TAX", "PERCENTAGE", "GROSS_SALARY", 0, Decimal("10.00"), True),
+    "BENCH_EMPLOYER": ("BENEFIT", "INSURANCE", "PERCENTAGE", "BASIC_SALARY", 0, Decimal("17.50"), True),
+}
+
+async def set_up(session_factory, start: date, share: float, seed: int):
+    """Components, and assignments of the optional ones to ``share`` of employees"""
+    async with session_factory() as db:
+        existing = set((await db.scalars(select(SalaryComponent.code).where(SalaryComponent.code.in_(COMPONENTS)))).all())
+        if existing == set(COMPONENTS):
+            return
+        for code, (kind, category, calculation, base, value, percentage, mandatory) in COMPONENTS.items():
+            if code not in existing:
+                db.add(SalaryComponent(
+                    name=code.title(), code=code, type=kind, category=category, calculation_type=calculation,
+                    calculation_base=base, default_value=value, default_percentage=percentage, is_mandatory=mandatory
+                ))
+        await db.commit()
+
+        optional = (await db.execute(
+            select(SalaryComponent.id, SalaryComponent.code).where(SalaryComponent.code.in_(["BENCH_PHONE", "BENCH_BONUS"]))
+        )).all()
+        employee_ids = (await db.scalars(select(Employee.id).where(Employee.is_active.is_(True)))).all()
+        rng = random.Random(seed)
+        rows = [
+            {
+                "employee_id": employee_id, "salary_component_id": component_id,
+                "amount": 300_000_00 if code == "BENCH_PHONE" else 0,
+                "percentage": Decimal(rng.choice(["5.00", "10.00", "15.00"])) if code == "BENCH_BONUS" else None,
+                "effective_date": start - timedelta(days=rng.randrange(1, 365)), "is_active": True,
+            }
+            for component_id, code in optional
+            for employee_id in employee_ids if rng.random() < share
+        ]
+        for first in range(0, len(rows), 10000):
+            await db.execute(insert(EmployeeSalaryStructure), rows[first:first + 10000])
+        await db.commit()
+        print(f"Assigned {len(rows)} optional components")
+
+async def run(args: argparse.Namespace):
+    engine = create_async_engine(get_async_database_url(args.database_url))
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with session_factory() as db:
+        latest = await db.scalar(select(func.max(AttendanceRecord.attendance_date)))
+        employees = await db.scalar(select(func.count()).select_from(Employee).where(Employee.is_active.is_(True)))
+    month = (latest or date.today()).replace(day=1)
+    end = (month + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    await set_up(session_factory, month, args.share, args.seed)
+
+    async with session_factory() as db:
+        cycle = PayrollCycle(name=f"Bench {month:%Y-%m}", start_date=month, end_date=end, pay_date=end)
+        db.add(cycle)
+        await db.commit()
+        cycle_id = cycle.id
+    print(f"{employees} active employees, cycle {month:%Y-%m}")
+
+    policy = PayrollPolicy.from_settings(get_settings())
+    for workers in args.workers:
+        async with session_factory() as db:
+            started = time.perf_counter()
+            result = await PayrollEngine(db, policy, workers=workers, database_url=args.database_url).run(cycle_id)
+            seconds = time.perf_counter() - started
+        print(
+            f"workers {workers:>2}  {seconds:>7.2f}s  {result.total_employees / seconds:>9.0f} employees/s  "
+            f"net {result.total_net_amount / 100:,.2f}"
+        )
+
+    # Records and details go with the cycle (ON DELETE CASCADE)
+    async with session_factory() as db:
+        await db.execute(delete(PayrollCycle).where(PayrollCycle.id == cycle_id))
+        await db.commit()
+    await engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Payroll run benchmark")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", "sqlite:///./bench.db"))
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4], help="Worker processes per run")
+    parser.add_argument("--share", type=float, default=0.2, help="Employees given each optional component")
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
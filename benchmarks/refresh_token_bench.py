@@ -0,0 +1,184 @@
+"""Refresh-token lookup benchmark at scale (PostgreSQL).
+
+Fills ``refresh_tokens`` with synthetic digests and a copy of the previous
+schema (the full JWT in a unique ``String(500)``) with the same tokens,
+then times the revocation check and the whole refresh for:
+
+- the previous schema: lookup by the full token string;
+- the digest column (``refresh_token_revocation_backend=database``);
+- the in-memory and Redis revocation sets.
+
+    python benchmarks/refresh_token_bench.py --database-url postgresql://... --populate --tokens 10000000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "services", "auth-service"))
+
+from sqlalchemy import (
+    Boolean, Column, DateTime, Integer, MetaData, String, Table, create_engine, insert, select, text
+)
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.sql import func
+from shared.auth.jwt_handler import create_refresh_token, decode_token
+from shared.auth.revocation import MemoryRevocationSet, RedisRevocationSet, token_digest
+from shared.cache.backends import RedisBackend
+from shared.database.base import Base, get_async_database_url
+from app.models.auth import RefreshToken, User
+from app.services.auth_service import AuthService
+from app.services.refresh_tokens import purge_expired_tokens
+
+# The refresh_tokens table before digests, kept for comparison
+legacy_metadata = MetaData()
+legacy_tokens = Table(
+    "refresh_tokens_legacy", legacy_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("token", String(500), unique=True, index=True, nullable=False),
+    Column("user_id", String(50), nullable=False),
+    Column("is_revoked", Boolean, default=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("updated_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+# JWT-shaped strings: a shared header, a base64 payload and a signature
+SYNTHETIC_TOKEN = (
+    "'eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.' || "
+    "replace(encode(convert_to('{\"sub\":\"' || (i % 100000) || '\",\"exp\":' || (1800000000 + i) || "
+    "',\"type\":\"refresh\",\"jti\":\"' || md5(i::text) || '\"}', 'UTF8'), 'base64'), E'\\n', '') || "
+    "'.' || md5('s' || i) || md5('t' || i)"
+)
+
+def populate(database_url: str, tokens: int, chunk: int = 1_000_000):
+    """Create both tables and fill them server-side; 10% of digests are expired"""
+    engine = create_engine(database_url)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS refresh_tokens, refresh_tokens_legacy"))
+    Base.metadata.create_all(engine, tables=[User.__table__, RefreshToken.__table__])
+    legacy_metadata.create_all(engine)
+
+    for first in range(1, tokens + 1, chunk):
+        last = min(first + chunk - 1, tokens)
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"INSERT INTO refresh_tokens_legacy (token, user_id, is_revoked) "
+                f"SELECT {SYNTHETIC_TOKEN}, (i % 100000)::text, false FROM generate_series(:first, :last) i"
+            ), {"first": first, "last": last})
+            conn.execute(text(
+                f"INSERT INTO refresh_tokens (token_hash, user_id, is_revoked, expires_at) "
+                f"SELECT sha256(convert_to({SYNTHETIC_TOKEN}, 'UTF8')), (i % 100000)::text, false, "
+                f"now() + ((i % 100) - 10) * interval '1 day' FROM generate_series(:first, :last) i"
+            ), {"first": first, "last": last})
+        print(f"  {last:>10} tokens ({time.perf_counter() - started:.1f}s)")
+
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE refresh_tokens; ANALYZE refresh_tokens_legacy"))
+    engine.dispose()
+
+def table_sizes(database_url: str):
+    engine = create_engine(database_url)
+    with engine.connect() as conn:
+        for table in ("refresh_tokens_legacy", "refresh_tokens"):
+            heap, indexes = conn.execute(text(
+                "SELECT pg_relation_size(:table), pg_indexes_size(:table)"
+            ), {"table": table}).one()
+            print(f"{table:<24} heap {heap / 2**20:>7.0f} MB   indexes {indexes / 2**20:>7.0f} MB")
+    engine.dispose()
+
+def summary(label: str, samples: list[float]):
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{label:<36} p50 {statistics.median(samples) * 1e6:>7.0f} us   p99 {p99 * 1e6:>7.0f} us")
+
+async def timed(call, tokens: list[str]) -> list[float]:
+    for token in tokens[:50]:
+        await call(token)
+    samples = []
+    for token in tokens:
+        started = time.perf_counter()
+        await call(token)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+async def run(args: argparse.Namespace):
+    engine = create_async_engine(get_async_database_url(args.database_url), pool_size=1)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    # Real refresh tokens for one user, stored in both tables
+    async with session_factory() as db:
+        user = User(username=f"bench{time.time_ns()}", email=f"bench{time.time_ns()}@example.com",
+                    full_name="Bench", hashed_password="x", permissions=["user"])
+        db.add(user)
+        await db.flush()
+        tokens = [create_refresh_token({"sub": str(user.id)}) for _ in range(args.samples)]
+        await db.execute(insert(legacy_tokens), [{"token": token, "user_id": str(user.id)} for token in tokens])
+        await db.execute(insert(RefreshToken), [
+            {
+                "token_hash": token_digest(token),
+                "user_id": str(user.id),
+                "expires_at": datetime.fromtimestamp(decode_token(token)["exp"], timezone.utc),
+            }
+            for token in tokens
+        ])
+        await db.commit()
+
+    revocation_sets = [("memory", MemoryRevocationSet())]
+    if args.redis_url:
+        revocation_sets.append(("redis", RedisRevocationSet(RedisBackend(args.redis_url), "bench:")))
+
+    async with session_factory() as db:
+        async def legacy_lookup(token: str):
+            return (await db.execute(select(legacy_tokens).where(
+                legacy_tokens.c.token == token, legacy_tokens.c.is_revoked == False
+            ))).first()
+
+        summary("check: previous schema (String(500))", await timed(legacy_lookup, tokens))
+        service = AuthService(db, None)
+        summary("check: digest column", await timed(service._is_refresh_token_active, tokens))
+        for name, revocations in revocation_sets:
+            summary(f"check: {name} revocation set",
+                    await timed(AuthService(db, revocations)._is_refresh_token_active, tokens))
+
+        summary("refresh: digest column", await timed(service.refresh_access_token, tokens))
+        for name, revocations in revocation_sets:
+            summary(f"refresh: {name} revocation set",
+                    await timed(AuthService(db, revocations).refresh_access_token, tokens))
+
+    for name, revocations in revocation_sets:
+        await revocations.close()
+
+    if args.purge:
+        async with session_factory() as db:
+            started = time.perf_counter()
+            purged = await purge_expired_tokens(db, args.purge_batch_size)
+            elapsed = time.perf_counter() - started
+        print(f"purge: {purged} expired tokens in {elapsed:.1f}s ({purged / elapsed:.0f} rows/s)")
+    await engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh token store benchmark")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"), required="DATABASE_URL" not in os.environ)
+    parser.add_argument("--tokens", type=int, default=10_000_000)
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--redis-url", default=os.environ.get("REDIS_URL"))
+    parser.add_argument("--populate", action="store_true", help="Generate the token tables first")
+    parser.add_argument("--purge", action="store_true", help="Also time purging the expired 10%%")
+    parser.add_argument("--purge-batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    if args.populate:
+        started = time.perf_counter()
+        populate(args.database_url, args.tokens)
+        print(f"Generated {args.tokens} tokens per table in {time.perf_counter() - started:.0f}s")
+    table_sizes(args.database_url)
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
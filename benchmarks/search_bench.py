@@ -0,0 +1,77 @@
+"""Employee search benchmark: indexed full-text vs. four-way ILIKE.
+
+    python benchmarks/search_bench.py --database-url postgresql://... --employees 500000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from sqlalchemy import select, or_
+
+from datagen import populate
+from app.models.user import Employee
+from app.services.user_service import UserService
+from shared.database.base import get_async_database_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+TERMS = ["ng", "ngu", "nguyen", "nguyen mi", "tran thanh", "emp00123", "linh.le", "smith"]
+
+def legacy_filter(search: str):
+    """The original substring filter, for comparison"""
+    return or_(
+        Employee.first_name.ilike(f"%{search}%"),
+        Employee.last_name.ilike(f"%{search}%"),
+        Employee.email.ilike(f"%{search}%"),
+        Employee.employee_id.ilike(f"%{search}%")
+    )
+
+async def time_it(func, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+async def run(args: argparse.Namespace):
+    engine = create_async_engine(get_async_database_url(args.database_url))
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    print(f"{'term':>12} {'legacy ms':>10} {'indexed ms':>11} {'speedup':>8} {'hits':>7}")
+    async with session_factory() as db:
+        service = UserService(db)
+        for term in TERMS:
+            async def legacy():
+                result = await db.scalars(
+                    select(Employee).where(legacy_filter(term)).order_by(Employee.id).limit(args.page_size)
+                )
+                return result.all()
+
+            async def indexed():
+                return await service.list_employees(page_size=args.page_size, search=term, count="none")
+
+            await indexed()
+            legacy_ms = statistics.median(await time_it(legacy, args.repeat))
+            indexed_ms = statistics.median(await time_it(indexed, args.repeat))
+            hits = len((await indexed()).employees)
+            print(f"{term:>12} {legacy_ms:>10.2f} {indexed_ms:>11.2f} {legacy_ms / indexed_ms:>7.1f}x {hits:>7}")
+    await engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Employee search benchmark")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", "sqlite:///./bench.db"))
+    parser.add_argument("--employees", type=int, default=500_000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--skip-populate", action="store_true", help="Reuse an existing dataset")
+    args = parser.parse_args()
+
+    if not args.skip_populate:
+        elapsed = populate(args.database_url, args.employees)
+        print(f"Generated {args.employees} employees in {elapsed:.1f}s")
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Employee list serialization benchmark.
+
+Times one page of ``GET /users/employees/`` per path:
+
+- previous: ORM entities with their department, ``EmployeeResponse.from_orm``
+  per row, then FastAPI's response_model validation and JSON encoding;
+- fast: response columns only, rows to dicts, orjson without re-validation.
+
+Each path is timed for serialization alone (rows already fetched) and for
+fetch plus serialization. The database is filled with ``--employees`` rows
+unless it already has them.
+
+    python benchmarks/serialization_bench.py --database-url postgresql://... --page-size 100
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "services", "user-service"))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import joinedload
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from shared.database.base import Base, get_async_database_url
+from shared.utils.responses import FastJSONResponse
+from app.main import app
+from app.models.user import Department, Employee
+from app.schemas.user import EmployeeListResponse, EmployeeResponse
+from app.services.user_service import EMPLOYEE_LIST_COLUMNS, DEPARTMENT_LIST_COLUMNS, UserService, _employee_row
+
+def populate(database_url: str, employees: int, departments: int = 20):
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine, tables=[Department.__table__, Employee.__table__])
+    with engine.begin() as conn:
+        if conn.scalar(select(func.count()).select_from(Employee)) >= employees:
+            return
+        first = conn.scalar(select(func.coalesce(func.max(Employee.id), 0))) + 1
+        if not conn.scalar(select(func.count()).select_from(Department)):
+            conn.execute(insert(Department), [{"name": f"Department {i}", "is_active": True} for i in range(departments)])
+        department_ids = conn.scalars(select(Department.id)).all()
+        conn.execute(insert(Employee), [
+            {
+                "employee_id": f"SER{i:07d}", "first_name": f"First{i}", "last_name": f"Last{i}",
+                "email": f"ser{i}@example.com", "phone": "0900000000", "position": "Engineer",
+                "salary": 1_000_000 + i, "is_active": True,
+                "department_id": department_ids[i % len(department_ids)] if i % 10 else None,
+            }
+            for i in range(first, first + employees)
+        ])
+    engine.dispose()
+
+def response_field():
+    route = next(
+        route for route in app.routes
+        if getattr(route, "path", None) == "/users/employees/" and "GET" in route.methods
+    )
+    return route.secure_cloned_response_field
+
+async def previous_serialize(employees, field) -> bytes:
+    page = EmployeeListResponse(
+        employees=[EmployeeResponse.from_orm(employee) for employee in employees],
+        total=None, page=1, page_size=len(employees)
+    )
+    content = await serialize_response(field=field, response_content=page)
+    return JSONResponse(content).body
+
+def fast_serialize(rows) -> bytes:
+    return FastJSONResponse({
+        "employees": [_employee_row(row) for row in rows],
+        "total": None, "page": 1, "page_size": len(rows), "total_pages": None, "next_cursor": None,
+    }).body
+
+async def timed(call, runs: int) -> list[float]:
+    for _ in range(5):
+        await call()
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+def summary(label: str, samples: list[float]):
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{label:<40} p50 {statistics.median(samples) * 1e3:>7.2f} ms   p99 {p99 * 1e3:>7.2f} ms")
+
+async def run(args: argparse.Namespace):
+    engine = create_async_engine(get_async_database_url(args.database_url))
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    field = response_field()
+
+    entity_query = (
+        select(Employee).options(joinedload(Employee.department)).order_by(Employee.id).limit(args.page_size)
+    )
+    column_query = (
+        select(*EMPLOYEE_LIST_COLUMNS, *(column.label(f"department_{column.key}") for column in DEPARTMENT_LIST_COLUMNS))
+        .outerjoin(Department, Department.id == Employee.department_id)
+        .order_by(Employee.id).limit(args.page_size)
+    )
+
+    async with session_factory() as db:
+        employees = (await db.scalars(entity_query)).all()
+        rows = (await db.execute(column_query)).all()
+        assert (await previous_serialize(employees, field)).count(b'"employee_id"') == args.page_size
+        print(f"page of {args.page_size}: {len(await previous_serialize(employees, field))} bytes before, "
+              f"{len(fast_serialize(rows))} bytes after")
+
+        async def fast():
+            fast_serialize(rows)
+
+        summary("serialize: previous", await timed(lambda: previous_serialize(employees, field), args.runs))
+        summary("serialize: fast path", await timed(fast, args.runs))
+
+        async def previous_page():
+            db.expunge_all()
+            await previous_serialize((await db.scalars(entity_query)).all(), field)
+
+        async def fast_page():
+            page = await UserService(db).list_employee_rows(page_size=args.page_size, count="none")
+            FastJSONResponse(page).body
+
+        summary("fetch + serialize: previous", await timed(previous_page, args.runs))
+        summary("fetch + serialize: fast path", await timed(fast_page, args.runs))
+    await engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Employee list serialization benchmark")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", "sqlite:///./serialization_bench.db"))
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=300)
+    args = parser.parse_args()
+
+    populate(args.database_url, args.employees)
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
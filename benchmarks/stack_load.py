@@ -0,0 +1,248 @@
+"""Scripted load against the whole stack.
+
+Runs a weighted mix of scenarios (login, token validation, employee list,
+search and detail, bulk writes) with concurrent clients and reports
+throughput and latency per scenario. Targets are either running services:
+
+    python benchmarks/stack_load.py --auth-url http://localhost:8001 --user-url http://localhost:8002
+
+or both apps in-process on a datagen database (SQLite by default), so no
+server or container is needed:
+
+    python benchmarks/stack_load.py --in-process --employees 100000
+
+``--output`` saves the results; ``--compare`` checks them against a saved
+baseline and exits non-zero when a scenario's p50 or throughput is worse
+than ``--max-regression`` allows, so CI can fail on regressions:
+
+    python benchmarks/stack_load.py --in-process --compare benchmarks/baselines/stack_load.json
+
+Reads use the load-test user's own login. Bulk writes need HR rights, so
+they send a token minted with this environment's JWT_SECRET_KEY, which must
+match the services'.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from load_test import percentile
+from shared.auth.jwt_handler import create_access_token
+from shared.config.settings import get_settings
+
+DEFAULT_MIX = "login=1,validate=20,list=20,search=10,detail=40,write=5"
+BENCH_USER = {"username": "loadtest", "email": "loadtest@example.com", "full_name": "Load Test", "password": "loadtest-password"}
+SEARCH_TERMS = ["nguyen", "tran", "linh", "minh", "smith", "engineer", "hoa", "garcia"]
+
+class Stack:
+    """HTTP clients for the auth and user services plus the dataset size"""
+
+    def __init__(self, auth: httpx.AsyncClient, user: httpx.AsyncClient, employees: int):
+        self.auth = auth
+        self.user = user
+        self.employees = employees
+        self.headers: dict = {}
+        self.hr_headers = {"Authorization": f"Bearer {create_access_token({'sub': '1', 'permissions': ['hr', 'admin']})}"}
+        self.writes = 0
+
+    async def sign_in(self):
+        """Log in as the load-test user, registering it first if needed"""
+        response = await self.auth.post("/auth/login", json=BENCH_USER)
+        if response.status_code == 401:
+            (await self.auth.post("/auth/register", json=BENCH_USER)).raise_for_status()
+            response = await self.auth.post("/auth/login", json=BENCH_USER)
+        response.raise_for_status()
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+# Scenarios: one request each, returning the response
+async def login(stack: Stack, rng: random.Random) -> httpx.Response:
+    return await stack.auth.post("/auth/login", json=BENCH_USER)
+
+async def validate(stack: Stack, rng: random.Random) -> httpx.Response:
+    return await stack.auth.get("/auth/validate-token", headers=stack.headers)
+
+async def list_page(stack: Stack, rng: random.Random) -> httpx.Response:
+    page = rng.randrange(1, max(2, stack.employees // 100))
+    return await stack.user.get(f"/users/employees/?page={page}&page_size=100&count=none", headers=stack.headers)
+
+async def search(stack: Stack, rng: random.Random) -> httpx.Response:
+    return await stack.user.get(f"/users/employees/?search={rng.choice(SEARCH_TERMS)}&count=none", headers=stack.headers)
+
+async def detail(stack: Stack, rng: random.Random) -> httpx.Response:
+    return await stack.user.get(f"/users/employees/{rng.randrange(1, stack.employees + 1)}", headers=stack.headers)
+
+async def write(stack: Stack, rng: random.Random) -> httpx.Response:
+    """Bulk import of 100 new employees"""
+    stack.writes += 1
+    batch = f"{os.getpid()}{stack.writes:05d}{rng.randrange(10**6):06d}"
+    body = "".join(json.dumps({
+        "employee_id": f"LT{batch}{index:03d}", "first_name": "Load", "last_name": f"Test{index}",
+        "email": f"lt.{batch}.{index}@example.com", "position": "Engineer", "salary": 1_000_000,
+    }) + "\n" for index in range(100))
+    return await stack.user.post(
+        "/users/employees/bulk", content=body,
+        headers={**stack.hr_headers, "Content-Type": "application/x-ndjson"}
+    )
+
+SCENARIOS = {"login": login, "validate": validate, "list": list_page, "search": search, "detail": detail, "write": write}
+
+def parse_mix(mix: str) -> dict[str, int]:
+    weights = {}
+    for item in mix.split(","):
+        name, weight = item.split("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        weights[name] = int(weight)
+    return weights
+
+async def run_mix(stack: Stack, weights: dict[str, int], concurrency: int, total: int, seed: int) -> dict:
+    """Issue ``total`` requests drawn from the mix with ``concurrency`` clients in flight"""
+    rng = random.Random(seed)
+    names = rng.choices(list(weights), weights=list(weights.values()), k=total)
+    samples: dict[str, list[float]] = {name: [] for name in weights}
+    errors: dict[str, int] = {name: 0 for name in weights}
+    queue = iter(names)
+
+    async def worker(worker_rng: random.Random):
+        for name in queue:
+            started = time.perf_counter()
+            try:
+                response = await SCENARIOS[name](stack, worker_rng)
+                if response.status_code >= 400:
+                    errors[name] += 1
+            except httpx.HTTPError:
+                errors[name] += 1
+            samples[name].append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(random.Random(seed + index)) for index in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    results = {}
+    for name, latencies in samples.items():
+        results[name] = {
+            "requests": len(latencies),
+            "errors": errors[name],
+            "rps": len(latencies) / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+        }
+    return results
+
+def regressions(results: dict, baseline: dict, max_regression: float) -> list[str]:
+    """Scenarios whose p50 grew or throughput fell by more than ``max_regression``"""
+    failures = []
+    for name, row in results.items():
+        base = baseline.get(name)
+        if not base or not row["requests"]:
+            continue
+        if row["p50_ms"] > base["p50_ms"] * (1 + max_regression):
+            failures.append(f"{name}: p50 {base['p50_ms']:.2f} -> {row['p50_ms']:.2f} ms")
+        if row["rps"] < base["rps"] * (1 - max_regression):
+            failures.append(f"{name}: {base['rps']:.1f} -> {row['rps']:.1f} req/s")
+        if row["errors"] > base["errors"]:
+            failures.append(f"{name}: {row['errors']} errors (baseline {base['errors']})")
+    return failures
+
+def print_results(results: dict, baseline: dict = None):
+    print(f"{'scenario':<10} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'vs base':>9}")
+    for name, row in results.items():
+        base = (baseline or {}).get(name)
+        delta = f"{row['p50_ms'] / base['p50_ms']:.2f}x" if base and base["p50_ms"] else "-"
+        print(
+            f"{name:<10} {row['requests']:>9} {row['errors']:>7} {row['rps']:>9.1f} "
+            f"{row['p50_ms']:>9.2f} {row['p99_ms']:>9.2f} {delta:>9}"
+        )
+
+def in_process_stack(args: argparse.Namespace) -> Stack:
+    """Both apps behind ASGI transports on a datagen database"""
+    # Settings are loaded already; the cache is built when the services are
+    # imported below and engines on first use, so both pick these up
+    settings = get_settings()
+    settings.database_url = args.database_url
+    if "CACHE_BACKEND" not in os.environ:
+        settings.cache_backend = "memory"
+    from tests.conftest import AUTH_SERVICE, USER_SERVICE
+    from sqlalchemy import create_engine, text
+    from datagen import populate
+
+    engine = create_engine(args.database_url)
+    try:
+        with engine.connect() as conn:
+            ready = conn.scalar(text("SELECT COUNT(*) FROM employees")) >= args.employees
+    except Exception:
+        ready = False
+    engine.dispose()
+    if not ready:
+        print(f"Generating {args.employees} employees...")
+        populate(args.database_url, args.employees)
+
+    return Stack(
+        httpx.AsyncClient(app=AUTH_SERVICE["app.main"].app, base_url="http://auth", timeout=args.timeout),
+        httpx.AsyncClient(app=USER_SERVICE["app.main"].app, base_url="http://user", timeout=args.timeout),
+        args.employees
+    )
+
+async def main(args: argparse.Namespace) -> int:
+    weights = parse_mix(args.mix)
+    if args.in_process:
+        stack = in_process_stack(args)
+    else:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        stack = Stack(
+            httpx.AsyncClient(base_url=args.auth_url, limits=limits, timeout=args.timeout),
+            httpx.AsyncClient(base_url=args.user_url, limits=limits, timeout=args.timeout),
+            args.employees
+        )
+
+    async with stack.auth, stack.user:
+        await stack.sign_in()
+        if args.warmup:
+            await run_mix(stack, weights, args.concurrency, args.warmup, args.seed + 1)
+        results = await run_mix(stack, weights, args.concurrency, args.requests, args.seed)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)["results"]
+    print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump({"mix": args.mix, "concurrency": args.concurrency, "employees": args.employees, "results": results}, handle, indent=2)
+
+    if baseline:
+        failures = regressions(results, baseline, args.max_regression)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        return 1 if failures else 0
+    return 0
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="HRSOFT stack load test")
+    parser.add_argument("--auth-url", default="http://localhost:8001")
+    parser.add_argument("--user-url", default="http://localhost:8002")
+    parser.add_argument("--in-process", action="store_true", help="Run both apps in this process instead")
+    parser.add_argument("--database-url", default=os.environ.get("BENCH_DATABASE_URL", f"sqlite:///{os.path.join(ROOT, 'benchmarks', 'stack_load.db')}"))
+    parser.add_argument("--employees", type=int, default=10_000, help="Dataset size (generated when in-process)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Scenario weights, e.g. detail=40,write=5")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--compare", help="Baseline results JSON; exit 1 on regression")
+    parser.add_argument("--max-regression", type=float, default=0.3, help="Allowed fractional slowdown")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
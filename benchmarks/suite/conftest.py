@@ -0,0 +1,99 @@
+"""Fixtures for the pytest-benchmark suite.
+
+Services run against a datagen dataset: SQLite by default, or
+BENCH_DATABASE_URL (e.g. a Postgres container). BENCH_EMPLOYEES sets its
+size; the database is reused while it holds that many employees.
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+# Imported first: loads both services side by side and selects the memory cache
+from tests.conftest import AUTH_SERVICE, USER_SERVICE
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from shared.database.base import get_async_database_url, get_async_db
+from shared.cache.cache import cache
+from datagen import populate
+
+DATABASE_URL = os.environ.get("BENCH_DATABASE_URL", f"sqlite:///{os.path.join(ROOT, 'benchmarks', 'bench_suite.db')}")
+EMPLOYEES = int(os.environ.get("BENCH_EMPLOYEES", "10000"))
+
+BENCH_USER = {"username": "bench", "email": "bench@example.com", "full_name": "Bench User", "password": "bench-password"}
+
+def _dataset_ready(database_url: str, employees: int) -> bool:
+    engine = create_engine(database_url)
+    try:
+        with engine.connect() as conn:
+            return conn.scalar(text("SELECT COUNT(*) FROM employees")) == employees
+    except Exception:
+        return False
+    finally:
+        engine.dispose()
+
+@pytest.fixture(scope="session")
+def loop():
+    """One event loop for the session; benchmarks drive coroutines on it"""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+@pytest.fixture(scope="session")
+def session_factory(loop):
+    if not _dataset_ready(DATABASE_URL, EMPLOYEES):
+        populate(DATABASE_URL, EMPLOYEES)
+    engine = create_async_engine(get_async_database_url(DATABASE_URL))
+    factory = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+
+    async def register_bench_user():
+        auth_service = AUTH_SERVICE["app.services.auth_service"]
+        user_model = AUTH_SERVICE["app.models.auth"].User
+        async with factory() as db:
+            if await db.scalar(select(func.count()).select_from(user_model).where(user_model.username == BENCH_USER["username"])):
+                return
+            schemas = AUTH_SERVICE["app.schemas.auth"]
+            await auth_service.AuthService(db).register_user(schemas.UserCreate(**BENCH_USER))
+
+    loop.run_until_complete(register_bench_user())
+    yield factory
+    loop.run_until_complete(engine.dispose())
+
+@pytest.fixture
+def run(loop, session_factory):
+    """Run a coroutine function with a fresh session, returning its result"""
+    def _run(call):
+        async def with_session():
+            async with session_factory() as db:
+                return await call(db)
+        return loop.run_until_complete(with_session())
+    return _run
+
+@pytest.fixture(scope="session")
+def clients(session_factory):
+    """In-process HTTP clients for both apps, on the benchmark database"""
+    from httpx import AsyncClient
+
+    async def override_get_async_db():
+        async with session_factory() as session:
+            yield session
+
+    auth_app, user_app = AUTH_SERVICE["app.main"].app, USER_SERVICE["app.main"].app
+    for app in (auth_app, user_app):
+        app.dependency_overrides[get_async_db] = override_get_async_db
+    yield {
+        "auth": AsyncClient(app=auth_app, base_url="http://auth"),
+        "user": AsyncClient(app=user_app, base_url="http://user"),
+    }
+    for app in (auth_app, user_app):
+        app.dependency_overrides.clear()
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Every benchmark starts with an empty in-memory cache"""
+    cache.backend.clear()
@@ -0,0 +1,27 @@
+import pytest
+
+from conftest import AUTH_SERVICE, BENCH_USER
+from shared.auth.jwt_handler import create_access_token, verify_token, verify_token_cached
+
+AuthService = AUTH_SERVICE["app.services.auth_service"].AuthService
+
+def test_login(benchmark, run):
+    """Password check (bcrypt, in the hashing pool) plus token issue"""
+    async def login(db):
+        return await AuthService(db).login_user(BENCH_USER["username"], BENCH_USER["password"])
+
+    tokens = benchmark.pedantic(run, args=(login,), rounds=10, warmup_rounds=1)
+    assert tokens.access_token
+
+def test_verify_token(benchmark):
+    token = create_access_token({"sub": "1", "permissions": ["hr", "admin"]})
+    assert benchmark(verify_token, token)["sub"] == "1"
+
+def test_verify_token_cached(benchmark):
+    token = create_access_token({"sub": "1", "permissions": ["hr", "admin"]})
+    assert benchmark(verify_token_cached, token)["sub"] == "1"
+
+def test_validate_token_http(benchmark, loop, clients):
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '1', 'permissions': ['hr', 'admin']})}"}
+    response = benchmark(lambda: loop.run_until_complete(clients["auth"].get("/auth/validate-token", headers=headers)))
+    assert response.status_code == 200
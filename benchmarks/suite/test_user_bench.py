@@ -0,0 +1,87 @@
+import itertools
+import json
+
+from sqlalchemy import delete
+from conftest import EMPLOYEES, USER_SERVICE
+from shared.auth.jwt_handler import create_access_token
+from shared.cache.cache import cache
+
+UserService = USER_SERVICE["app.services.user_service"].UserService
+Employee = USER_SERVICE["app.models.user"].Employee
+user_schemas = USER_SERVICE["app.schemas.user"]
+
+HEADERS = {"Authorization": f"Bearer {create_access_token({'sub': '1', 'permissions': ['hr', 'admin']})}"}
+
+def test_list_employees_offset(benchmark, run):
+    async def page(db):
+        return await UserService(db).list_employee_rows(page=50, page_size=100)
+
+    assert len(benchmark(run, page)["employees"]) == 100
+
+def test_list_employees_cursor(benchmark, run):
+    async def first_page(db):
+        return await UserService(db).list_employee_rows(page_size=100, pagination="cursor", count="none")
+    cursor = run(first_page)["next_cursor"]
+
+    async def next_page(db):
+        return await UserService(db).list_employee_rows(page_size=100, pagination="cursor", cursor=cursor, count="none")
+
+    assert len(benchmark(run, next_page)["employees"]) == 100
+
+def test_search_employees(benchmark, run):
+    async def search(db):
+        return await UserService(db).list_employee_rows(search="nguyen", page_size=20, count="none")
+
+    assert benchmark(run, search)["employees"]
+
+def test_get_employee_detail(benchmark, run):
+    """Cache misses over the whole dataset"""
+    ids = itertools.cycle(range(1, EMPLOYEES + 1, max(1, EMPLOYEES // 997)))
+
+    async def detail(db):
+        cache.backend.clear()
+        return await UserService(db).get_employee_detail(next(ids))
+
+    assert benchmark(run, detail).id
+
+def test_list_employees_http(benchmark, loop, clients):
+    url = "/users/employees/?page=10&page_size=100&count=none"
+    response = benchmark(lambda: loop.run_until_complete(clients["user"].get(url, headers=HEADERS)))
+    assert response.status_code == 200
+
+def test_bulk_import(benchmark, run):
+    """1000-row JSONL import; every round adds new employees"""
+    rounds = itertools.count()
+
+    def body():
+        batch = next(rounds)
+        return ([json.dumps({
+            "employee_id": f"BENCH{batch:04d}{index:04d}", "first_name": "Bench", "last_name": f"Import{index}",
+            "email": f"bench.{batch}.{index}@example.com", "position": "Engineer", "salary": 1_000_000,
+        }).encode() + b"\n" for index in range(1000)],), {}
+
+    def import_rows(lines):
+        async def chunks():
+            for line in lines:
+                yield line
+
+        async def call(db):
+            return await UserService(db).import_employees(chunks(), "jsonl")
+        return run(call)
+
+    result = benchmark.pedantic(import_rows, setup=body, rounds=5)
+    assert result.imported == 1000
+
+    # Keep the dataset at its generated size so the next run reuses it
+    async def remove_imported(db):
+        await db.execute(delete(Employee).where(Employee.employee_id.like("BENCH%")))
+        await db.commit()
+    run(remove_imported)
+
+def test_update_employee(benchmark, run):
+    salaries = itertools.count(2_000_000)
+
+    async def update(db):
+        return await UserService(db).update_employee(1, user_schemas.EmployeeUpdate(salary=next(salaries)))
+
+    assert benchmark(run, update).id == 1
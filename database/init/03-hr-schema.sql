@@ -25,7 +25,9 @@ CREATE TABLE IF NOT EXISTS user_profiles (
     INDEX idx_auth_user_id (auth_user_id),
     INDEX idx_employee_code (employee_code),
     INDEX idx_name (first_name, last_name),
-    INDEX idx_deleted_at (deleted_at)
+    INDEX idx_deleted_at (deleted_at),
+    -- Directory search: word prefixes in boolean mode
+    FULLTEXT INDEX ft_user_profiles_search (first_name, last_name, employee_code)
 );
 
 -- Roles table
@@ -94,6 +94,10 @@ HAVING COUNT(*) > 1;
 -- 6. CLEANUP OLD RECORDS
 -- =============================================================================
 
+-- On PostgreSQL audit_logs and attendance_records are partitioned by month
+-- and expired months are dropped whole by shared/database/partitions.py
+-- (python -m shared.database.partitions); these DELETEs are for MySQL only.
+
 -- Delete old audit logs (older than 1 year)
 DELETE FROM hrsoft_hr.audit_logs 
 WHERE created_at < DATE_SUB(NOW(), INTERVAL 1 YEAR);
@@ -0,0 +1,85 @@
+"""Alembic environment for the schema shared by every service.
+
+Run from the repository root:
+
+    alembic upgrade head
+"""
+import importlib.util
+import os
+import sys
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from shared.config.settings import get_settings
+from shared.database.base import Base
+from shared.database.partitions import is_partition
+import shared.models.audit  # noqa: F401
+
+# Every service ships its own ``app`` package, so model modules are loaded
+# by path under unique names instead of imported
+MODEL_MODULES = {
+    "hrsoft_auth_models": "services/auth-service/app/models/auth.py",
+    "hrsoft_user_models": "services/user-service/app/models/user.py",
+    "hrsoft_attendance_models": "services/user-service/app/models/attendance.py",
+    "hrsoft_payroll_models": "services/user-service/app/models/payroll.py",
+    "hrsoft_notification_models": "services/user-service/app/models/notification.py",
+    "hrsoft_leave_models": "services/user-service/app/models/leave.py",
+}
+
+# Schema objects created by dialect-specific DDL rather than the models
+UNMAPPED_OBJECTS = {"search_vector", "ix_employees_search_vector", "ft_employees_search"}
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+def load_models():
+    for module_name, path in MODEL_MODULES.items():
+        spec = importlib.util.spec_from_file_location(module_name, os.path.join(ROOT, path))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "table" and is_partition(name):
+        return False
+    return name not in UNMAPPED_OBJECTS
+
+def database_url() -> str:
+    return config.get_main_option("sqlalchemy.url") or get_settings().database_url
+
+def run_migrations_offline():
+    """Emit SQL to stdout (``alembic upgrade head --sql``)"""
+    context.configure(
+        url=database_url(),
+        target_metadata=Base.metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    engine = create_engine(database_url(), poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=Base.metadata,
+            include_object=include_object,
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+    engine.dispose()
+
+load_models()
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
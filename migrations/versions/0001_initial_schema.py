@@ -0,0 +1,260 @@
+"""Initial schema: auth and user service tables
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+
+Databases created by the services' former ``create_all`` on startup are
+upgraded in place: run ``alembic upgrade head`` on them, do not stamp them.
+Tables that exist are kept and brought to this revision: refresh tokens
+stored in the clear are replaced by their digest and expiry, and missing
+indexes, the search column and the named departments.manager_id foreign
+key are added. Tables that do not exist, such as department_stats, are
+created. Later revisions then add row versions and the rest.
+"""
+import base64
+import hashlib
+import json
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The expression as first shipped; 0008 splits emails and employee ids
+EMPLOYEE_SEARCH_DOCUMENT = "first_name || ' ' || last_name || ' ' || email || ' ' || employee_id"
+
+def timestamps():
+    return [
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    ]
+
+# Refresh tokens rewritten per UPDATE batch when adopting a create_all schema
+TOKEN_BATCH_SIZE = 1000
+
+def existing_tables() -> set[str]:
+    """Tables already in the database; none when only emitting SQL"""
+    if op.get_context().as_sql:
+        return set()
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+def token_expiry(token: str) -> datetime:
+    """A refresh JWT's ``exp``; already expired when it cannot be read"""
+    try:
+        payload = token.split(".")[1]
+        exp = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))["exp"]
+        return datetime.fromtimestamp(exp, timezone.utc)
+    except (IndexError, KeyError, TypeError, ValueError):
+        return datetime.now(timezone.utc)
+
+def upgrade_refresh_tokens() -> None:
+    """Swap create_all's plain ``token`` column for its digest and expiry.
+
+    Digests are SHA-256 as in shared.auth.revocation.token_digest, so the
+    tokens already handed out keep working.
+    """
+    with op.batch_alter_table("refresh_tokens") as batch_op:
+        batch_op.add_column(sa.Column("token_hash", sa.LargeBinary(length=32).with_variant(mysql.BINARY(length=32), "mysql"), nullable=True))
+        batch_op.add_column(sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True))
+
+    tokens = sa.table(
+        "refresh_tokens",
+        sa.column("id", sa.Integer()),
+        sa.column("token", sa.String()),
+        sa.column("token_hash", sa.LargeBinary()),
+        sa.column("expires_at", sa.DateTime(timezone=True)),
+    )
+    rewrite = (
+        tokens.update()
+        .where(tokens.c.id == sa.bindparam("row_id"))
+        .values(token_hash=sa.bindparam("digest"), expires_at=sa.bindparam("expiry"))
+    )
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(tokens.c.id, tokens.c.token).order_by(tokens.c.id)).all()
+    for first in range(0, len(rows), TOKEN_BATCH_SIZE):
+        bind.execute(rewrite, [
+            {"row_id": row.id, "digest": hashlib.sha256(row.token.encode()).digest(), "expiry": token_expiry(row.token)}
+            for row in rows[first:first + TOKEN_BATCH_SIZE]
+        ])
+
+    with op.batch_alter_table("refresh_tokens") as batch_op:
+        batch_op.drop_index("ix_refresh_tokens_token")
+        batch_op.drop_column("token")
+        batch_op.alter_column("token_hash", existing_type=sa.LargeBinary(length=32), nullable=False)
+        batch_op.alter_column("expires_at", existing_type=sa.DateTime(timezone=True), nullable=False)
+        batch_op.create_unique_constraint("refresh_tokens_token_hash_key", ["token_hash"])
+        batch_op.create_index("ix_refresh_tokens_expires_at", ["expires_at"])
+
+def column_names(table: str) -> set[str]:
+    return {column["name"] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    existing = existing_tables()
+
+    # Auth service
+    if "users" not in existing:
+        create_users()
+    if "refresh_tokens" not in existing:
+        create_refresh_tokens()
+    elif "token" in column_names("refresh_tokens"):
+        upgrade_refresh_tokens()
+
+    create_user_service_tables(dialect, existing)
+
+def create_users() -> None:
+    op.create_table(
+        "users",
+        sa.Column("username", sa.String(length=50), nullable=False),
+        sa.Column("email", sa.String(length=100), nullable=False),
+        sa.Column("full_name", sa.String(length=100), nullable=False),
+        sa.Column("hashed_password", sa.String(length=255), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("is_superuser", sa.Boolean(), nullable=True),
+        sa.Column("permissions", sa.JSON(), nullable=True),
+        *timestamps(),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+def create_refresh_tokens() -> None:
+    op.create_table(
+        "refresh_tokens",
+        sa.Column("token_hash", sa.LargeBinary(length=32).with_variant(mysql.BINARY(length=32), "mysql"), nullable=False),
+        sa.Column("user_id", sa.String(length=50), nullable=False),
+        sa.Column("is_revoked", sa.Boolean(), nullable=True),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        *timestamps(),
+        sa.UniqueConstraint("token_hash"),
+    )
+    op.create_index("ix_refresh_tokens_id", "refresh_tokens", ["id"])
+    op.create_index("ix_refresh_tokens_expires_at", "refresh_tokens", ["expires_at"])
+
+def create_user_service_tables(dialect: str, existing: set[str]) -> None:
+    # User service. departments.manager_id and employees.department_id
+    # reference each other, so the former is added once both tables exist
+    # (SQLite cannot ALTER in constraints, but accepts the forward reference).
+    manager_fk = sa.ForeignKeyConstraint(["manager_id"], ["employees.id"], name="fk_departments_manager_id")
+    if "departments" not in existing:
+        op.create_table(
+            "departments",
+            sa.Column("name", sa.String(length=100), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("manager_id", sa.Integer(), nullable=True),
+            sa.Column("budget", sa.Integer(), nullable=True),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            *timestamps(),
+            sa.UniqueConstraint("name"),
+            *([manager_fk] if dialect == "sqlite" else []),
+        )
+        op.create_index("ix_departments_id", "departments", ["id"])
+
+    if "employees" not in existing:
+        op.create_table(
+            "employees",
+            sa.Column("employee_id", sa.String(length=20), nullable=False),
+            sa.Column("first_name", sa.String(length=50), nullable=False),
+            sa.Column("last_name", sa.String(length=50), nullable=False),
+            sa.Column("email", sa.String(length=100), nullable=False),
+            sa.Column("phone", sa.String(length=20), nullable=True),
+            sa.Column("date_of_birth", sa.Date(), nullable=True),
+            sa.Column("address", sa.Text(), nullable=True),
+            sa.Column("department_id", sa.Integer(), nullable=True),
+            sa.Column("position", sa.String(length=100), nullable=True),
+            sa.Column("hire_date", sa.Date(), nullable=True),
+            sa.Column("salary", sa.Integer(), nullable=True),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("manager_id", sa.Integer(), nullable=True),
+            *timestamps(),
+            sa.ForeignKeyConstraint(["department_id"], ["departments.id"]),
+            sa.ForeignKeyConstraint(["manager_id"], ["employees.id"]),
+        )
+        op.create_index("ix_employees_id", "employees", ["id"])
+        op.create_index("ix_employees_employee_id", "employees", ["employee_id"], unique=True)
+        op.create_index("ix_employees_email", "employees", ["email"], unique=True)
+
+    # Indexes added after the first create_all schema
+    employee_indexes = set() if "employees" not in existing else {
+        index["name"] for index in sa.inspect(op.get_bind()).get_indexes("employees")
+    }
+    for name, columns in (
+        ("ix_employees_manager_id", ["manager_id"]),
+        ("ix_employees_department_id_id", ["department_id", "id"]),
+        ("ix_employees_last_name_id", ["last_name", "id"]),
+    ):
+        if name not in employee_indexes:
+            op.create_index(name, "employees", columns)
+
+    if dialect != "sqlite":
+        # create_all gave this constraint the database's default name
+        names = set() if "departments" not in existing else {
+            foreign_key["name"] for foreign_key in sa.inspect(op.get_bind()).get_foreign_keys("departments")
+            if foreign_key["constrained_columns"] == ["manager_id"]
+        }
+        for name in names - {manager_fk.name}:
+            op.drop_constraint(name, "departments", type_="foreignkey")
+        if manager_fk.name not in names:
+            op.create_foreign_key(manager_fk.name, "departments", "employees", ["manager_id"], ["id"])
+
+    # Full-text search, maintained by the database; create_all databases
+    # made once search shipped have it already
+    employee_columns = column_names("employees") if "employees" in existing else set()
+    if dialect == "postgresql" and "search_vector" not in employee_columns:
+        op.execute(
+            "ALTER TABLE employees ADD COLUMN search_vector tsvector GENERATED ALWAYS AS "
+            f"(to_tsvector('simple'::regconfig, {EMPLOYEE_SEARCH_DOCUMENT})) STORED"
+        )
+        op.create_index("ix_employees_search_vector", "employees", ["search_vector"], postgresql_using="gin")
+    elif dialect == "mysql" and "ft_employees_search" not in employee_indexes:
+        op.create_index(
+            "ft_employees_search", "employees", ["first_name", "last_name", "email", "employee_id"],
+            mysql_prefix="FULLTEXT"
+        )
+
+    if "employee_profiles" not in existing:
+        op.create_table(
+            "employee_profiles",
+            sa.Column("employee_id", sa.Integer(), nullable=True),
+            sa.Column("bio", sa.Text(), nullable=True),
+            sa.Column("skills", sa.Text(), nullable=True),
+            sa.Column("emergency_contact_name", sa.String(length=100), nullable=True),
+            sa.Column("emergency_contact_phone", sa.String(length=20), nullable=True),
+            sa.Column("emergency_contact_relationship", sa.String(length=50), nullable=True),
+            *timestamps(),
+            sa.ForeignKeyConstraint(["employee_id"], ["employees.id"]),
+            sa.UniqueConstraint("employee_id"),
+        )
+        op.create_index("ix_employee_profiles_id", "employee_profiles", ["id"])
+
+    # Left empty for existing departments: the stats endpoint rebuilds a
+    # department's row from employees the first time it finds none
+    if "department_stats" not in existing:
+        op.create_table(
+            "department_stats",
+            sa.Column("department_id", sa.Integer(), nullable=False),
+            sa.Column("headcount", sa.Integer(), nullable=False),
+            sa.Column("active_count", sa.Integer(), nullable=False),
+            sa.Column("salary_total", sa.BigInteger(), nullable=False),
+            sa.Column("salary_count", sa.Integer(), nullable=False),
+            *timestamps(),
+            sa.ForeignKeyConstraint(["department_id"], ["departments.id"]),
+            sa.UniqueConstraint("department_id"),
+        )
+        op.create_index("ix_department_stats_id", "department_stats", ["id"])
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        op.drop_constraint("fk_departments_manager_id", "departments", type_="foreignkey")
+    for table in ("department_stats", "employee_profiles", "employees", "departments", "refresh_tokens", "users"):
+        op.drop_table(table)
@@ -0,0 +1,46 @@
+"""Attendance records, one row per employee and day
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.create_table(
+        "attendance_records",
+        sa.Column("id", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), nullable=False),
+        sa.Column("employee_id", sa.Integer(), nullable=False),
+        sa.Column("attendance_date", sa.Date(), nullable=False),
+        sa.Column("check_in_time", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("check_out_time", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("total_hours", sa.Numeric(4, 2), nullable=True),
+        sa.Column("overtime_hours", sa.Numeric(4, 2), server_default="0", nullable=False),
+        sa.Column("late_minutes", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("early_leave_minutes", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("status", sa.String(length=20), server_default="PRESENT", nullable=False),
+        sa.Column("location", sa.String(length=255), nullable=True),
+        sa.Column("ip_address", sa.String(length=45), nullable=True),
+        sa.Column("device_info", sa.Text(), nullable=True),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(["employee_id"], ["employees.id"], ondelete="CASCADE"),
+        sa.UniqueConstraint("employee_id", "attendance_date", name="uk_employee_date"),
+    )
+    op.create_index("idx_attendance_date", "attendance_records", ["attendance_date"])
+
+def downgrade() -> None:
+    op.drop_index("idx_attendance_date", table_name="attendance_records")
+    op.drop_table("attendance_records")
@@ -0,0 +1,151 @@
+"""Payroll: salary components and structures, cycles, records and details
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def timestamps():
+    return [
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    ]
+
+def big_id():
+    return sa.Column("id", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), nullable=False)
+
+def upgrade() -> None:
+    op.create_table(
+        "salary_components",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("code", sa.String(length=50), nullable=False),
+        sa.Column("type", sa.String(length=20), nullable=False),
+        sa.Column("category", sa.String(length=20), nullable=False),
+        sa.Column("calculation_type", sa.String(length=20), nullable=False),
+        sa.Column("calculation_base", sa.String(length=20), nullable=False),
+        sa.Column("default_value", sa.BigInteger(), nullable=False),
+        sa.Column("default_percentage", sa.Numeric(5, 2), nullable=True),
+        sa.Column("is_taxable", sa.Boolean(), nullable=True),
+        sa.Column("is_mandatory", sa.Boolean(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("description", sa.Text(), nullable=True),
+        *timestamps(),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("code"),
+    )
+    op.create_index("ix_salary_components_id", "salary_components", ["id"])
+
+    op.create_table(
+        "employee_salary_structures",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("employee_id", sa.Integer(), nullable=False),
+        sa.Column("salary_component_id", sa.Integer(), nullable=False),
+        sa.Column("amount", sa.BigInteger(), nullable=False),
+        sa.Column("percentage", sa.Numeric(5, 2), nullable=True),
+        sa.Column("effective_date", sa.Date(), nullable=False),
+        sa.Column("end_date", sa.Date(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("notes", sa.Text(), nullable=True),
+        *timestamps(),
+        sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(["employee_id"], ["employees.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["salary_component_id"], ["salary_components.id"], ondelete="CASCADE"),
+    )
+    op.create_index("ix_employee_salary_structures_id", "employee_salary_structures", ["id"])
+    op.create_index("ix_employee_salary_structures_salary_component_id", "employee_salary_structures", ["salary_component_id"])
+    op.create_index("idx_emp_salary_active", "employee_salary_structures", ["employee_id", "is_active"])
+    op.create_index("idx_emp_salary_dates", "employee_salary_structures", ["effective_date", "end_date"])
+
+    op.create_table(
+        "payroll_cycles",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("period_type", sa.String(length=20), nullable=False),
+        sa.Column("start_date", sa.Date(), nullable=False),
+        sa.Column("end_date", sa.Date(), nullable=False),
+        sa.Column("pay_date", sa.Date(), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("total_employees", sa.Integer(), nullable=False),
+        sa.Column("total_gross_amount", sa.BigInteger(), nullable=False),
+        sa.Column("total_net_amount", sa.BigInteger(), nullable=False),
+        sa.Column("total_deductions", sa.BigInteger(), nullable=False),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("processed_by", sa.Integer(), nullable=True),
+        sa.Column("processed_at", sa.DateTime(timezone=True), nullable=True),
+        *timestamps(),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_payroll_cycles_id", "payroll_cycles", ["id"])
+    op.create_index("ix_payroll_cycles_status", "payroll_cycles", ["status"])
+    op.create_index("idx_payroll_cycle_period", "payroll_cycles", ["start_date", "end_date"])
+
+    op.create_table(
+        "payroll_records",
+        big_id(),
+        sa.Column("payroll_cycle_id", sa.Integer(), nullable=False),
+        sa.Column("employee_id", sa.Integer(), nullable=False),
+        sa.Column("basic_salary", sa.BigInteger(), nullable=False),
+        sa.Column("gross_salary", sa.BigInteger(), nullable=False),
+        sa.Column("total_earnings", sa.BigInteger(), nullable=False),
+        sa.Column("total_deductions", sa.BigInteger(), nullable=False),
+        sa.Column("net_salary", sa.BigInteger(), nullable=False),
+        sa.Column("tax_amount", sa.BigInteger(), nullable=False),
+        sa.Column("insurance_amount", sa.BigInteger(), nullable=False),
+        sa.Column("worked_days", sa.Numeric(5, 2), nullable=False),
+        sa.Column("overtime_hours", sa.Numeric(6, 2), nullable=False),
+        sa.Column("leave_days", sa.Numeric(5, 2), nullable=False),
+        sa.Column("absent_days", sa.Numeric(5, 2), nullable=False),
+        sa.Column("payslip_number", sa.String(length=50), nullable=True),
+        sa.Column("payment_status", sa.String(length=20), nullable=False),
+        sa.Column("payment_date", sa.Date(), nullable=True),
+        *timestamps(),
+        sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(["payroll_cycle_id"], ["payroll_cycles.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["employee_id"], ["employees.id"], ondelete="CASCADE"),
+        sa.UniqueConstraint("payroll_cycle_id", "employee_id", name="uk_payroll_employee_cycle"),
+    )
+    op.create_index("idx_payroll_employee", "payroll_records", ["employee_id"])
+
+    op.create_table(
+        "payroll_details",
+        big_id(),
+        sa.Column("payroll_record_id", sa.BigInteger(), nullable=False),
+        sa.Column("salary_component_id", sa.Integer(), nullable=False),
+        sa.Column("amount", sa.BigInteger(), nullable=False),
+        sa.Column("calculation_base", sa.BigInteger(), nullable=True),
+        sa.Column("rate_percentage", sa.Numeric(5, 2), nullable=True),
+        *timestamps(),
+        sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(["payroll_record_id"], ["payroll_records.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["salary_component_id"], ["salary_components.id"], ondelete="RESTRICT"),
+    )
+    op.create_index("ix_payroll_details_payroll_record_id", "payroll_details", ["payroll_record_id"])
+
+def downgrade() -> None:
+    op.drop_index("ix_payroll_details_payroll_record_id", table_name="payroll_details")
+    op.drop_table("payroll_details")
+    op.drop_index("idx_payroll_employee", table_name="payroll_records")
+    op.drop_table("payroll_records")
+    op.drop_index("idx_payroll_cycle_period", table_name="payroll_cycles")
+    op.drop_index("ix_payroll_cycles_status", table_name="payroll_cycles")
+    op.drop_index("ix_payroll_cycles_id", table_name="payroll_cycles")
+    op.drop_table("payroll_cycles")
+    op.drop_index("idx_emp_salary_dates", table_name="employee_salary_structures")
+    op.drop_index("idx_emp_salary_active", table_name="employee_salary_structures")
+    op.drop_index("ix_employee_salary_structures_salary_component_id", table_name="employee_salary_structures")
+    op.drop_index("ix_employee_salary_structures_id", table_name="employee_salary_structures")
+    op.drop_table("employee_salary_structures")
+    op.drop_index("ix_salary_components_id", table_name="salary_components")
+    op.drop_table("salary_components")
@@ -0,0 +1,42 @@
+"""Audit log of changes to audited tables
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.create_table(
+        "audit_logs",
+        sa.Column("id", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), nullable=False),
+        sa.Column("table_name", sa.String(length=100), nullable=False),
+        sa.Column("record_id", sa.BigInteger(), nullable=False),
+        sa.Column("action", sa.String(length=10), nullable=False),
+        sa.Column("old_values", sa.JSON(), nullable=True),
+        sa.Column("new_values", sa.JSON(), nullable=True),
+        sa.Column("changed_by", sa.Integer(), nullable=True),
+        sa.Column("ip_address", sa.String(length=45), nullable=True),
+        sa.Column("user_agent", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("idx_audit_table_record", "audit_logs", ["table_name", "record_id"])
+    op.create_index("idx_audit_user", "audit_logs", ["changed_by"])
+    op.create_index("idx_audit_date", "audit_logs", ["created_at"])
+
+def downgrade() -> None:
+    op.drop_index("idx_audit_date", table_name="audit_logs")
+    op.drop_index("idx_audit_user", table_name="audit_logs")
+    op.drop_index("idx_audit_table_record", table_name="audit_logs")
+    op.drop_table("audit_logs")
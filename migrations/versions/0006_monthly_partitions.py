@@ -0,0 +1,93 @@
+"""Monthly range partitions for audit_logs and attendance_records (PostgreSQL)
+
+Each table is rebuilt partitioned by month on its date or timestamp
+column, with a partition for every month from its oldest row to two
+months ahead and a default partition; shared/database/partitions.py
+manages them from then on. Primary keys gain the partition key, as
+PostgreSQL requires. Other databases are left unpartitioned.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PREMAKE_MONTHS = 2
+
+# table: (partition key, TIMESTAMPTZ key, constraints and indexes to recreate)
+TABLES = {
+    "audit_logs": ("created_at", True, [
+        "CREATE INDEX idx_audit_table_record ON audit_logs (table_name, record_id)",
+        "CREATE INDEX idx_audit_user ON audit_logs (changed_by)",
+        "CREATE INDEX idx_audit_date ON audit_logs (created_at)",
+    ]),
+    "attendance_records": ("attendance_date", False, [
+        "ALTER TABLE attendance_records ADD CONSTRAINT uk_employee_date UNIQUE (employee_id, attendance_date)",
+        "ALTER TABLE attendance_records ADD CONSTRAINT attendance_records_employee_id_fkey "
+        "FOREIGN KEY (employee_id) REFERENCES employees (id) ON DELETE CASCADE",
+        "CREATE INDEX idx_attendance_date ON attendance_records (attendance_date)",
+    ]),
+}
+
+# Copy of shared.database.partitions.add_months (also in 0007), kept here
+# so the migration stays self-contained as the application code moves on
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def bound(month: date, timestamp: bool) -> str:
+    return f"'{month.isoformat()} 00:00:00+00'" if timestamp else f"'{month.isoformat()}'"
+
+def create_partitions(table: str, key: str, timestamp: bool, source: str):
+    utc_key = f"{key} AT TIME ZONE 'UTC'" if timestamp else key
+    oldest = op.get_bind().scalar(sa.text(f"SELECT CAST(min({utc_key}) AS date) FROM {source}"))
+    current = datetime.now(timezone.utc).date().replace(day=1)
+    month = min(oldest.replace(day=1), current) if oldest else current
+    while month <= add_months(current, PREMAKE_MONTHS):
+        op.execute(
+            f"CREATE TABLE {table}_p{month:%Y_%m} PARTITION OF {table} "
+            f"FOR VALUES FROM ({bound(month, timestamp)}) TO ({bound(add_months(month, 1), timestamp)})"
+        )
+        month = add_months(month, 1)
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+def rebuild(table: str, partitioned: bool):
+    """Recreate ``table`` with or without partitions, keeping rows, id sequence and indexes"""
+    key, timestamp, statements = TABLES[table]
+    source = f"{table}_rebuild"
+    op.execute(f"ALTER TABLE {table} RENAME TO {source}")
+    partition_by = f" PARTITION BY RANGE ({key})" if partitioned else ""
+    op.execute(f"CREATE TABLE {table} (LIKE {source} INCLUDING DEFAULTS INCLUDING CONSTRAINTS){partition_by}")
+    if partitioned:
+        create_partitions(table, key, timestamp, source)
+    op.execute(f"INSERT INTO {table} SELECT * FROM {source}")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    op.execute(f"DROP TABLE {source}")
+
+    primary_key = f"id, {key}" if partitioned else "id"
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY ({primary_key})")
+    for statement in statements:
+        op.execute(statement)
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table in TABLES:
+        rebuild(table, partitioned=True)
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table in TABLES:
+        rebuild(table, partitioned=False)
@@ -0,0 +1,68 @@
+"""Notifications, partitioned by month on PostgreSQL
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PREMAKE_MONTHS = 2
+
+# Copy of shared.database.partitions.add_months (also in 0006), kept here
+# so the migration stays self-contained as the application code moves on
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def upgrade() -> None:
+    # PostgreSQL wants the partition key in the primary key; id keeps its
+    # sequence as the first of two key columns
+    partitioned = op.get_bind().dialect.name == "postgresql"
+    op.create_table(
+        "notifications",
+        sa.Column("id", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), autoincrement=True, nullable=False),
+        sa.Column("recipient_id", sa.Integer(), nullable=False),
+        sa.Column("sender_id", sa.Integer(), nullable=True),
+        sa.Column("title", sa.String(length=255), nullable=False),
+        sa.Column("message", sa.Text(), nullable=False),
+        sa.Column("notification_type", sa.String(length=20), nullable=False),
+        sa.Column("category", sa.String(length=20), nullable=False),
+        sa.Column("entity_type", sa.String(length=100), nullable=True),
+        sa.Column("entity_id", sa.BigInteger(), nullable=True),
+        sa.Column("is_read", sa.Boolean(), nullable=False),
+        sa.Column("read_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id", "created_at") if partitioned else sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(["recipient_id"], ["employees.id"], ondelete="CASCADE"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.create_index("idx_notification_recipient", "notifications", ["recipient_id", "id"])
+    op.create_index("idx_notification_unread", "notifications", ["recipient_id", "is_read"])
+    op.create_index("idx_notification_date", "notifications", ["created_at"])
+
+    if partitioned:
+        month = datetime.now(timezone.utc).date().replace(day=1)
+        for _ in range(PREMAKE_MONTHS + 1):
+            op.execute(
+                f"CREATE TABLE notifications_p{month:%Y_%m} PARTITION OF notifications "
+                f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+            )
+            month = add_months(month, 1)
+        op.execute("CREATE TABLE notifications_default PARTITION OF notifications DEFAULT")
+
+def downgrade() -> None:
+    op.drop_index("idx_notification_date", table_name="notifications")
+    op.drop_index("idx_notification_unread", table_name="notifications")
+    op.drop_index("idx_notification_recipient", table_name="notifications")
+    op.drop_table("notifications")
@@ -0,0 +1,45 @@
+"""Split emails and employee ids into words in employees.search_vector
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+
+The text search parser keeps "john.doe@acme.com" as a single lexeme, so a
+search for "acme", or for the whole address once tokenized, found nothing.
+PostgreSQL cannot alter a generated column's expression, so the column and
+its index are rebuilt.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same expression as app.models.user.EMPLOYEE_SEARCH_DOCUMENT
+EMPLOYEE_SEARCH_DOCUMENT = (
+    "first_name || ' ' || last_name || ' ' || regexp_replace(email, '[@._+-]+', ' ', 'g') || ' ' || "
+    "regexp_replace(employee_id, '[@._+-]+', ' ', 'g')"
+)
+PREVIOUS_SEARCH_DOCUMENT = "first_name || ' ' || last_name || ' ' || email || ' ' || employee_id"
+
+def rebuild_search_vector(document: str) -> None:
+    op.drop_index("ix_employees_search_vector", table_name="employees")
+    op.drop_column("employees", "search_vector")
+    op.execute(
+        "ALTER TABLE employees ADD COLUMN search_vector tsvector GENERATED ALWAYS AS "
+        f"(to_tsvector('simple'::regconfig, {document})) STORED"
+    )
+    op.create_index("ix_employees_search_vector", "employees", ["search_vector"], postgresql_using="gin")
+
+def upgrade() -> None:
+    # MySQL's FULLTEXT parser already splits at '@' and '.'
+    if op.get_bind().dialect.name == "postgresql":
+        rebuild_search_vector(EMPLOYEE_SEARCH_DOCUMENT)
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        rebuild_search_vector(PREVIOUS_SEARCH_DOCUMENT)
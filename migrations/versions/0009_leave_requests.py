@@ -0,0 +1,72 @@
+"""Leave types and requests, read by payroll runs
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def timestamps():
+    return [
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    ]
+
+def upgrade() -> None:
+    op.create_table(
+        "leave_types",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("code", sa.String(length=50), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("days_per_year", sa.Numeric(5, 2), nullable=False),
+        sa.Column("is_paid", sa.Boolean(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        *timestamps(),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("code"),
+    )
+    op.create_index("ix_leave_types_id", "leave_types", ["id"])
+
+    op.create_table(
+        "leave_requests",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("employee_id", sa.Integer(), nullable=False),
+        sa.Column("leave_type_id", sa.Integer(), nullable=False),
+        sa.Column("start_date", sa.Date(), nullable=False),
+        sa.Column("end_date", sa.Date(), nullable=False),
+        sa.Column("total_days", sa.Numeric(5, 2), nullable=False),
+        sa.Column("reason", sa.Text(), nullable=True),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("requested_by", sa.Integer(), nullable=True),
+        sa.Column("approved_by", sa.Integer(), nullable=True),
+        sa.Column("approved_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("rejection_reason", sa.Text(), nullable=True),
+        *timestamps(),
+        sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(["employee_id"], ["employees.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["leave_type_id"], ["leave_types.id"], ondelete="RESTRICT"),
+    )
+    op.create_index("ix_leave_requests_id", "leave_requests", ["id"])
+    op.create_index("idx_leave_request_employee", "leave_requests", ["employee_id"])
+    op.create_index("idx_leave_request_dates", "leave_requests", ["start_date", "end_date"])
+    op.create_index("idx_leave_request_status", "leave_requests", ["status"])
+
+def downgrade() -> None:
+    op.drop_index("idx_leave_request_status", table_name="leave_requests")
+    op.drop_index("idx_leave_request_dates", table_name="leave_requests")
+    op.drop_index("idx_leave_request_employee", table_name="leave_requests")
+    op.drop_index("ix_leave_requests_id", table_name="leave_requests")
+    op.drop_table("leave_requests")
+    op.drop_index("ix_leave_types_id", table_name="leave_types")
+    op.drop_table("leave_types")
@@ -8,13 +8,26 @@ sys.path.append(os.path.join(os.path.dirname(__file__), "../../../"))
 
 from shared.config.settings import get_settings
 from shared.utils.logging import setup_logging
-from shared.utils.exceptions import handle_exception
+from shared.database.base import async_session, pool_stats
+from shared.observability.exposition import setup_metrics
+from shared.utils.exceptions import HRSoftException, handle_exception, hrsoft_exception_handler
 from app.routers import auth
-from app.database import create_tables
+from shared.auth.jwt_handler import password_hash_pool, token_cache
+from shared.auth.revocation import revocation_set
+from app.services.refresh_tokens import RefreshTokenPurger, load_revocations
+from shared.audit.pipeline import audit_writer
 
 settings = get_settings()
 logger = setup_logging("auth-service")
 
+# Deletes refresh tokens once they expire
+refresh_token_purger = RefreshTokenPurger(
+    async_session,
+    interval=settings.refresh_token_purge_interval,
+    batch_size=settings.refresh_token_purge_batch_size,
+    revocation_set=revocation_set
+)
+
 # Create FastAPI app
 app = FastAPI(
     title="HRSOFT Auth Service",
@@ -31,6 +44,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request, query and pool metrics served at /metrics
+setup_metrics(
+    app,
+    "auth-service",
+    collectors={
+        "password_hashing": password_hash_pool.stats,
+        "token_cache": token_cache.stats,
+        "refresh_token_purge": refresh_token_purger.stats,
+        "database_pool": lambda: pool_stats(snapshots=False),
+        "audit": lambda: audit_writer.stats(snapshots=False),
+    }
+)
+
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["authentication"])
 
@@ -38,21 +64,50 @@ app.include_router(auth.router, prefix="/auth", tags=["authentication"])
 @app.on_event("startup")
 async def startup_event():
     logger.info("Starting Auth Service...")
-    create_tables()
+    if settings.audit_enabled:
+        audit_writer.start()
+    if revocation_set is not None:
+        async with async_session() as db:
+            loaded = await load_revocations(db, revocation_set)
+        logger.info(f"Loaded {loaded} refresh token revocations")
+    refresh_token_purger.start()
     logger.info("Auth Service started successfully!")
 
+# Shutdown event
+@app.on_event("shutdown")
+async def shutdown_event():
+    logger.info("Stopping Auth Service...")
+    password_hash_pool.shutdown()
+    await refresh_token_purger.stop()
+    if revocation_set is not None:
+        await revocation_set.close()
+    await audit_writer.stop()
+
 # Health check
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "auth-service"}
+    return {
+        "status": "healthy",
+        "service": "auth-service",
+        "password_hashing": password_hash_pool.stats(),
+        "token_cache": token_cache.stats(),
+        "refresh_tokens": {
+            "purge": refresh_token_purger.stats(),
+            "revocation_set": revocation_set.stats() if revocation_set is not None else None
+        },
+        "database_pool": pool_stats(),
+        "audit": audit_writer.stats()
+    }
 
 # Root endpoint
 @app.get("/")
 async def root():
     return {"message": "HRSOFT Auth Service", "version": "1.0.0"}
 
-# Exception handler
+# Exception handlers
+app.add_exception_handler(HRSoftException, hrsoft_exception_handler)
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     logger.error(f"Global exception handler: {exc}")
-    return handle_exception(exc)
+    return await hrsoft_exception_handler(request, exc)
@@ -2,7 +2,8 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), "../../../../"))
 
-from sqlalchemy import Column, String, Boolean, JSON
+from sqlalchemy import Column, String, Boolean, JSON, DateTime, LargeBinary
+from sqlalchemy.dialects import mysql
 from shared.models.base import BaseModel
 
 class User(BaseModel):
@@ -19,6 +20,10 @@ class User(BaseModel):
 class RefreshToken(BaseModel):
     __tablename__ = "refresh_tokens"
     
-    token = Column(String(500), unique=True, index=True, nullable=False)
+    # SHA-256 of the JWT: a 32-byte key instead of a 500-character one
+    token_hash = Column(
+        LargeBinary(32).with_variant(mysql.BINARY(32), "mysql"), unique=True, nullable=False
+    )
     user_id = Column(String(50), nullable=False)
     is_revoked = Column(Boolean, default=False)
+    expires_at = Column(DateTime(timezone=True), index=True, nullable=False)  # Purged after this
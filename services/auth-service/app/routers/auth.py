@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 import sys
 import os
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "../../../../"))
 
-from shared.database.base import get_db
+from shared.database.base import get_async_db
 from shared.auth.dependencies import get_current_active_user
+from shared.auth.gateway import identity_headers
+from shared.config.settings import get_settings
 from app.schemas.auth import (
     LoginRequest, TokenResponse, RefreshTokenRequest,
     UserCreate, UserResponse, ChangePasswordRequest,
@@ -15,21 +17,22 @@ from app.schemas.auth import (
 from app.services.auth_service import AuthService
 
 router = APIRouter()
+settings = get_settings()
 
 @router.post("/register", response_model=UserResponse)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Register a new user"""
     auth_service = AuthService(db)
     return await auth_service.register_user(user_data)
 
 @router.post("/login", response_model=TokenResponse)
-async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+async def login(login_data: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     """Login user and return tokens"""
     auth_service = AuthService(db)
     return await auth_service.login_user(login_data.username, login_data.password)
 
 @router.post("/refresh", response_model=TokenResponse)
-async def refresh_token(refresh_data: RefreshTokenRequest, db: Session = Depends(get_db)):
+async def refresh_token(refresh_data: RefreshTokenRequest, db: AsyncSession = Depends(get_async_db)):
     """Refresh access token"""
     auth_service = AuthService(db)
     return await auth_service.refresh_access_token(refresh_data.refresh_token)
@@ -37,7 +40,7 @@ async def refresh_token(refresh_data: RefreshTokenRequest, db: Session = Depends
 @router.post("/logout")
 async def logout(
     refresh_data: RefreshTokenRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """Logout user and revoke refresh token"""
@@ -45,9 +48,14 @@ async def logout(
     await auth_service.logout_user(refresh_data.refresh_token)
     return {"message": "Successfully logged out"}
 
-@router.post("/validate-token", response_model=TokenValidationResponse)
-async def validate_token(current_user: dict = Depends(get_current_active_user)):
-    """Validate token and return user info"""
+@router.api_route("/validate-token", methods=["GET", "POST"], response_model=TokenValidationResponse)
+async def validate_token(response: Response, current_user: dict = Depends(get_current_active_user)):
+    """Validate token and return user info.
+
+    Also answers nginx ``auth_request`` subrequests (GET): the identity goes
+    in headers for the gateway to forward, with how long it may cache them.
+    """
+    response.headers.update(identity_headers(current_user["payload"], settings.gateway_auth_cache_ttl))
     return TokenValidationResponse(
         valid=True,
         user_id=current_user["user_id"],
@@ -57,7 +65,7 @@ async def validate_token(current_user: dict = Depends(get_current_active_user)):
 @router.post("/change-password")
 async def change_password(
     password_data: ChangePasswordRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """Change user password"""
@@ -71,7 +79,7 @@ async def change_password(
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """Get current user information"""
@@ -1,41 +1,47 @@
-from sqlalchemy.orm import Session
-from datetime import timedelta
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import logging
 import sys
 import os
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "../../../../"))
 
 from shared.auth.jwt_handler import (
-    verify_password, get_password_hash,
-    create_access_token, create_refresh_token, verify_token
+    verify_password_async, get_password_hash_async,
+    create_access_token, create_refresh_token, verify_token, decode_token
 )
+from shared.auth.revocation import RevocationSet, revocation_set, token_digest
 from shared.utils.exceptions import (
-    AuthenticationError, NotFoundError, DuplicateError, ValidationError
+    AuthenticationError, NotFoundError, DuplicateError, ValidationError, ServiceUnavailableError
 )
 from shared.config.settings import get_settings
 from app.models.auth import User, RefreshToken
 from app.schemas.auth import UserCreate, UserResponse, TokenResponse
 
 settings = get_settings()
+logger = logging.getLogger("hrsoft.auth")
 
 class AuthService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, revocations: Optional[RevocationSet] = revocation_set):
         self.db = db
+        self.revocations = revocations
 
     async def register_user(self, user_data: UserCreate) -> UserResponse:
         """Register a new user"""
         # Check if username already exists
-        existing_user = self.db.query(User).filter(User.username == user_data.username).first()
+        existing_user = await self.db.scalar(select(User).where(User.username == user_data.username))
         if existing_user:
             raise DuplicateError("Username already registered")
         
         # Check if email already exists
-        existing_email = self.db.query(User).filter(User.email == user_data.email).first()
+        existing_email = await self.db.scalar(select(User).where(User.email == user_data.email))
         if existing_email:
             raise DuplicateError("Email already registered")
         
         # Create new user
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await get_password_hash_async(user_data.password)
         db_user = User(
             username=user_data.username,
             email=user_data.email,
@@ -45,15 +51,15 @@ class AuthService:
         )
         
         self.db.add(db_user)
-        self.db.commit()
-        self.db.refresh(db_user)
+        await self.db.commit()
+        await self.db.refresh(db_user)
         
         return UserResponse.from_orm(db_user)
 
     async def login_user(self, username: str, password: str) -> TokenResponse:
         """Login user and return tokens"""
-        user = self.db.query(User).filter(User.username == username).first()
-        if not user or not verify_password(password, user.hashed_password):
+        user = await self.db.scalar(select(User).where(User.username == username))
+        if not user or not await verify_password_async(password, user.hashed_password):
             raise AuthenticationError("Incorrect username or password")
         
         if not user.is_active:
@@ -67,10 +73,14 @@ class AuthService:
         )
         refresh_token = create_refresh_token(data={"sub": str(user.id)})
         
-        # Store refresh token
-        db_refresh_token = RefreshToken(token=refresh_token, user_id=str(user.id))
+        # Store refresh token by digest, with its expiry for the purge job
+        db_refresh_token = RefreshToken(
+            token_hash=token_digest(refresh_token),
+            user_id=str(user.id),
+            expires_at=datetime.fromtimestamp(decode_token(refresh_token)["exp"], timezone.utc)
+        )
         self.db.add(db_refresh_token)
-        self.db.commit()
+        await self.db.commit()
         
         return TokenResponse(
             access_token=access_token,
@@ -85,18 +95,13 @@ class AuthService:
         if not payload or payload.get("type") != "refresh":
             raise AuthenticationError("Invalid refresh token")
         
-        # Check if token exists and is not revoked
-        db_token = self.db.query(RefreshToken).filter(
-            RefreshToken.token == refresh_token,
-            RefreshToken.is_revoked == False
-        ).first()
-        
-        if not db_token:
+        # Check that the token has not been revoked
+        if not await self._is_refresh_token_active(refresh_token):
             raise AuthenticationError("Invalid or revoked refresh token")
         
         # Get user
         user_id = payload.get("sub")
-        user = self.db.query(User).filter(User.id == int(user_id)).first()
+        user = await self.db.get(User, int(user_id))
         if not user or not user.is_active:
             raise AuthenticationError("User not found or inactive")
         
@@ -113,31 +118,54 @@ class AuthService:
             expires_in=settings.access_token_expire_minutes * 60
         )
 
+    async def _is_refresh_token_active(self, refresh_token: str) -> bool:
+        """Check revocation in the revocation set, or by digest in the database"""
+        digest = token_digest(refresh_token)
+        if self.revocations is not None:
+            try:
+                return not await self.revocations.contains(digest)
+            except Exception as exc:
+                logger.warning(f"Revocation set unavailable, checking the database: {exc}")
+        
+        token_id = await self.db.scalar(select(RefreshToken.id).where(
+            RefreshToken.token_hash == digest,
+            RefreshToken.is_revoked == False
+        ))
+        return token_id is not None
+
     async def logout_user(self, refresh_token: str):
         """Logout user by revoking refresh token"""
-        db_token = self.db.query(RefreshToken).filter(
-            RefreshToken.token == refresh_token
-        ).first()
-        
-        if db_token:
-            db_token.is_revoked = True
-            self.db.commit()
+        digest = token_digest(refresh_token)
+        if self.revocations is not None:
+            # Refresh trusts the set alone, so a revocation it missed must fail the logout
+            payload = verify_token(refresh_token)
+            if payload and payload.get("type") == "refresh":
+                try:
+                    await self.revocations.add(digest, payload["exp"])
+                except Exception as exc:
+                    logger.warning(f"Could not record revocation: {exc}")
+                    raise ServiceUnavailableError("Could not revoke refresh token")
+        
+        await self.db.execute(
+            update(RefreshToken).where(RefreshToken.token_hash == digest).values(is_revoked=True)
+        )
+        await self.db.commit()
 
     async def change_password(self, user_id: str, current_password: str, new_password: str):
         """Change user password"""
-        user = self.db.query(User).filter(User.id == int(user_id)).first()
+        user = await self.db.get(User, int(user_id))
         if not user:
             raise NotFoundError("User not found")
         
-        if not verify_password(current_password, user.hashed_password):
+        if not await verify_password_async(current_password, user.hashed_password):
             raise AuthenticationError("Incorrect current password")
         
-        user.hashed_password = get_password_hash(new_password)
-        self.db.commit()
+        user.hashed_password = await get_password_hash_async(new_password)
+        await self.db.commit()
 
     async def get_user_by_id(self, user_id: int) -> UserResponse:
         """Get user by ID"""
-        user = self.db.query(User).filter(User.id == user_id).first()
+        user = await self.db.get(User, user_id)
         if not user:
             raise NotFoundError("User not found")
         
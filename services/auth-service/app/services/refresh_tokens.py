@@ -0,0 +1,114 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Callable, Optional
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../../"))
+
+from shared.auth.revocation import RevocationSet
+from app.models.auth import RefreshToken
+
+logger = logging.getLogger("hrsoft.auth")
+
+async def purge_expired_tokens(db: AsyncSession, batch_size: int = 5000) -> int:
+    """Delete expired refresh tokens in short batches, returning how many"""
+    now = datetime.now(timezone.utc)
+    purged = 0
+    while True:
+        # Two statements keep this portable: MySQL rejects LIMIT in a
+        # subquery on the table being deleted from
+        ids = (await db.scalars(
+            select(RefreshToken.id)
+            .where(RefreshToken.expires_at <= now)
+            .order_by(RefreshToken.expires_at)
+            .limit(batch_size)
+        )).all()
+        if not ids:
+            return purged
+
+        await db.execute(delete(RefreshToken).where(RefreshToken.id.in_(ids)))
+        await db.commit()
+        purged += len(ids)
+        if len(ids) < batch_size:
+            return purged
+
+async def load_revocations(db: AsyncSession, revocation_set: RevocationSet) -> int:
+    """Copy unexpired revocations from the database into the revocation set"""
+    result = await db.stream(
+        select(RefreshToken.token_hash, RefreshToken.expires_at)
+        .where(RefreshToken.is_revoked == True, RefreshToken.expires_at > datetime.now(timezone.utc))
+        .execution_options(yield_per=5000)
+    )
+    loaded = 0
+    async for token_hash, expires_at in result:
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        await revocation_set.add(token_hash, expires_at.timestamp())
+        loaded += 1
+    return loaded
+
+class RefreshTokenPurger:
+    """Background task that periodically purges expired refresh tokens"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        interval: float,
+        batch_size: int = 5000,
+        revocation_set: Optional[RevocationSet] = None
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self.revocation_set = revocation_set
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.runs = 0
+        self.purged = 0
+        self.errors = 0
+
+    async def run_once(self) -> int:
+        async with self.session_factory() as db:
+            purged = await purge_expired_tokens(db, self.batch_size)
+        if self.revocation_set is not None:
+            self.revocation_set.purge()
+        self.runs += 1
+        self.purged += purged
+        return purged
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                purged = await self.run_once()
+                if purged:
+                    logger.info(f"Purged {purged} expired refresh tokens")
+            except Exception as exc:
+                self.errors += 1
+                logger.warning(f"Refresh token purge failed: {exc}")
+
+    def start(self):
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "interval": self.interval,
+            "runs": self.runs,
+            "purged": self.purged,
+            "errors": self.errors,
+        }
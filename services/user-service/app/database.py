@@ -2,12 +2,12 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), "../../../"))
 
-from shared.database.base import Base, engine
+from shared.database.base import Base, get_engine
 
 def create_tables():
-    """Create all tables for user service"""
-    Base.metadata.create_all(bind=engine)
+    """Create all tables for user service (tests and throwaway databases; use migrations otherwise)"""
+    Base.metadata.create_all(bind=get_engine())
 
 def drop_tables():
     """Drop all tables for user service"""
-    Base.metadata.drop_all(bind=engine)
+    Base.metadata.drop_all(bind=get_engine())
@@ -8,18 +8,31 @@ sys.path.append(os.path.join(os.path.dirname(__file__), "../../../"))
 
 from shared.config.settings import get_settings
 from shared.utils.logging import setup_logging
-from shared.utils.exceptions import handle_exception
-from app.routers import user
-from app.database import create_tables
+from shared.database.base import async_session, pool_stats
+from shared.database.partitions import RetentionScheduler, create_partition_manager
+from shared.observability.exposition import setup_metrics
+from shared.utils.exceptions import HRSoftException, handle_exception, hrsoft_exception_handler
+from shared.utils.responses import FastJSONResponse
+from app.routers import user, attendance, payroll, notification
+from app.services.attendance import attendance_buffer
+from app.services.notifications import notification_hub, unread_counter
+from shared.audit.pipeline import audit_writer
+from shared.auth.jwt_handler import token_cache
+from shared.cache.cache import cache
 
 settings = get_settings()
 logger = setup_logging("user-service")
 
+# Keeps months partitioned ahead and retires expired ones; runs in every
+# worker, an advisory lock lets one at a time through
+retention_scheduler = RetentionScheduler(create_partition_manager(settings, async_session), settings.retention_interval)
+
 # Create FastAPI app
 app = FastAPI(
     title="HRSOFT User Service",
     description="User Management Service",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # Add CORS middleware
@@ -31,28 +44,77 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request, query and pool metrics served at /metrics
+setup_metrics(
+    app,
+    "user-service",
+    collectors={
+        "token_cache": token_cache.stats,
+        "cache": cache.stats,
+        "database_pool": lambda: pool_stats(snapshots=False),
+        "attendance": lambda: attendance_buffer.stats(snapshots=False),
+        "audit": lambda: audit_writer.stats(snapshots=False),
+        "retention": retention_scheduler.stats,
+        "notifications": notification_hub.stats,
+        "unread_counter": unread_counter.stats,
+    }
+)
+
 # Include routers
 app.include_router(user.router, prefix="/users", tags=["users"])
+app.include_router(attendance.router, prefix="/attendance", tags=["attendance"])
+app.include_router(payroll.router, prefix="/payroll", tags=["payroll"])
+app.include_router(notification.router, prefix="/notifications", tags=["notifications"])
 
 # Startup event
 @app.on_event("startup")
 async def startup_event():
     logger.info("Starting User Service...")
-    create_tables()
+    if settings.audit_enabled:
+        audit_writer.start()
+    attendance_buffer.start()
+    retention_scheduler.start()
+    notification_hub.start()
     logger.info("User Service started successfully!")
 
+# Shutdown event
+@app.on_event("shutdown")
+async def shutdown_event():
+    logger.info("Stopping User Service...")
+    await retention_scheduler.stop()
+    await notification_hub.stop()
+    await unread_counter.close()
+    await attendance_buffer.stop()
+    await audit_writer.stop()
+    await cache.close()
+
 # Health check
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "user-service"}
+    return {
+        "status": "healthy",
+        "service": "user-service",
+        "token_cache": token_cache.stats(),
+        "cache": cache.stats(),
+        "database_pool": pool_stats(),
+        "attendance": attendance_buffer.stats(),
+        "audit": audit_writer.stats(),
+        "retention": retention_scheduler.stats(),
+        "notifications": {
+            "streams": notification_hub.stats(),
+            "unread_counter": unread_counter.stats()
+        }
+    }
 
 # Root endpoint
 @app.get("/")
 async def root():
     return {"message": "HRSOFT User Service", "version": "1.0.0"}
 
-# Exception handler
+# Exception handlers
+app.add_exception_handler(HRSoftException, hrsoft_exception_handler)
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     logger.error(f"Global exception handler: {exc}")
-    return handle_exception(exc)
+    return await hrsoft_exception_handler(request, exc)
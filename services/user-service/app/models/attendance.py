@@ -0,0 +1,37 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../../"))
+
+from sqlalchemy import Column, String, Integer, BigInteger, Date, DateTime, Numeric, ForeignKey, Text, Index, UniqueConstraint
+from shared.models.base import BaseModel
+
+class AttendanceRecord(BaseModel):
+    """One employee's attendance on one day, written in batches by AttendanceBuffer"""
+    __tablename__ = "attendance_records"
+    __table_args__ = (
+        # Upsert target: every clock event for a day lands on this row
+        UniqueConstraint("employee_id", "attendance_date", name="uk_employee_date"),
+        Index("idx_attendance_date", "attendance_date"),
+    )
+    
+    # One row per employee per day adds up; SQLite only autoincrements INTEGER
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), nullable=False)
+    attendance_date = Column(Date, nullable=False)  # Local date in the attendance timezone
+    
+    # Earliest check-in and latest check-out of the day
+    check_in_time = Column(DateTime(timezone=True))
+    check_out_time = Column(DateTime(timezone=True))
+    
+    # Derived from the times and the work schedule
+    total_hours = Column(Numeric(4, 2))
+    overtime_hours = Column(Numeric(4, 2), nullable=False, default=0, server_default="0")
+    late_minutes = Column(Integer, nullable=False, default=0, server_default="0")
+    early_leave_minutes = Column(Integer, nullable=False, default=0, server_default="0")
+    status = Column(String(20), nullable=False, default="PRESENT", server_default="PRESENT")
+    
+    # Source of the first check-in
+    location = Column(String(255))
+    ip_address = Column(String(45))
+    device_info = Column(Text)
+    notes = Column(Text)
@@ -0,0 +1,39 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../../"))
+
+from sqlalchemy import Column, String, Boolean, Integer, Date, DateTime, Numeric, ForeignKey, Text, Index
+from shared.models.base import BaseModel
+
+class LeaveType(BaseModel):
+    """A kind of leave, e.g. annual or unpaid; payroll only reads is_paid"""
+    __tablename__ = "leave_types"
+
+    name = Column(String(255), nullable=False)
+    code = Column(String(50), unique=True, nullable=False)
+    description = Column(Text)
+    days_per_year = Column(Numeric(5, 2), nullable=False, default=0)
+    is_paid = Column(Boolean, nullable=False, default=True)
+    is_active = Column(Boolean, default=True)
+
+class LeaveRequest(BaseModel):
+    """Leave an employee asked for; APPROVED ones count in payroll runs"""
+    __tablename__ = "leave_requests"
+    __table_args__ = (
+        Index("idx_leave_request_employee", "employee_id"),
+        Index("idx_leave_request_dates", "start_date", "end_date"),
+        Index("idx_leave_request_status", "status"),
+    )
+
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), nullable=False)
+    leave_type_id = Column(Integer, ForeignKey("leave_types.id", ondelete="RESTRICT"), nullable=False)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)  # Inclusive
+    total_days = Column(Numeric(5, 2), nullable=False)
+    reason = Column(Text)
+    status = Column(String(20), nullable=False, default="PENDING")  # PENDING, APPROVED, REJECTED, CANCELLED
+
+    requested_by = Column(Integer)  # User ID from the access token
+    approved_by = Column(Integer)
+    approved_at = Column(DateTime(timezone=True))
+    rejection_reason = Column(Text)
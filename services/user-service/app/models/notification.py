@@ -0,0 +1,35 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../../"))
+
+from sqlalchemy import Column, String, Boolean, Integer, BigInteger, DateTime, ForeignKey, Text, Index
+from sqlalchemy.sql import func
+from shared.database.base import Base
+
+class Notification(Base):
+    """One employee's copy of a notification, written in bulk by NotificationService.fan_out"""
+    __tablename__ = "notifications"
+    __table_args__ = (
+        # Newest first per employee, and the unread count
+        Index("idx_notification_recipient", "recipient_id", "id"),
+        Index("idx_notification_unread", "recipient_id", "is_read"),
+        Index("idx_notification_date", "created_at"),
+    )
+    
+    # A row per recipient adds up fast; SQLite only autoincrements INTEGER
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    recipient_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), nullable=False)
+    sender_id = Column(Integer)  # User ID from the access token
+    
+    title = Column(String(255), nullable=False)
+    message = Column(Text, nullable=False)
+    notification_type = Column(String(20), nullable=False, default="INFO")  # INFO, WARNING, ERROR, SUCCESS
+    category = Column(String(20), nullable=False, default="SYSTEM")  # SYSTEM, HR, PAYROLL, LEAVE, TRAINING, PERFORMANCE, RECRUITMENT
+    
+    # What the notification is about, e.g. payroll_cycles and its id
+    entity_type = Column(String(100))
+    entity_id = Column(BigInteger)
+    
+    is_read = Column(Boolean, nullable=False, default=False)
+    read_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())  # Partition key on PostgreSQL
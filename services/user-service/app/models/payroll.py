@@ -0,0 +1,111 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../../"))
+
+from sqlalchemy import Column, String, Boolean, Integer, BigInteger, Date, DateTime, Numeric, ForeignKey, Text, Index, UniqueConstraint
+from shared.models.base import BaseModel
+
+# Amounts are integer cents, like Employee.salary; rates are percentages
+
+class SalaryComponent(BaseModel):
+    """An earning, deduction or employer benefit that payroll runs compute"""
+    __tablename__ = "salary_components"
+    
+    name = Column(String(255), nullable=False)
+    code = Column(String(50), unique=True, nullable=False)
+    type = Column(String(20), nullable=False)  # EARNING, DEDUCTION or BENEFIT
+    category = Column(String(20), nullable=False)  # BASIC, ALLOWANCE, OVERTIME, BONUS, TAX, INSURANCE, LOAN, OTHER
+    calculation_type = Column(String(20), nullable=False, default="FIXED")  # FIXED or PERCENTAGE
+    calculation_base = Column(String(20), nullable=False, default="BASIC_SALARY")  # BASIC_SALARY or GROSS_SALARY
+    
+    # Used for employees without their own amount or rate
+    default_value = Column(BigInteger, nullable=False, default=0)  # In cents
+    default_percentage = Column(Numeric(5, 2))
+    
+    is_taxable = Column(Boolean, default=True)
+    is_mandatory = Column(Boolean, default=False)  # Applies to every employee
+    is_active = Column(Boolean, default=True)
+    description = Column(Text)
+
+class EmployeeSalaryStructure(BaseModel):
+    """A component assigned to one employee, with its own amount or rate"""
+    __tablename__ = "employee_salary_structures"
+    __table_args__ = (
+        Index("idx_emp_salary_active", "employee_id", "is_active"),
+        Index("idx_emp_salary_dates", "effective_date", "end_date"),
+    )
+    
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), nullable=False)
+    salary_component_id = Column(Integer, ForeignKey("salary_components.id", ondelete="CASCADE"), nullable=False, index=True)
+    amount = Column(BigInteger, nullable=False, default=0)  # In cents, for FIXED components
+    percentage = Column(Numeric(5, 2))  # For PERCENTAGE components
+    effective_date = Column(Date, nullable=False)
+    end_date = Column(Date)
+    is_active = Column(Boolean, default=True)
+    notes = Column(Text)
+
+class PayrollCycle(BaseModel):
+    __tablename__ = "payroll_cycles"
+    __table_args__ = (
+        Index("idx_payroll_cycle_period", "start_date", "end_date"),
+    )
+    
+    name = Column(String(255), nullable=False)
+    period_type = Column(String(20), nullable=False, default="MONTHLY")  # MONTHLY, BIWEEKLY, WEEKLY, QUARTERLY
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    pay_date = Column(Date, nullable=False)
+    status = Column(String(20), nullable=False, default="DRAFT", index=True)  # DRAFT, PROCESSING, COMPLETED, FAILED, CANCELLED
+    
+    # Totals of the last completed run
+    total_employees = Column(Integer, nullable=False, default=0)
+    total_gross_amount = Column(BigInteger, nullable=False, default=0)  # In cents
+    total_net_amount = Column(BigInteger, nullable=False, default=0)
+    total_deductions = Column(BigInteger, nullable=False, default=0)
+    
+    notes = Column(Text)
+    processed_by = Column(Integer)  # User ID from the access token
+    processed_at = Column(DateTime(timezone=True))
+
+class PayrollRecord(BaseModel):
+    """One employee's pay for one cycle, written in bulk by the payroll engine"""
+    __tablename__ = "payroll_records"
+    __table_args__ = (
+        UniqueConstraint("payroll_cycle_id", "employee_id", name="uk_payroll_employee_cycle"),
+        Index("idx_payroll_employee", "employee_id"),
+    )
+    
+    # A record per employee per cycle adds up; SQLite only autoincrements INTEGER
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    payroll_cycle_id = Column(Integer, ForeignKey("payroll_cycles.id", ondelete="CASCADE"), nullable=False)
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), nullable=False)
+    
+    # In cents
+    basic_salary = Column(BigInteger, nullable=False)  # After unpaid absences
+    gross_salary = Column(BigInteger, nullable=False)  # Basic plus total earnings
+    total_earnings = Column(BigInteger, nullable=False)  # Overtime and earning components
+    total_deductions = Column(BigInteger, nullable=False)
+    net_salary = Column(BigInteger, nullable=False)
+    tax_amount = Column(BigInteger, nullable=False, default=0)
+    insurance_amount = Column(BigInteger, nullable=False, default=0)
+    
+    # From attendance_records and approved leave_requests over the cycle
+    worked_days = Column(Numeric(5, 2), nullable=False, default=0)
+    overtime_hours = Column(Numeric(6, 2), nullable=False, default=0)
+    leave_days = Column(Numeric(5, 2), nullable=False, default=0)
+    absent_days = Column(Numeric(5, 2), nullable=False, default=0)
+    
+    payslip_number = Column(String(50))
+    payment_status = Column(String(20), nullable=False, default="PENDING")  # PENDING, PAID, CANCELLED
+    payment_date = Column(Date)
+
+class PayrollDetail(BaseModel):
+    """Breakdown of a payroll record by salary component"""
+    __tablename__ = "payroll_details"
+    
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    payroll_record_id = Column(BigInteger, ForeignKey("payroll_records.id", ondelete="CASCADE"), nullable=False, index=True)
+    salary_component_id = Column(Integer, ForeignKey("salary_components.id", ondelete="RESTRICT"), nullable=False)
+    amount = Column(BigInteger, nullable=False)  # In cents
+    calculation_base = Column(BigInteger)  # In cents, for PERCENTAGE components
+    rate_percentage = Column(Numeric(5, 2))
@@ -2,12 +2,17 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), "../../../../"))
 
-from sqlalchemy import Column, String, Boolean, Integer, Date, ForeignKey, Text
+from sqlalchemy import Column, String, Boolean, Integer, BigInteger, Date, ForeignKey, Text, Index, DDL, event
 from sqlalchemy.orm import relationship
 from shared.models.base import BaseModel
 
 class Employee(BaseModel):
     __tablename__ = "employees"
+    __table_args__ = (
+        # Keyset pagination indexes (sort key, id)
+        Index("ix_employees_last_name_id", "last_name", "id"),
+        Index("ix_employees_department_id_id", "department_id", "id"),
+    )
     
     # Personal Information
     employee_id = Column(String(20), unique=True, index=True, nullable=False)
@@ -25,25 +30,65 @@ class Employee(BaseModel):
     salary = Column(Integer)  # In cents to avoid floating point issues
     is_active = Column(Boolean, default=True)
     
-    # Manager relationship
-    manager_id = Column(Integer, ForeignKey("employees.id"))
-    manager = relationship("Employee", remote_side=[BaseModel.id])
+    # Manager relationship (indexed for org-chart walks and FK checks on delete)
+    manager_id = Column(Integer, ForeignKey("employees.id"), index=True)
+    manager = relationship("Employee", remote_side="Employee.id")
     
     # Department relationship
-    department = relationship("Department", back_populates="employees")
+    department = relationship("Department", back_populates="employees", foreign_keys=[department_id])
+    
+    # Optimistic concurrency: UserService updates bump it and may require a match
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+# PostgreSQL keeps a stored, GIN-indexed tsvector of the searchable columns.
+# The database maintains it, so it is not mapped on the model. The parser
+# keeps an email whole and reads "EMP-001" as "emp" and "-001", so emails
+# and employee ids are split at punctuation first, the way searches are
+# tokenized (employee_search.tokenize).
+EMPLOYEE_SEARCH_DOCUMENT = (
+    "first_name || ' ' || last_name || ' ' || regexp_replace(email, '[@._+-]+', ' ', 'g') || ' ' || "
+    "regexp_replace(employee_id, '[@._+-]+', ' ', 'g')"
+)
+event.listen(Employee.__table__, "after_create", DDL(
+    "ALTER TABLE %(table)s ADD COLUMN search_vector tsvector GENERATED ALWAYS AS "
+    f"(to_tsvector('simple'::regconfig, {EMPLOYEE_SEARCH_DOCUMENT})) STORED"
+).execute_if(dialect="postgresql"))
+event.listen(Employee.__table__, "after_create", DDL(
+    "CREATE INDEX ix_employees_search_vector ON %(table)s USING gin (search_vector)"
+).execute_if(dialect="postgresql"))
+
+# MySQL full-text index over the same columns
+Index(
+    "ft_employees_search",
+    Employee.first_name, Employee.last_name, Employee.email, Employee.employee_id,
+    mysql_prefix="FULLTEXT"
+).ddl_if(dialect="mysql")
 
 class Department(BaseModel):
     __tablename__ = "departments"
     
     name = Column(String(100), unique=True, nullable=False)
     description = Column(Text)
-    manager_id = Column(Integer, ForeignKey("employees.id"))
+    manager_id = Column(Integer, ForeignKey("employees.id", use_alter=True, name="fk_departments_manager_id"))
     budget = Column(Integer)  # In cents
     is_active = Column(Boolean, default=True)
     
     # Relationships
-    employees = relationship("Employee", back_populates="department")
+    employees = relationship("Employee", back_populates="department", foreign_keys=[Employee.department_id])
     manager = relationship("Employee", foreign_keys=[manager_id])
+    
+    # Optimistic concurrency, as on Employee
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+class DepartmentStats(BaseModel):
+    """Per-department headcount and salary totals, kept current by UserService writes"""
+    __tablename__ = "department_stats"
+    
+    department_id = Column(Integer, ForeignKey("departments.id"), unique=True, nullable=False)
+    headcount = Column(Integer, nullable=False, default=0)  # All employees, active or not
+    active_count = Column(Integer, nullable=False, default=0)
+    salary_total = Column(BigInteger, nullable=False, default=0)  # Cents, active employees
+    salary_count = Column(Integer, nullable=False, default=0)  # Active employees with a salary
 
 class EmployeeProfile(BaseModel):
     __tablename__ = "employee_profiles"
@@ -0,0 +1,101 @@
+from datetime import date, datetime, timezone
+from fastapi import APIRouter, Depends, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../../"))
+
+from shared.database.base import get_async_db
+from shared.auth.dependencies import get_current_active_user, require_hr, require_attendance
+from shared.utils.exceptions import NotFoundError
+from app.schemas.attendance import (
+    ClockEvent, AttendanceBatch, AttendanceAccepted, AttendanceFlushResponse, AttendanceRecordResponse
+)
+from app.services.attendance import AttendanceBuffer, AttendanceService, get_attendance_buffer
+
+router = APIRouter()
+
+def _clock(event: str, clock_event: ClockEvent, ip_address: Optional[str], now: datetime) -> tuple:
+    return (
+        clock_event.employee_id, event, clock_event.timestamp or now,
+        clock_event.location, ip_address, clock_event.device_info
+    )
+
+async def _buffer(buffer: AttendanceBuffer, events: list[tuple]) -> AttendanceAccepted:
+    """Buffer the events of existing employees, reporting the ids that do not exist"""
+    unknown = await buffer.unknown_employees({event[0] for event in events})
+    accepted = buffer.add([event for event in events if event[0] not in unknown])
+    return AttendanceAccepted(accepted=accepted, buffered=buffer.buffered, unknown_employees=sorted(unknown))
+
+async def _buffer_one(buffer: AttendanceBuffer, event: tuple) -> AttendanceAccepted:
+    if await buffer.unknown_employees({event[0]}):
+        raise NotFoundError("Employee not found")
+    return await _buffer(buffer, [event])
+
+@router.post("/clock-in", response_model=AttendanceAccepted, status_code=status.HTTP_202_ACCEPTED)
+async def clock_in(
+    clock_event: ClockEvent,
+    request: Request,
+    buffer: AttendanceBuffer = Depends(get_attendance_buffer),
+    current_user: dict = Depends(require_attendance)
+):
+    """Record a check-in; it is written with the next batch (time clocks only).
+
+    The earliest check-in of the day counts, so repeated badge reads are
+    harmless.
+    """
+    now = datetime.now(timezone.utc)
+    return await _buffer_one(buffer, _clock("in", clock_event, request.client and request.client.host, now))
+
+@router.post("/clock-out", response_model=AttendanceAccepted, status_code=status.HTTP_202_ACCEPTED)
+async def clock_out(
+    clock_event: ClockEvent,
+    request: Request,
+    buffer: AttendanceBuffer = Depends(get_attendance_buffer),
+    current_user: dict = Depends(require_attendance)
+):
+    """Record a check-out; the latest one of the day counts (time clocks only)"""
+    now = datetime.now(timezone.utc)
+    return await _buffer_one(buffer, _clock("out", clock_event, request.client and request.client.host, now))
+
+@router.post("/events", response_model=AttendanceAccepted, status_code=status.HTTP_202_ACCEPTED)
+async def record_events(
+    batch: AttendanceBatch,
+    request: Request,
+    buffer: AttendanceBuffer = Depends(get_attendance_buffer),
+    current_user: dict = Depends(require_attendance)
+):
+    """Record many clock events at once (badge readers, gateways).
+
+    Events of employees that do not exist are not buffered; their ids come
+    back in ``unknown_employees``.
+    """
+    now = datetime.now(timezone.utc)
+    ip_address = request.client and request.client.host
+    return await _buffer(buffer, [_clock(event.event, event, ip_address, now) for event in batch.events])
+
+@router.post("/flush", response_model=AttendanceFlushResponse)
+async def flush_attendance(
+    buffer: AttendanceBuffer = Depends(get_attendance_buffer),
+    current_user: dict = Depends(require_hr)
+):
+    """Write this worker's buffered events now (HR only)"""
+    written, rejected = await buffer.flush()
+    return AttendanceFlushResponse(written=written, rejected=rejected)
+
+@router.get("/employees/{employee_id}", response_model=list[AttendanceRecordResponse])
+async def list_attendance(
+    employee_id: int,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Attendance of one employee by day, optionally between two dates.
+
+    Events still buffered (up to the flush interval) are not included.
+    """
+    attendance_service = AttendanceService(db)
+    return await attendance_service.list_records(employee_id, start=start, end=end)
@@ -0,0 +1,93 @@
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../../"))
+
+from shared.config.settings import get_settings
+from shared.database.base import get_async_db
+from shared.auth.dependencies import get_current_active_user, require_hr
+from app.schemas.notification import (
+    NotificationCreate, NotificationFanOutResponse, NotificationListResponse, MarkReadRequest, MarkReadResponse,
+    UnreadCountResponse
+)
+from app.services.notifications import NotificationService
+
+router = APIRouter()
+settings = get_settings()
+
+@router.post("/", response_model=NotificationFanOutResponse, status_code=status.HTTP_201_CREATED)
+async def create_notification(
+    notification_data: NotificationCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(require_hr)
+):
+    """Notify employees, everyone at once if need be (HR only)"""
+    notification_service = NotificationService(db)
+    user_id = str(current_user["user_id"])
+    return await notification_service.fan_out(notification_data, sender_id=int(user_id) if user_id.isdigit() else None)
+
+@router.get("/employees/{employee_id}", response_model=NotificationListResponse)
+async def list_notifications(
+    employee_id: int,
+    unread_only: bool = False,
+    before_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """An employee's notifications, newest first, with the unread count"""
+    notification_service = NotificationService(db)
+    return await notification_service.list_notifications(employee_id, unread_only=unread_only, before_id=before_id, limit=limit)
+
+@router.get("/employees/{employee_id}/unread-count", response_model=UnreadCountResponse)
+async def unread_count(
+    employee_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Unread notifications of an employee, from the counter rather than COUNT(*)"""
+    notification_service = NotificationService(db)
+    return UnreadCountResponse(unread=await notification_service.unread_count(employee_id))
+
+@router.post("/employees/{employee_id}/read", response_model=MarkReadResponse)
+async def mark_read(
+    employee_id: int,
+    read_data: MarkReadRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Mark notifications read in one statement: the ids given, or all"""
+    notification_service = NotificationService(db)
+    return await notification_service.mark_read(employee_id, read_data.ids)
+
+@router.get("/employees/{employee_id}/stream")
+async def stream_notifications(
+    employee_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Server-Sent Events: the unread count, then new and read notifications as they happen.
+
+    Replaces polling the unread count. Events are ``unread``, ``notification``,
+    ``read`` and ``resync`` (reload, the stream fell behind).
+    """
+    notification_service = NotificationService(db)
+    # Subscribed before counting, so nothing falls between the two
+    queue = notification_service.hub.subscribe(employee_id)
+    try:
+        unread = await notification_service.unread_count(employee_id)
+    except Exception:
+        notification_service.hub.unsubscribe(employee_id, queue)
+        raise
+    # Streams stay open for long; don't hold a pooled connection meanwhile
+    await db.close()
+
+    return StreamingResponse(
+        notification_service.hub.stream(employee_id, queue, unread, settings.notification_stream_heartbeat),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,116 @@
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../../"))
+
+from shared.config.settings import get_settings
+from shared.database.base import get_async_db
+from shared.auth.dependencies import require_hr
+from app.schemas.payroll import (
+    SalaryComponentCreate, SalaryComponentResponse, SalaryStructureCreate, SalaryStructureResponse,
+    PayrollCycleCreate, PayrollCycleResponse, PayrollRecordListResponse, PayslipResponse
+)
+from app.services.payroll import PayrollEngine, PayrollPolicy, PayrollService
+
+router = APIRouter()
+settings = get_settings()
+
+# Salary components and structures
+@router.post("/components", response_model=SalaryComponentResponse, status_code=status.HTTP_201_CREATED)
+async def create_component(
+    component_data: SalaryComponentCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(require_hr)
+):
+    """Create a salary component (HR only)"""
+    payroll_service = PayrollService(db)
+    return await payroll_service.create_component(component_data)
+
+@router.get("/components", response_model=list[SalaryComponentResponse])
+async def list_components(
+    is_active: Optional[bool] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(require_hr)
+):
+    """List salary components (HR only)"""
+    payroll_service = PayrollService(db)
+    return await payroll_service.list_components(is_active=is_active)
+
+@router.post("/structures", response_model=SalaryStructureResponse, status_code=status.HTTP_201_CREATED)
+async def create_structure(
+    structure_data: SalaryStructureCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(require_hr)
+):
+    """Assign a salary component to an employee (HR only)"""
+    payroll_service = PayrollService(db)
+    return await payroll_service.create_structure(structure_data)
+
+# Payroll cycles
+@router.post("/cycles", response_model=PayrollCycleResponse, status_code=status.HTTP_201_CREATED)
+async def create_cycle(
+    cycle_data: PayrollCycleCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(require_hr)
+):
+    """Create a payroll cycle in DRAFT (HR only)"""
+    payroll_service = PayrollService(db)
+    return await payroll_service.create_cycle(cycle_data)
+
+@router.get("/cycles/{cycle_id}", response_model=PayrollCycleResponse)
+async def get_cycle(
+    cycle_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(require_hr)
+):
+    """Get a payroll cycle and its totals (HR only)"""
+    payroll_service = PayrollService(db)
+    return await payroll_service.get_cycle(cycle_id)
+
+@router.post("/cycles/{cycle_id}/run", response_model=PayrollCycleResponse)
+async def run_cycle(
+    cycle_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(require_hr)
+):
+    """Compute the cycle for every active employee (HR only).
+
+    Runs DRAFT, COMPLETED and FAILED cycles, replacing earlier results;
+    409 while another run is in progress. Departments are split across
+    PAYROLL_WORKERS processes. A run that fails leaves the cycle FAILED.
+    """
+    engine = PayrollEngine(
+        db,
+        PayrollPolicy.from_settings(settings),
+        workers=settings.payroll_workers,
+        database_url=settings.async_database_url or settings.database_url,
+        stale_after=settings.payroll_stale_after
+    )
+    user_id = str(current_user["user_id"])
+    return await engine.run(cycle_id, processed_by=int(user_id) if user_id.isdigit() else None)
+
+@router.get("/cycles/{cycle_id}/records", response_model=PayrollRecordListResponse)
+async def list_records(
+    cycle_id: int,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(require_hr)
+):
+    """Payroll records of a cycle by employee (HR only)"""
+    payroll_service = PayrollService(db)
+    return await payroll_service.list_records(cycle_id, page=page, page_size=page_size)
+
+@router.get("/cycles/{cycle_id}/employees/{employee_id}", response_model=PayslipResponse)
+async def get_payslip(
+    cycle_id: int,
+    employee_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(require_hr)
+):
+    """One employee's payslip with its breakdown by component (HR only)"""
+    payroll_service = PayrollService(db)
+    return await payroll_service.get_payslip(cycle_id, employee_id)
@@ -1,33 +1,71 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Literal
 import sys
 import os
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "../../../../"))
 
-from shared.database.base import get_db
+from shared.database.base import get_async_db
 from shared.auth.dependencies import get_current_active_user, require_hr
+from shared.utils.exceptions import ValidationError
+from shared.utils.responses import FastJSONResponse
+from shared.utils.conditional import is_conditional
 from app.schemas.user import (
     EmployeeCreate, EmployeeUpdate, EmployeeResponse, EmployeeDetailResponse,
     EmployeeListResponse, DepartmentCreate, DepartmentUpdate, DepartmentResponse,
-    EmployeeProfileCreate, EmployeeProfileUpdate, EmployeeProfileResponse
+    EmployeeProfileCreate, EmployeeProfileUpdate, EmployeeProfileResponse, EmployeeImportResponse,
+    EmployeeBatchResponse, OrgChartResponse, DepartmentStatsResponse
 )
-from app.services.user_service import UserService
+from app.services.user_service import UserService, department_version, departments_version, employee_version
+from app.services.employee_export import EXPORT_FORMATS
+from app.services.org_chart import MAX_HIERARCHY_DEPTH
 
 router = APIRouter()
 
+# Bulk import formats by request Content-Type
+IMPORT_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/jsonl": "jsonl",
+    "application/x-ndjson": "jsonl",
+    "application/x-jsonlines": "jsonl",
+}
+
 # Employee endpoints
 @router.post("/employees/", response_model=EmployeeResponse)
 async def create_employee(
     employee_data: EmployeeCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(require_hr)
 ):
     """Create a new employee (HR only)"""
     user_service = UserService(db)
     return await user_service.create_employee(employee_data)
 
+@router.post("/employees/bulk", response_model=EmployeeImportResponse)
+async def import_employees(
+    request: Request,
+    format: Optional[Literal["csv", "jsonl"]] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(require_hr)
+):
+    """Bulk import employees from a CSV or JSONL body (HR only).
+
+    The body is streamed, so files of any size are accepted. The format is
+    taken from ``format`` or the Content-Type. Valid rows are imported and
+    the others are reported by row number. ``manager_employee_id`` links a
+    manager by employee ID, including employees in the same file.
+    """
+    import_format = format or IMPORT_CONTENT_TYPES.get(
+        request.headers.get("content-type", "").split(";")[0].strip().lower()
+    )
+    if import_format is None:
+        raise ValidationError("Send text/csv or application/x-ndjson, or pass format=csv|jsonl")
+    
+    user_service = UserService(db)
+    return await user_service.import_employees(request.stream(), import_format)
+
 @router.get("/employees/", response_model=EmployeeListResponse)
 async def list_employees(
     page: int = Query(1, ge=1),
@@ -35,34 +73,106 @@ async def list_employees(
     department_id: Optional[int] = None,
     is_active: Optional[bool] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db),
+    pagination: Literal["offset", "cursor"] = "offset",
+    cursor: Optional[str] = None,
+    sort_by: Optional[Literal["id", "employee_id", "last_name", "relevance"]] = None,
+    count: Literal["exact", "estimated", "none"] = "exact",
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_active_user)
 ):
-    """List employees with pagination and filters"""
+    """List employees with pagination and filters.
+
+    ``pagination=cursor`` pages by keyset: pass the returned ``next_cursor``
+    back as ``cursor`` to fetch the following page in constant time.
+    ``count`` controls whether the total is exact, estimated or skipped.
+    ``search`` matches word prefixes and is ordered by relevance by default.
+    """
     user_service = UserService(db)
-    return await user_service.list_employees(
+    # Rows are already shaped like EmployeeListResponse, so skip re-validation
+    return FastJSONResponse(await user_service.list_employee_rows(
         page=page,
         page_size=page_size,
         department_id=department_id,
         is_active=is_active,
-        search=search
+        search=search,
+        pagination=pagination,
+        cursor=cursor,
+        sort_by=sort_by,
+        count=count
+    ))
+
+@router.get("/employees/export")
+async def export_employees(
+    format: Literal["csv", "ndjson", "parquet"] = "csv",
+    department_id: Optional[int] = None,
+    is_active: Optional[bool] = None,
+    search: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(require_hr)
+):
+    """Stream the whole filtered roster as CSV, NDJSON or Parquet (HR only).
+
+    Takes the same filters as the employee list, without pagination.
+    """
+    user_service = UserService(db)
+    chunks = await user_service.export_employees(
+        format, department_id=department_id, is_active=is_active, search=search
+    )
+    media_type, extension, _ = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=employees.{extension}"}
     )
 
+@router.get("/employees:batch", response_model=EmployeeBatchResponse)
+async def get_employees_batch(
+    ids: str = Query(..., description="Comma-separated employee IDs"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Get employee details for many IDs at once (e.g. one org-chart page)"""
+    try:
+        employee_ids = [int(employee_id) for employee_id in ids.split(",") if employee_id.strip()]
+    except ValueError:
+        raise ValidationError("ids must be comma-separated integers")
+    
+    user_service = UserService(db)
+    return await user_service.get_employee_details(employee_ids)
+
 @router.get("/employees/{employee_id}", response_model=EmployeeDetailResponse)
 async def get_employee(
     employee_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_active_user)
 ):
-    """Get employee by ID"""
+    """Get employee by ID.
+
+    Sends ETag and Last-Modified; a conditional request whose copy is
+    current gets 304 after a version lookup, without loading the employee.
+    """
     user_service = UserService(db)
-    return await user_service.get_employee_detail(employee_id)
+    if is_conditional(request):
+        version = await user_service.get_employee_version(employee_id)
+        if version.is_current(request):
+            return version.not_modified()
+    
+    employee = await user_service.get_employee_detail(employee_id)
+    department, profile = employee.department, employee.profile
+    response.headers.update(employee_version(
+        employee.id,
+        (employee.version, department.version if department else None),
+        (employee.updated_at, department and department.updated_at, profile and profile.updated_at)
+    ).headers())
+    return employee
 
 @router.put("/employees/{employee_id}", response_model=EmployeeResponse)
 async def update_employee(
     employee_id: int,
     employee_data: EmployeeUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(require_hr)
 ):
     """Update employee (HR only)"""
@@ -72,7 +182,7 @@ async def update_employee(
 @router.delete("/employees/{employee_id}")
 async def delete_employee(
     employee_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(require_hr)
 ):
     """Soft delete employee (HR only)"""
@@ -80,12 +190,35 @@ async def delete_employee(
     await user_service.delete_employee(employee_id)
     return {"message": "Employee deleted successfully"}
 
+# Org chart endpoints
+@router.get("/employees/{employee_id}/reports", response_model=OrgChartResponse)
+async def get_employee_reports(
+    employee_id: int,
+    max_depth: int = Query(MAX_HIERARCHY_DEPTH, ge=1, le=MAX_HIERARCHY_DEPTH),
+    is_active: Optional[bool] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Get direct and indirect reports; max_depth=1 gives direct reports only"""
+    user_service = UserService(db)
+    return await user_service.get_reports(employee_id, max_depth=max_depth, is_active=is_active)
+
+@router.get("/employees/{employee_id}/managers", response_model=OrgChartResponse)
+async def get_employee_managers(
+    employee_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Get the reporting chain from the direct manager to the top"""
+    user_service = UserService(db)
+    return await user_service.get_managers(employee_id)
+
 # Employee Profile endpoints
 @router.post("/employees/{employee_id}/profile", response_model=EmployeeProfileResponse)
 async def create_employee_profile(
     employee_id: int,
     profile_data: EmployeeProfileCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """Create employee profile"""
@@ -97,7 +230,7 @@ async def create_employee_profile(
 async def update_employee_profile(
     employee_id: int,
     profile_data: EmployeeProfileUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """Update employee profile"""
@@ -108,7 +241,7 @@ async def update_employee_profile(
 @router.post("/departments/", response_model=DepartmentResponse)
 async def create_department(
     department_data: DepartmentCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(require_hr)
 ):
     """Create a new department (HR only)"""
@@ -117,29 +250,79 @@ async def create_department(
 
 @router.get("/departments/", response_model=list[DepartmentResponse])
 async def list_departments(
+    request: Request,
     is_active: Optional[bool] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_active_user)
 ):
-    """List all departments"""
+    """List all departments (conditional GET as for a single department)"""
     user_service = UserService(db)
-    return await user_service.list_departments(is_active=is_active)
+    if is_conditional(request):
+        version = await user_service.get_departments_version(is_active=is_active)
+        if version.is_current(request):
+            return version.not_modified()
+    
+    departments = await user_service.list_department_rows(is_active=is_active)
+    version = departments_version(
+        is_active,
+        len(departments),
+        sum(dept["version"] for dept in departments),
+        [dept["updated_at"] for dept in departments]
+    )
+    return FastJSONResponse(departments, headers=version.headers())
+
+@router.get("/departments/stats", response_model=list[DepartmentStatsResponse])
+async def get_department_stats(
+    source: Literal["summary", "live"] = "summary",
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(require_hr)
+):
+    """Headcount and salary aggregates per department (HR only).
+
+    source=summary reads the maintained summary table; source=live
+    aggregates employees and adds salary percentiles.
+    """
+    user_service = UserService(db)
+    return await user_service.get_department_stats(source)
+
+@router.post("/departments/stats/rebuild")
+async def rebuild_department_stats(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(require_hr)
+):
+    """Recompute the department summary table from employees (HR only)"""
+    user_service = UserService(db)
+    await user_service.rebuild_department_stats()
+    return {"message": "Department stats rebuilt"}
 
 @router.get("/departments/{department_id}", response_model=DepartmentResponse)
 async def get_department(
     department_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_active_user)
 ):
-    """Get department by ID"""
+    """Get department by ID.
+
+    Sends ETag and Last-Modified; a conditional request whose copy is
+    current gets 304 after a primary key lookup of ``updated_at``.
+    """
     user_service = UserService(db)
-    return await user_service.get_department(department_id)
+    if is_conditional(request):
+        version = await user_service.get_department_version(department_id)
+        if version.is_current(request):
+            return version.not_modified()
+    
+    department = await user_service.get_department(department_id)
+    response.headers.update(department_version(department.id, department.version, department.updated_at).headers())
+    return department
 
 @router.put("/departments/{department_id}", response_model=DepartmentResponse)
 async def update_department(
     department_id: int,
     department_data: DepartmentUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(require_hr)
 ):
     """Update department (HR only)"""
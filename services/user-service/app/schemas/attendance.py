@@ -0,0 +1,45 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List, Literal
+from datetime import datetime, date
+
+# Events accepted per batch request
+MAX_BATCH_EVENTS = 10000
+
+class ClockEvent(BaseModel):
+    employee_id: int
+    timestamp: Optional[datetime] = None  # Server time when omitted; naive values are UTC
+    location: Optional[str] = None
+    device_info: Optional[str] = None
+
+class AttendanceEvent(ClockEvent):
+    event: Literal["in", "out"]
+
+class AttendanceBatch(BaseModel):
+    """Events from one badge reader or gateway, in any order"""
+    events: List[AttendanceEvent] = Field(..., max_length=MAX_BATCH_EVENTS)
+
+class AttendanceAccepted(BaseModel):
+    """Events were buffered; they are written within the flush interval"""
+    accepted: int
+    buffered: int  # Employee-days waiting for the next flush
+    unknown_employees: List[int] = []  # Ids whose events were rejected: no such employee
+
+class AttendanceFlushResponse(BaseModel):
+    written: int  # Employee-days upserted
+    rejected: int  # Dropped for employees deleted since their events arrived
+
+class AttendanceRecordResponse(BaseModel):
+    id: int
+    employee_id: int
+    attendance_date: date
+    check_in_time: Optional[datetime] = None
+    check_out_time: Optional[datetime] = None
+    total_hours: Optional[float] = None
+    overtime_hours: float
+    late_minutes: int
+    early_leave_minutes: int
+    status: str
+    location: Optional[str] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,61 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, List, Literal
+from datetime import datetime
+
+NotificationType = Literal["INFO", "WARNING", "ERROR", "SUCCESS"]
+NotificationCategory = Literal["SYSTEM", "HR", "PAYROLL", "LEAVE", "TRAINING", "PERFORMANCE", "RECRUITMENT"]
+
+class NotificationCreate(BaseModel):
+    """A notification for the active employees listed, in the departments listed, or everyone"""
+    title: str = Field(..., max_length=255)
+    message: str
+    notification_type: NotificationType = "INFO"
+    category: NotificationCategory = "SYSTEM"
+    entity_type: Optional[str] = Field(None, max_length=100)
+    entity_id: Optional[int] = None
+
+    # Recipients
+    employee_ids: List[int] = []
+    department_ids: List[int] = []
+    all_employees: bool = False
+
+    @model_validator(mode="after")
+    def check_recipients(self):
+        if not (self.all_employees or self.employee_ids or self.department_ids):
+            raise ValueError("Give employee_ids, department_ids or all_employees")
+        return self
+
+class NotificationFanOutResponse(BaseModel):
+    created: int  # One per recipient
+
+class NotificationResponse(BaseModel):
+    id: int
+    recipient_id: int
+    sender_id: Optional[int] = None
+    title: str
+    message: str
+    notification_type: str
+    category: str
+    entity_type: Optional[str] = None
+    entity_id: Optional[int] = None
+    is_read: bool
+    read_at: Optional[datetime] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class NotificationListResponse(BaseModel):
+    notifications: List[NotificationResponse]
+    unread: int
+    next_before_id: Optional[int] = None  # Pass as before_id for the next page
+
+class MarkReadRequest(BaseModel):
+    ids: Optional[List[int]] = None  # None marks every notification read
+
+class MarkReadResponse(BaseModel):
+    marked: int
+    unread: int
+
+class UnreadCountResponse(BaseModel):
+    unread: int
@@ -0,0 +1,143 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, List, Literal
+from datetime import datetime, date
+from decimal import Decimal
+
+# Amounts are integer cents, like Employee.salary; rates are percentages
+
+ComponentType = Literal["EARNING", "DEDUCTION", "BENEFIT"]
+ComponentCategory = Literal["BASIC", "ALLOWANCE", "OVERTIME", "BONUS", "TAX", "INSURANCE", "LOAN", "OTHER"]
+PeriodType = Literal["MONTHLY", "BIWEEKLY", "WEEKLY", "QUARTERLY"]
+
+class SalaryComponentCreate(BaseModel):
+    name: str
+    code: str = Field(..., max_length=50)
+    type: ComponentType
+    category: ComponentCategory
+    calculation_type: Literal["FIXED", "PERCENTAGE"] = "FIXED"
+    calculation_base: Literal["BASIC_SALARY", "GROSS_SALARY"] = "BASIC_SALARY"
+    default_value: int = 0
+    default_percentage: Optional[Decimal] = Field(None, ge=0, le=100)
+    is_taxable: bool = True
+    is_mandatory: bool = False  # Applies to every employee, with the defaults unless assigned
+    description: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_base(self):
+        # Gross is the sum of the earnings, so an earning cannot be a share of it
+        if self.type == "EARNING" and self.calculation_type == "PERCENTAGE" and self.calculation_base == "GROSS_SALARY":
+            raise ValueError("Earnings cannot be a percentage of the gross salary")
+        return self
+
+class SalaryComponentResponse(BaseModel):
+    id: int
+    name: str
+    code: str
+    type: str
+    category: str
+    calculation_type: str
+    calculation_base: str
+    default_value: int
+    default_percentage: Optional[float] = None
+    is_taxable: bool
+    is_mandatory: bool
+    is_active: bool
+    description: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class SalaryStructureCreate(BaseModel):
+    """Assign a component to an employee; the latest assignment in force wins"""
+    employee_id: int
+    salary_component_id: int
+    amount: int = 0  # For FIXED components
+    percentage: Optional[Decimal] = Field(None, ge=0, le=100)  # For PERCENTAGE ones; else the default
+    effective_date: date
+    end_date: Optional[date] = None
+    notes: Optional[str] = None
+
+class SalaryStructureResponse(BaseModel):
+    id: int
+    employee_id: int
+    salary_component_id: int
+    amount: int
+    percentage: Optional[float] = None
+    effective_date: date
+    end_date: Optional[date] = None
+    is_active: bool
+
+    class Config:
+        from_attributes = True
+
+class PayrollCycleCreate(BaseModel):
+    name: str
+    period_type: PeriodType = "MONTHLY"
+    start_date: date
+    end_date: date
+    pay_date: date
+    notes: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_dates(self):
+        if self.end_date < self.start_date:
+            raise ValueError("end_date is before start_date")
+        return self
+
+class PayrollCycleResponse(BaseModel):
+    id: int
+    name: str
+    period_type: str
+    start_date: date
+    end_date: date
+    pay_date: date
+    status: str
+    total_employees: int
+    total_gross_amount: int
+    total_net_amount: int
+    total_deductions: int
+    notes: Optional[str] = None
+    processed_by: Optional[int] = None
+    processed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class PayrollRecordResponse(BaseModel):
+    id: int
+    payroll_cycle_id: int
+    employee_id: int
+    basic_salary: int
+    gross_salary: int
+    total_earnings: int
+    total_deductions: int
+    net_salary: int
+    tax_amount: int
+    insurance_amount: int
+    worked_days: float
+    overtime_hours: float
+    leave_days: float
+    absent_days: float
+    payslip_number: Optional[str] = None
+    payment_status: str
+
+    class Config:
+        from_attributes = True
+
+class PayrollRecordListResponse(BaseModel):
+    records: List[PayrollRecordResponse]
+    total: int
+    page: int
+    page_size: int
+
+class PayrollDetailResponse(BaseModel):
+    salary_component_id: int
+    code: str
+    name: str
+    type: str
+    amount: int
+    calculation_base: Optional[int] = None
+    rate_percentage: Optional[float] = None
+
+class PayslipResponse(PayrollRecordResponse):
+    details: List[PayrollDetailResponse]
@@ -1,4 +1,7 @@
-from pydantic import BaseModel, EmailStr
+import re
+from functools import lru_cache
+from pydantic import BaseModel, EmailStr, field_validator
+from pydantic.networks import validate_email
 from typing import Optional, List
 from datetime import datetime, date
 from decimal import Decimal
@@ -17,11 +20,13 @@ class DepartmentUpdate(BaseModel):
     manager_id: Optional[int] = None
     budget: Optional[int] = None
     is_active: Optional[bool] = None
+    version: Optional[int] = None  # Version last read; 409 if it has since changed
 
 class DepartmentResponse(DepartmentBase):
     id: int
     manager_id: Optional[int] = None
     is_active: bool
+    version: int
     created_at: datetime
     updated_at: datetime
 
@@ -57,12 +62,14 @@ class EmployeeUpdate(BaseModel):
     salary: Optional[int] = None
     manager_id: Optional[int] = None
     is_active: Optional[bool] = None
+    version: Optional[int] = None  # Version last read; 409 if it has since changed
 
 class EmployeeResponse(EmployeeBase):
     id: int
     department_id: Optional[int] = None
     manager_id: Optional[int] = None
     is_active: bool
+    version: int
     created_at: datetime
     updated_at: datetime
     
@@ -98,10 +105,91 @@ class EmployeeDetailResponse(EmployeeResponse):
     """Employee with profile details"""
     profile: Optional[EmployeeProfileResponse] = None
 
+class EmployeeBatchResponse(BaseModel):
+    """Employee details fetched by ID, in request order"""
+    employees: List[EmployeeDetailResponse]
+    missing: List[int]  # Requested IDs with no employee
+
+class DepartmentStatsResponse(BaseModel):
+    """Headcount and salary aggregates of one department (salaries in cents)"""
+    department_id: int
+    name: str
+    headcount: int  # All employees, active or not
+    active_count: int
+    salary_total: int  # Active employees only, as are the salary figures below
+    salary_avg: Optional[float] = None
+    salary_p50: Optional[float] = None  # Percentiles only with source=live
+    salary_p90: Optional[float] = None
+
+class OrgChartNode(BaseModel):
+    """Employee in a reporting hierarchy"""
+    id: int
+    employee_id: str
+    first_name: str
+    last_name: str
+    position: Optional[str] = None
+    department_id: Optional[int] = None
+    manager_id: Optional[int] = None
+    is_active: bool
+    depth: int  # Levels below (reports) or above (managers) the employee
+
+class OrgChartResponse(BaseModel):
+    """Reports or managers of one employee, nearest first"""
+    employee_id: int
+    total: int
+    employees: List[OrgChartNode]
+
 class EmployeeListResponse(BaseModel):
     """Paginated employee list"""
     employees: List[EmployeeResponse]
-    total: int
-    page: int
+    total: Optional[int] = None  # None when count=none
+    page: Optional[int] = None  # None in cursor mode
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # Set in cursor mode when more rows follow
+
+# Plain ASCII dot-atom local part, the common case for imported addresses
+ASCII_LOCAL_PART = re.compile(r"[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+(\.[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+)*")
+
+@lru_cache(maxsize=4096)
+def _normalized_email_domain(domain: str) -> str:
+    return validate_email(f"user@{domain}")[1].rpartition("@")[2]
+
+def validate_email_fast(value: str) -> str:
+    """Same result as ``EmailStr`` validation, checking each domain only once.
+
+    Bulk imports repeat a handful of domains across thousands of rows, and
+    domain checks dominate email-validator's cost. Anything outside the
+    plain ASCII fast path goes through the full validator.
+    """
+    local, at, domain = value.rpartition("@")
+    if at and len(local) <= 64 and len(value) <= 254 and ASCII_LOCAL_PART.fullmatch(local):
+        try:
+            return f"{local}@{_normalized_email_domain(domain)}"
+        except ValueError:
+            pass
+    return validate_email(value)[1]
+
+class EmployeeImportRow(EmployeeCreate):
+    """One bulk import row; a manager may be given by employee ID"""
+    email: str
+    manager_employee_id: Optional[str] = None
+
+    @field_validator("email")
+    @classmethod
+    def check_email(cls, value: str) -> str:
+        return validate_email_fast(value)
+
+class EmployeeImportError(BaseModel):
+    """Problem with one row of a bulk import"""
+    row: int  # 1-based data row, excluding the CSV header
+    employee_id: Optional[str] = None
+    errors: List[str]
+
+class EmployeeImportResponse(BaseModel):
+    """Bulk import summary"""
+    total_rows: int
+    imported: int
+    failed: int
+    errors: List[EmployeeImportError]  # Rows that were not imported
+    warnings: List[EmployeeImportError] = []  # Imported rows whose manager could not be linked
@@ -0,0 +1,406 @@
+import asyncio
+import logging
+import time
+from datetime import date, datetime, time as time_of_day, timezone
+from decimal import Decimal
+from typing import Callable, NamedTuple, Optional
+from zoneinfo import ZoneInfo
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../../"))
+
+from sqlalchemy import select, case, or_, bindparam, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from shared.config.settings import Settings, get_settings
+from shared.database.base import async_session
+from shared.observability.metrics import Histogram
+from shared.utils.exceptions import ServiceUnavailableError
+from app.models.attendance import AttendanceRecord
+from app.models.user import Employee
+from app.schemas.attendance import AttendanceRecordResponse
+
+logger = logging.getLogger("hrsoft.attendance")
+
+# Days per flush transaction; shorter transactions hold row locks for less time
+UPSERT_CHUNK_SIZE = 5000
+
+_HOURS = Decimal("0.01")
+_MAX_HOURS = Decimal("99.99")  # NUMERIC(4,2)
+
+class WorkSchedule(NamedTuple):
+    """Working hours that late, early-leave and overtime figures are measured against"""
+    start: time_of_day
+    end: time_of_day
+    tz: ZoneInfo
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "WorkSchedule":
+        return cls(
+            time_of_day.fromisoformat(settings.attendance_work_start),
+            time_of_day.fromisoformat(settings.attendance_work_end),
+            ZoneInfo(settings.attendance_timezone)
+        )
+
+    def local_date(self, moment: datetime) -> date:
+        return moment.astimezone(self.tz).date()
+
+    def at(self, day: date, clock: time_of_day) -> datetime:
+        return datetime.combine(day, clock, tzinfo=self.tz)
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Aware UTC datetime; naive values (SQLite, MySQL) are UTC"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def _hours(seconds: float) -> Decimal:
+    return min(Decimal(max(seconds, 0) / 3600).quantize(_HOURS), _MAX_HOURS)
+
+def attendance_figures(
+    schedule: WorkSchedule,
+    day: date,
+    check_in: Optional[datetime],
+    check_out: Optional[datetime]
+) -> dict:
+    """Derived columns of one day's record from its check-in and check-out"""
+    start, end = schedule.at(day, schedule.start), schedule.at(day, schedule.end)
+    late = int((check_in - start).total_seconds() // 60) if check_in and check_in > start else 0
+    early = int((end - check_out).total_seconds() // 60) if check_out and check_out < end else 0
+    return {
+        "total_hours": _hours((check_out - check_in).total_seconds()) if check_in and check_out else None,
+        "overtime_hours": _hours((check_out - end).total_seconds()) if check_out else Decimal("0.00"),
+        "late_minutes": late,
+        "early_leave_minutes": early,
+        "status": "LATE" if late else "PRESENT",
+    }
+
+# Buffered day: [check_in, check_out, location, ip_address, device_info]
+def _merge(entry: list, check_in: Optional[datetime], check_out: Optional[datetime], location, ip_address, device_info):
+    if check_in is not None and (entry[0] is None or check_in < entry[0]):
+        entry[0] = check_in
+        entry[2], entry[3], entry[4] = location, ip_address, device_info
+    if check_out is not None and (entry[1] is None or check_out > entry[1]):
+        entry[1] = check_out
+
+def _upsert_statement(dialect_name: str):
+    """Insert that merges into the existing day on ``uk_employee_date``.
+
+    The earliest check-in and latest check-out win, decided per row inside
+    the statement, so concurrent flushes from other workers cannot lose
+    events. Derived columns take the inserted values; ``write_attendance``
+    corrects the rows where a stored time won. Executed with a list of
+    rows, it is compiled once and sent as multi-row VALUES batches.
+    """
+    dialect_insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert, "mysql": mysql.insert}[dialect_name]
+    table = AttendanceRecord.__table__
+    statement = dialect_insert(table)
+    new = statement.inserted if dialect_name == "mysql" else statement.excluded
+
+    earlier_in = or_(table.c.check_in_time.is_(None), new.check_in_time < table.c.check_in_time)
+    # Source columns before check_in_time: MySQL applies assignments in order
+    values = {
+        "location": case((earlier_in, new.location), else_=table.c.location),
+        "ip_address": case((earlier_in, new.ip_address), else_=table.c.ip_address),
+        "device_info": case((earlier_in, new.device_info), else_=table.c.device_info),
+        "check_in_time": case((earlier_in, new.check_in_time), else_=table.c.check_in_time),
+        "check_out_time": case(
+            (or_(table.c.check_out_time.is_(None), new.check_out_time > table.c.check_out_time), new.check_out_time),
+            else_=table.c.check_out_time
+        ),
+        **{column: getattr(new, column) for column in
+           ("total_hours", "overtime_hours", "late_minutes", "early_leave_minutes", "status")},
+        "updated_at": func.now(),
+    }
+    if dialect_name == "mysql":
+        return statement.on_duplicate_key_update(**values)
+    return statement.on_conflict_do_update(index_elements=["employee_id", "attendance_date"], set_=values).returning(
+        table.c.id, table.c.employee_id, table.c.attendance_date, table.c.check_in_time, table.c.check_out_time
+    )
+
+_UPSERT_STATEMENTS = {}
+
+# Derived columns of a record whose times are still the ones they were computed from
+_correct_figures = (
+    AttendanceRecord.__table__.update()
+    .where(
+        AttendanceRecord.__table__.c.id == bindparam("record_id"),
+        AttendanceRecord.__table__.c.check_in_time.is_not_distinct_from(bindparam("merged_in")),
+        AttendanceRecord.__table__.c.check_out_time.is_not_distinct_from(bindparam("merged_out")),
+    )
+    .values(
+        total_hours=bindparam("new_total_hours"),
+        overtime_hours=bindparam("new_overtime_hours"),
+        late_minutes=bindparam("new_late_minutes"),
+        early_leave_minutes=bindparam("new_early_leave_minutes"),
+        status=bindparam("new_status"),
+    )
+)
+
+async def _merged_times(db: AsyncSession, dialect_name: str, rows: list[dict]) -> list:
+    """Run the upsert and return each day's stored times after the merge"""
+    statement = _UPSERT_STATEMENTS.get(dialect_name)
+    if statement is None:
+        statement = _UPSERT_STATEMENTS[dialect_name] = _upsert_statement(dialect_name)
+    result = await db.execute(statement, rows)
+    if dialect_name != "mysql":
+        return result.all()
+    # No RETURNING on MySQL: read the days back in the same transaction
+    table = AttendanceRecord.__table__
+    employee_ids = {row["employee_id"] for row in rows}
+    days = {row["attendance_date"] for row in rows}
+    return (await db.execute(
+        select(table.c.id, table.c.employee_id, table.c.attendance_date, table.c.check_in_time, table.c.check_out_time)
+        .where(table.c.employee_id.in_(employee_ids), table.c.attendance_date.in_(days))
+    )).all()
+
+async def write_attendance(db: AsyncSession, schedule: WorkSchedule, rows: list[dict]) -> int:
+    """Upsert buffered days in one transaction, returning how many were written.
+
+    Rows hold the record columns including ``attendance_figures``. Most
+    rows need just the upsert: new days, and days where the incoming event
+    is the one that counts. Days where a stored check-in or check-out won
+    get their figures recomputed from the merged times in one batched
+    UPDATE, guarded by those times so a concurrent flush that moved them
+    again keeps its own figures.
+    """
+    dialect_name = db.bind.dialect.name
+    incoming = {(row["employee_id"], row["attendance_date"]): row for row in rows}
+    corrections = []
+    merged = await _merged_times(db, dialect_name, rows)
+    for record_id, employee_id, day, merged_in, merged_out in merged:
+        row = incoming.get((employee_id, day))
+        if row is None:
+            continue
+        check_in, check_out = _utc(merged_in), _utc(merged_out)
+        if check_in == row["check_in_time"] and check_out == row["check_out_time"]:
+            continue
+        figures = attendance_figures(schedule, day, check_in, check_out)
+        corrections.append({
+            "record_id": record_id, "merged_in": merged_in, "merged_out": merged_out,
+            **{f"new_{column}": value for column, value in figures.items()},
+        })
+    if corrections:
+        await db.execute(_correct_figures, corrections)
+    await db.commit()
+    return len(rows)
+
+class AttendanceBuffer:
+    """In-memory buffer of clock events, flushed to attendance_records in batches.
+
+    Events for the same employee and day are coalesced as they arrive, so a
+    burst of check-ins becomes one row per employee and a few multi-row
+    upserts instead of a transaction per event. A flush runs every
+    ``interval`` seconds, or sooner once ``flush_size`` days are waiting.
+    Buffered events are lost if the process dies before its next flush.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        schedule: WorkSchedule,
+        interval: float,
+        flush_size: int = 5000,
+        max_buffered: int = 200000
+    ):
+        self.session_factory = session_factory
+        self.schedule = schedule
+        self.interval = interval
+        self.flush_size = flush_size
+        self.max_buffered = max_buffered
+        self._pending: dict[tuple[int, date], list] = {}
+        # Employees seen to exist; they are deactivated, never deleted
+        self._known_employees: set[int] = set()
+        self._flush_lock = asyncio.Lock()
+        self._flush_due = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.accepted = 0
+        self.written = 0
+        self.rejected = 0
+        self.flushes = 0
+        self.errors = 0
+        self.flush_seconds = Histogram()
+
+    @property
+    def buffered(self) -> int:
+        return len(self._pending)
+
+    async def unknown_employees(self, employee_ids: set[int]) -> set[int]:
+        """The ids in ``employee_ids`` with no employee, looking up only ids not seen before"""
+        unseen = employee_ids - self._known_employees
+        if not unseen:
+            return set()
+        async with self.session_factory() as db:
+            found = set((await db.scalars(select(Employee.id).where(Employee.id.in_(unseen)))).all())
+        self._known_employees |= found
+        return unseen - found
+
+    def add(self, events: list[tuple]) -> int:
+        """Buffer ``(employee_id, event, timestamp, location, ip_address, device_info)`` tuples.
+
+        ``event`` is ``"in"`` or ``"out"``; naive timestamps are UTC.
+        Raises ServiceUnavailableError, buffering none of them, when the
+        events could take the buffer past ``max_buffered`` days.
+        """
+        if len(self._pending) + len(events) > self.max_buffered:
+            raise ServiceUnavailableError("Attendance buffer is full, retry shortly")
+
+        accepted = 0
+        for employee_id, event, timestamp, location, ip_address, device_info in events:
+            timestamp = _utc(timestamp)
+            key = (employee_id, self.schedule.local_date(timestamp))
+            entry = self._pending.get(key)
+            if entry is None:
+                entry = self._pending[key] = [None, None, None, None, None]
+            if event == "in":
+                _merge(entry, timestamp, None, location, ip_address, device_info)
+            else:
+                _merge(entry, None, timestamp, None, None, None)
+            accepted += 1
+
+        self.accepted += accepted
+        if len(self._pending) >= self.flush_size:
+            self._flush_due.set()
+        return accepted
+
+    def _rows(self, pending: dict) -> list[dict]:
+        # Sorted, so concurrent flushes lock rows in the same order
+        return [
+            {
+                "employee_id": employee_id,
+                "attendance_date": day,
+                "check_in_time": check_in,
+                "check_out_time": check_out,
+                "location": location,
+                "ip_address": ip_address,
+                "device_info": device_info,
+                **attendance_figures(self.schedule, day, check_in, check_out),
+            }
+            for (employee_id, day), (check_in, check_out, location, ip_address, device_info) in sorted(pending.items())
+        ]
+
+    async def _write_chunk(self, rows: list[dict]) -> tuple[int, int]:
+        async with self.session_factory() as db:
+            try:
+                return await write_attendance(db, self.schedule, rows), 0
+            except IntegrityError:
+                await db.rollback()
+            # An employee deleted outside the service since its events arrived fails the whole statement: drop and retry
+            employee_ids = {row["employee_id"] for row in rows}
+            known = set((await db.scalars(select(Employee.id).where(Employee.id.in_(employee_ids)))).all())
+            valid = [row for row in rows if row["employee_id"] in known]
+            written = await write_attendance(db, self.schedule, valid) if valid else 0
+            return written, len(rows) - len(valid)
+
+    async def flush(self) -> tuple[int, int]:
+        """Write everything buffered so far, returning days written and rejected"""
+        async with self._flush_lock:
+            self._flush_due.clear()
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return 0, 0
+
+            started = time.perf_counter()
+            rows = self._rows(pending)
+            written = rejected = 0
+            for first in range(0, len(rows), UPSERT_CHUNK_SIZE):
+                try:
+                    chunk_written, chunk_rejected = await self._write_chunk(rows[first:first + UPSERT_CHUNK_SIZE])
+                except Exception:
+                    # Put the unwritten days back for the next flush
+                    self.errors += 1
+                    for row in rows[first:]:
+                        key = (row["employee_id"], row["attendance_date"])
+                        entry = self._pending.setdefault(key, [None, None, None, None, None])
+                        _merge(entry, row["check_in_time"], row["check_out_time"],
+                               row["location"], row["ip_address"], row["device_info"])
+                    raise
+                written += chunk_written
+                rejected += chunk_rejected
+
+            self.flushes += 1
+            self.written += written
+            self.rejected += rejected
+            self.flush_seconds.observe(time.perf_counter() - started)
+            return written, rejected
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_due.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                written, rejected = await self.flush()
+                if rejected:
+                    logger.warning(f"Dropped attendance for {rejected} unknown employee days")
+            except Exception as exc:
+                logger.warning(f"Attendance flush failed, will retry: {exc}")
+                await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop flushing in the background and write what is left"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self, snapshots: bool = True) -> dict:
+        return {
+            "buffered": self.buffered,
+            "accepted": self.accepted,
+            "written": self.written,
+            "rejected": self.rejected,
+            "flushes": self.flushes,
+            "errors": self.errors,
+            "flush_seconds": self.flush_seconds.snapshot() if snapshots else self.flush_seconds,
+        }
+
+class AttendanceService:
+    """Reads of stored attendance; writes go through AttendanceBuffer"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def list_records(
+        self,
+        employee_id: int,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> list[AttendanceRecordResponse]:
+        query = select(AttendanceRecord).where(AttendanceRecord.employee_id == employee_id)
+        if start is not None:
+            query = query.where(AttendanceRecord.attendance_date >= start)
+        if end is not None:
+            query = query.where(AttendanceRecord.attendance_date <= end)
+        records = (await self.db.scalars(query.order_by(AttendanceRecord.attendance_date))).all()
+        return [AttendanceRecordResponse.from_orm(record) for record in records]
+
+def create_attendance_buffer(settings: Settings) -> AttendanceBuffer:
+    return AttendanceBuffer(
+        async_session,
+        WorkSchedule.from_settings(settings),
+        settings.attendance_flush_interval,
+        settings.attendance_flush_size,
+        settings.attendance_max_buffered
+    )
+
+attendance_buffer = create_attendance_buffer(get_settings())
+
+def get_attendance_buffer() -> AttendanceBuffer:
+    """Dependency for the process-wide buffer (overridable in tests)"""
+    return attendance_buffer
@@ -0,0 +1,191 @@
+from collections import defaultdict
+from typing import Iterable, NamedTuple, Optional
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../../"))
+
+from sqlalchemy import select, update, delete, insert, func, case, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user import Employee, Department, DepartmentStats
+from app.schemas.user import DepartmentStatsResponse
+
+# Salary percentiles of the live aggregates, by response field
+SALARY_PERCENTILES = {"salary_p50": 0.5, "salary_p90": 0.9}
+
+_is_active = Employee.is_active == True
+_is_paid = and_(_is_active, Employee.salary.is_not(None))
+
+class EmployeeFigures(NamedTuple):
+    """The employee fields that department stats depend on"""
+    department_id: Optional[int]
+    is_active: bool
+    salary: Optional[int]
+
+    @classmethod
+    def of(cls, employee: Employee) -> "EmployeeFigures":
+        return cls(employee.department_id, bool(employee.is_active), employee.salary)
+
+def aggregates_query():
+    """Grouped headcount and salary totals per department"""
+    return (
+        select(
+            Employee.department_id,
+            func.count().label("headcount"),
+            func.count(case((_is_active, 1))).label("active_count"),
+            func.coalesce(func.sum(case((_is_active, Employee.salary))), 0).label("salary_total"),
+            func.count(case((_is_paid, 1))).label("salary_count"),
+        )
+        .where(Employee.department_id.is_not(None))
+        .group_by(Employee.department_id)
+    )
+
+def percentile(values: list[int], fraction: float) -> Optional[float]:
+    """Linear-interpolated percentile of sorted values, as percentile_cont"""
+    if not values:
+        return None
+    position = fraction * (len(values) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+async def rebuild_department_stats(db: AsyncSession, department_ids: Optional[Iterable[int]] = None):
+    """Recompute summary rows from employees, for all departments when ``department_ids`` is None.
+
+    Runs in the caller's transaction and does not commit.
+    """
+    query = aggregates_query()
+    clear = delete(DepartmentStats)
+    if department_ids is None:
+        department_ids = (await db.scalars(select(Department.id))).all()
+    else:
+        department_ids = list(department_ids)
+        query = query.where(Employee.department_id.in_(department_ids))
+        clear = clear.where(DepartmentStats.department_id.in_(department_ids))
+    if not department_ids:
+        return
+
+    totals = {row.department_id: row for row in (await db.execute(query)).all()}
+    await db.execute(clear)
+    await db.execute(insert(DepartmentStats), [
+        {
+            "department_id": department_id,
+            "headcount": totals[department_id].headcount if department_id in totals else 0,
+            "active_count": totals[department_id].active_count if department_id in totals else 0,
+            "salary_total": totals[department_id].salary_total if department_id in totals else 0,
+            "salary_count": totals[department_id].salary_count if department_id in totals else 0,
+        }
+        for department_id in department_ids
+    ])
+
+async def apply_employee_change(
+    db: AsyncSession,
+    before: Optional[EmployeeFigures],
+    after: Optional[EmployeeFigures]
+):
+    """Move one employee's contribution between summary rows.
+
+    Each affected department gets a single relative UPDATE, so concurrent
+    writers never overwrite each other. A department without a summary row
+    is rebuilt from employees instead, so the change must be flushed first.
+    """
+    deltas = defaultdict(lambda: [0, 0, 0, 0])
+    for figures, sign in ((before, -1), (after, 1)):
+        if figures is None or figures.department_id is None:
+            continue
+        delta = deltas[figures.department_id]
+        delta[0] += sign
+        if figures.is_active:
+            delta[1] += sign
+            if figures.salary is not None:
+                delta[2] += sign * figures.salary
+                delta[3] += sign
+
+    for department_id, (headcount, active_count, salary_total, salary_count) in deltas.items():
+        if not (headcount or active_count or salary_total or salary_count):
+            continue
+        result = await db.execute(
+            update(DepartmentStats)
+            .where(DepartmentStats.department_id == department_id)
+            .values(
+                headcount=DepartmentStats.headcount + headcount,
+                active_count=DepartmentStats.active_count + active_count,
+                salary_total=DepartmentStats.salary_total + salary_total,
+                salary_count=DepartmentStats.salary_count + salary_count
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            await rebuild_department_stats(db, [department_id])
+
+def _response(department_id: int, name: str, totals, **percentiles) -> DepartmentStatsResponse:
+    return DepartmentStatsResponse(
+        department_id=department_id,
+        name=name,
+        headcount=totals.headcount if totals else 0,
+        active_count=totals.active_count if totals else 0,
+        salary_total=totals.salary_total if totals else 0,
+        salary_avg=totals.salary_total / totals.salary_count if totals and totals.salary_count else None,
+        **percentiles
+    )
+
+async def summary_stats(db: AsyncSession) -> list[DepartmentStatsResponse]:
+    """Read the summary table: one row per department"""
+    query = (
+        select(Department.id, Department.name, DepartmentStats)
+        .outerjoin(DepartmentStats, DepartmentStats.department_id == Department.id)
+        .order_by(Department.id)
+    )
+    rows = (await db.execute(query)).all()
+
+    # Departments created before the summary table, or never written to
+    missing = [department_id for department_id, _, stats in rows if stats is None]
+    if missing:
+        await rebuild_department_stats(db, missing)
+        await db.commit()
+        rows = (await db.execute(query.execution_options(populate_existing=True))).all()
+
+    return [_response(department_id, name, stats) for department_id, name, stats in rows]
+
+async def live_stats(db: AsyncSession) -> list[DepartmentStatsResponse]:
+    """Aggregate employees directly, with salary percentiles of active employees.
+
+    PostgreSQL computes percentiles with percentile_cont (NULLs, i.e. inactive
+    employees, are ignored); other databases stream sorted salaries.
+    """
+    query = aggregates_query()
+    if db.bind.dialect.name == "postgresql":
+        query = query.add_columns(*(
+            func.percentile_cont(fraction).within_group(case((_is_active, Employee.salary))).label(field)
+            for field, fraction in SALARY_PERCENTILES.items()
+        ))
+    totals = {row.department_id: row for row in (await db.execute(query)).all()}
+
+    if db.bind.dialect.name == "postgresql":
+        percentiles = {
+            department_id: {field: getattr(row, field) for field in SALARY_PERCENTILES}
+            for department_id, row in totals.items()
+        }
+    else:
+        # Stream sorted salaries and cut percentiles per department
+        salaries = defaultdict(list)
+        result = await db.stream(
+            select(Employee.department_id, Employee.salary)
+            .where(_is_paid, Employee.department_id.is_not(None))
+            .order_by(Employee.department_id, Employee.salary)
+            .execution_options(yield_per=10000)
+        )
+        async for department_id, salary in result:
+            salaries[department_id].append(salary)
+        percentiles = {
+            department_id: {
+                field: percentile(values, fraction) for field, fraction in SALARY_PERCENTILES.items()
+            }
+            for department_id, values in salaries.items()
+        }
+
+    departments = (await db.execute(select(Department.id, Department.name).order_by(Department.id))).all()
+    return [
+        _response(department_id, name, totals.get(department_id), **percentiles.get(department_id, {}))
+        for department_id, name in departments
+    ]
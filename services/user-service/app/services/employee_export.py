@@ -0,0 +1,124 @@
+import csv
+import io
+import json
+import sys
+import os
+from typing import AsyncIterator, Callable
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../../"))
+
+from sqlalchemy import select
+from app.models.user import Employee, Department
+
+# Rows fetched from the server-side cursor per round trip
+EXPORT_BATCH_SIZE = 2000
+
+# Exported fields: (name, column, Arrow type for Parquet)
+EXPORT_FIELDS = [
+    ("id", Employee.id, "int64"),
+    ("employee_id", Employee.employee_id, "string"),
+    ("first_name", Employee.first_name, "string"),
+    ("last_name", Employee.last_name, "string"),
+    ("email", Employee.email, "string"),
+    ("phone", Employee.phone, "string"),
+    ("date_of_birth", Employee.date_of_birth, "date32"),
+    ("address", Employee.address, "string"),
+    ("department_id", Employee.department_id, "int64"),
+    ("department_name", Department.name, "string"),
+    ("position", Employee.position, "string"),
+    ("hire_date", Employee.hire_date, "date32"),
+    ("salary", Employee.salary, "int64"),
+    ("manager_id", Employee.manager_id, "int64"),
+    ("is_active", Employee.is_active, "bool"),
+    ("created_at", Employee.created_at, "timestamp"),
+    ("updated_at", Employee.updated_at, "timestamp"),
+]
+EXPORT_COLUMNS = [name for name, _, _ in EXPORT_FIELDS]
+
+def export_query():
+    """Flat select of the exported columns; no ORM entities are built"""
+    return (
+        select(*[column.label(name) for name, column, _ in EXPORT_FIELDS])
+        .outerjoin(Department, Employee.department_id == Department.id)
+    )
+
+def _json_default(value):
+    return value.isoformat()
+
+async def csv_chunks(partitions: AsyncIterator[list]) -> AsyncIterator[bytes]:
+    """Header row, then one CSV chunk per fetched batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    async for rows in partitions:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+async def ndjson_chunks(partitions: AsyncIterator[list]) -> AsyncIterator[bytes]:
+    """One JSON object per line"""
+    async for rows in partitions:
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=_json_default) + "\n" for row in rows
+        ).encode()
+
+class _StreamSink(io.RawIOBase):
+    """Write-only file that hands out written bytes while keeping the
+    absolute position, which Parquet records in its footer"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+async def parquet_chunks(partitions: AsyncIterator[list]) -> AsyncIterator[bytes]:
+    """Parquet file written one row group per fetched batch"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {
+        "int64": pa.int64(),
+        "string": pa.string(),
+        "date32": pa.date32(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+    }
+    schema = pa.schema([(name, types[arrow_type]) for name, _, arrow_type in EXPORT_FIELDS])
+    sink = _StreamSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+
+    async for rows in partitions:
+        columns = list(zip(*rows))
+        writer.write_table(pa.Table.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+            schema=schema
+        ))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+# Export formats: (media type, file extension, chunk writer)
+EXPORT_FORMATS: dict[str, tuple[str, str, Callable]] = {
+    "csv": ("text/csv", "csv", csv_chunks),
+    "ndjson": ("application/x-ndjson", "ndjson", ndjson_chunks),
+    "parquet": ("application/vnd.apache.parquet", "parquet", parquet_chunks),
+}
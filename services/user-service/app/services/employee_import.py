@@ -0,0 +1,369 @@
+import codecs
+import csv
+import json
+import sys
+import os
+from typing import AsyncIterator, Optional
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../../"))
+
+from pydantic import ValidationError as PydanticValidationError
+from sqlalchemy import select, insert, update, bindparam
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from shared.audit.pipeline import audit_bulk_change
+from shared.utils.exceptions import ValidationError
+from app.models.user import Employee, Department
+from app.services.org_chart import MAX_HIERARCHY_DEPTH, chains_cte
+from app.schemas.user import EmployeeImportRow, EmployeeImportError, EmployeeImportResponse
+
+# Rows validated, checked and inserted per round trip
+IMPORT_BATCH_SIZE = 1000
+
+# Largest IN list per lookup query, to stay under driver bind limits
+LOOKUP_CHUNK_SIZE = 1000
+
+IMPORT_FORMATS = {"csv", "jsonl"}
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a UTF-8 byte stream into lines without buffering the whole body"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+async def iter_records(chunks: AsyncIterator[bytes], import_format: str) -> AsyncIterator[tuple[int, object]]:
+    """Yield ``(row_number, record)`` from a CSV or JSONL stream.
+
+    CSV records become dicts keyed by the header row and may span lines
+    inside quoted fields. A JSONL line that is not valid JSON is yielded as
+    the exception so it is reported against its row.
+    """
+    if import_format not in IMPORT_FORMATS:
+        raise ValidationError(f"Unsupported import format: {import_format}")
+
+    header = None
+    buffered = []
+    row_number = 0
+    async for line in iter_lines(chunks):
+        if import_format == "jsonl":
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                yield row_number, json.loads(line)
+            except ValueError as exc:
+                yield row_number, exc
+            continue
+
+        # A CSV record is complete once its quotes are balanced
+        buffered.append(line)
+        text = "\n".join(buffered)
+        if text.count('"') % 2:
+            continue
+        buffered = []
+        if not text.strip():
+            continue
+
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row_number += 1
+        yield row_number, {name: value for name, value in zip(header, values) if value != ""}
+
+    if buffered:
+        yield row_number + 1, ValueError("Unterminated quoted field")
+
+class EmployeeImporter:
+    """Set-based bulk employee import.
+
+    Rows are validated with ``EmployeeImportRow`` and handled in batches:
+    set-based queries per batch check employee IDs and emails and resolve
+    department and manager references, and the valid rows go in as
+    multi-row INSERTs, or COPY on PostgreSQL. ``manager_employee_id`` may
+    name an employee already stored or imported by an earlier batch;
+    references to rows in the same or a later batch are linked at
+    the end, unless the link would close a reporting cycle. Each batch
+    commits on its own, so a failed row never rolls back the others.
+    """
+
+    def __init__(self, db: AsyncSession, batch_size: int = IMPORT_BATCH_SIZE):
+        self.db = db
+        self.batch_size = batch_size
+        self.total_rows = 0
+        self.imported = 0
+        self.errors: list[EmployeeImportError] = []
+        self.warnings: list[EmployeeImportError] = []
+
+        # Keys seen earlier in this import, for in-file duplicate checks
+        self._seen_employee_ids: set[str] = set()
+        self._seen_emails: set[str] = set()
+        self._known_departments: set[int] = set()
+
+        # (employee_id, manager_employee_id, row) links resolved at the end
+        self._pending_managers: list[tuple[str, str, int]] = []
+        self._linked: list[int] = []
+
+    async def run(self, chunks: AsyncIterator[bytes], import_format: str) -> EmployeeImportResponse:
+        """Import every record of the stream"""
+        batch = []
+        async for row_number, record in iter_records(chunks, import_format):
+            self.total_rows += 1
+            row = self._validate(row_number, record)
+            if row is not None:
+                batch.append(row)
+            if len(batch) >= self.batch_size:
+                await self._import_batch(batch)
+                batch = []
+
+        if batch:
+            await self._import_batch(batch)
+        await self._link_managers()
+
+        self.errors.sort(key=lambda error: error.row)
+        self.warnings.sort(key=lambda warning: warning.row)
+        return EmployeeImportResponse(
+            total_rows=self.total_rows,
+            imported=self.imported,
+            failed=self.total_rows - self.imported,
+            errors=self.errors,
+            warnings=self.warnings
+        )
+
+    @property
+    def departments(self) -> set[int]:
+        """Departments referenced by rows of this import"""
+        return self._known_departments
+
+    @property
+    def linked(self) -> list[int]:
+        """Employees whose manager was set after their rows went in"""
+        return self._linked
+
+    def _fail(self, row_number: int, employee_id: Optional[str], *messages: str):
+        self.errors.append(EmployeeImportError(row=row_number, employee_id=employee_id, errors=list(messages)))
+
+    def _warn(self, row_number: int, employee_id: str, *messages: str):
+        """Report a problem with a row that was imported regardless"""
+        self.warnings.append(EmployeeImportError(row=row_number, employee_id=employee_id, errors=list(messages)))
+
+    def _validate(self, row_number: int, record: object) -> Optional[tuple[int, dict, Optional[str]]]:
+        """Validate one record, returning ``(row_number, values, manager_employee_id)``"""
+        if isinstance(record, Exception):
+            self._fail(row_number, None, f"Malformed record: {record}")
+            return None
+        if not isinstance(record, dict):
+            self._fail(row_number, None, "Record must be an object")
+            return None
+
+        try:
+            employee = EmployeeImportRow(**record)
+        except PydanticValidationError as exc:
+            messages = [f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()]
+            self._fail(row_number, record.get("employee_id"), *messages)
+            return None
+
+        if employee.manager_employee_id is not None and employee.manager_id is not None:
+            self._fail(row_number, employee.employee_id, "Give either manager_id or manager_employee_id")
+            return None
+
+        # Duplicates inside the file; the first occurrence wins
+        messages = []
+        if employee.employee_id in self._seen_employee_ids:
+            messages.append("Employee ID is repeated in the import")
+        if employee.email in self._seen_emails:
+            messages.append("Email is repeated in the import")
+        if messages:
+            self._fail(row_number, employee.employee_id, *messages)
+            return None
+        self._seen_employee_ids.add(employee.employee_id)
+        self._seen_emails.add(employee.email)
+
+        values = employee.dict(exclude={"manager_employee_id"})
+        values["is_active"] = True
+        return row_number, values, employee.manager_employee_id
+
+    async def _existing(self, column, values: set) -> set:
+        """Subset of ``values`` already present in ``column``"""
+        found = set()
+        values = list(values)
+        for start in range(0, len(values), LOOKUP_CHUNK_SIZE):
+            result = await self.db.scalars(select(column).where(column.in_(values[start:start + LOOKUP_CHUNK_SIZE])))
+            found.update(result.all())
+        return found
+
+    async def _import_batch(self, batch: list[tuple[int, dict, Optional[str]]]):
+        """Check a batch against the database with set-based queries and insert it"""
+        # One lookup covers both the duplicate check and manager_employee_id references
+        employee_codes = {values["employee_id"] for _, values, _ in batch}
+        manager_codes = {code for _, _, code in batch if code}
+        ids_by_code = await self._ids_by_employee_id(employee_codes | manager_codes)
+        existing_ids = employee_codes & ids_by_code.keys()
+        existing_emails = await self._existing(Employee.email, {values["email"] for _, values, _ in batch})
+
+        department_ids = {values["department_id"] for _, values, _ in batch if values["department_id"]}
+        missing_departments = department_ids - self._known_departments
+        if missing_departments:
+            self._known_departments |= await self._existing(Department.id, missing_departments)
+
+        manager_ids = {values["manager_id"] for _, values, _ in batch if values["manager_id"]}
+        known_managers = await self._existing(Employee.id, manager_ids) if manager_ids else set()
+
+        rows = []
+        for row_number, values, manager_employee_id in batch:
+            messages = []
+            if values["employee_id"] in existing_ids:
+                messages.append("Employee ID already exists")
+            if values["email"] in existing_emails:
+                messages.append("Email already exists")
+            if values["department_id"] and values["department_id"] not in self._known_departments:
+                messages.append("Department not found")
+            if values["manager_id"] and values["manager_id"] not in known_managers:
+                messages.append("Manager not found")
+            if messages:
+                self._fail(row_number, values["employee_id"], *messages)
+                continue
+            if manager_employee_id in ids_by_code:
+                values["manager_id"] = ids_by_code[manager_employee_id]
+                manager_employee_id = None
+            rows.append((row_number, values, manager_employee_id))
+
+        if not rows:
+            return
+
+        try:
+            if self.db.bind.dialect.driver == "asyncpg":
+                await self._copy_rows([values for _, values, _ in rows])
+            else:
+                await self.db.execute(insert(Employee), [values for _, values, _ in rows])
+            self._audit(rows)
+            await self.db.commit()
+        except IntegrityError:
+            # A concurrent writer took a key after the checks; retry row by row
+            await self.db.rollback()
+            rows = await self._insert_rows_individually(rows)
+
+        self.imported += len(rows)
+        for row_number, values, manager_employee_id in rows:
+            if manager_employee_id:
+                self._pending_managers.append((values["employee_id"], manager_employee_id, row_number))
+
+    async def _copy_rows(self, rows: list[dict]):
+        """Load rows with COPY on the session's asyncpg connection, in its transaction"""
+        # Only reached on asyncpg; other drivers never need it installed
+        from asyncpg.exceptions import IntegrityConstraintViolationError
+
+        columns = list(rows[0])
+        connection = await self.db.connection()
+        raw_connection = await connection.get_raw_connection()
+        try:
+            await raw_connection.driver_connection.copy_records_to_table(
+                Employee.__tablename__,
+                columns=columns,
+                records=[tuple(row[column] for column in columns) for row in rows]
+            )
+        except IntegrityConstraintViolationError as exc:
+            raise IntegrityError(f"COPY {Employee.__tablename__}", None, exc) from exc
+
+    async def _insert_rows_individually(self, rows: list) -> list:
+        """Insert rows one at a time, reporting the ones that still conflict"""
+        inserted = []
+        for row in rows:
+            row_number, values, _ = row
+            try:
+                async with self.db.begin_nested():
+                    await self.db.execute(insert(Employee), [values])
+                inserted.append(row)
+            except IntegrityError:
+                self._fail(row_number, values["employee_id"], "Employee ID or email already exists")
+        if inserted:
+            self._audit(inserted)
+        await self.db.commit()
+        return inserted
+
+    def _audit(self, rows: list):
+        """One audit record per committed batch: bulk inserts bypass the session events"""
+        audit_bulk_change(self.db, Employee.__tablename__, "IMPORT", {
+            "rows": len(rows),
+            "employee_ids": [values["employee_id"] for _, values, _ in rows],
+        })
+
+    async def _ids_by_employee_id(self, codes: set) -> dict[str, int]:
+        """Map employee codes to primary keys for the ones that exist"""
+        ids = {}
+        codes = list(codes)
+        for start in range(0, len(codes), LOOKUP_CHUNK_SIZE):
+            result = await self.db.execute(
+                select(Employee.employee_id, Employee.id)
+                .where(Employee.employee_id.in_(codes[start:start + LOOKUP_CHUNK_SIZE]))
+            )
+            ids.update(result.tuples().all())
+        return ids
+
+    async def _link_managers(self):
+        """Set managers referenced by rows of the same or a later batch.
+
+        The chains above every referenced manager are read in one query per
+        chunk, then each link is checked in memory against them as they
+        stand after the previous links, so rows of the file cannot form a
+        reporting cycle between them. The links go in as one executemany
+        UPDATE that bumps each row's version, with one audit summary.
+        """
+        if not self._pending_managers:
+            return
+
+        ids = await self._ids_by_employee_id({code for pair in self._pending_managers for code in pair[:2]})
+        managers = await self._manager_chains({ids[code] for _, code, _ in self._pending_managers if code in ids})
+
+        links = []
+        for employee_code, manager_code, row_number in self._pending_managers:
+            if manager_code not in ids:
+                self._warn(row_number, employee_code, "Manager not found; employee imported without a manager")
+                continue
+            employee_id, manager_id = ids[employee_code], ids[manager_code]
+            if _reports_to(managers, manager_id, employee_id):
+                self._warn(row_number, employee_code, "Manager is one of the employee's reports; employee imported without a manager")
+                continue
+            managers[employee_id] = manager_id
+            links.append({"link_id": employee_id, "link_manager_id": manager_id})
+
+        if links:
+            await self.db.execute(
+                update(Employee.__table__)
+                .where(Employee.id == bindparam("link_id"))
+                .values(manager_id=bindparam("link_manager_id"), version=Employee.version + 1),
+                links
+            )
+            audit_bulk_change(self.db, Employee.__tablename__, "UPDATE", {
+                "rows": len(links),
+                "manager_id": {link["link_id"]: link["link_manager_id"] for link in links},
+            })
+        await self.db.commit()
+        self._linked = [link["link_id"] for link in links]
+
+    async def _manager_chains(self, manager_ids: set) -> dict[int, int]:
+        """Map each of ``manager_ids`` and everyone above them to their manager"""
+        managers = {}
+        manager_ids = list(manager_ids)
+        for start in range(0, len(manager_ids), LOOKUP_CHUNK_SIZE):
+            chains = chains_cte(manager_ids[start:start + LOOKUP_CHUNK_SIZE])
+            result = await self.db.execute(select(chains.c.id, chains.c.manager_id).where(chains.c.manager_id.is_not(None)))
+            managers.update(result.tuples().all())
+        return managers
+
+def _reports_to(managers: dict[int, int], employee_id: int, manager_id: int) -> bool:
+    """Whether ``manager_id`` is ``employee_id`` or one of the managers above it"""
+    for _ in range(MAX_HIERARCHY_DEPTH + 1):
+        if employee_id == manager_id:
+            return True
+        employee_id = managers.get(employee_id)
+        if employee_id is None:
+            return False
+    return False
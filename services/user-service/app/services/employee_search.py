@@ -0,0 +1,53 @@
+import re
+import sys
+import os
+from typing import Optional
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../../"))
+
+from sqlalchemy import and_, or_, func, text, literal_column
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.dialects.mysql import match
+from app.models.user import Employee
+
+# Upper bound on search terms, to keep generated queries small
+MAX_SEARCH_TOKENS = 8
+
+def tokenize(search: str) -> list[str]:
+    """Split a search string into lowercase word tokens.
+
+    Underscores and punctuation separate tokens, as in the indexed document,
+    so "john.doe@acme.com" searches for john, doe, acme and com.
+    """
+    return re.findall(r"[^\W_]+", search.lower())[:MAX_SEARCH_TOKENS]
+
+def employee_search_clause(dialect_name: str, search: str) -> tuple[Optional[object], Optional[object]]:
+    """Build the (filter, rank) expressions for an employee search.
+
+    Every token is matched as a prefix (typeahead) and all tokens must match.
+    PostgreSQL uses the stored ``search_vector`` column (GIN indexed) and
+    ranks with ts_rank_cd, MySQL
+    uses the FULLTEXT index in boolean mode and ranks by match score. Other
+    databases fall back to unranked prefix LIKE matching.
+    """
+    tokens = tokenize(search)
+    if not tokens:
+        return None, None
+
+    if dialect_name == "postgresql":
+        query = func.to_tsquery(
+            text("'simple'::regconfig"),
+            " & ".join(f"{token}:*" for token in tokens)
+        )
+        vector = literal_column("employees.search_vector", type_=TSVECTOR)
+        return vector.op("@@")(query), func.ts_rank_cd(vector, query)
+
+    if dialect_name == "mysql":
+        score = match(
+            Employee.first_name, Employee.last_name, Employee.email, Employee.employee_id,
+            against=" ".join(f"+{token}*" for token in tokens)
+        ).in_boolean_mode()
+        return score > 0, score
+
+    columns = (Employee.first_name, Employee.last_name, Employee.email, Employee.employee_id)
+    return and_(*(or_(*(column.ilike(f"{token}%") for column in columns)) for token in tokens)), None
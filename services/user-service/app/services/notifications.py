@@ -0,0 +1,452 @@
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from typing import Any, AsyncIterator, Optional
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../../"))
+
+import orjson
+from sqlalchemy import select, insert, update, func, literal, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from shared.cache.backends import RedisBackend
+from shared.config.settings import Settings, get_settings
+from app.models.notification import Notification
+from app.models.user import Employee
+from app.schemas.notification import (
+    NotificationCreate, NotificationFanOutResponse, NotificationResponse, NotificationListResponse, MarkReadResponse
+)
+
+logger = logging.getLogger("hrsoft.notifications")
+
+# Counts adjusted per Redis call after a fan-out
+COUNTER_CHUNK_SIZE = 1000
+
+# Columns copied from the request into every recipient's row
+FAN_OUT_FIELDS = ("title", "message", "notification_type", "category", "entity_type", "entity_id")
+
+def _dumps(value: Any) -> bytes:
+    return orjson.dumps(value, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+def _sse(event: str, data: Any, event_id: Optional[int] = None) -> bytes:
+    event_line = f"event: {event}\n" if event_id is None else f"event: {event}\nid: {event_id}\n"
+    return event_line.encode() + b"data: " + _dumps(data) + b"\n\n"
+
+class UnreadCounter(ABC):
+    """Unread notifications per employee, so that the bell icon needs no COUNT(*).
+
+    A count is read from the database the first time it is asked for and
+    then adjusted by fan-outs and mark-read. Adjustments skip employees
+    without a cached count, so a count is never built from increments
+    alone. Counts an adjustment failed to reach are forgotten, to be
+    recounted on their next read; a count that drifted from a change
+    racing its first read is corrected when it expires, so the TTL is
+    kept short.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self.errors = 0
+
+    @abstractmethod
+    async def get(self, recipient_id: int) -> Optional[int]:
+        ...
+
+    @abstractmethod
+    async def fill(self, recipient_id: int, count: int):
+        """Cache a count read from the database, unless one is cached already"""
+
+    @abstractmethod
+    async def add(self, deltas: dict[int, int]):
+        """Adjust the cached counts of the employees in ``deltas``"""
+
+    @abstractmethod
+    async def forget(self, recipient_ids: list[int]):
+        """Drop cached counts, so that the next read recounts them"""
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "errors": self.errors}
+
+    async def close(self):
+        pass
+
+class MemoryUnreadCounter(UnreadCounter):
+    """Per-process counts for single-worker deployments; the least recently read are evicted"""
+
+    name = "memory"
+
+    def __init__(self, ttl: int = 300, max_entries: int = 100000):
+        super().__init__()
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._counts: OrderedDict[int, tuple[int, float]] = OrderedDict()
+
+    async def get(self, recipient_id: int) -> Optional[int]:
+        entry = self._counts.get(recipient_id)
+        if entry is None or entry[1] <= time.monotonic():
+            self._counts.pop(recipient_id, None)
+            return None
+        self._counts.move_to_end(recipient_id)
+        return entry[0]
+
+    async def fill(self, recipient_id: int, count: int):
+        if await self.get(recipient_id) is None:
+            self._counts[recipient_id] = (count, time.monotonic() + self.ttl)
+            while len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+
+    async def add(self, deltas: dict[int, int]):
+        for recipient_id, delta in deltas.items():
+            entry = self._counts.get(recipient_id)
+            if entry is not None:
+                self._counts[recipient_id] = (max(entry[0] + delta, 0), entry[1])
+
+    async def forget(self, recipient_ids: list[int]):
+        for recipient_id in recipient_ids:
+            self._counts.pop(recipient_id, None)
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "size": len(self._counts), "errors": self.errors}
+
+class RedisUnreadCounter(UnreadCounter):
+    """Counts shared by every worker; Redis expires them"""
+
+    name = "redis"
+
+    # Adjust only the counts that exist, keeping their expiry
+    ADD_EXISTING_SCRIPT = """
+    for i, key in ipairs(KEYS) do
+        if redis.call("exists", key) == 1 then
+            redis.call("incrby", key, ARGV[i])
+        end
+    end
+    return 0
+    """
+
+    def __init__(self, backend: RedisBackend, key_prefix: str = "hrsoft:", ttl: int = 300):
+        super().__init__()
+        self.backend = backend
+        self.key_prefix = f"{key_prefix}unread:"
+        self.ttl = ttl
+        self._add_existing = backend.client.register_script(self.ADD_EXISTING_SCRIPT)
+
+    async def get(self, recipient_id: int) -> Optional[int]:
+        count = await self.backend.client.get(f"{self.key_prefix}{recipient_id}")
+        return None if count is None else max(int(count), 0)
+
+    async def fill(self, recipient_id: int, count: int):
+        await self.backend.client.set(f"{self.key_prefix}{recipient_id}", count, ex=self.ttl, nx=True)
+
+    async def add(self, deltas: dict[int, int]):
+        items = list(deltas.items())
+        for first in range(0, len(items), COUNTER_CHUNK_SIZE):
+            chunk = items[first:first + COUNTER_CHUNK_SIZE]
+            await self._add_existing(
+                keys=[f"{self.key_prefix}{recipient_id}" for recipient_id, _ in chunk],
+                args=[delta for _, delta in chunk]
+            )
+
+    async def forget(self, recipient_ids: list[int]):
+        for first in range(0, len(recipient_ids), COUNTER_CHUNK_SIZE):
+            chunk = recipient_ids[first:first + COUNTER_CHUNK_SIZE]
+            await self.backend.client.delete(*(f"{self.key_prefix}{recipient_id}" for recipient_id in chunk))
+
+    async def close(self):
+        await self.backend.close()
+
+class NotificationHub:
+    """SSE streams open in this process, and the events sent to them.
+
+    An event carries each recipient's part: ``{recipient_id: data}``. With
+    a Redis backend events are published on a channel that every worker
+    listens to, so a stream sees them whichever worker created them;
+    without one, only this process's streams do. A stream that falls
+    ``max_queued`` events behind has them replaced by a single ``resync``
+    event, telling the client to reload.
+    """
+
+    def __init__(self, backend: Optional[RedisBackend] = None, channel: str = "hrsoft:notifications", max_queued: int = 100):
+        self.backend = backend
+        self.channel = channel
+        self.max_queued = max_queued
+        self._streams: dict[int, set[asyncio.Queue]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.published = 0
+        self.delivered = 0
+        self.resyncs = 0
+        self.errors = 0
+
+    def subscribe(self, recipient_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(self.max_queued)
+        self._streams.setdefault(recipient_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, recipient_id: int, queue: asyncio.Queue):
+        queues = self._streams.get(recipient_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._streams[recipient_id]
+
+    async def publish(self, event_type: str, recipients: dict[int, Any], data: Any = None):
+        """Send an event to the streams of ``recipients``, in every worker when possible"""
+        event = {"type": event_type, "data": data, "recipients": recipients}
+        self.published += 1
+        if self.backend is not None:
+            try:
+                await self.backend.client.publish(self.channel, _dumps(event))
+                return
+            except Exception as exc:
+                self.errors += 1
+                logger.warning(f"Notification publish failed, delivering in this worker only: {exc}")
+        self.deliver(event)
+
+    def deliver(self, event: dict):
+        """Queue an event for the streams of its recipients open in this process"""
+        recipients = event["recipients"]
+        # Walk whichever side is smaller: a broadcast to 50k, or a handful of streams
+        if len(self._streams) < len(recipients):
+            targets = [recipient_id for recipient_id in self._streams if recipient_id in recipients]
+        else:
+            targets = [recipient_id for recipient_id in recipients if recipient_id in self._streams]
+
+        for recipient_id in targets:
+            item = (event["type"], event["data"], recipients[recipient_id])
+            for queue in self._streams[recipient_id]:
+                try:
+                    queue.put_nowait(item)
+                except asyncio.QueueFull:
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait(("resync", None, None))
+                    self.resyncs += 1
+                self.delivered += 1
+
+    async def stream(self, recipient_id: int, queue: asyncio.Queue, unread: int, heartbeat: float) -> AsyncIterator[bytes]:
+        """Server-Sent Events for a subscribed queue, starting with the unread count"""
+        try:
+            yield _sse("unread", {"unread": unread})
+            while True:
+                try:
+                    event_type, data, part = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle connection
+                    yield b": keepalive\n\n"
+                    continue
+                if event_type == "notification":
+                    yield _sse(event_type, {"id": part, "recipient_id": recipient_id, **data}, event_id=part)
+                elif event_type == "read":
+                    yield _sse(event_type, {"ids": part})
+                else:
+                    yield _sse(event_type, {})
+        finally:
+            self.unsubscribe(recipient_id, queue)
+
+    async def _listen(self):
+        while True:
+            try:
+                async with self.backend.client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    while True:
+                        # A read timeout above the client's socket timeout, returning None when idle
+                        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                        if message is None:
+                            continue
+                        event = orjson.loads(message["data"])
+                        # JSON keys are strings
+                        event["recipients"] = {int(recipient_id): part for recipient_id, part in event["recipients"].items()}
+                        self.deliver(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self.errors += 1
+                logger.warning(f"Notification channel failed, resubscribing: {exc}")
+                await asyncio.sleep(1)
+
+    def start(self):
+        if self.backend is not None and self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "backend": "redis" if self.backend is not None else "memory",
+            "streams": sum(len(queues) for queues in self._streams.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "resyncs": self.resyncs,
+            "errors": self.errors,
+        }
+
+class NotificationService:
+    """Fan-out, listing and read state of employees' notifications"""
+
+    def __init__(self, db: AsyncSession, counter: Optional[UnreadCounter] = None, hub: Optional[NotificationHub] = None):
+        self.db = db
+        self.counter = counter if counter is not None else unread_counter
+        self.hub = hub if hub is not None else notification_hub
+
+    async def fan_out(self, notification_data: NotificationCreate, sender_id: Optional[int] = None) -> NotificationFanOutResponse:
+        """Create a row per recipient with a single INSERT ... SELECT over employees"""
+        recipients = select(Employee.id).where(Employee.is_active == True)
+        if not notification_data.all_employees:
+            recipients = recipients.where(or_(
+                Employee.id.in_(notification_data.employee_ids),
+                Employee.department_id.in_(notification_data.department_ids)
+            ))
+
+        table = Notification.__table__
+        values = {field: getattr(notification_data, field) for field in FAN_OUT_FIELDS}
+        values.update(sender_id=sender_id, is_read=False)
+        statement = insert(table).from_select(
+            ["recipient_id", *values],
+            recipients.add_columns(*(literal(value, table.c[name].type) for name, value in values.items()))
+        )
+        if self.db.bind.dialect.insert_returning:
+            rows = (await self.db.execute(statement.returning(table.c.id, table.c.recipient_id, table.c.created_at))).all()
+        else:
+            rows = await self._insert_and_read_back(statement, recipients)
+        await self.db.commit()
+        if not rows:
+            return NotificationFanOutResponse(created=0)
+
+        await self._adjust(Counter(row.recipient_id for row in rows))
+        values.update(read_at=None, created_at=rows[0].created_at)
+        await self.hub.publish("notification", {row.recipient_id: row.id for row in rows}, values)
+        return NotificationFanOutResponse(created=len(rows))
+
+    async def _insert_and_read_back(self, statement, recipients) -> list:
+        """INSERT ... SELECT without RETURNING (MySQL), then read the new rows back.
+
+        The recipients are locked first, so a fan-out to any of them waits
+        for this one to commit. Rows for those recipients above the highest
+        id seen after taking the locks are then this statement's alone,
+        under READ COMMITTED as under REPEATABLE READ.
+        """
+        table = Notification.__table__
+        await self.db.execute(recipients.order_by(Employee.id).with_for_update())
+        last_id = await self.db.scalar(select(func.coalesce(func.max(table.c.id), 0)))
+        await self.db.execute(statement)
+        return (await self.db.execute(
+            select(table.c.id, table.c.recipient_id, table.c.created_at)
+            .where(table.c.id > last_id, table.c.recipient_id.in_(recipients.scalar_subquery()))
+        )).all()
+
+    async def list_notifications(
+        self,
+        recipient_id: int,
+        unread_only: bool = False,
+        before_id: Optional[int] = None,
+        limit: int = 20
+    ) -> NotificationListResponse:
+        """Newest first, a page at a time by id"""
+        query = (
+            select(Notification)
+            .where(Notification.recipient_id == recipient_id)
+            .order_by(Notification.id.desc())
+            .limit(limit)
+        )
+        if unread_only:
+            query = query.where(Notification.is_read == False)
+        if before_id is not None:
+            query = query.where(Notification.id < before_id)
+        notifications = (await self.db.scalars(query)).all()
+        return NotificationListResponse(
+            notifications=[NotificationResponse.from_orm(notification) for notification in notifications],
+            unread=await self.unread_count(recipient_id),
+            next_before_id=notifications[-1].id if len(notifications) == limit else None
+        )
+
+    async def unread_count(self, recipient_id: int) -> int:
+        try:
+            count = await self.counter.get(recipient_id)
+            if count is not None:
+                return count
+        except Exception as exc:
+            self._counter_failed(exc)
+
+        count = await self.db.scalar(
+            select(func.count()).select_from(Notification)
+            .where(Notification.recipient_id == recipient_id, Notification.is_read == False)
+        )
+        try:
+            await self.counter.fill(recipient_id, count)
+        except Exception as exc:
+            self._counter_failed(exc)
+        return count
+
+    async def mark_read(self, recipient_id: int, ids: Optional[list[int]] = None) -> MarkReadResponse:
+        """Mark the given notifications, or all of them, read in one UPDATE.
+
+        Without UPDATE ... RETURNING (MySQL) the unread ids are selected
+        FOR UPDATE first, then updated by id.
+        """
+        unread = [Notification.recipient_id == recipient_id, Notification.is_read == False]
+        if ids is not None:
+            unread.append(Notification.id.in_(ids))
+        statement = (
+            update(Notification)
+            .values(is_read=True, read_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        if self.db.bind.dialect.update_returning:
+            marked = (await self.db.scalars(statement.where(*unread).returning(Notification.id))).all()
+        else:
+            marked = (await self.db.scalars(select(Notification.id).where(*unread).with_for_update())).all()
+            if marked:
+                await self.db.execute(statement.where(Notification.id.in_(marked)))
+        await self.db.commit()
+
+        if marked:
+            await self._adjust({recipient_id: -len(marked)})
+            await self.hub.publish("read", {recipient_id: sorted(marked)})
+        return MarkReadResponse(marked=len(marked), unread=await self.unread_count(recipient_id))
+
+    async def _adjust(self, deltas: dict[int, int]):
+        # Committed already: on failure the counts are recounted on their next
+        # read, or corrected at expiry if they cannot be dropped either
+        try:
+            await self.counter.add(deltas)
+        except Exception as exc:
+            self._counter_failed(exc)
+            try:
+                await self.counter.forget(list(deltas))
+            except Exception as exc:
+                self._counter_failed(exc)
+
+    def _counter_failed(self, exc: Exception):
+        self.counter.errors += 1
+        logger.warning(f"Unread counter failed, using the database: {exc}")
+
+def create_notification_backends(settings: Settings) -> tuple[UnreadCounter, NotificationHub]:
+    """Redis counts and channel when the cache uses Redis, else per-process ones"""
+    if settings.cache_backend == "redis":
+        try:
+            backend = RedisBackend(settings.redis_url)
+            return (
+                RedisUnreadCounter(backend, settings.cache_key_prefix, settings.notification_unread_ttl),
+                NotificationHub(backend, f"{settings.cache_key_prefix}notifications", settings.notification_stream_max_queued)
+            )
+        except RuntimeError as exc:
+            logger.warning(f"{exc}; keeping notification counts per process")
+    return (
+        MemoryUnreadCounter(settings.notification_unread_ttl),
+        NotificationHub(max_queued=settings.notification_stream_max_queued)
+    )
+
+# Process-wide counter and hub
+unread_counter, notification_hub = create_notification_backends(get_settings())
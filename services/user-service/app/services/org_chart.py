@@ -0,0 +1,75 @@
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../../"))
+
+from sqlalchemy import CTE, select, literal
+from app.models.user import Employee
+
+# Deepest reporting chain walked; also stops the recursion on bad data
+MAX_HIERARCHY_DEPTH = 64
+
+# Columns returned for each employee in a hierarchy
+ORG_CHART_COLUMNS = (
+    Employee.id,
+    Employee.employee_id,
+    Employee.first_name,
+    Employee.last_name,
+    Employee.position,
+    Employee.department_id,
+    Employee.manager_id,
+    Employee.is_active,
+)
+
+def reports_cte(employee_id: int, max_depth: int = MAX_HIERARCHY_DEPTH) -> CTE:
+    """Recursive CTE of (id, depth) for everyone under ``employee_id``.
+
+    Each level is one probe of the ``manager_id`` index per manager.
+    """
+    reports = (
+        select(Employee.id, literal(1).label("depth"))
+        .where(Employee.manager_id == employee_id)
+        .cte("reports", recursive=True)
+    )
+    return reports.union_all(
+        select(Employee.id, reports.c.depth + 1)
+        .join(reports, Employee.manager_id == reports.c.id)
+        .where(reports.c.depth < max_depth)
+    )
+
+def managers_cte(employee_id: int, max_depth: int = MAX_HIERARCHY_DEPTH) -> CTE:
+    """Recursive CTE of (id, depth) for the managers above ``employee_id``"""
+    managers = (
+        select(Employee.manager_id.label("id"), literal(1).label("depth"))
+        .where(Employee.id == employee_id, Employee.manager_id.is_not(None))
+        .cte("managers", recursive=True)
+    )
+    return managers.union_all(
+        select(Employee.manager_id, managers.c.depth + 1)
+        .join(managers, Employee.id == managers.c.id)
+        .where(Employee.manager_id.is_not(None), managers.c.depth < max_depth)
+    )
+
+def chains_cte(employee_ids: list[int]) -> CTE:
+    """Recursive CTE of (id, manager_id) for ``employee_ids`` and every manager above them.
+
+    UNION drops rows already found, so chains that meet are walked once
+    and a cycle in bad data ends the recursion.
+    """
+    chains = (
+        select(Employee.id, Employee.manager_id)
+        .where(Employee.id.in_(employee_ids))
+        .cte("chains", recursive=True)
+    )
+    return chains.union(
+        select(Employee.id, Employee.manager_id)
+        .join(chains, Employee.id == chains.c.manager_id)
+    )
+
+def hierarchy_query(hierarchy: CTE):
+    """Select the org-chart columns and depth of every employee in ``hierarchy``"""
+    return (
+        select(*ORG_CHART_COLUMNS, hierarchy.c.depth)
+        .join(hierarchy, Employee.id == hierarchy.c.id)
+        .order_by(hierarchy.c.depth, Employee.id)
+    )
@@ -0,0 +1,638 @@
+import asyncio
+import heapq
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import NamedTuple, Optional
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../../../"))
+
+import numpy as np
+from sqlalchemy import select, insert, update, delete, func, case, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+from shared.config.settings import Settings
+from shared.database.base import get_async_database_url
+from shared.utils.exceptions import NotFoundError, DuplicateError, ConflictError
+from app.models.attendance import AttendanceRecord
+from app.models.leave import LeaveType, LeaveRequest
+from app.models.payroll import SalaryComponent, EmployeeSalaryStructure, PayrollCycle, PayrollRecord, PayrollDetail
+from app.models.user import Employee
+from app.schemas.payroll import (
+    SalaryComponentCreate, SalaryComponentResponse, SalaryStructureCreate, SalaryStructureResponse,
+    PayrollCycleCreate, PayrollCycleResponse, PayrollRecordResponse, PayrollRecordListResponse,
+    PayrollDetailResponse, PayslipResponse
+)
+
+logger = logging.getLogger("hrsoft.payroll")
+
+PERIODS_PER_YEAR = {"MONTHLY": 12, "BIWEEKLY": 26, "WEEKLY": 52, "QUARTERLY": 4}
+
+# Records per COPY or multi-row INSERT, and per id lookup after it
+WRITE_CHUNK_SIZE = 10000
+
+# Cycles that may be (re)computed; a run replaces the cycle's records
+RUNNABLE_STATUSES = ("DRAFT", "COMPLETED", "FAILED")
+
+_CENTS = Decimal("0.01")
+
+class PayrollPolicy(NamedTuple):
+    """Pay rules that are not stored per component"""
+    hours_per_day: int
+    overtime_rate: int  # Percent of the hourly rate
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "PayrollPolicy":
+        return cls(settings.payroll_hours_per_day, settings.payroll_overtime_rate)
+
+class CycleInfo(NamedTuple):
+    """What a partition needs to know about the cycle it computes"""
+    id: int
+    start_date: date
+    end_date: date
+    working_days: int  # Monday to Friday
+    periods_per_year: int
+
+    @classmethod
+    def of(cls, cycle: PayrollCycle) -> "CycleInfo":
+        return cls(
+            cycle.id, cycle.start_date, cycle.end_date,
+            int(np.busday_count(cycle.start_date, cycle.end_date + timedelta(days=1))),
+            PERIODS_PER_YEAR[cycle.period_type]
+        )
+
+class ComponentTable(NamedTuple):
+    """Active salary components as columns, one entry per component"""
+    ids: np.ndarray
+    earning: np.ndarray  # Masks
+    deduction: np.ndarray
+    percentage: np.ndarray
+    gross_based: np.ndarray
+    tax: np.ndarray
+    insurance: np.ndarray
+    mandatory: np.ndarray
+    default_value: np.ndarray  # Cents
+    default_rate: np.ndarray  # Basis points (hundredths of a percent)
+
+    @classmethod
+    def from_rows(cls, rows: list[tuple]) -> "ComponentTable":
+        """From ``(id, type, category, calculation_type, calculation_base, default_value, default_percentage, is_mandatory)``"""
+        def column(index, dtype=np.int64):
+            return np.array([row[index] for row in rows], dtype=dtype)
+
+        def flag(index, value):
+            return np.array([row[index] == value for row in rows], dtype=bool)
+
+        return cls(
+            ids=column(0),
+            earning=flag(1, "EARNING"),
+            deduction=flag(1, "DEDUCTION"),
+            percentage=flag(3, "PERCENTAGE"),
+            gross_based=flag(4, "GROSS_SALARY"),
+            tax=flag(2, "TAX"),
+            insurance=flag(2, "INSURANCE"),
+            mandatory=np.array([bool(row[7]) for row in rows], dtype=bool),
+            default_value=column(5),
+            default_rate=np.array([_basis_points(row[6]) or 0 for row in rows], dtype=np.int64),
+        )
+
+class Assignments(NamedTuple):
+    """Employee salary structures in force, as parallel columns"""
+    employees: np.ndarray  # Row index into the partition's employees
+    components: np.ndarray  # Index into the ComponentTable
+    amount: np.ndarray  # Cents
+    rate: np.ndarray  # Basis points, -1 for the component default
+
+class PayrollResult(NamedTuple):
+    basic: np.ndarray
+    overtime: np.ndarray
+    total_earnings: np.ndarray
+    gross: np.ndarray
+    total_deductions: np.ndarray
+    net: np.ndarray
+    tax: np.ndarray
+    insurance: np.ndarray
+    applies: np.ndarray  # (employees, components) masks and values
+    amounts: np.ndarray
+    bases: np.ndarray
+    rates: np.ndarray
+
+class PartitionTotals(NamedTuple):
+    employees: int
+    gross: int
+    deductions: int
+    net: int
+
+def _basis_points(percentage) -> Optional[int]:
+    return None if percentage is None else int(round(Decimal(percentage) * 100))
+
+def _div_round(numerator: np.ndarray, denominator) -> np.ndarray:
+    """Integer division rounding half up, for non-negative cents"""
+    return (numerator + denominator // 2) // denominator
+
+def compute_payroll(
+    cycle: CycleInfo,
+    policy: PayrollPolicy,
+    components: ComponentTable,
+    salary: np.ndarray,
+    absent_days: np.ndarray,
+    overtime_centihours: np.ndarray,
+    assignments: Assignments
+) -> PayrollResult:
+    """Pay for every employee of a partition at once, in int64 cents.
+
+    ``salary`` is the monthly salary. The basic pay for the period loses a
+    day's pay per unpaid absence; overtime is paid at ``overtime_rate``
+    percent of the hourly rate. Components apply to the employees they are
+    assigned to, and mandatory ones to everyone else with their defaults.
+    Percentages of the basic salary come first, then the gross (basic,
+    overtime and earnings), then percentages of the gross.
+    """
+    count, width = len(salary), len(components.ids)
+    days = max(cycle.working_days, 1)
+    period_salary = _div_round(salary * 12, cycle.periods_per_year)
+    basic = _div_round(period_salary * (days - np.clip(absent_days, 0, days)), days)
+    overtime = _div_round(
+        period_salary * overtime_centihours * policy.overtime_rate,
+        days * policy.hours_per_day * 100 * 100
+    )
+
+    # Defaults for every employee, then their own assignments over them
+    applies = np.broadcast_to(components.mandatory, (count, width)).copy()
+    fixed = np.broadcast_to(components.default_value, (count, width)).copy()
+    rates = np.broadcast_to(components.default_rate, (count, width)).copy()
+    rows, columns = assignments.employees, assignments.components
+    applies[rows, columns] = True
+    fixed[rows, columns] = assignments.amount
+    rates[rows, columns] = np.where(assignments.rate >= 0, assignments.rate, components.default_rate[columns])
+
+    bases = np.repeat(basic[:, None], width, axis=1)
+    amounts = np.where(components.percentage, _div_round(bases * rates, 10000), fixed)
+    amounts[~applies] = 0
+    earnings = overtime + (amounts * components.earning).sum(axis=1)
+    gross = basic + earnings
+
+    of_gross = components.percentage & components.gross_based
+    if of_gross.any():
+        bases[:, of_gross] = gross[:, None]
+        amounts[:, of_gross] = np.where(applies[:, of_gross], _div_round(bases[:, of_gross] * rates[:, of_gross], 10000), 0)
+
+    deductions = amounts * components.deduction
+    total_deductions = deductions.sum(axis=1)
+    return PayrollResult(
+        basic=basic,
+        overtime=overtime,
+        total_earnings=earnings,
+        gross=gross,
+        total_deductions=total_deductions,
+        net=gross - total_deductions,
+        tax=(deductions * components.tax).sum(axis=1),
+        insurance=(deductions * components.insurance).sum(axis=1),
+        applies=applies,
+        amounts=amounts,
+        bases=bases,
+        rates=rates,
+    )
+
+def _employee_filter(departments: list[Optional[int]]):
+    """Active employees of the partition's departments (None: no department)"""
+    department_ids = [department_id for department_id in departments if department_id is not None]
+    in_departments = Employee.department_id.in_(department_ids)
+    if None in departments:
+        in_departments = or_(in_departments, Employee.department_id.is_(None))
+    return Employee.is_active.is_(True), in_departments
+
+async def _load_partition(db: AsyncSession, cycle: CycleInfo, components: ComponentTable, departments: list[Optional[int]]):
+    """Employees, attendance totals, leave and salary structures of a partition, in four queries"""
+    employee_filter = _employee_filter(departments)
+    employees = (await db.execute(
+        select(Employee.id, func.coalesce(Employee.salary, 0)).where(*employee_filter).order_by(Employee.id)
+    )).all()
+    table = np.array(employees, dtype=np.int64).reshape(-1, 2)
+    employee_ids, salary = table[:, 0], table[:, 1]
+
+    # Days with a check-in are worked; ON_LEAVE days are paid and ABSENT ones are not
+    attendance = (await db.execute(
+        select(
+            AttendanceRecord.employee_id,
+            func.count(AttendanceRecord.check_in_time),
+            func.sum(case((AttendanceRecord.status == "ON_LEAVE", 1), else_=0)),
+            func.sum(case((AttendanceRecord.status == "ABSENT", 1), else_=0)),
+            func.coalesce(func.sum(AttendanceRecord.overtime_hours), 0),
+        )
+        .join(Employee, Employee.id == AttendanceRecord.employee_id)
+        .where(*employee_filter, AttendanceRecord.attendance_date.between(cycle.start_date, cycle.end_date))
+        .group_by(AttendanceRecord.employee_id)
+    )).all()
+    worked, leave, absent, overtime = (np.zeros(len(employee_ids), dtype=np.int64) for _ in range(4))
+    if attendance:
+        rows = np.searchsorted(employee_ids, np.array([row[0] for row in attendance], dtype=np.int64))
+        worked[rows] = [row[1] for row in attendance]
+        leave[rows] = [row[2] for row in attendance]
+        absent[rows] = [row[3] for row in attendance]
+        overtime[rows] = np.rint(np.array([float(row[4]) for row in attendance]) * 100)
+
+    # Approved leave, in working days within the cycle. Attendance may mark
+    # the same days ON_LEAVE, so they count once and the leave type decides
+    # whether they are paid; unpaid leave is deducted like an absence
+    requests = (await db.execute(
+        select(LeaveRequest.employee_id, LeaveRequest.start_date, LeaveRequest.end_date, LeaveType.is_paid)
+        .join(Employee, Employee.id == LeaveRequest.employee_id)
+        .join(LeaveType, LeaveType.id == LeaveRequest.leave_type_id)
+        .where(
+            *employee_filter,
+            LeaveRequest.status == "APPROVED",
+            LeaveRequest.start_date <= cycle.end_date,
+            LeaveRequest.end_date >= cycle.start_date,
+        )
+    )).all()
+    if requests:
+        rows = np.searchsorted(employee_ids, np.array([row[0] for row in requests], dtype=np.int64))
+        starts = np.maximum(np.array([row[1] for row in requests], dtype="datetime64[D]"), np.datetime64(cycle.start_date))
+        ends = np.minimum(np.array([row[2] for row in requests], dtype="datetime64[D]"), np.datetime64(cycle.end_date))
+        days = np.busday_count(starts, ends + 1)
+        paid = np.array([bool(row[3]) for row in requests], dtype=bool)
+        paid_days, unpaid_days = (np.zeros(len(employee_ids), dtype=np.int64) for _ in range(2))
+        np.add.at(paid_days, rows[paid], days[paid])
+        np.add.at(unpaid_days, rows[~paid], days[~paid])
+        leave = np.maximum(np.maximum(leave - unpaid_days, 0), paid_days)
+        absent += unpaid_days
+
+    # Latest assignment per employee and component first, so np.unique keeps it
+    structures = (await db.execute(
+        select(
+            EmployeeSalaryStructure.employee_id, EmployeeSalaryStructure.salary_component_id,
+            EmployeeSalaryStructure.amount, EmployeeSalaryStructure.percentage
+        )
+        .join(Employee, Employee.id == EmployeeSalaryStructure.employee_id)
+        .where(
+            *employee_filter,
+            EmployeeSalaryStructure.is_active.is_(True),
+            EmployeeSalaryStructure.effective_date <= cycle.end_date,
+            or_(EmployeeSalaryStructure.end_date.is_(None), EmployeeSalaryStructure.end_date >= cycle.start_date),
+        )
+        .order_by(
+            EmployeeSalaryStructure.employee_id, EmployeeSalaryStructure.salary_component_id,
+            EmployeeSalaryStructure.effective_date.desc(), EmployeeSalaryStructure.id.desc()
+        )
+    )).all()
+    assignments = Assignments(*(np.zeros(0, dtype=np.int64) for _ in range(4)))
+    if structures and len(components.ids):
+        component_order = np.argsort(components.ids)
+        structure_components = np.array([row[1] for row in structures], dtype=np.int64)
+        positions = np.minimum(np.searchsorted(components.ids, structure_components, sorter=component_order), len(components.ids) - 1)
+        columns = component_order[positions]
+        # Assignments of inactive components are ignored
+        known = components.ids[columns] == structure_components
+        rows = np.searchsorted(employee_ids, np.array([row[0] for row in structures], dtype=np.int64))
+        _, first = np.unique(rows[known] * len(components.ids) + columns[known], return_index=True)
+        selected = np.flatnonzero(known)[first]
+        assignments = Assignments(
+            rows[selected],
+            columns[selected],
+            np.array([structures[index][2] for index in selected], dtype=np.int64),
+            np.array([_basis_points(structures[index][3]) if structures[index][3] is not None else -1 for index in selected], dtype=np.int64),
+        )
+
+    return employee_ids, salary, worked, leave, absent, overtime, assignments
+
+async def _copy_or_insert(db: AsyncSession, table, columns: list[str], records: list[tuple]):
+    """COPY on asyncpg, else one multi-row INSERT, in the session's transaction"""
+    if db.bind.dialect.driver == "asyncpg":
+        connection = await db.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(table.name, columns=columns, records=records)
+    else:
+        await db.execute(insert(table), [dict(zip(columns, record)) for record in records])
+
+RECORD_COLUMNS = [
+    "payroll_cycle_id", "employee_id", "basic_salary", "gross_salary", "total_earnings", "total_deductions",
+    "net_salary", "tax_amount", "insurance_amount", "worked_days", "overtime_hours", "leave_days",
+    "absent_days", "payslip_number", "payment_status",
+]
+DETAIL_COLUMNS = ["payroll_record_id", "salary_component_id", "amount", "calculation_base", "rate_percentage"]
+
+async def _write_partition(
+    db: AsyncSession,
+    cycle: CycleInfo,
+    components: ComponentTable,
+    employee_ids: np.ndarray,
+    days: tuple,
+    result: PayrollResult
+):
+    """Bulk insert records, read their ids back, then bulk insert the details"""
+    worked, leave, absent, overtime = days
+    decimals = {}
+
+    def decimal(value: int, exponent: int = 0) -> Decimal:
+        key = (value, exponent)
+        if key not in decimals:
+            decimals[key] = Decimal(value).scaleb(exponent).quantize(_CENTS)
+        return decimals[key]
+
+    component_ids = components.ids.tolist()
+    for first in range(0, len(employee_ids), WRITE_CHUNK_SIZE):
+        chunk = slice(first, first + WRITE_CHUNK_SIZE)
+        chunk_ids = employee_ids[chunk]
+        columns = [
+            result.basic[chunk], result.gross[chunk], result.total_earnings[chunk], result.total_deductions[chunk],
+            result.net[chunk], result.tax[chunk], result.insurance[chunk],
+        ]
+        records = [
+            (
+                cycle.id, employee_id, *amounts,
+                decimal(worked_days), decimal(overtime_centihours, -2), decimal(leave_days), decimal(absent_days),
+                f"PS-{cycle.id}-{employee_id}", "PENDING",
+            )
+            for employee_id, *amounts, worked_days, overtime_centihours, leave_days, absent_days in zip(
+                chunk_ids.tolist(), *(column.tolist() for column in columns),
+                worked[chunk].tolist(), overtime[chunk].tolist(), leave[chunk].tolist(), absent[chunk].tolist()
+            )
+        ]
+        await _copy_or_insert(db, PayrollRecord.__table__, RECORD_COLUMNS, records)
+
+        written = np.array((await db.execute(
+            select(PayrollRecord.employee_id, PayrollRecord.id)
+            .where(PayrollRecord.payroll_cycle_id == cycle.id, PayrollRecord.employee_id.in_(chunk_ids.tolist()))
+            .order_by(PayrollRecord.employee_id)
+        )).all(), dtype=np.int64).reshape(-1, 2)
+        record_ids = written[np.searchsorted(written[:, 0], chunk_ids), 1]
+
+        rows, columns = np.nonzero(result.applies[chunk])
+        percentage = components.percentage[columns]
+        details = [
+            (
+                record_id, component_ids[column], amount,
+                base if is_percentage else None,
+                decimal(rate, -2) if is_percentage else None,
+            )
+            for record_id, column, amount, base, rate, is_percentage in zip(
+                record_ids[rows].tolist(), columns.tolist(),
+                result.amounts[chunk][rows, columns].tolist(), result.bases[chunk][rows, columns].tolist(),
+                result.rates[chunk][rows, columns].tolist(), percentage.tolist()
+            )
+        ]
+        if details:
+            await _copy_or_insert(db, PayrollDetail.__table__, DETAIL_COLUMNS, details)
+        await db.commit()
+
+async def run_partition(
+    db: AsyncSession,
+    cycle: CycleInfo,
+    policy: PayrollPolicy,
+    component_rows: list[tuple],
+    departments: list[Optional[int]]
+) -> PartitionTotals:
+    """Compute and write the payroll of some departments' active employees"""
+    components = ComponentTable.from_rows(component_rows)
+    employee_ids, salary, worked, leave, absent, overtime, assignments = await _load_partition(
+        db, cycle, components, departments
+    )
+    if not len(employee_ids):
+        return PartitionTotals(0, 0, 0, 0)
+    result = compute_payroll(cycle, policy, components, salary, absent, overtime, assignments)
+    await _write_partition(db, cycle, components, employee_ids, (worked, leave, absent, overtime), result)
+    return PartitionTotals(
+        len(employee_ids), int(result.gross.sum()), int(result.total_deductions.sum()), int(result.net.sum())
+    )
+
+async def _run_partition_on(database_url: str, *args) -> PartitionTotals:
+    engine = create_async_engine(get_async_database_url(database_url), poolclass=NullPool)
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            return await run_partition(db, *args)
+    finally:
+        await engine.dispose()
+
+def _run_partition_process(database_url: str, *args) -> PartitionTotals:
+    """Worker process entry point, with its own event loop and connection"""
+    return asyncio.run(_run_partition_on(database_url, *args))
+
+def plan_partitions(headcounts: list[tuple], workers: int) -> list[list[Optional[int]]]:
+    """Split departments into at most ``workers`` groups of similar headcount.
+
+    Largest departments first, each to the group with the fewest employees.
+    """
+    groups = [(0, index, []) for index in range(max(workers, 1))]
+    for department_id, headcount in sorted(headcounts, key=lambda item: -item[1]):
+        total, index, departments = heapq.heappop(groups)
+        departments.append(department_id)
+        heapq.heappush(groups, (total + headcount, index, departments))
+    return [departments for _, _, departments in sorted(groups, key=lambda group: group[1]) if departments]
+
+class PayrollEngine:
+    """Runs a payroll cycle for every active employee.
+
+    Each department group is loaded in a few set-based queries, computed
+    column-wise with NumPy and written with bulk inserts. With more than
+    one worker the groups run in separate processes, each with its own
+    connection; the pool is started per run.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        policy: PayrollPolicy,
+        workers: int = 1,
+        database_url: Optional[str] = None,
+        stale_after: float = 3600
+    ):
+        self.db = db
+        self.policy = policy
+        self.workers = workers if database_url else 1
+        self.database_url = database_url
+        self.stale_after = stale_after
+
+    async def run(self, cycle_id: int, processed_by: Optional[int] = None) -> PayrollCycleResponse:
+        """Compute the cycle, replacing any records of an earlier run.
+
+        A run that fails or is cancelled leaves the cycle FAILED without
+        records. A cycle still PROCESSING ``stale_after`` seconds after its
+        run was claimed belongs to a process that died, and is claimed again.
+        """
+        stale = datetime.now(timezone.utc) - timedelta(seconds=self.stale_after)
+        claimed = await self.db.execute(
+            update(PayrollCycle)
+            .where(
+                PayrollCycle.id == cycle_id,
+                or_(
+                    PayrollCycle.status.in_(RUNNABLE_STATUSES),
+                    and_(PayrollCycle.status == "PROCESSING", PayrollCycle.updated_at < stale)
+                )
+            )
+            .values(status="PROCESSING", updated_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+        if claimed.rowcount == 0:
+            status = await self.db.scalar(select(PayrollCycle.status).where(PayrollCycle.id == cycle_id))
+            if status is None:
+                raise NotFoundError("Payroll cycle not found")
+            raise ConflictError(f"Payroll cycle is {status}")
+
+        cycle = await self.db.get(PayrollCycle, cycle_id, populate_existing=True)
+        started = time.perf_counter()
+        try:
+            await self._clear(cycle_id)
+            totals = await self._run_partitions(CycleInfo.of(cycle))
+        except BaseException:
+            # Cancellation included: the cycle must not stay PROCESSING
+            await self._fail(cycle_id)
+            raise
+
+        cycle.status = "COMPLETED"
+        cycle.total_employees = sum(part.employees for part in totals)
+        cycle.total_gross_amount = sum(part.gross for part in totals)
+        cycle.total_deductions = sum(part.deductions for part in totals)
+        cycle.total_net_amount = sum(part.net for part in totals)
+        cycle.processed_by = processed_by
+        cycle.processed_at = datetime.now(timezone.utc)
+        await self.db.commit()
+        await self.db.refresh(cycle)
+        logger.info(
+            f"Payroll cycle {cycle_id}: {cycle.total_employees} employees in "
+            f"{len(totals)} partitions, {time.perf_counter() - started:.1f}s"
+        )
+        return PayrollCycleResponse.from_orm(cycle)
+
+    async def _fail(self, cycle_id: int):
+        """Mark the cycle FAILED, then drop the records its run wrote; a rerun replaces them anyway"""
+        try:
+            await self.db.rollback()
+            await self.db.execute(update(PayrollCycle).where(PayrollCycle.id == cycle_id).values(status="FAILED"))
+            await self.db.commit()
+            await self._clear(cycle_id)
+        except Exception as exc:
+            logger.error(f"Payroll cycle {cycle_id} failed and could not be marked FAILED: {exc}")
+
+    async def _clear(self, cycle_id: int):
+        records = select(PayrollRecord.id).where(PayrollRecord.payroll_cycle_id == cycle_id)
+        await self.db.execute(delete(PayrollDetail).where(PayrollDetail.payroll_record_id.in_(records)))
+        await self.db.execute(delete(PayrollRecord).where(PayrollRecord.payroll_cycle_id == cycle_id))
+        await self.db.commit()
+
+    async def _run_partitions(self, cycle: CycleInfo) -> list[PartitionTotals]:
+        component_rows = [tuple(row) for row in (await self.db.execute(
+            select(
+                SalaryComponent.id, SalaryComponent.type, SalaryComponent.category,
+                SalaryComponent.calculation_type, SalaryComponent.calculation_base,
+                SalaryComponent.default_value, SalaryComponent.default_percentage, SalaryComponent.is_mandatory
+            ).where(SalaryComponent.is_active.is_(True)).order_by(SalaryComponent.id)
+        )).all()]
+        headcounts = (await self.db.execute(
+            select(Employee.department_id, func.count()).where(Employee.is_active.is_(True)).group_by(Employee.department_id)
+        )).all()
+        partitions = plan_partitions(headcounts, self.workers)
+        if len(partitions) <= 1:
+            return [await run_partition(self.db, cycle, self.policy, component_rows, departments) for departments in partitions]
+
+        # Spawned, not forked: the parent's event loop and connections must not be inherited
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(len(partitions), mp_context=multiprocessing.get_context("spawn")) as pool:
+            return list(await asyncio.gather(*(
+                loop.run_in_executor(
+                    pool, _run_partition_process, self.database_url,
+                    cycle, self.policy, component_rows, departments
+                )
+                for departments in partitions
+            )))
+
+class PayrollService:
+    """Salary components and structures, cycles and their results"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_component(self, component_data: SalaryComponentCreate) -> SalaryComponentResponse:
+        if await self.db.scalar(select(SalaryComponent.id).where(SalaryComponent.code == component_data.code)):
+            raise DuplicateError("Salary component code already exists")
+        
+        component = SalaryComponent(**component_data.dict())
+        self.db.add(component)
+        await self.db.commit()
+        await self.db.refresh(component)
+        return SalaryComponentResponse.from_orm(component)
+
+    async def list_components(self, is_active: Optional[bool] = None) -> list[SalaryComponentResponse]:
+        query = select(SalaryComponent).order_by(SalaryComponent.id)
+        if is_active is not None:
+            query = query.where(SalaryComponent.is_active == is_active)
+        return [SalaryComponentResponse.from_orm(component) for component in (await self.db.scalars(query)).all()]
+
+    async def create_structure(self, structure_data: SalaryStructureCreate) -> SalaryStructureResponse:
+        if not await self.db.scalar(select(Employee.id).where(Employee.id == structure_data.employee_id)):
+            raise NotFoundError("Employee not found")
+        if not await self.db.scalar(select(SalaryComponent.id).where(SalaryComponent.id == structure_data.salary_component_id)):
+            raise NotFoundError("Salary component not found")
+        
+        structure = EmployeeSalaryStructure(**structure_data.dict())
+        self.db.add(structure)
+        await self.db.commit()
+        await self.db.refresh(structure)
+        return SalaryStructureResponse.from_orm(structure)
+
+    async def create_cycle(self, cycle_data: PayrollCycleCreate) -> PayrollCycleResponse:
+        cycle = PayrollCycle(**cycle_data.dict())
+        self.db.add(cycle)
+        await self.db.commit()
+        await self.db.refresh(cycle)
+        return PayrollCycleResponse.from_orm(cycle)
+
+    async def get_cycle(self, cycle_id: int) -> PayrollCycleResponse:
+        cycle = await self.db.get(PayrollCycle, cycle_id)
+        if cycle is None:
+            raise NotFoundError("Payroll cycle not found")
+        return PayrollCycleResponse.from_orm(cycle)
+
+    async def list_records(self, cycle_id: int, page: int = 1, page_size: int = 100) -> PayrollRecordListResponse:
+        await self.get_cycle(cycle_id)
+        total = await self.db.scalar(
+            select(func.count()).select_from(PayrollRecord).where(PayrollRecord.payroll_cycle_id == cycle_id)
+        )
+        records = (await self.db.scalars(
+            select(PayrollRecord)
+            .where(PayrollRecord.payroll_cycle_id == cycle_id)
+            .order_by(PayrollRecord.employee_id)
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+        )).all()
+        return PayrollRecordListResponse(
+            records=[PayrollRecordResponse.from_orm(record) for record in records],
+            total=total,
+            page=page,
+            page_size=page_size
+        )
+
+    async def get_payslip(self, cycle_id: int, employee_id: int) -> PayslipResponse:
+        record = await self.db.scalar(select(PayrollRecord).where(
+            PayrollRecord.payroll_cycle_id == cycle_id, PayrollRecord.employee_id == employee_id
+        ))
+        if record is None:
+            raise NotFoundError("Payroll record not found")
+        
+        details = (await self.db.execute(
+            select(PayrollDetail, SalaryComponent.code, SalaryComponent.name, SalaryComponent.type)
+            .join(SalaryComponent, SalaryComponent.id == PayrollDetail.salary_component_id)
+            .where(PayrollDetail.payroll_record_id == record.id)
+            .order_by(SalaryComponent.id)
+        )).all()
+        return PayslipResponse(
+            **PayrollRecordResponse.from_orm(record).dict(),
+            details=[
+                PayrollDetailResponse(
+                    salary_component_id=detail.salary_component_id,
+                    code=code,
+                    name=name,
+                    type=component_type,
+                    amount=detail.amount,
+                    calculation_base=detail.calculation_base,
+                    rate_percentage=detail.rate_percentage
+                )
+                for detail, code, name, component_type in details
+            ]
+        )
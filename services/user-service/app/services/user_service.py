@@ -1,197 +1,587 @@
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, and_
-from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy import select, update, func, or_, and_, tuple_
+from sqlalchemy.exc import IntegrityError
+from typing import AsyncIterator, Optional
 import sys
 import os
 import math
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "../../../../"))
 
-from shared.utils.exceptions import NotFoundError, DuplicateError
+from shared.utils.exceptions import HRSoftException, NotFoundError, DuplicateError, ValidationError, ConflictError
+from shared.utils.pagination import encode_cursor, decode_cursor, count_rows, estimate_rows
+from shared.utils.conditional import ResourceVersion, resource_version
+from shared.cache.cache import cache
+from shared.audit.pipeline import audit_row_change
+from app.services.employee_search import employee_search_clause
+from app.services.employee_import import EmployeeImporter
+from app.services.employee_export import EXPORT_BATCH_SIZE, EXPORT_FORMATS, export_query
+from app.services.department_stats import (
+    EmployeeFigures, apply_employee_change, rebuild_department_stats, summary_stats, live_stats
+)
+from app.services.org_chart import MAX_HIERARCHY_DEPTH, reports_cte, managers_cte, hierarchy_query
 from app.models.user import Employee, Department, EmployeeProfile
 from app.schemas.user import (
     EmployeeCreate, EmployeeUpdate, EmployeeResponse, EmployeeDetailResponse,
     EmployeeListResponse, DepartmentCreate, DepartmentUpdate, DepartmentResponse,
-    EmployeeProfileCreate, EmployeeProfileUpdate, EmployeeProfileResponse
+    EmployeeProfileCreate, EmployeeProfileUpdate, EmployeeProfileResponse, EmployeeImportResponse,
+    EmployeeBatchResponse, OrgChartNode, OrgChartResponse, DepartmentStatsResponse
+)
+
+# Sort keys accepted for employee listing; every key is tie-broken on id
+EMPLOYEE_SORT_COLUMNS = {
+    "id": Employee.id,
+    "employee_id": Employee.employee_id,
+    "last_name": Employee.last_name,
+}
+
+# Cache namespaces. Employee responses embed their department, so
+# department changes invalidate both.
+DEPARTMENT_CACHE = "departments"
+EMPLOYEE_CACHE = "employees"
+
+# Most employee IDs accepted by one batch detail request
+EMPLOYEE_BATCH_MAX_IDS = 200
+
+# Columns behind each response field, for list pages built from rows
+# rather than ORM entities and response models
+EMPLOYEE_LIST_COLUMNS = tuple(
+    getattr(Employee, field) for field in EmployeeResponse.model_fields if field != "department"
 )
+DEPARTMENT_LIST_COLUMNS = tuple(getattr(Department, field) for field in DepartmentResponse.model_fields)
+
+# Employee fields that department stats depend on
+EMPLOYEE_STATS_FIELDS = frozenset(EmployeeFigures._fields)
+
+def _is_unique_violation(exc: IntegrityError, column: str) -> bool:
+    """Whether ``exc`` is a unique constraint violation on ``column`` (any backend)"""
+    message = str(exc.orig).lower()
+    return column in message and ("unique" in message or "duplicate" in message)
+
+def _employee_row(row) -> dict:
+    """Response-shaped dict of an employee list row with its department"""
+    employee = {column.key: row[index] for index, column in enumerate(EMPLOYEE_LIST_COLUMNS)}
+    department = row[len(EMPLOYEE_LIST_COLUMNS):]
+    employee["department"] = (
+        {column.key: value for column, value in zip(DEPARTMENT_LIST_COLUMNS, department)}
+        if department[0] is not None else None
+    )
+    return employee
+
+# Conditional GET validators of each cacheable representation. The same
+# version comes from a served payload or from UserService's version queries.
+# Row versions make them exact; updated_at still covers unversioned profiles.
+def department_version(department_id: int, version: int, updated_at) -> ResourceVersion:
+    return resource_version(f"department:{department_id}:{version}", [updated_at])
+
+def departments_version(is_active: Optional[bool], count: int, version_total: int, updated_at: list) -> ResourceVersion:
+    """Every update raises the version total; rows leaving the filter change the count"""
+    return resource_version(f"departments:{is_active}:{count}:{version_total}", updated_at)
+
+def employee_version(employee_id: int, versions: tuple, updated_at: tuple) -> ResourceVersion:
+    """Employee detail: the employee, its department and its profile"""
+    return resource_version(f"employee:{employee_id}:{versions}", updated_at)
 
 class UserService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
+    async def _get_employee_with_department(self, employee_id: int) -> Optional[Employee]:
+        """Load an employee with its department eagerly (no lazy loads under asyncio)"""
+        return await self.db.scalar(
+            select(Employee)
+            .options(joinedload(Employee.department))
+            .where(Employee.id == employee_id)
+            .execution_options(populate_existing=True)
+        )
+
     # Employee methods
     async def create_employee(self, employee_data: EmployeeCreate) -> EmployeeResponse:
         """Create a new employee"""
         # Check if employee_id already exists
-        existing_employee = self.db.query(Employee).filter(
+        existing_employee = await self.db.scalar(select(Employee).where(
             Employee.employee_id == employee_data.employee_id
-        ).first()
+        ))
         if existing_employee:
             raise DuplicateError("Employee ID already exists")
         
         # Check if email already exists
-        existing_email = self.db.query(Employee).filter(
+        existing_email = await self.db.scalar(select(Employee).where(
             Employee.email == employee_data.email
-        ).first()
+        ))
         if existing_email:
             raise DuplicateError("Email already exists")
         
         # Validate department exists
         if employee_data.department_id:
-            department = self.db.query(Department).filter(
-                Department.id == employee_data.department_id
-            ).first()
+            department = await self.db.get(Department, employee_data.department_id)
             if not department:
                 raise NotFoundError("Department not found")
         
         # Validate manager exists
         if employee_data.manager_id:
-            manager = self.db.query(Employee).filter(
-                Employee.id == employee_data.manager_id
-            ).first()
+            manager = await self.db.get(Employee, employee_data.manager_id)
             if not manager:
                 raise NotFoundError("Manager not found")
         
         # Create employee
         db_employee = Employee(**employee_data.dict())
         self.db.add(db_employee)
-        self.db.commit()
-        self.db.refresh(db_employee)
+        await self.db.flush()
+        await apply_employee_change(self.db, None, EmployeeFigures.of(db_employee))
+        await self.db.commit()
         
+        db_employee = await self._get_employee_with_department(db_employee.id)
         return EmployeeResponse.from_orm(db_employee)
 
-    async def list_employees(
+    async def import_employees(self, chunks: AsyncIterator[bytes], import_format: str) -> EmployeeImportResponse:
+        """Bulk import employees from a CSV or JSONL byte stream"""
+        importer = EmployeeImporter(self.db)
+        result = await importer.run(chunks, import_format)
+        if importer.linked:
+            await cache.invalidate(EMPLOYEE_CACHE, *[f"detail:{employee_id}" for employee_id in importer.linked])
+        if result.imported and importer.departments:
+            await rebuild_department_stats(self.db, importer.departments)
+            await self.db.commit()
+        return result
+
+    def _filter_employees(
         self,
-        page: int = 1,
-        page_size: int = 10,
+        query,
         department_id: Optional[int] = None,
         is_active: Optional[bool] = None,
         search: Optional[str] = None
-    ) -> EmployeeListResponse:
-        """List employees with pagination and filters"""
-        query = self.db.query(Employee).options(joinedload(Employee.department))
-        
-        # Apply filters
+    ):
+        """Apply the employee list filters to a select, returning it with the search rank"""
+        rank = None
         if department_id:
-            query = query.filter(Employee.department_id == department_id)
+            query = query.where(Employee.department_id == department_id)
         
         if is_active is not None:
-            query = query.filter(Employee.is_active == is_active)
+            query = query.where(Employee.is_active == is_active)
         
         if search:
-            search_filter = or_(
-                Employee.first_name.ilike(f"%{search}%"),
-                Employee.last_name.ilike(f"%{search}%"),
-                Employee.email.ilike(f"%{search}%"),
-                Employee.employee_id.ilike(f"%{search}%")
-            )
-            query = query.filter(search_filter)
+            search_filter, rank = employee_search_clause(self.db.bind.dialect.name, search)
+            if search_filter is not None:
+                query = query.where(search_filter)
         
-        # Get total count
-        total = query.count()
+        return query, rank
+
+    async def list_employees(
+        self,
+        page: int = 1,
+        page_size: int = 10,
+        department_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+        search: Optional[str] = None,
+        pagination: str = "offset",
+        cursor: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        count: str = "exact"
+    ) -> EmployeeListResponse:
+        """List employees with offset or keyset (cursor) pagination and filters"""
+        return EmployeeListResponse(**await self.list_employee_rows(
+            page=page,
+            page_size=page_size,
+            department_id=department_id,
+            is_active=is_active,
+            search=search,
+            pagination=pagination,
+            cursor=cursor,
+            sort_by=sort_by,
+            count=count
+        ))
+
+    async def list_employee_rows(
+        self,
+        page: int = 1,
+        page_size: int = 10,
+        department_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+        search: Optional[str] = None,
+        pagination: str = "offset",
+        cursor: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        count: str = "exact"
+    ) -> dict:
+        """``list_employees`` as a plain dict shaped like ``EmployeeListResponse``.
+
+        Only the response columns are selected and rows become dicts
+        directly, with no ORM entities or Pydantic models per row.
+        """
+        query, rank = self._filter_employees(select(*EMPLOYEE_LIST_COLUMNS), department_id, is_active, search)
         
-        # Apply pagination
-        offset = (page - 1) * page_size
-        employees = query.offset(offset).limit(page_size).all()
+        # Searches are ranked by relevance unless another order is requested
+        if sort_by is None:
+            sort_by = "relevance" if search and pagination == "offset" else "id"
+        if sort_by == "relevance" and (not search or pagination == "cursor"):
+            raise ValidationError("Relevance ordering requires a search term and offset pagination")
         
-        total_pages = math.ceil(total / page_size)
+        # Get total count
+        total = None
+        if count == "exact":
+            total = await count_rows(self.db, query)
+        elif count == "estimated":
+            total = await estimate_rows(self.db, query)
+        
+        query = query.add_columns(
+            *(column.label(f"department_{column.key}") for column in DEPARTMENT_LIST_COLUMNS)
+        ).outerjoin(
+            Department, Department.id == Employee.department_id
+        )
+        if sort_by == "relevance":
+            sort_column = None
+            query = query.order_by(rank.desc(), Employee.id) if rank is not None else query.order_by(Employee.id)
+        else:
+            sort_column = EMPLOYEE_SORT_COLUMNS[sort_by]
+            query = query.order_by(sort_column, Employee.id)
         
-        return EmployeeListResponse(
-            employees=[EmployeeResponse.from_orm(emp) for emp in employees],
-            total=total,
-            page=page,
-            page_size=page_size,
-            total_pages=total_pages
+        # Apply pagination
+        if pagination == "cursor":
+            if cursor:
+                position = decode_cursor(cursor)
+                if position.get("sort") != sort_by or "id" not in position:
+                    raise ValidationError("Cursor does not match the requested sort order")
+                if sort_by == "id":
+                    query = query.where(Employee.id > position["id"])
+                else:
+                    query = query.where(tuple_(sort_column, Employee.id) > tuple_(position["key"], position["id"]))
+            page = None
+        else:
+            query = query.offset((page - 1) * page_size)
+        
+        # Fetch one extra row to learn whether another page follows
+        result = await self.db.execute(query.limit(page_size + 1))
+        employees = result.all()
+        has_more = len(employees) > page_size
+        employees = employees[:page_size]
+        
+        next_cursor = None
+        if pagination == "cursor" and has_more:
+            last = employees[-1]
+            next_cursor = encode_cursor({"sort": sort_by, "key": getattr(last, sort_column.key), "id": last.id})
+        
+        total_pages = math.ceil(total / page_size) if total is not None else None
+        
+        return {
+            "employees": [_employee_row(row) for row in employees],
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": total_pages,
+            "next_cursor": next_cursor,
+        }
+
+    async def export_employees(
+        self,
+        export_format: str,
+        department_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+        search: Optional[str] = None
+    ) -> AsyncIterator[bytes]:
+        """Stream every employee matching the list filters, in id order.
+
+        Rows come from a server-side cursor in batches of ``EXPORT_BATCH_SIZE``
+        and are encoded batch by batch, so memory stays flat however many
+        rows match.
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError(f"Unsupported export format: {export_format}")
+        
+        query, _ = self._filter_employees(export_query(), department_id, is_active, search)
+        result = await self.db.stream(
+            query.order_by(Employee.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
         )
+        _, _, write_chunks = EXPORT_FORMATS[export_format]
+        return write_chunks(result.partitions())
 
     async def get_employee_detail(self, employee_id: int) -> EmployeeDetailResponse:
-        """Get employee with profile details"""
-        employee = self.db.query(Employee).options(
-            joinedload(Employee.department)
-        ).filter(Employee.id == employee_id).first()
+        """Get employee with profile details (cached)"""
+        async def load():
+            return (await self._load_employee_detail(employee_id)).dict()
         
-        if not employee:
+        data = await cache.get_or_load(EMPLOYEE_CACHE, f"detail:{employee_id}", load)
+        return EmployeeDetailResponse(**data)
+
+    async def _load_employee_detail(self, employee_id: int) -> EmployeeDetailResponse:
+        """Load employee with department and profile from the database in one query"""
+        row = (await self.db.execute(
+            select(Employee, EmployeeProfile)
+            .outerjoin(EmployeeProfile, EmployeeProfile.employee_id == Employee.id)
+            .options(joinedload(Employee.department))
+            .where(Employee.id == employee_id)
+            .execution_options(populate_existing=True)
+        )).first()
+        
+        if not row:
             raise NotFoundError("Employee not found")
         
-        # Get profile
-        profile = self.db.query(EmployeeProfile).filter(
-            EmployeeProfile.employee_id == employee_id
-        ).first()
-        
+        return self._employee_detail(*row)
+
+    def _employee_detail(self, employee: Employee, profile: Optional[EmployeeProfile]) -> EmployeeDetailResponse:
         employee_dict = EmployeeResponse.from_orm(employee).dict()
         employee_dict["profile"] = EmployeeProfileResponse.from_orm(profile) if profile else None
-        
         return EmployeeDetailResponse(**employee_dict)
 
-    async def update_employee(self, employee_id: int, employee_data: EmployeeUpdate) -> EmployeeResponse:
-        """Update employee"""
-        employee = self.db.query(Employee).filter(Employee.id == employee_id).first()
-        if not employee:
+    async def get_employee_version(self, employee_id: int) -> ResourceVersion:
+        """Validators of ``get_employee_detail``: from the cached copy, else one indexed lookup"""
+        cached = await cache.peek(EMPLOYEE_CACHE, f"detail:{employee_id}")
+        if cached is not None:
+            department, profile = cached["department"], cached["profile"]
+            return employee_version(
+                employee_id,
+                (cached["version"], department["version"] if department else None),
+                (cached["updated_at"], department and department["updated_at"], profile and profile["updated_at"])
+            )
+        
+        row = (await self.db.execute(
+            select(
+                Employee.version, Department.version,
+                Employee.updated_at, Department.updated_at, EmployeeProfile.updated_at
+            )
+            .outerjoin(Department, Department.id == Employee.department_id)
+            .outerjoin(EmployeeProfile, EmployeeProfile.employee_id == Employee.id)
+            .where(Employee.id == employee_id)
+        )).first()
+        if not row:
             raise NotFoundError("Employee not found")
+        return employee_version(employee_id, tuple(row[:2]), tuple(row[2:]))
+
+    async def get_employee_details(self, employee_ids: list[int]) -> EmployeeBatchResponse:
+        """Get many employees with department and profile in three queries.
+
+        Employees come back in request order; unknown IDs are listed in ``missing``.
+        """
+        employee_ids = list(dict.fromkeys(employee_ids))
+        if len(employee_ids) > EMPLOYEE_BATCH_MAX_IDS:
+            raise ValidationError(f"At most {EMPLOYEE_BATCH_MAX_IDS} employee IDs per request")
+        if not employee_ids:
+            return EmployeeBatchResponse(employees=[], missing=[])
+        
+        # Employees, then their departments via one IN query
+        employees = {
+            employee.id: employee
+            for employee in await self.db.scalars(
+                select(Employee)
+                .options(selectinload(Employee.department))
+                .where(Employee.id.in_(employee_ids))
+                .execution_options(populate_existing=True)
+            )
+        }
         
-        # Check email uniqueness if email is being updated
-        if employee_data.email and employee_data.email != employee.email:
-            existing_email = self.db.query(Employee).filter(
-                Employee.email == employee_data.email,
-                Employee.id != employee_id
-            ).first()
-            if existing_email:
+        # Profiles for the employees found
+        profiles = {
+            profile.employee_id: profile
+            for profile in await self.db.scalars(
+                select(EmployeeProfile).where(EmployeeProfile.employee_id.in_(list(employees)))
+            )
+        } if employees else {}
+        
+        return EmployeeBatchResponse(
+            employees=[
+                self._employee_detail(employees[employee_id], profiles.get(employee_id))
+                for employee_id in employee_ids
+                if employee_id in employees
+            ],
+            missing=[employee_id for employee_id in employee_ids if employee_id not in employees]
+        )
+
+    async def update_employee(self, employee_id: int, employee_data: EmployeeUpdate) -> EmployeeResponse:
+        """Update employee in one UPDATE on PostgreSQL (see ``_versioned_update`` elsewhere).
+
+        When ``version`` is sent it must still match, or nothing is written
+        and ConflictError (409) is raised. Email uniqueness is enforced by
+        the unique index rather than checked beforehand.
+        """
+        values = employee_data.dict(exclude_unset=True)
+        expected_version = values.pop("version", None)
+        
+        # Validate department exists if being updated (cached read)
+        if values.get("department_id"):
+            await self.get_department(values["department_id"])
+        
+        # Validate manager exists and is not one of the employee's reports
+        if values.get("manager_id"):
+            await self._check_manager(employee_id, values["manager_id"])
+        
+        row = await self._update_employee_row(employee_id, values, expected_version)
+        await self.db.commit()
+        await cache.invalidate(EMPLOYEE_CACHE, f"detail:{employee_id}")
+        
+        employee = dict(row._mapping)
+        employee["department"] = await self.get_department(row.department_id) if row.department_id else None
+        return EmployeeResponse(**employee)
+
+    async def _update_employee_row(self, employee_id: int, values: dict, expected_version: Optional[int] = None):
+        """Write ``values`` and bump the version, returning the response columns.
+
+        Changes to department stats fields also get the figures they
+        replace from the update itself. Does not commit.
+        """
+        stats_changed = bool(EMPLOYEE_STATS_FIELDS & values.keys())
+        try:
+            row, previous = await self._versioned_update(
+                Employee, employee_id, values, expected_version, EMPLOYEE_LIST_COLUMNS,
+                EmployeeFigures._fields if stats_changed else ()
+            )
+        except IntegrityError as exc:
+            await self.db.rollback()
+            if _is_unique_violation(exc, "email"):
                 raise DuplicateError("Email already exists")
-        
-        # Validate department exists if being updated
-        if employee_data.department_id:
-            department = self.db.query(Department).filter(
-                Department.id == employee_data.department_id
-            ).first()
-            if not department:
-                raise NotFoundError("Department not found")
-        
-        # Update fields
-        update_data = employee_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(employee, field, value)
-        
-        self.db.commit()
-        self.db.refresh(employee)
-        
-        return EmployeeResponse.from_orm(employee)
+            raise
+        if not row:
+            raise await self._missing_or_stale(Employee, employee_id, "Employee not found")
+        
+        if stats_changed:
+            await apply_employee_change(
+                self.db,
+                EmployeeFigures(previous["department_id"], bool(previous["is_active"]), previous["salary"]),
+                EmployeeFigures(row.department_id, bool(row.is_active), row.salary)
+            )
+        return row
+
+    async def _versioned_update(
+        self,
+        model,
+        row_id: int,
+        values: dict,
+        expected_version: Optional[int],
+        columns: tuple,
+        previous_fields: tuple = ()
+    ):
+        """Write ``values`` to one row and bump its version.
+
+        Returns ``columns`` of the result and a dict of the values replaced,
+        for the changed fields, the version and ``previous_fields``; the
+        audit log takes the change from these instead of reading the row.
+        On PostgreSQL this is a single UPDATE ... FROM a locked read of the
+        row, RETURNING new and old values. Elsewhere the row is locked and
+        its previous values read first, then a single UPDATE ... RETURNING;
+        MySQL has no RETURNING on UPDATE, so the row is read back after it.
+        (None, None) when no row matched.
+        """
+        fields = list(dict.fromkeys([*values, "version", *previous_fields]))
+        guard = [model.id == row_id]
+        if expected_version is not None:
+            guard.append(model.version == expected_version)
+        statement = (
+            update(model)
+            .values(**values, version=model.version + 1)
+            .execution_options(synchronize_session=False, audit_logged=True)
+        )
+
+        if self.db.bind.dialect.name == "postgresql":
+            old = select(model.id, *[getattr(model, field) for field in fields]).where(*guard).with_for_update().subquery("previous")
+            frozen = (await self.db.execute(
+                statement.where(model.id == old.c.id)
+                .returning(*columns, *[old.c[field].label(f"previous_{field}") for field in fields])
+            )).freeze()
+            returned = frozen().first()
+            if not returned:
+                return None, None
+            row = frozen().columns(*range(len(columns))).first()
+            previous = dict(zip(fields, returned[len(columns):]))
+        else:
+            current = (await self.db.execute(
+                select(*[getattr(model, field) for field in fields]).where(*guard).with_for_update()
+            )).first()
+            if not current:
+                return None, None
+            previous = dict(current._mapping)
+            statement = statement.where(model.id == row_id)
+            if self.db.bind.dialect.update_returning:
+                row = (await self.db.execute(statement.returning(*columns))).first()
+            else:
+                await self.db.execute(statement)
+                row = (await self.db.execute(select(*columns).where(model.id == row_id))).first()
+
+        audit_row_change(self.db, model.__tablename__, row_id, previous, {**values, "version": previous["version"] + 1})
+        return row, previous
+
+    async def _missing_or_stale(self, model, row_id: int, message: str) -> HRSoftException:
+        """Why a guarded UPDATE matched no row: gone, or a newer version"""
+        exists = await self.db.scalar(select(model.id).where(model.id == row_id))
+        return ConflictError() if exists is not None else NotFoundError(message)
+
+    async def _check_manager(self, employee_id: int, manager_id: int):
+        """Reject a manager that does not exist or would create a reporting cycle"""
+        if manager_id == employee_id:
+            raise ValidationError("An employee cannot be their own manager")
+        
+        manager = await self.db.get(Employee, manager_id)
+        if not manager:
+            raise NotFoundError("Manager not found")
+        
+        managers = managers_cte(manager_id)
+        cycle = await self.db.scalar(select(managers.c.id).where(managers.c.id == employee_id).limit(1))
+        if cycle is not None:
+            raise ValidationError("Manager is one of the employee's reports")
 
     async def delete_employee(self, employee_id: int):
         """Soft delete employee"""
-        employee = self.db.query(Employee).filter(Employee.id == employee_id).first()
-        if not employee:
+        await self._update_employee_row(employee_id, {"is_active": False})
+        await self.db.commit()
+        await cache.invalidate(EMPLOYEE_CACHE, f"detail:{employee_id}")
+
+    # Org chart methods
+    async def get_reports(
+        self,
+        employee_id: int,
+        max_depth: int = MAX_HIERARCHY_DEPTH,
+        is_active: Optional[bool] = None
+    ) -> OrgChartResponse:
+        """Get everyone under an employee, direct reports first, in one query"""
+        query = hierarchy_query(reports_cte(employee_id, max_depth))
+        if is_active is not None:
+            query = query.where(Employee.is_active == is_active)
+        return await self._org_chart(employee_id, query)
+
+    async def get_managers(self, employee_id: int) -> OrgChartResponse:
+        """Get an employee's reporting chain, direct manager first, in one query"""
+        return await self._org_chart(employee_id, hierarchy_query(managers_cte(employee_id)))
+
+    async def _org_chart(self, employee_id: int, query) -> OrgChartResponse:
+        rows = (await self.db.execute(query)).mappings().all()
+        
+        # An empty hierarchy still needs the employee to exist
+        if not rows and not await self.db.scalar(select(Employee.id).where(Employee.id == employee_id)):
             raise NotFoundError("Employee not found")
         
-        employee.is_active = False
-        self.db.commit()
+        return OrgChartResponse(
+            employee_id=employee_id,
+            total=len(rows),
+            employees=[OrgChartNode(**row) for row in rows]
+        )
 
     # Employee Profile methods
     async def create_employee_profile(self, profile_data: EmployeeProfileCreate) -> EmployeeProfileResponse:
         """Create employee profile"""
         # Check if employee exists
-        employee = self.db.query(Employee).filter(Employee.id == profile_data.employee_id).first()
+        employee = await self.db.get(Employee, profile_data.employee_id)
         if not employee:
             raise NotFoundError("Employee not found")
         
         # Check if profile already exists
-        existing_profile = self.db.query(EmployeeProfile).filter(
+        existing_profile = await self.db.scalar(select(EmployeeProfile).where(
             EmployeeProfile.employee_id == profile_data.employee_id
-        ).first()
+        ))
         if existing_profile:
             raise DuplicateError("Employee profile already exists")
         
         db_profile = EmployeeProfile(**profile_data.dict())
         self.db.add(db_profile)
-        self.db.commit()
-        self.db.refresh(db_profile)
+        await self.db.commit()
+        await self.db.refresh(db_profile)
+        await cache.invalidate(EMPLOYEE_CACHE, f"detail:{profile_data.employee_id}")
         
         return EmployeeProfileResponse.from_orm(db_profile)
 
     async def update_employee_profile(self, employee_id: int, profile_data: EmployeeProfileUpdate) -> EmployeeProfileResponse:
         """Update employee profile"""
-        profile = self.db.query(EmployeeProfile).filter(
+        profile = await self.db.scalar(select(EmployeeProfile).where(
             EmployeeProfile.employee_id == employee_id
-        ).first()
+        ))
         if not profile:
             raise NotFoundError("Employee profile not found")
         
@@ -200,8 +590,9 @@ class UserService:
         for field, value in update_data.items():
             setattr(profile, field, value)
         
-        self.db.commit()
-        self.db.refresh(profile)
+        await self.db.commit()
+        await self.db.refresh(profile)
+        await cache.invalidate(EMPLOYEE_CACHE, f"detail:{employee_id}")
         
         return EmployeeProfileResponse.from_orm(profile)
 
@@ -209,66 +600,115 @@ class UserService:
     async def create_department(self, department_data: DepartmentCreate) -> DepartmentResponse:
         """Create a new department"""
         # Check if department name already exists
-        existing_dept = self.db.query(Department).filter(
+        existing_dept = await self.db.scalar(select(Department).where(
             Department.name == department_data.name
-        ).first()
+        ))
         if existing_dept:
             raise DuplicateError("Department name already exists")
         
         db_department = Department(**department_data.dict())
         self.db.add(db_department)
-        self.db.commit()
-        self.db.refresh(db_department)
+        await self.db.commit()
+        await self.db.refresh(db_department)
+        await cache.invalidate_namespace(DEPARTMENT_CACHE)
         
         return DepartmentResponse.from_orm(db_department)
 
     async def list_departments(self, is_active: Optional[bool] = None) -> list[DepartmentResponse]:
-        """List all departments"""
-        query = self.db.query(Department)
+        """List all departments (cached)"""
+        return [DepartmentResponse(**dept) for dept in await self.list_department_rows(is_active)]
+
+    async def list_department_rows(self, is_active: Optional[bool] = None) -> list[dict]:
+        """``list_departments`` as response-shaped dicts, straight from the cache"""
+        async def load():
+            query = select(*DEPARTMENT_LIST_COLUMNS)
+            
+            if is_active is not None:
+                query = query.where(Department.is_active == is_active)
+            
+            result = await self.db.execute(query.order_by(Department.id))
+            return [dict(row._mapping) for row in result.all()]
+        
+        return await cache.get_or_load(DEPARTMENT_CACHE, f"list:{is_active}", load)
+
+    async def get_departments_version(self, is_active: Optional[bool] = None) -> ResourceVersion:
+        """Validators of ``list_departments``: from the cached copy, else a count and the latest update"""
+        cached = await cache.peek(DEPARTMENT_CACHE, f"list:{is_active}")
+        if cached is not None:
+            return departments_version(
+                is_active, len(cached), sum(dept["version"] for dept in cached), [dept["updated_at"] for dept in cached]
+            )
         
+        query = select(func.count(), func.coalesce(func.sum(Department.version), 0), func.max(Department.updated_at))
         if is_active is not None:
-            query = query.filter(Department.is_active == is_active)
-        
-        departments = query.all()
-        return [DepartmentResponse.from_orm(dept) for dept in departments]
+            query = query.where(Department.is_active == is_active)
+        count, version_total, updated_at = (await self.db.execute(query)).one()
+        return departments_version(is_active, count, version_total, [updated_at])
 
-    async def get_department(self, department_id: int) -> DepartmentResponse:
-        """Get department by ID"""
-        department = self.db.query(Department).filter(Department.id == department_id).first()
-        if not department:
+    async def get_department_version(self, department_id: int) -> ResourceVersion:
+        """Validators of ``get_department``: from the cached copy, else a primary key lookup"""
+        cached = await cache.peek(DEPARTMENT_CACHE, str(department_id))
+        if cached is not None:
+            return department_version(department_id, cached["version"], cached["updated_at"])
+        
+        row = (await self.db.execute(
+            select(Department.version, Department.updated_at).where(Department.id == department_id)
+        )).first()
+        if not row:
             raise NotFoundError("Department not found")
+        return department_version(department_id, row.version, row.updated_at)
+
+    async def get_department(self, department_id: int) -> DepartmentResponse:
+        """Get department by ID (cached)"""
+        async def load():
+            department = await self.db.get(Department, department_id)
+            if not department:
+                raise NotFoundError("Department not found")
+            return DepartmentResponse.from_orm(department).dict()
         
-        return DepartmentResponse.from_orm(department)
+        return DepartmentResponse(**await cache.get_or_load(DEPARTMENT_CACHE, str(department_id), load))
 
     async def update_department(self, department_id: int, department_data: DepartmentUpdate) -> DepartmentResponse:
-        """Update department"""
-        department = self.db.query(Department).filter(Department.id == department_id).first()
-        if not department:
-            raise NotFoundError("Department not found")
-        
-        # Check name uniqueness if name is being updated
-        if department_data.name and department_data.name != department.name:
-            existing_dept = self.db.query(Department).filter(
-                Department.name == department_data.name,
-                Department.id != department_id
-            ).first()
-            if existing_dept:
-                raise DuplicateError("Department name already exists")
+        """Update department in one UPDATE on PostgreSQL (see ``_versioned_update`` elsewhere).
+
+        ``version`` and name uniqueness are handled as in ``update_employee``.
+        """
+        values = department_data.dict(exclude_unset=True)
+        expected_version = values.pop("version", None)
         
         # Validate manager exists if being updated
-        if department_data.manager_id:
-            manager = self.db.query(Employee).filter(
-                Employee.id == department_data.manager_id
-            ).first()
-            if not manager:
+        if values.get("manager_id"):
+            manager = await self.db.scalar(select(Employee.id).where(Employee.id == values["manager_id"]))
+            if manager is None:
                 raise NotFoundError("Manager not found")
         
-        # Update fields
-        update_data = department_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(department, field, value)
+        try:
+            row, _ = await self._versioned_update(Department, department_id, values, expected_version, DEPARTMENT_LIST_COLUMNS)
+        except IntegrityError as exc:
+            await self.db.rollback()
+            if _is_unique_violation(exc, "name"):
+                raise DuplicateError("Department name already exists")
+            raise
+        if not row:
+            raise await self._missing_or_stale(Department, department_id, "Department not found")
         
-        self.db.commit()
-        self.db.refresh(department)
+        await self.db.commit()
+        await cache.invalidate_namespace(DEPARTMENT_CACHE)
+        await cache.invalidate_namespace(EMPLOYEE_CACHE)
         
-        return DepartmentResponse.from_orm(department)
+        return DepartmentResponse(**row._mapping)
+
+    async def get_department_stats(self, source: str = "summary") -> list[DepartmentStatsResponse]:
+        """Headcount and salary aggregates per department.
+
+        ``summary`` reads the incrementally maintained table (O(departments));
+        ``live`` aggregates employees and adds salary percentiles.
+        """
+        if source == "live":
+            return await live_stats(self.db)
+        return await summary_stats(self.db)
+
+    async def rebuild_department_stats(self):
+        """Recompute the department summary table from employees"""
+        await rebuild_department_stats(self.db)
+        await self.db.commit()
@@ -0,0 +1,429 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import date, datetime, time as time_of_day, timezone
+from decimal import Decimal
+from itertools import chain
+from typing import Callable, Iterable, NamedTuple, Optional
+from sqlalchemy import event, insert, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from shared.config.settings import Settings, get_settings
+from shared.database.base import async_session
+from shared.models.audit import AuditLog
+from shared.observability.metrics import Histogram
+from shared.utils.exceptions import ServiceUnavailableError
+
+logger = logging.getLogger("hrsoft.audit")
+
+# Records per INSERT transaction
+AUDIT_INSERT_CHUNK_SIZE = 5000
+
+# What happens to changes while the queue is full: ``drop`` commits them and
+# counts the lost records, ``reject`` refuses the commit with 503
+OVERFLOW_POLICIES = {"drop", "reject"}
+
+# Stored as REDACTED, never in the clear
+REDACTED_COLUMNS = {"hashed_password", "token_hash"}
+REDACTED = "***"
+
+# Bookkeeping columns left out of the logged values
+IGNORED_COLUMNS = {"created_at", "updated_at"}
+
+# Records captured by a session's flushes, queued once it commits
+_PENDING = "audit_pending"
+
+class AuditActor(NamedTuple):
+    changed_by: Optional[int]
+    ip_address: Optional[str]
+    user_agent: Optional[str]
+
+_NO_ACTOR = AuditActor(None, None, None)
+
+# Who is making changes in the request being served
+_actor: ContextVar[Optional[AuditActor]] = ContextVar("audit_actor", default=None)
+
+def set_audit_actor(user_id, request) -> None:
+    """Attribute changes committed while serving ``request`` to ``user_id``"""
+    user_id = str(user_id)
+    _actor.set(AuditActor(
+        int(user_id) if user_id.isdigit() else None,
+        request.client.host if request.client else None,
+        request.headers.get("user-agent")
+    ))
+
+def _json_value(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (datetime, date, time_of_day)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    return str(value)
+
+def _log_values(values: Iterable[tuple]) -> dict:
+    return {
+        name: REDACTED if name in REDACTED_COLUMNS else _json_value(value)
+        for name, value in values if name not in IGNORED_COLUMNS
+    }
+
+def _record(table_name: str, record_id, action: str, old_values: Optional[dict], new_values: Optional[dict]) -> dict:
+    actor = _actor.get() or _NO_ACTOR
+    return {
+        "table_name": table_name,
+        "record_id": record_id,
+        "action": action,
+        "old_values": old_values,
+        "new_values": new_values,
+        "changed_by": actor.changed_by,
+        "ip_address": actor.ip_address,
+        "user_agent": actor.user_agent,
+        "created_at": datetime.now(timezone.utc),
+    }
+
+def _flushed_records(session: Session, tables: frozenset) -> list[dict]:
+    """CREATE, UPDATE and DELETE records for the audited objects a flush wrote.
+
+    Updates log the changed columns only, with their loaded value before
+    the change (None when it was never loaded).
+    """
+    records = []
+    for objects, action in ((session.new, "CREATE"), (session.dirty, "UPDATE"), (session.deleted, "DELETE")):
+        for obj in objects:
+            state = inspect(obj)
+            mapper = state.mapper
+            if mapper.local_table.name not in tables:
+                continue
+            columns = [(prop.key, prop.columns[0].name) for prop in mapper.column_attrs]
+            if action == "UPDATE":
+                old_values, new_values = [], []
+                for key, name in columns:
+                    history = state.attrs[key].history
+                    if history.has_changes():
+                        old_values.append((name, history.deleted[0] if history.deleted else None))
+                        new_values.append((name, history.added[0] if history.added else None))
+                old_values, new_values = _log_values(old_values), _log_values(new_values)
+                if not new_values:
+                    continue
+            else:
+                values = _log_values((name, state.dict[key]) for key, name in columns if key in state.dict)
+                old_values, new_values = (None, values) if action == "CREATE" else (values, None)
+            record_id = mapper.primary_key_from_instance(obj)[0]
+            records.append(_record(mapper.local_table.name, record_id, action, old_values, new_values))
+    return records
+
+def _changed_values(old_row, new_row) -> tuple[dict, dict]:
+    """The columns of ``new_row`` whose value differs from ``old_row``, before and after"""
+    changed = [name for name, value in new_row.items() if name in old_row and old_row[name] != value]
+    return (
+        _log_values((name, old_row[name]) for name in changed),
+        _log_values((name, new_row[name]) for name in changed)
+    )
+
+def audit_bulk_change(session, table_name: str, action: str, summary: dict) -> None:
+    """Log one summary record for rows written in bulk (COPY, multi-row INSERT).
+
+    Session events never see those rows. The record is queued when the
+    session commits and discarded if it rolls back; ``summary`` must be
+    JSON-serializable.
+    """
+    writer = _active_writer
+    if writer is None or table_name not in writer.tables:
+        return
+    # record_id 0 stands for the table rather than one of its rows
+    session.info.setdefault(_PENDING, []).append(_record(table_name, 0, action, None, summary))
+
+def audit_row_change(session, table_name: str, record_id: int, old_values: dict, new_values: dict) -> None:
+    """Log an UPDATE of one row from values its writer already has.
+
+    For statements run with ``execution_options(audit_logged=True)``, which
+    the session events skip, so logging them costs no extra reads. Only the
+    keys of ``new_values`` whose value differs from ``old_values`` are kept.
+    """
+    writer = _active_writer
+    if writer is None or table_name not in writer.tables:
+        return
+    old_values, new_values = _changed_values(old_values, new_values)
+    if new_values:
+        session.info.setdefault(_PENDING, []).append(_record(table_name, record_id, "UPDATE", old_values, new_values))
+
+class AuditLogWriter:
+    """Committed changes to audited tables, queued and written to audit_logs in batches.
+
+    Session events capture changes as they are flushed and queue them when
+    the transaction commits, so requests never wait on an audit INSERT.
+    Changes made through the unit of work and ORM UPDATE statements log
+    the columns that changed, before and after; UPDATE statements read the
+    rows they match first, unless their writer logs them through
+    ``audit_row_change``. ORM DELETE statements with RETURNING log the
+    returned row. Bulk inserts are logged only through a summary record
+    from ``audit_bulk_change``. The queue holds at most ``max_queued`` records; what
+    happens beyond that depends on ``policy``. ``stop`` writes whatever is
+    still queued; records are lost only if the process dies first.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        tables: Iterable[str],
+        interval: float,
+        flush_size: int = 1000,
+        max_queued: int = 100000,
+        policy: str = "drop"
+    ):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown audit overflow policy: {policy}")
+        self.session_factory = session_factory
+        self.tables = frozenset(tables)
+        self.interval = interval
+        self.flush_size = flush_size
+        self.max_queued = max_queued
+        self.policy = policy
+        self._queue: deque = deque()
+        self._flush_lock = asyncio.Lock()
+        self._flush_due = asyncio.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.captured = 0
+        self.written = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.flushes = 0
+        self.errors = 0
+        self.flush_seconds = Histogram()
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    @property
+    def full(self) -> bool:
+        return len(self._queue) >= self.max_queued
+
+    def enqueue(self, records: list[dict]):
+        """Queue committed records, dropping what does not fit"""
+        room = max(self.max_queued - len(self._queue), 0)
+        if len(records) > room:
+            self.dropped += len(records) - room
+            records = records[:room]
+        self._queue.extend(records)
+        self.captured += len(records)
+        # Sync sessions commit from worker threads
+        if len(self._queue) >= self.flush_size and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._flush_due.set)
+
+    async def flush(self) -> int:
+        """Write the records queued so far, returning how many were written"""
+        async with self._flush_lock:
+            self._flush_due.clear()
+            remaining = len(self._queue)
+            if not remaining:
+                return 0
+
+            started = time.perf_counter()
+            written = 0
+            while remaining > 0:
+                batch = [self._queue.popleft() for _ in range(min(remaining, AUDIT_INSERT_CHUNK_SIZE))]
+                try:
+                    async with self.session_factory() as db:
+                        await db.execute(insert(AuditLog.__table__), batch)
+                        await db.commit()
+                except Exception:
+                    # Back to the front in order; the newest go if that overfills the queue
+                    self.errors += 1
+                    self._queue.extendleft(reversed(batch))
+                    while len(self._queue) > self.max_queued:
+                        self._queue.pop()
+                        self.dropped += 1
+                    raise
+                written += len(batch)
+                remaining -= len(batch)
+
+            self.flushes += 1
+            self.written += written
+            self.flush_seconds.observe(time.perf_counter() - started)
+            return written
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_due.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as exc:
+                logger.warning(f"Audit log flush failed, will retry: {exc}")
+                await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Capture changes committed in this process from now on"""
+        global _active_writer
+        _active_writer = self
+        self._loop = asyncio.get_running_loop()
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, attempts: int = 3):
+        """Stop capturing and write what is queued, retrying a failed write"""
+        global _active_writer
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if _active_writer is self:
+            _active_writer = None
+        for attempt in range(1, attempts + 1):
+            try:
+                await self.flush()
+                return
+            except Exception as exc:
+                if attempt == attempts:
+                    logger.error(f"Lost {self.queued} audit records on shutdown: {exc}")
+                    return
+                await asyncio.sleep(self.interval or 0.1)
+
+    def stats(self, snapshots: bool = True) -> dict:
+        return {
+            "queued": self.queued,
+            "captured": self.captured,
+            "written": self.written,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "flushes": self.flushes,
+            "errors": self.errors,
+            "flush_seconds": self.flush_seconds.snapshot() if snapshots else self.flush_seconds,
+        }
+
+# The writer session events feed; None until one is started
+_active_writer: Optional[AuditLogWriter] = None
+
+@event.listens_for(Session, "after_flush")
+def _capture_flush(session, flush_context):
+    writer = _active_writer
+    if writer is None:
+        return
+    records = _flushed_records(session, writer.tables)
+    if records:
+        session.info.setdefault(_PENDING, []).extend(records)
+
+@event.listens_for(Session, "do_orm_execute")
+def _capture_statement(orm_execute_state):
+    """Log the rows an audited UPDATE changes, or an audited DELETE ... RETURNING reports"""
+    writer = _active_writer
+    if writer is None or not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return None
+    mapper = orm_execute_state.bind_mapper
+    statement = orm_execute_state.statement
+    if mapper is None or mapper.local_table.name not in writer.tables:
+        return None
+    if orm_execute_state.is_update:
+        return _capture_update(orm_execute_state, mapper)
+    if not statement.returning_column_descriptions:
+        return None
+
+    frozen = orm_execute_state.invoke_statement().freeze()
+    primary_key = mapper.primary_key[0].key
+    records = []
+    for row in frozen().mappings():
+        if row.get(primary_key) is None:
+            continue
+        records.append(_record(mapper.local_table.name, row[primary_key], "DELETE", _log_values(row.items()), None))
+    if records:
+        orm_execute_state.session.info.setdefault(_PENDING, []).extend(records)
+    return frozen()
+
+def _capture_update(orm_execute_state, mapper):
+    """Run an UPDATE statement between reads of the rows it matches, logging what changed.
+
+    The rows are locked as they are read, so nothing else changes them in
+    between. With RETURNING the new values come from the returned rows;
+    otherwise, as on MySQL, the rows are read again afterwards.
+    Executemany (bulk UPDATE by primary key) is not captured, nor are
+    statements marked ``audit_logged``, whose writer calls ``audit_row_change``.
+    """
+    parameters = orm_execute_state.parameters
+    if parameters is not None and not isinstance(parameters, dict):
+        return None
+    if orm_execute_state.execution_options.get("audit_logged"):
+        return None
+    session = orm_execute_state.session
+    table = mapper.local_table
+    primary_key = mapper.primary_key[0]
+    statement = orm_execute_state.statement
+
+    before = select(*table.columns).with_for_update()
+    if statement.whereclause is not None:
+        before = before.where(statement.whereclause)
+    old_rows = {
+        row[primary_key.name]: row
+        for row in session.execute(before, parameters).mappings()
+    }
+    if not old_rows:
+        return None
+
+    new_rows = None
+    if statement.returning_column_descriptions:
+        frozen = orm_execute_state.invoke_statement().freeze()
+        result = frozen()
+        new_rows = list(frozen().mappings())
+    else:
+        result = orm_execute_state.invoke_statement()
+    if not new_rows or primary_key.name not in new_rows[0]:
+        new_rows = session.execute(select(*table.columns).where(primary_key.in_(list(old_rows)))).mappings().all()
+
+    records = []
+    for new_row in new_rows:
+        old_row = old_rows.get(new_row.get(primary_key.name))
+        if old_row is None:
+            continue
+        old_values, new_values = _changed_values(old_row, new_row)
+        if new_values:
+            records.append(_record(table.name, new_row[primary_key.name], "UPDATE", old_values, new_values))
+    if records:
+        session.info.setdefault(_PENDING, []).extend(records)
+    return result
+
+@event.listens_for(Session, "before_commit")
+def _apply_backpressure(session):
+    """Refuse commits with audited changes while the queue is full, under the reject policy"""
+    writer = _active_writer
+    if writer is None or writer.policy != "reject" or not writer.full:
+        return
+    # Changes still unflushed are written by the commit's own flush
+    unflushed = chain(session.new, session.dirty, session.deleted)
+    if session.info.get(_PENDING) or any(inspect(obj).mapper.local_table.name in writer.tables for obj in unflushed):
+        writer.rejected += 1
+        raise ServiceUnavailableError("Audit log is behind, retry shortly")
+
+@event.listens_for(Session, "after_commit")
+def _queue_committed(session):
+    records = session.info.pop(_PENDING, None)
+    writer = _active_writer
+    if records and writer is not None:
+        writer.enqueue(records)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(_PENDING, None)
+
+def create_audit_writer(settings: Settings) -> AuditLogWriter:
+    return AuditLogWriter(
+        async_session,
+        settings.audit_tables,
+        settings.audit_flush_interval,
+        settings.audit_flush_size,
+        settings.audit_max_queued,
+        settings.audit_overflow_policy
+    )
+
+audit_writer = create_audit_writer(get_settings())
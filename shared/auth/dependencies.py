@@ -1,12 +1,28 @@
-from fastapi import HTTPException, Depends, status
+from fastapi import HTTPException, Depends, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
-from shared.auth.jwt_handler import verify_token
+from shared.auth.jwt_handler import verify_token_cached
+from shared.auth.gateway import gateway_identity
+from shared.audit.pipeline import set_audit_actor
+from shared.config.settings import get_settings
 
-security = HTTPBearer()
+settings = get_settings()
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
-    """Get current user from JWT token"""
+# Not auto_error: in gateway mode the identity may come without a token
+security = HTTPBearer(auto_error=False)
+
+async def get_current_user(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+) -> dict:
+    """Get current user from the gateway's identity headers or a JWT token"""
+    identity = gateway_identity(request, settings)
+    if identity is not None:
+        set_audit_actor(identity["user_id"], request)
+        return identity
+    if credentials is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -14,7 +30,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     )
     
     try:
-        payload = verify_token(credentials.credentials)
+        payload = verify_token_cached(credentials.credentials)
         if payload is None:
             raise credentials_exception
         
@@ -24,6 +40,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         if user_id is None or token_type != "access":
             raise credentials_exception
             
+        set_audit_actor(user_id, request)
         return {"user_id": user_id, "payload": payload}
     except Exception:
         raise credentials_exception
@@ -56,3 +73,4 @@ class RequirePermissions:
 require_admin = RequirePermissions(["admin"])
 require_hr = RequirePermissions(["hr", "admin"])
 require_manager = RequirePermissions(["manager", "hr", "admin"])
+require_attendance = RequirePermissions(["attendance"])  # Badge readers and time clocks
@@ -0,0 +1,42 @@
+import hmac
+import time
+from typing import Optional
+from fastapi import Request
+from shared.config.settings import Settings
+
+# Headers between nginx and the services in gateway mode
+GATEWAY_SECRET_HEADER = "X-Gateway-Secret"
+USER_ID_HEADER = "X-Auth-User-Id"
+PERMISSIONS_HEADER = "X-Auth-Permissions"
+# How long nginx may cache the auth subrequest response
+CACHE_TTL_HEADER = "X-Accel-Expires"
+
+def identity_headers(payload: dict, max_ttl: int) -> dict[str, str]:
+    """Headers of a token check for nginx: who the caller is and how long to cache it"""
+    ttl = max_ttl
+    if payload.get("exp") is not None:
+        ttl = max(0, min(ttl, int(payload["exp"] - time.time())))
+    return {
+        USER_ID_HEADER: str(payload["sub"]),
+        PERMISSIONS_HEADER: ",".join(payload.get("permissions", [])),
+        CACHE_TTL_HEADER: str(ttl),
+    }
+
+def gateway_identity(request: Request, settings: Settings) -> Optional[dict]:
+    """Current user as forwarded by the gateway, or None when not trusted.
+
+    Headers count only in gateway mode and with the shared secret, so
+    callers that reach a service directly still go through JWT checks.
+    """
+    if settings.auth_mode != "gateway" or not settings.gateway_secret:
+        return None
+    secret = request.headers.get(GATEWAY_SECRET_HEADER)
+    user_id = request.headers.get(USER_ID_HEADER)
+    if not secret or not user_id or not hmac.compare_digest(secret.encode(), settings.gateway_secret.encode()):
+        return None
+    
+    permissions = [permission for permission in request.headers.get(PERMISSIONS_HEADER, "").split(",") if permission]
+    return {
+        "user_id": user_id,
+        "payload": {"sub": user_id, "type": "access", "permissions": permissions},
+    }
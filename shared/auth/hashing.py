@@ -0,0 +1,88 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+from shared.utils.exceptions import ServiceUnavailableError
+
+def _timed_call(func: Callable, *args) -> tuple[Any, float]:
+    """Run ``func`` in a worker process and report how long it computed"""
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+class PasswordHashPool:
+    """Bounded process pool for CPU-bound password hashing.
+
+    bcrypt takes hundreds of milliseconds per call, so hashing runs in
+    worker processes instead of on the event loop. At most
+    ``max_workers + max_queue`` operations are pending at once; further
+    requests are rejected with ``ServiceUnavailableError`` so a login storm
+    sheds load instead of queueing without bound.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+        # Metrics
+        self.pending = 0
+        self.max_pending_seen = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.total_compute_seconds = 0.0
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    @property
+    def queue_depth(self) -> int:
+        """Operations waiting for a free worker"""
+        return max(0, self.pending - self.max_workers)
+
+    async def run(self, func: Callable, *args) -> Any:
+        """Run ``func(*args)`` in the pool, rejecting when the queue is full"""
+        if self.pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise ServiceUnavailableError("Password hashing capacity exceeded, retry shortly")
+
+        self.pending += 1
+        self.submitted += 1
+        self.max_pending_seen = max(self.max_pending_seen, self.pending)
+        started = time.perf_counter()
+        try:
+            future = self.executor.submit(_timed_call, func, *args)
+            result, compute_seconds = await asyncio.wrap_future(future)
+        finally:
+            self.pending -= 1
+
+        self.completed += 1
+        self.total_compute_seconds += compute_seconds
+        self.total_wait_seconds += max(0.0, time.perf_counter() - started - compute_seconds)
+        return result
+
+    def stats(self) -> dict:
+        """Snapshot of pool utilisation and queue metrics"""
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": min(self.pending, self.max_workers),
+            "queue_depth": self.queue_depth,
+            "max_pending_seen": self.max_pending_seen,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": self.total_wait_seconds / self.completed * 1000 if self.completed else 0.0,
+            "avg_compute_ms": self.total_compute_seconds / self.completed * 1000 if self.completed else 0.0,
+        }
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
@@ -1,13 +1,26 @@
 from datetime import datetime, timedelta
 from typing import Optional, Any, Union
-from jose import JWTError, jwt
+from uuid import uuid4
+import jwt
+from jwt import PyJWTError
 from passlib.context import CryptContext
+from shared.auth.hashing import PasswordHashPool
+from shared.auth.token_cache import TokenCache
 from shared.config.settings import get_settings
 
 settings = get_settings()
 
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
+
+# Worker pool that keeps bcrypt off the event loop
+password_hash_pool = PasswordHashPool(
+    max_workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue
+)
+
+# Verified access-token claims, so hot tokens skip signature checks
+token_cache = TokenCache(max_size=settings.token_cache_size)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its hash"""
@@ -17,6 +30,14 @@ def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a plain password against its hash in the hashing pool"""
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in the hashing pool"""
+    return await password_hash_pool.run(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
     to_encode = data.copy()
@@ -34,7 +55,7 @@ def create_refresh_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days)
     
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
     return encoded_jwt
 
@@ -43,13 +64,22 @@ def verify_token(token: str) -> Optional[dict]:
     try:
         payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
         return payload
-    except JWTError:
+    except PyJWTError:
         return None
 
+def verify_token_cached(token: str) -> Optional[dict]:
+    """Verify and decode JWT token, reusing claims of recently verified tokens"""
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = verify_token(token)
+        if payload is not None:
+            token_cache.put(token, payload)
+    return payload
+
 def decode_token(token: str) -> Optional[dict]:
     """Decode JWT token without verification (for development)"""
     try:
         payload = jwt.decode(token, options={"verify_signature": False})
         return payload
-    except JWTError:
+    except PyJWTError:
         return None
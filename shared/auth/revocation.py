@@ -0,0 +1,107 @@
+import hashlib
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+from shared.cache.backends import RedisBackend
+from shared.config.settings import Settings, get_settings
+
+# Revocation set backends accepted by ``refresh_token_revocation_backend``
+REVOCATION_BACKENDS = {"database", "memory", "redis"}
+
+def token_digest(token: str) -> bytes:
+    """Fixed-width SHA-256 digest under which a refresh token is stored"""
+    return hashlib.sha256(token.encode()).digest()
+
+class RevocationSet(ABC):
+    """Digests of revoked refresh tokens, each kept until the token expires.
+
+    Once enabled the set is authoritative: a signed, unexpired refresh token
+    that is not in the set is accepted without a database lookup.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def add(self, digest: bytes, expires_at: float):
+        """Revoke ``digest`` until the Unix time ``expires_at``"""
+
+    @abstractmethod
+    async def contains(self, digest: bytes) -> bool:
+        ...
+
+    def purge(self) -> int:
+        """Drop entries whose token has expired, returning how many"""
+        return 0
+
+    def stats(self) -> dict:
+        return {"backend": self.name}
+
+    async def close(self):
+        pass
+
+class MemoryRevocationSet(RevocationSet):
+    """Per-process revocation set for single-worker deployments.
+
+    Entries are never evicted early, since a dropped revocation would make
+    the token usable again; expired ones are removed by ``purge``.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self._entries: dict[bytes, float] = {}
+
+    async def add(self, digest: bytes, expires_at: float):
+        self._entries[digest] = expires_at
+
+    async def contains(self, digest: bytes) -> bool:
+        expires_at = self._entries.get(digest)
+        return expires_at is not None and expires_at > time.time()
+
+    def purge(self) -> int:
+        now = time.time()
+        expired = [digest for digest, expires_at in self._entries.items() if expires_at <= now]
+        for digest in expired:
+            del self._entries[digest]
+        return len(expired)
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "size": len(self._entries)}
+
+class RedisRevocationSet(RevocationSet):
+    """Revocation set shared by every auth worker; Redis expires the keys"""
+
+    name = "redis"
+
+    def __init__(self, backend: RedisBackend, key_prefix: str = "hrsoft:"):
+        self.backend = backend
+        self.key_prefix = f"{key_prefix}revoked:"
+
+    async def add(self, digest: bytes, expires_at: float):
+        ttl = int(expires_at - time.time()) + 1
+        if ttl > 0:
+            await self.backend.set(self.key_prefix + digest.hex(), "1", ttl)
+
+    async def contains(self, digest: bytes) -> bool:
+        return await self.backend.get(self.key_prefix + digest.hex()) is not None
+
+    async def close(self):
+        await self.backend.close()
+
+def create_revocation_set(settings: Settings) -> Optional[RevocationSet]:
+    """Build the configured revocation set, or None to check the database"""
+    backend = settings.refresh_token_revocation_backend
+    if backend not in REVOCATION_BACKENDS:
+        raise ValueError(f"refresh_token_revocation_backend must be one of {sorted(REVOCATION_BACKENDS)}")
+    if backend == "memory":
+        return MemoryRevocationSet()
+    if backend == "redis":
+        # No silent fallback: the service would run without the set it was configured with
+        try:
+            return RedisRevocationSet(RedisBackend(settings.redis_url), settings.cache_key_prefix)
+        except RuntimeError as exc:
+            raise RuntimeError(f"refresh_token_revocation_backend=redis cannot be used: {exc}") from exc
+    return None
+
+# Process-wide revocation set, None when refresh tokens are checked in the database
+revocation_set = create_revocation_set(get_settings())
@@ -0,0 +1,75 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional
+
+class TokenCache:
+    """Bounded LRU of verified JWT claims keyed by token digest.
+
+    Entries expire at the token's ``exp`` claim, so a cached token is never
+    accepted past the point where ``jwt.decode`` would reject it. Tokens are
+    stored as SHA-256 digests rather than raw bearer strings. Cached claims
+    are shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, tuple[float, dict]]" = OrderedDict()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        """Return cached claims for ``token`` if present and not expired"""
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, claims = entry
+        if expires_at <= time.time():
+            self._entries.pop(key, None)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return claims
+
+    def put(self, token: str, claims: dict):
+        """Cache verified claims until the token's ``exp``"""
+        expires_at = claims.get("exp")
+        if self.max_size <= 0 or expires_at is None:
+            return
+
+        key = self._key(token)
+        self._entries[key] = (float(expires_at), claims)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Snapshot of cache size and hit/miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
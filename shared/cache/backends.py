@@ -0,0 +1,156 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+from uuid import uuid4
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # pragma: no cover - redis is optional outside the services
+    redis_asyncio = None
+
+class CacheBackend(ABC):
+    """Storage used by ``ReadThroughCache``; values are serialized strings"""
+
+    name = "base"
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: int):
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str):
+        ...
+
+    @abstractmethod
+    async def incr(self, key: str) -> int:
+        ...
+
+    @abstractmethod
+    async def acquire_lock(self, key: str, ttl: float) -> Optional[str]:
+        """Take a short-lived lock, returning its token or None if held elsewhere"""
+
+    @abstractmethod
+    async def release_lock(self, key: str, token: str):
+        ...
+
+    async def close(self):
+        pass
+
+class MemoryBackend(CacheBackend):
+    """Per-process LRU backend, used in tests and when Redis is unavailable"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[Optional[float], str]]" = OrderedDict()
+        # Namespace generations, outside the LRU: evicting one would bring
+        # back entries written under an older generation
+        self._counters: dict[str, int] = {}
+        self._locks: dict[str, tuple[float, str]] = {}
+
+    def _live(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def get(self, key: str) -> Optional[str]:
+        if key in self._counters:
+            return str(self._counters[key])
+        return self._live(key)
+
+    async def set(self, key: str, value: str, ttl: int):
+        self._counters.pop(key, None)
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._entries.pop(key, None)
+            self._counters.pop(key, None)
+
+    async def incr(self, key: str) -> int:
+        value = self._counters.get(key)
+        if value is None:
+            value = int(self._entries.pop(key, (None, 0))[1])
+        self._counters[key] = value + 1
+        return value + 1
+
+    async def acquire_lock(self, key: str, ttl: float) -> Optional[str]:
+        held = self._locks.get(key)
+        if held is not None and held[0] > time.monotonic():
+            return None
+        token = uuid4().hex
+        self._locks[key] = (time.monotonic() + ttl, token)
+        return token
+
+    async def release_lock(self, key: str, token: str):
+        held = self._locks.get(key)
+        if held is not None and held[1] == token:
+            del self._locks[key]
+
+    def clear(self):
+        self._entries.clear()
+        self._counters.clear()
+        self._locks.clear()
+
+class RedisBackend(CacheBackend):
+    """Redis backend shared by every worker and service instance"""
+
+    name = "redis"
+
+    # Delete the lock only if it still holds our token
+    RELEASE_LOCK_SCRIPT = """
+    if redis.call("get", KEYS[1]) == ARGV[1] then
+        return redis.call("del", KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(self, url: str, socket_timeout: float = 0.5):
+        if redis_asyncio is None:
+            raise RuntimeError("The redis package is required for the Redis cache backend")
+        self.client = redis_asyncio.from_url(
+            url,
+            decode_responses=True,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_timeout
+        )
+        self._release_lock = self.client.register_script(self.RELEASE_LOCK_SCRIPT)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: str, ttl: int):
+        await self.client.set(key, value, ex=ttl)
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self.client.delete(*keys)
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(key)
+
+    async def acquire_lock(self, key: str, ttl: float) -> Optional[str]:
+        token = uuid4().hex
+        acquired = await self.client.set(key, token, nx=True, px=int(ttl * 1000))
+        return token if acquired else None
+
+    async def release_lock(self, key: str, token: str):
+        await self._release_lock(keys=[key], args=[token])
+
+    async def close(self):
+        await self.client.aclose()
@@ -0,0 +1,222 @@
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable, Optional
+from shared.cache.backends import CacheBackend, MemoryBackend, RedisBackend
+from shared.config.settings import Settings, get_settings
+from shared.utils.responses import utc_isoformat
+
+logger = logging.getLogger("hrsoft.cache")
+
+def _json_default(value: Any) -> Any:
+    # Cached rows may be served as-is, so dates are written as responses render them
+    if hasattr(value, "isoformat"):
+        return utc_isoformat(value)
+    return str(value)
+
+class ReadThroughCache:
+    """Read-through cache of JSON-serializable values with TTL and invalidation.
+
+    Keys live in namespaces. ``invalidate`` drops single keys, and
+    ``invalidate_namespace`` bumps the namespace generation so every key
+    written under the old generation is skipped and ages out by TTL.
+
+    Stampede protection works at two levels. Concurrent misses for a key
+    in one process share a single load. Across processes, a short backend
+    lock lets one loader fill the key while the others poll for the value.
+    Backend failures are logged and counted, and the read falls through to
+    the loader, so an unavailable cache never fails a request.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        default_ttl: int = 300,
+        key_prefix: str = "hrsoft:",
+        lock_timeout: float = 5.0,
+        lock_poll_interval: float = 0.05
+    ):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.key_prefix = key_prefix
+        self.lock_timeout = lock_timeout
+        self.lock_poll_interval = lock_poll_interval
+        self._inflight: dict[str, asyncio.Future] = {}
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    def _generation_key(self, namespace: str) -> str:
+        return f"{self.key_prefix}{namespace}:generation"
+
+    async def _generation(self, namespace: str) -> str:
+        return await self.backend.get(self._generation_key(namespace)) or "0"
+
+    async def _full_key(self, namespace: str, key: str) -> str:
+        return f"{self.key_prefix}{namespace}:{await self._generation(namespace)}:{key}"
+
+    async def get_or_load(
+        self,
+        namespace: str,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None
+    ) -> Any:
+        """Return the cached value for ``key``, loading and storing it on a miss.
+
+        Exceptions raised by ``loader`` propagate and nothing is cached.
+        """
+        try:
+            full_key = await self._full_key(namespace, key)
+            cached = await self.backend.get(full_key)
+        except Exception as exc:
+            self._backend_error("read", exc)
+            return await loader()
+
+        if cached is not None:
+            self.hits += 1
+            return json.loads(cached)
+        self.misses += 1
+
+        # Share an in-flight load for the same key within this process
+        inflight = self._inflight.get(full_key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[full_key] = future
+        try:
+            value = await self._load(full_key, loader, ttl or self.default_ttl)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark retrieved so an unawaited future does not log a warning
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            del self._inflight[full_key]
+
+    async def peek(self, namespace: str, key: str) -> Any:
+        """Return the cached value for ``key``, or None on a miss without loading"""
+        try:
+            cached = await self.backend.get(await self._full_key(namespace, key))
+        except Exception as exc:
+            self._backend_error("read", exc)
+            return None
+        if cached is None:
+            return None
+        self.hits += 1
+        return json.loads(cached)
+
+    async def _load(self, full_key: str, loader: Callable[[], Awaitable[Any]], ttl: int) -> Any:
+        """Fill ``full_key`` under the backend lock, or wait for its holder"""
+        lock_key = f"{full_key}:lock"
+        try:
+            token = await self.backend.acquire_lock(lock_key, self.lock_timeout)
+        except Exception as exc:
+            self._backend_error("lock", exc)
+            return await loader()
+
+        if token is None:
+            value = await self._wait_for_value(full_key)
+            if value is not None:
+                self.coalesced += 1
+                return json.loads(value)
+
+        try:
+            self.loads += 1
+            serialized = json.dumps(await loader(), default=_json_default)
+            try:
+                await self.backend.set(full_key, serialized, ttl)
+            except Exception as exc:
+                self._backend_error("write", exc)
+            # Decode what was stored so hits and misses return identical shapes
+            return json.loads(serialized)
+        finally:
+            if token is not None:
+                try:
+                    await self.backend.release_lock(lock_key, token)
+                except Exception as exc:
+                    self._backend_error("unlock", exc)
+
+    async def _wait_for_value(self, full_key: str) -> Optional[str]:
+        """Poll for a value being loaded by another process, up to the lock timeout"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.lock_timeout
+        while loop.time() < deadline:
+            await asyncio.sleep(self.lock_poll_interval)
+            try:
+                value = await self.backend.get(full_key)
+            except Exception as exc:
+                self._backend_error("read", exc)
+                return None
+            if value is not None:
+                return value
+        return None
+
+    async def invalidate(self, namespace: str, *keys: str):
+        """Drop individual keys from a namespace"""
+        try:
+            generation = await self._generation(namespace)
+            await self.backend.delete(*[f"{self.key_prefix}{namespace}:{generation}:{key}" for key in keys])
+        except Exception as exc:
+            self._backend_error("invalidate", exc)
+
+    async def invalidate_namespace(self, namespace: str):
+        """Invalidate every key in a namespace at once"""
+        try:
+            await self.backend.incr(self._generation_key(namespace))
+        except Exception as exc:
+            self._backend_error("invalidate", exc)
+
+    def _backend_error(self, operation: str, exc: Exception):
+        self.errors += 1
+        logger.warning(f"Cache {operation} failed on {self.backend.name} backend: {exc}")
+
+    async def close(self):
+        await self.backend.close()
+
+    def stats(self) -> dict:
+        """Snapshot of hit/miss, load and error counters"""
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+        }
+
+def create_cache(settings: Settings) -> ReadThroughCache:
+    """Build the cache configured in settings, falling back to memory"""
+    backend: CacheBackend
+    if settings.cache_backend == "redis":
+        try:
+            backend = RedisBackend(settings.redis_url)
+        except RuntimeError as exc:
+            logger.warning(f"{exc}; using the in-memory cache")
+            backend = MemoryBackend(settings.cache_memory_max_entries)
+    else:
+        backend = MemoryBackend(settings.cache_memory_max_entries)
+
+    return ReadThroughCache(
+        backend,
+        default_ttl=settings.cache_default_ttl,
+        key_prefix=settings.cache_key_prefix,
+        lock_timeout=settings.cache_lock_timeout
+    )
+
+# Process-wide cache instance
+cache = create_cache(get_settings())
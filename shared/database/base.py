@@ -1,20 +1,72 @@
+from typing import Optional
 from sqlalchemy import create_engine, MetaData
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from shared.config.settings import get_settings
+from shared.database.pool import pool_options, install_idle_ping
 
 settings = get_settings()
 
-# Create database engine
-engine = create_engine(
-    settings.database_url,
-    echo=settings.database_echo,
-    pool_pre_ping=True,
-    pool_recycle=300
+# asyncio drivers used when the configured URL names a sync driver
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "mysql": "aiomysql",
+    "sqlite": "aiosqlite",
+}
+
+def get_async_database_url(database_url: str) -> str:
+    """Translate a sync database URL to its asyncio driver equivalent"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend in ASYNC_DRIVERS and url.get_driver_name() != ASYNC_DRIVERS[backend]:
+        url = url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    return url.render_as_string(hide_password=False)
+
+# Engines are created on first use, so importing a service does not load
+# database drivers or touch the network before the app is serving
+_engine: Optional[Engine] = None
+_async_engine: Optional[AsyncEngine] = None
+
+def get_engine() -> Engine:
+    """Sync engine, kept for scripts and maintenance jobs"""
+    global _engine
+    if _engine is None:
+        _engine = create_engine(
+            settings.database_url,
+            echo=settings.database_echo,
+            **pool_options(settings, settings.database_url)
+        )
+        if settings.database_pool_pre_ping == "idle":
+            install_idle_ping(_engine, settings.database_pool_ping_idle_seconds)
+    return _engine
+
+def get_async_engine() -> AsyncEngine:
+    """Async engine used by the services"""
+    global _async_engine
+    if _async_engine is None:
+        async_database_url = settings.async_database_url or get_async_database_url(settings.database_url)
+        _async_engine = create_async_engine(
+            async_database_url,
+            echo=settings.database_echo,
+            **pool_options(settings, async_database_url, asyncio=True)
+        )
+        if settings.database_pool_pre_ping == "idle":
+            install_idle_ping(_async_engine.sync_engine, settings.database_pool_ping_idle_seconds)
+    return _async_engine
+
+# Session factories, bound to the engines when a session is opened
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+AsyncSessionLocal = async_sessionmaker(
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
 )
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def async_session() -> AsyncSession:
+    """New async session on the service engine"""
+    return AsyncSessionLocal(bind=get_async_engine())
 
 # Create base class for models
 Base = declarative_base()
@@ -24,16 +76,26 @@ metadata = MetaData()
 
 def get_db():
     """Dependency to get database session"""
-    db = SessionLocal()
+    db = SessionLocal(bind=get_engine())
     try:
         yield db
     finally:
         db.close()
 
+async def get_async_db():
+    """Dependency to get async database session"""
+    async with async_session() as db:
+        yield db
+
+def pool_stats(snapshots: bool = True) -> dict:
+    """Connection pool gauges and checkout metrics of the async engine"""
+    pool = get_async_engine().pool
+    return pool.stats(snapshots) if hasattr(pool, "stats") else {"pool": type(pool).__name__}
+
 def create_tables():
-    """Create all tables"""
-    Base.metadata.create_all(bind=engine)
+    """Create all tables (tests and throwaway databases; use migrations otherwise)"""
+    Base.metadata.create_all(bind=get_engine())
 
 def drop_tables():
     """Drop all tables"""
-    Base.metadata.drop_all(bind=engine)
+    Base.metadata.drop_all(bind=get_engine())
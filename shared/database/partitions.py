@@ -0,0 +1,341 @@
+"""Monthly range partitions and retention for high-volume tables.
+
+On PostgreSQL the tables in ``partitioned_tables`` are partitioned by
+month on a date or timestamp column (migrations 0006 and 0007), one partition per
+month named ``<table>_pYYYY_MM`` plus ``<table>_default`` for rows outside
+them. A retention run creates the partitions for the coming months ahead
+of inserts, then archives and drops whole partitions once they are past
+retention: dropping a month is instant whatever its row count, and leaves
+nothing for vacuum. Rows that landed in the default partition are deleted
+once past retention. Timestamp months are UTC months.
+
+Other databases are not partitioned; a run deletes their expired rows in
+short batches instead, without archiving.
+
+Run it from cron, or let user-service schedule it (``retention_interval``):
+
+    python -m shared.database.partitions --archive-dir /var/backups/hrsoft
+"""
+import argparse
+import asyncio
+import csv
+import gzip
+import io
+import logging
+import os
+import re
+import zlib
+from datetime import date, datetime, timezone
+from typing import Callable, Iterable, NamedTuple, Optional
+from sqlalchemy import column, delete, select, table, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from shared.config.settings import Settings, get_settings
+
+logger = logging.getLogger("hrsoft.retention")
+
+# Rows per DELETE where tables are not partitioned
+DELETE_BATCH_SIZE = 5000
+
+PARTITION_NAME = re.compile(r"^(?P<table>\w+)_p(?P<year>\d{4})_(?P<month>\d{2})$")
+
+class PartitionedTable(NamedTuple):
+    name: str
+    column: str  # Partition key
+    timestamp: bool  # TIMESTAMPTZ key, else DATE
+    retention_months: int  # Whole months kept before the current one; 0 keeps everything
+
+class RetentionResult(NamedTuple):
+    table: str
+    created: list  # Partitions created
+    dropped: list  # Partitions archived (if configured) and dropped
+    archived_rows: int
+    deleted_rows: int  # Expired rows deleted one by one: default partition, or unpartitioned tables
+
+def partitioned_tables(settings: Settings) -> list[PartitionedTable]:
+    return [
+        PartitionedTable("audit_logs", "created_at", True, settings.audit_retention_months),
+        PartitionedTable("attendance_records", "attendance_date", False, settings.attendance_retention_months),
+        PartitionedTable("notifications", "created_at", True, settings.notification_retention_months),
+    ]
+
+# Migrations 0006 and 0007 carry their own copies: a migration must not
+# import application code that later changes under it
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(table_name: str, month: date) -> str:
+    return f"{table_name}_p{month:%Y_%m}"
+
+def is_partition(name: str) -> bool:
+    """Whether ``name`` is a partition managed here rather than a mapped table"""
+    match = PARTITION_NAME.match(name)
+    parent = match["table"] if match else name.removesuffix("_default")
+    return parent != name and parent in {partitioned.name for partitioned in partitioned_tables(get_settings())}
+
+def retention_cutoff(today: date, retention_months: int) -> Optional[date]:
+    """First day still kept, or None when nothing expires"""
+    if retention_months <= 0:
+        return None
+    return add_months(today.replace(day=1), -retention_months)
+
+def plan_partitions(
+    existing: Iterable[date],
+    today: date,
+    retention_months: int,
+    premake_months: int
+) -> tuple[list[date], list[date]]:
+    """Months to create (this one and ``premake_months`` ahead) and months to drop"""
+    existing = set(existing)
+    current = today.replace(day=1)
+    create = [month for month in (add_months(current, ahead) for ahead in range(premake_months + 1)) if month not in existing]
+    cutoff = retention_cutoff(today, retention_months)
+    expire = sorted(month for month in existing if cutoff is not None and month < cutoff)
+    return create, expire
+
+def _bound(partitioned: PartitionedTable, month: date) -> str:
+    return f"'{month.isoformat()} 00:00:00+00'" if partitioned.timestamp else f"'{month.isoformat()}'"
+
+def _cutoff_value(partitioned: PartitionedTable, cutoff: date):
+    return datetime(cutoff.year, cutoff.month, cutoff.day, tzinfo=timezone.utc) if partitioned.timestamp else cutoff
+
+class PartitionManager:
+    """Creates upcoming partitions and retires expired ones"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        tables: list[PartitionedTable],
+        premake_months: int = 2,
+        archive_dir: Optional[str] = None
+    ):
+        self.session_factory = session_factory
+        self.tables = tables
+        self.premake_months = premake_months
+        self.archive_dir = archive_dir
+
+    async def run(self, today: Optional[date] = None) -> list[RetentionResult]:
+        today = today or datetime.now(timezone.utc).date()
+        results = []
+        for partitioned in self.tables:
+            async with self.session_factory() as db:
+                if db.bind.dialect.name == "postgresql":
+                    results.append(await self._run_partitioned(db, partitioned, today))
+                else:
+                    results.append(await self._run_unpartitioned(db, partitioned, today))
+        return results
+
+    async def _lock(self, db: AsyncSession, partitioned: PartitionedTable) -> bool:
+        """Transaction lock so that runs in several workers don't overlap"""
+        key = zlib.crc32(f"hrsoft_retention:{partitioned.name}".encode())
+        return await db.scalar(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": key})
+
+    async def _partitions(self, db: AsyncSession, partitioned: PartitionedTable) -> dict[date, str]:
+        names = (await db.scalars(
+            text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = CAST(:parent AS regclass)"
+            ),
+            {"parent": partitioned.name}
+        )).all()
+        months = {}
+        for name in names:
+            match = PARTITION_NAME.match(name)
+            if match and match["table"] == partitioned.name:
+                months[date(int(match["year"]), int(match["month"]), 1)] = name
+        return months
+
+    async def _run_partitioned(self, db: AsyncSession, partitioned: PartitionedTable, today: date) -> RetentionResult:
+        created, dropped = [], []
+        archived_rows = deleted_rows = 0
+        if not await self._lock(db, partitioned):
+            logger.info(f"Retention of {partitioned.name} is running elsewhere, skipped")
+            return RetentionResult(partitioned.name, created, dropped, archived_rows, deleted_rows)
+
+        existing = await self._partitions(db, partitioned)
+        create, expire = plan_partitions(existing, today, partitioned.retention_months, self.premake_months)
+        for month in create:
+            created.append(await self._create_partition(db, partitioned, month))
+        await db.commit()
+
+        # A transaction per partition keeps the parent locked only while one is dropped
+        for month in expire:
+            if not await self._lock(db, partitioned):
+                break
+            name = existing[month]
+            if self.archive_dir:
+                archived_rows += await self._archive(db, partitioned, name)
+            await db.execute(text(f"DROP TABLE {name}"))
+            await db.commit()
+            dropped.append(name)
+            logger.info(f"Dropped partition {name}")
+
+        cutoff = retention_cutoff(today, partitioned.retention_months)
+        if cutoff is not None:
+            result = await db.execute(
+                text(f"DELETE FROM {partitioned.name}_default WHERE {partitioned.column} < :cutoff"),
+                {"cutoff": _cutoff_value(partitioned, cutoff)}
+            )
+            await db.commit()
+            deleted_rows = result.rowcount
+        return RetentionResult(partitioned.name, created, dropped, archived_rows, deleted_rows)
+
+    async def _create_partition(self, db: AsyncSession, partitioned: PartitionedTable, month: date) -> str:
+        name = partition_name(partitioned.name, month)
+        low, high = _bound(partitioned, month), _bound(partitioned, add_months(month, 1))
+        bounds = f"FOR VALUES FROM ({low}) TO ({high})"
+        in_month = f"{partitioned.column} >= {low} AND {partitioned.column} < {high}"
+        default = f"{partitioned.name}_default"
+        if not await db.scalar(text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_month})")):
+            await db.execute(text(f"CREATE TABLE {name} PARTITION OF {partitioned.name} {bounds}"))
+            return name
+
+        # The default partition caught rows for this month: they move over
+        # before it is attached, or attaching would fail
+        await db.execute(text(f"CREATE TABLE {name} (LIKE {partitioned.name} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        await db.execute(text(f"INSERT INTO {name} SELECT * FROM {default} WHERE {in_month}"))
+        await db.execute(text(f"DELETE FROM {default} WHERE {in_month}"))
+        await db.execute(text(f"ALTER TABLE {partitioned.name} ATTACH PARTITION {name} {bounds}"))
+        logger.info(f"Moved rows for {month:%Y-%m} out of {default}")
+        return name
+
+    async def _archive(self, db: AsyncSession, partitioned: PartitionedTable, name: str) -> int:
+        """Write a partition to ``<archive_dir>/<table>/<partition>.csv.gz``, returning its row count"""
+        directory = os.path.join(self.archive_dir, partitioned.name)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{name}.csv.gz")
+        # Only a complete archive takes the final name
+        partial = f"{path}.part"
+
+        connection = await db.connection()
+        with gzip.open(partial, "wb") as archive:
+            if db.bind.dialect.driver == "asyncpg":
+                raw = await connection.get_raw_connection()
+                status = await raw.driver_connection.copy_from_table(name, output=archive, format="csv", header=True)
+                rows = int(status.split()[-1])
+            else:
+                result = await connection.stream(text(f"SELECT * FROM {name}"))
+                text_archive = io.TextIOWrapper(archive, encoding="utf-8", newline="")
+                writer = csv.writer(text_archive)
+                writer.writerow(result.keys())
+                rows = 0
+                async for partition in result.partitions(DELETE_BATCH_SIZE):
+                    writer.writerows(partition)
+                    rows += len(partition)
+                text_archive.flush()
+                text_archive.detach()
+        os.replace(partial, path)
+        logger.info(f"Archived {rows} rows of {name} to {path}")
+        return rows
+
+    async def _run_unpartitioned(self, db: AsyncSession, partitioned: PartitionedTable, today: date) -> RetentionResult:
+        cutoff = retention_cutoff(today, partitioned.retention_months)
+        deleted_rows = 0
+        if cutoff is not None:
+            rows = table(partitioned.name, column("id"), column(partitioned.column))
+            expired = rows.c[partitioned.column] < _cutoff_value(partitioned, cutoff)
+            while True:
+                # Two statements: MySQL rejects LIMIT in a subquery on the table being deleted from
+                ids = (await db.scalars(select(rows.c.id).where(expired).limit(DELETE_BATCH_SIZE))).all()
+                if not ids:
+                    break
+                await db.execute(delete(rows).where(rows.c.id.in_(ids)))
+                await db.commit()
+                deleted_rows += len(ids)
+                if len(ids) < DELETE_BATCH_SIZE:
+                    break
+        return RetentionResult(partitioned.name, [], [], 0, deleted_rows)
+
+class RetentionScheduler:
+    """Background task that periodically runs a PartitionManager"""
+
+    def __init__(self, manager: PartitionManager, interval: float):
+        self.manager = manager
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.runs = 0
+        self.created = 0
+        self.dropped = 0
+        self.deleted = 0
+        self.errors = 0
+
+    async def run_once(self) -> list[RetentionResult]:
+        results = await self.manager.run()
+        self.runs += 1
+        for result in results:
+            self.created += len(result.created)
+            self.dropped += len(result.dropped)
+            self.deleted += result.deleted_rows
+        return results
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as exc:
+                self.errors += 1
+                logger.warning(f"Retention run failed: {exc}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        # Runs at startup too, so the current month always has its partition
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "interval": self.interval,
+            "runs": self.runs,
+            "partitions_created": self.created,
+            "partitions_dropped": self.dropped,
+            "rows_deleted": self.deleted,
+            "errors": self.errors,
+        }
+
+def create_partition_manager(settings: Settings, session_factory: Callable[[], AsyncSession]) -> PartitionManager:
+    return PartitionManager(
+        session_factory,
+        partitioned_tables(settings),
+        premake_months=settings.retention_premake_months,
+        archive_dir=settings.retention_archive_dir
+    )
+
+async def _main(args: argparse.Namespace):
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from shared.database.base import get_async_database_url
+
+    settings = get_settings()
+    engine = create_async_engine(get_async_database_url(args.database_url or settings.database_url))
+    manager = create_partition_manager(settings, async_sessionmaker(engine, expire_on_commit=False))
+    if args.archive_dir:
+        manager.archive_dir = args.archive_dir
+    try:
+        for result in await manager.run(args.today):
+            print(
+                f"{result.table}: created {', '.join(result.created) or 'none'}; "
+                f"dropped {', '.join(result.dropped) or 'none'} ({result.archived_rows} rows archived); "
+                f"{result.deleted_rows} rows deleted"
+            )
+    finally:
+        await engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Create upcoming partitions and retire expired data")
+    parser.add_argument("--database-url", help="Defaults to DATABASE_URL")
+    parser.add_argument("--archive-dir", help="Defaults to RETENTION_ARCHIVE_DIR; without one, partitions are dropped unarchived")
+    parser.add_argument("--today", type=date.fromisoformat, help="Run as of this date (YYYY-MM-DD)")
+    asyncio.run(_main(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from shared.config.settings import Settings
+from shared.observability.metrics import Histogram
+
+# Pre-ping strategies accepted by ``database_pool_pre_ping``
+PRE_PING_STRATEGIES = {"always", "idle", "never"}
+
+class PoolMetrics:
+    """Checkout counters and latency histograms for one connection pool"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.idle_pings = 0
+        self.invalidated = 0
+        self.checkout_seconds = Histogram()  # Whole checkout as seen by the caller
+        self.wait_seconds = Histogram()  # Waiting for a pooled connection
+        self.connect_seconds = Histogram()  # Opening new connections
+
+class InstrumentedPoolMixin:
+    """Records checkout latency, queue wait and connect time on a QueuePool"""
+
+    def __init__(self, *args, metrics: PoolMetrics = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = metrics or PoolMetrics()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        self.metrics.checkouts += 1
+        self.metrics.checkout_seconds.observe(time.perf_counter() - started)
+        return connection
+
+    def _do_get(self):
+        started = time.perf_counter()
+        record = super()._do_get()
+        if not record.info.pop("_newly_connected", False):
+            self.metrics.wait_seconds.observe(time.perf_counter() - started)
+        return record
+
+    def _create_connection(self):
+        started = time.perf_counter()
+        record = super()._create_connection()
+        record.info["_newly_connected"] = True
+        self.metrics.connects += 1
+        self.metrics.connect_seconds.observe(time.perf_counter() - started)
+        return record
+
+    def stats(self, snapshots: bool = True) -> dict:
+        """Live pool gauges plus checkout metrics (raw histograms if not ``snapshots``)"""
+        histogram = (lambda h: h.snapshot()) if snapshots else (lambda h: h)
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(0, self.overflow()),
+            "max_overflow": self._max_overflow,
+            "timeout": self._timeout,
+            "checkouts": self.metrics.checkouts,
+            "timeouts": self.metrics.timeouts,
+            "connects": self.metrics.connects,
+            "idle_pings": self.metrics.idle_pings,
+            "invalidated": self.metrics.invalidated,
+            "checkout_seconds": histogram(self.metrics.checkout_seconds),
+            "wait_seconds": histogram(self.metrics.wait_seconds),
+            "connect_seconds": histogram(self.metrics.connect_seconds),
+        }
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+def pool_options(settings: Settings, database_url: str, asyncio: bool = False) -> dict:
+    """Engine keyword arguments for the configured pool.
+
+    SQLite keeps SQLAlchemy's default pool, which is not size-bounded.
+    """
+    if settings.database_pool_pre_ping not in PRE_PING_STRATEGIES:
+        raise ValueError(f"database_pool_pre_ping must be one of {sorted(PRE_PING_STRATEGIES)}")
+    if make_url(database_url).get_backend_name() == "sqlite":
+        return {}
+
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if asyncio else InstrumentedQueuePool,
+        "pool_size": settings.database_pool_size,
+        "max_overflow": settings.database_max_overflow,
+        "pool_timeout": settings.database_pool_timeout,
+        "pool_recycle": settings.database_pool_recycle,
+        "pool_pre_ping": settings.database_pool_pre_ping == "always",
+        "pool_use_lifo": True,
+    }
+
+def install_idle_ping(engine: Engine, idle_seconds: float):
+    """Ping only connections that sat idle in the pool for ``idle_seconds``.
+
+    Connections in steady use skip the extra round trip that ``pool_pre_ping``
+    spends on every checkout; stale ones are still detected and replaced
+    before the application sees them.
+    """
+    @event.listens_for(engine, "checkin")
+    def record_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+
+        metrics = getattr(engine.pool, "metrics", None)
+        if metrics is not None:
+            metrics.idle_pings += 1
+        try:
+            alive = engine.dialect.do_ping(dbapi_connection)
+        except Exception as error:
+            alive = not engine.dialect.is_disconnect(error, dbapi_connection, None)
+            if alive:
+                raise
+        if not alive:
+            if metrics is not None:
+                metrics.invalidated += 1
+            # The pool discards this connection and retries with a fresh one
+            raise exc.DisconnectionError("Idle connection failed ping")
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, JSON, Text, Index
+from sqlalchemy.sql import func
+from shared.database.base import Base
+
+class AuditLog(Base):
+    """One committed change to an audited row, written in batches by AuditLogWriter"""
+    __tablename__ = "audit_logs"
+    __table_args__ = (
+        Index("idx_audit_table_record", "table_name", "record_id"),
+        Index("idx_audit_user", "changed_by"),
+        Index("idx_audit_date", "created_at"),
+    )
+
+    # Append-only and high volume; SQLite only autoincrements INTEGER
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    table_name = Column(String(100), nullable=False)
+    record_id = Column(BigInteger, nullable=False)  # 0 for IMPORT: rows written in bulk
+    action = Column(String(10), nullable=False)  # CREATE, UPDATE, DELETE or IMPORT
+
+    # Changed columns only: before and after for updates
+    old_values = Column(JSON)
+    new_values = Column(JSON)
+
+    # Who made the change, from the request that committed it
+    changed_by = Column(Integer)  # User ID from the access token
+    ip_address = Column(String(45))
+    user_agent = Column(Text)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())  # When it was committed
@@ -0,0 +1,110 @@
+from typing import Callable, Iterable, Optional
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.engine import Engine
+from shared.observability.metrics import Histogram
+from shared.observability.middleware import (
+    MetricsMiddleware, RequestMetrics, instrument_engine, query_metrics
+)
+
+# Prefix of every exported metric name
+METRIC_PREFIX = "hrsoft"
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _labels(labels: dict) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+class _Writer:
+    """Accumulates Prometheus text exposition lines"""
+
+    def __init__(self, base_labels: dict):
+        self.base_labels = base_labels
+        self.lines: list[str] = []
+        self._typed: set[str] = set()
+
+    def _type(self, name: str, metric_type: str):
+        if name not in self._typed:
+            self._typed.add(name)
+            self.lines.append(f"# TYPE {name} {metric_type}")
+
+    def sample(self, name: str, metric_type: str, value: float, **labels):
+        self._type(name, metric_type)
+        self.lines.append(f"{name}{{{_labels({**self.base_labels, **labels})}}} {float(value)!r}")
+
+    def histogram(self, name: str, histogram: Histogram, **labels):
+        self._type(name, "histogram")
+        labels = {**self.base_labels, **labels}
+        for bound, count in histogram.cumulative():
+            self.lines.append(f"{name}_bucket{{{_labels({**labels, 'le': _format_bound(bound)})}}} {count}")
+        self.lines.append(f"{name}_sum{{{_labels(labels)}}} {histogram.sum!r}")
+        self.lines.append(f"{name}_count{{{_labels(labels)}}} {histogram.count}")
+
+def render_prometheus(
+    service_name: str,
+    request_metrics: RequestMetrics,
+    collectors: Optional[dict[str, Callable[[], dict]]] = None
+) -> str:
+    """Render request, query and collector metrics in Prometheus text format.
+
+    Collectors return flat dicts; numbers and booleans become gauges named
+    ``hrsoft_<collector>_<key>`` and ``Histogram`` values become histograms.
+    Other values are skipped.
+    """
+    writer = _Writer({"service": service_name})
+    prefix = METRIC_PREFIX
+
+    writer.sample(f"{prefix}_http_requests_in_flight", "gauge", request_metrics.in_flight)
+    for (method, route, status), count in sorted(request_metrics.requests.items()):
+        writer.sample(f"{prefix}_http_requests_total", "counter", count, method=method, route=route, status=status)
+    for (method, route), histogram in sorted(request_metrics.duration.items()):
+        writer.histogram(f"{prefix}_http_request_duration_seconds", histogram, method=method, route=route)
+    for (method, route), count in sorted(request_metrics.db_queries.items()):
+        writer.sample(f"{prefix}_http_request_db_queries_total", "counter", count, method=method, route=route)
+    for (method, route), histogram in sorted(request_metrics.db_seconds.items()):
+        writer.histogram(f"{prefix}_http_request_db_seconds", histogram, method=method, route=route)
+
+    writer.sample(f"{prefix}_db_queries_total", "counter", query_metrics.count)
+    writer.histogram(f"{prefix}_db_query_duration_seconds", query_metrics.seconds)
+
+    for collector_name, collect in (collectors or {}).items():
+        for key, value in collect().items():
+            name = f"{prefix}_{collector_name}_{key}"
+            if isinstance(value, Histogram):
+                writer.histogram(name, value)
+            elif isinstance(value, (bool, int, float)):
+                writer.sample(name, "gauge", value)
+
+    return "\n".join(writer.lines) + "\n"
+
+def setup_metrics(
+    app: FastAPI,
+    service_name: str,
+    engines: Iterable = (Engine,),
+    collectors: Optional[dict[str, Callable[[], dict]]] = None
+) -> RequestMetrics:
+    """Install the metrics middleware, statement timing and ``GET /metrics``.
+
+    Statements are timed on every engine by default, including engines
+    created lazily after startup.
+    """
+    request_metrics = RequestMetrics()
+    app.add_middleware(MetricsMiddleware, metrics=request_metrics)
+    for engine in engines:
+        instrument_engine(engine)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics_endpoint():
+        return PlainTextResponse(
+            render_prometheus(service_name, request_metrics, collectors),
+            media_type=PROMETHEUS_CONTENT_TYPE
+        )
+
+    app.state.request_metrics = request_metrics
+    return request_metrics
@@ -0,0 +1,105 @@
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from shared.observability.metrics import Histogram
+
+# DB work of the request being served: [query count, query seconds]
+_request_db: ContextVar[Optional[list]] = ContextVar("request_db", default=None)
+
+# Route label for requests that matched no route, to bound label cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+class QueryMetrics:
+    """Process-wide SQL statement count and latency"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = Histogram()
+
+query_metrics = QueryMetrics()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_started
+    query_metrics.count += 1
+    query_metrics.seconds.observe(elapsed)
+    request_db = _request_db.get()
+    if request_db is not None:
+        request_db[0] += 1
+        request_db[1] += elapsed
+
+def instrument_engine(engine):
+    """Time every statement on ``engine`` (``async_engine.sync_engine`` for async, or the Engine class for all)"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+class RequestMetrics:
+    """Per-route request counters and histograms for one application"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.requests: dict[tuple[str, str, int], int] = defaultdict(int)
+        self.duration: dict[tuple[str, str], Histogram] = {}
+        self.db_queries: dict[tuple[str, str], int] = defaultdict(int)
+        self.db_seconds: dict[tuple[str, str], Histogram] = {}
+
+    def record(self, method: str, route: str, status: int, elapsed: float, db_queries: int, db_seconds: float):
+        key = (method, route)
+        duration = self.duration.get(key)
+        if duration is None:
+            duration = self.duration[key] = Histogram()
+            self.db_seconds[key] = Histogram()
+        duration.observe(elapsed)
+        self.db_seconds[key].observe(db_seconds)
+        self.db_queries[key] += db_queries
+        self.requests[(method, route, status)] += 1
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency, status and DB work per route.
+
+    Routes are labelled by their path template (``/users/employees/{employee_id}``),
+    never the raw URL. Written as plain ASGI rather than BaseHTTPMiddleware
+    so the per-request cost is a few dictionary updates.
+    """
+
+    def __init__(self, app, metrics: RequestMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        request_db = [0, 0.0]
+        token = _request_db.set(request_db)
+        self.metrics.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.metrics.in_flight -= 1
+            _request_db.reset(token)
+            route = scope.get("route")
+            self.metrics.record(
+                scope["method"],
+                route.path if route is not None else UNMATCHED_ROUTE,
+                status,
+                elapsed,
+                request_db[0],
+                request_db[1]
+            )
@@ -0,0 +1,73 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Iterable, NamedTuple, Optional
+from fastapi import Request, Response
+
+# Responses depend on the caller's authorization: browsers may keep them,
+# shared caches may not, and every reuse is revalidated
+CACHE_CONTROL = "private, no-cache"
+
+def _utc(value: Any) -> Optional[datetime]:
+    """Timestamp as an aware UTC datetime; naive values (SQLite, MySQL) are UTC"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def _opaque_tag(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+class ResourceVersion(NamedTuple):
+    """ETag and Last-Modified validators of one representation"""
+    etag: str
+    last_modified: Optional[datetime]
+
+    def headers(self) -> dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": CACHE_CONTROL}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+    def is_current(self, request: Request) -> bool:
+        """Whether the request's conditional headers match, i.e. 304 applies.
+
+        ``If-None-Match`` takes precedence over ``If-Modified-Since`` and is
+        compared weakly, as RFC 9110 requires for GET.
+        """
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = {_opaque_tag(tag.strip()) for tag in if_none_match.split(",")}
+            return "*" in tags or _opaque_tag(self.etag) in tags
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and self.last_modified is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                return False
+            return self.last_modified.replace(microsecond=0) <= since
+        return False
+
+    def not_modified(self) -> Response:
+        return Response(status_code=304, headers=self.headers())
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+def resource_version(resource: str, timestamps: Iterable[Any]) -> ResourceVersion:
+    """Validators of a representation built from rows with these ``updated_at`` values.
+
+    Every write moves a row's ``updated_at`` forward, so the latest one
+    identifies the version. ``resource`` names the rows and anything else
+    the representation depends on, such as a row count or filter. The ETag
+    is weak: it tracks the data, not the exact bytes.
+    """
+    latest = max((stamp for stamp in map(_utc, timestamps) if stamp is not None), default=None)
+    key = f"{resource}@{latest.isoformat() if latest else '-'}"
+    return ResourceVersion(f'W/"{hashlib.sha1(key.encode()).hexdigest()[:20]}"', latest)
@@ -1,4 +1,5 @@
-from fastapi import HTTPException, status
+from fastapi import HTTPException, Request, status
+from fastapi.responses import JSONResponse
 from typing import Optional, Any
 
 class HRSoftException(Exception):
@@ -33,6 +34,11 @@ class DuplicateError(HRSoftException):
     def __init__(self, message: str = "Resource already exists"):
         super().__init__(message, status.HTTP_409_CONFLICT)
 
+class ConflictError(HRSoftException):
+    """Concurrent modification errors (stale version)"""
+    def __init__(self, message: str = "Resource was modified by another request"):
+        super().__init__(message, status.HTTP_409_CONFLICT)
+
 class ServiceUnavailableError(HRSoftException):
     """Service unavailable errors"""
     def __init__(self, message: str = "Service temporarily unavailable"):
@@ -47,3 +53,8 @@ def handle_exception(e: Exception) -> HTTPException:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
         )
+
+async def hrsoft_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+    """Render application exceptions as JSON error responses"""
+    http_exception = handle_exception(exc)
+    return JSONResponse(status_code=http_exception.status_code, content={"detail": http_exception.detail})
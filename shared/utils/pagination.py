@@ -0,0 +1,55 @@
+import base64
+import json
+from typing import Any, Optional
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from shared.utils.exceptions import ValidationError
+
+def encode_cursor(position: dict[str, Any]) -> str:
+    """Encode a keyset position as an opaque URL-safe cursor"""
+    raw = json.dumps(position, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> dict[str, Any]:
+    """Decode a cursor produced by ``encode_cursor``"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValidationError("Invalid cursor")
+    if not isinstance(position, dict):
+        raise ValidationError("Invalid cursor")
+    return position
+
+class Explain(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON)`` of a select, keeping its bound parameters"""
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+async def count_rows(db: AsyncSession, query: Select) -> int:
+    """Exact row count of a select"""
+    return await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+
+async def estimate_rows(db: AsyncSession, query: Select) -> Optional[int]:
+    """Planner row estimate of a select.
+
+    PostgreSQL answers from table statistics via EXPLAIN without scanning the
+    table; other databases fall back to an exact count.
+    """
+    if db.bind.dialect.name != "postgresql":
+        return await count_rows(db, query)
+
+    # Search text stays a bound parameter, never inlined into the SQL
+    plan = await db.scalar(Explain(query.order_by(None)))
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -1,19 +1,51 @@
 import pytest
+import pytest_asyncio
+import importlib
 import sys
 import os
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Tests run without Redis
+os.environ.setdefault("CACHE_BACKEND", "memory")
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from fastapi.testclient import TestClient
 
 from shared.database.base import Base
 from shared.config.settings import Settings
+from shared.cache.cache import cache
 
 # Test database settings
 TEST_DATABASE_URL = "sqlite:///./test.db"
+TEST_ASYNC_DATABASE_URL = "sqlite+aiosqlite://"
+
+SERVICES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "services")
+
+def load_service(service_name: str) -> dict:
+    """Import a service's ``app`` package and return its modules by dotted name.
+
+    Every service ships a top-level ``app`` package, so each one is imported
+    in isolation and kept in its own module map.
+    """
+    for module_name in [name for name in sys.modules if name == "app" or name.startswith("app.")]:
+        del sys.modules[module_name]
+
+    service_path = os.path.join(SERVICES_DIR, service_name)
+    sys.path.insert(0, service_path)
+    try:
+        importlib.import_module("app.main")
+    finally:
+        sys.path.remove(service_path)
+
+    return {name: module for name, module in sys.modules.items() if name == "app" or name.startswith("app.")}
+
+AUTH_SERVICE = load_service("auth-service")
+USER_SERVICE = load_service("user-service")
 
 class TestSettings(Settings):
     database_url: str = TEST_DATABASE_URL
@@ -23,6 +55,21 @@ class TestSettings(Settings):
 engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+@pytest.fixture(scope="session")
+def auth_app():
+    """Auth service FastAPI application"""
+    return AUTH_SERVICE["app.main"].app
+
+@pytest.fixture(scope="session")
+def user_app():
+    """User service FastAPI application"""
+    return USER_SERVICE["app.main"].app
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with an empty in-memory cache"""
+    cache.backend.clear()
+
 @pytest.fixture(scope="session")
 def db_engine():
     """Create test database engine"""
@@ -52,3 +99,34 @@ def override_get_db(db_session):
         finally:
             pass
     return _override_get_db
+
+@pytest_asyncio.fixture
+async def async_db_engine():
+    """Create an isolated in-memory async database per test"""
+    async_engine = create_async_engine(
+        TEST_ASYNC_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    yield async_engine
+
+    await async_engine.dispose()
+
+@pytest_asyncio.fixture
+async def async_db_session(async_db_engine):
+    """Create test async database session"""
+    session_factory = async_sessionmaker(async_db_engine, expire_on_commit=False, autoflush=False)
+    async with session_factory() as session:
+        yield session
+
+@pytest.fixture
+def override_get_async_db(async_db_engine):
+    """Override get_async_db dependency"""
+    session_factory = async_sessionmaker(async_db_engine, expire_on_commit=False, autoflush=False)
+    async def _override_get_async_db():
+        async with session_factory() as session:
+            yield session
+    return _override_get_async_db
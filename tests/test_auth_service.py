@@ -0,0 +1,121 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select
+
+from shared.auth.revocation import MemoryRevocationSet, token_digest
+from shared.utils.exceptions import AuthenticationError, DuplicateError
+from tests.conftest import AUTH_SERVICE
+
+AuthService = AUTH_SERVICE["app.services.auth_service"].AuthService
+UserCreate = AUTH_SERVICE["app.schemas.auth"].UserCreate
+RefreshToken = AUTH_SERVICE["app.models.auth"].RefreshToken
+refresh_tokens = AUTH_SERVICE["app.services.refresh_tokens"]
+
+def make_user(username: str = "jdoe") -> "UserCreate":
+    return UserCreate(
+        username=username,
+        email=f"{username}@example.com",
+        full_name="John Doe",
+        password="s3cret-pass"
+    )
+
+@pytest.mark.asyncio
+async def test_register_and_login(async_db_session):
+    """Register a user, then log in and refresh with the issued tokens"""
+    auth_service = AuthService(async_db_session)
+    user = await auth_service.register_user(make_user())
+    assert user.username == "jdoe"
+    assert user.permissions == ["user"]
+
+    tokens = await auth_service.login_user("jdoe", "s3cret-pass")
+    assert tokens.access_token and tokens.refresh_token
+
+    refreshed = await auth_service.refresh_access_token(tokens.refresh_token)
+    assert refreshed.refresh_token == tokens.refresh_token
+
+@pytest.mark.asyncio
+async def test_register_duplicate_username(async_db_session):
+    """Registering the same username twice is rejected"""
+    auth_service = AuthService(async_db_session)
+    await auth_service.register_user(make_user())
+
+    with pytest.raises(DuplicateError):
+        await auth_service.register_user(make_user())
+
+@pytest.mark.asyncio
+async def test_logout_revokes_refresh_token(async_db_session):
+    """A refresh token cannot be used after logout"""
+    auth_service = AuthService(async_db_session)
+    await auth_service.register_user(make_user())
+    tokens = await auth_service.login_user("jdoe", "s3cret-pass")
+
+    await auth_service.logout_user(tokens.refresh_token)
+
+    with pytest.raises(AuthenticationError):
+        await auth_service.refresh_access_token(tokens.refresh_token)
+
+@pytest.mark.asyncio
+async def test_refresh_tokens_stored_by_digest(async_db_session):
+    """Refresh tokens are stored as a 32-byte digest with their expiry"""
+    auth_service = AuthService(async_db_session)
+    await auth_service.register_user(make_user())
+    tokens = await auth_service.login_user("jdoe", "s3cret-pass")
+
+    stored = await async_db_session.scalar(select(RefreshToken))
+    assert stored.token_hash == token_digest(tokens.refresh_token)
+    assert len(stored.token_hash) == 32
+    assert stored.expires_at > datetime.now(timezone.utc).replace(tzinfo=None)
+
+@pytest.mark.asyncio
+async def test_logout_with_revocation_set(async_db_session):
+    """With a revocation set, logout is recorded there and refresh skips the database"""
+    revocations = MemoryRevocationSet()
+    auth_service = AuthService(async_db_session, revocations)
+    await auth_service.register_user(make_user())
+    tokens = await auth_service.login_user("jdoe", "s3cret-pass")
+
+    await auth_service.logout_user(tokens.refresh_token)
+    assert await revocations.contains(token_digest(tokens.refresh_token))
+    with pytest.raises(AuthenticationError):
+        await auth_service.refresh_access_token(tokens.refresh_token)
+
+    # A fresh set is rebuilt from the database on startup
+    rebuilt = MemoryRevocationSet()
+    assert await refresh_tokens.load_revocations(async_db_session, rebuilt) == 1
+    assert await rebuilt.contains(token_digest(tokens.refresh_token))
+
+def test_redis_revocation_backend_fails_loudly(monkeypatch):
+    """A configured Redis revocation set that cannot be built stops the service instead of falling back"""
+    from shared.auth import revocation
+    from shared.cache import backends
+    from shared.config.settings import Settings
+
+    monkeypatch.setattr(backends, "redis_asyncio", None)
+    with pytest.raises(RuntimeError, match="refresh_token_revocation_backend=redis"):
+        revocation.create_revocation_set(Settings(refresh_token_revocation_backend="redis"))
+    assert revocation.create_revocation_set(Settings(refresh_token_revocation_backend="database")) is None
+
+def test_incomplete_revocation_set_fails_when_built():
+    """A revocation set without ``contains`` is refused at construction"""
+    from shared.auth.revocation import RevocationSet
+
+    class AddOnlySet(RevocationSet):
+        async def add(self, digest, expires_at):
+            pass
+
+    with pytest.raises(TypeError):
+        AddOnlySet()
+
+@pytest.mark.asyncio
+async def test_purge_expired_refresh_tokens(async_db_session):
+    """The purge deletes expired tokens in batches and keeps live ones"""
+    now = datetime.now(timezone.utc)
+    async_db_session.add_all([
+        RefreshToken(token_hash=bytes([index]) * 32, user_id="1", expires_at=now + timedelta(days=offset))
+        for index, offset in enumerate([-2, -1, -1, 1])
+    ])
+    await async_db_session.commit()
+
+    assert await refresh_tokens.purge_expired_tokens(async_db_session, batch_size=2) == 3
+    remaining = (await async_db_session.scalars(select(RefreshToken.token_hash))).all()
+    assert remaining == [bytes([3]) * 32]
@@ -3,6 +3,7 @@ import asyncio
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
+import subprocess
 import sys
 import os
 
@@ -12,15 +13,9 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from shared.database.base import Base
 from shared.config.settings import get_settings
 
-# Test auth service
-sys.path.append(os.path.join(os.path.dirname(__file__), "../services/auth-service"))
-from app.main import app as auth_app
+# Service apps are loaded in isolation by conftest (both ship an ``app`` package)
 
-# Test user service  
-sys.path.append(os.path.join(os.path.dirname(__file__), "../services/user-service"))
-from app.main import app as user_app
-
-def test_auth_service_health():
+def test_auth_service_health(auth_app):
     """Test auth service health endpoint"""
     client = TestClient(auth_app)
     response = client.get("/health")
@@ -28,14 +23,14 @@ def test_auth_service_health():
     assert response.json()["status"] == "healthy"
     assert response.json()["service"] == "auth-service"
 
-def test_auth_service_root():
+def test_auth_service_root(auth_app):
     """Test auth service root endpoint"""
     client = TestClient(auth_app)
     response = client.get("/")
     assert response.status_code == 200
     assert "HRSOFT Auth Service" in response.json()["message"]
 
-def test_user_service_health():
+def test_user_service_health(user_app):
     """Test user service health endpoint"""
     client = TestClient(user_app)
     response = client.get("/health")
@@ -43,9 +38,428 @@ def test_user_service_health():
     assert response.json()["status"] == "healthy"
     assert response.json()["service"] == "user-service"
 
-def test_user_service_root():
+def test_user_service_root(user_app):
     """Test user service root endpoint"""
     client = TestClient(user_app)
     response = client.get("/")
     assert response.status_code == 200
     assert "HRSOFT User Service" in response.json()["message"]
+
+@pytest.mark.asyncio
+async def test_user_service_error_response(user_app, override_get_async_db):
+    """Application errors are returned as JSON with their status code"""
+    from httpx import AsyncClient
+    from shared.auth.jwt_handler import create_access_token
+    from shared.database.base import get_async_db
+
+    user_app.dependency_overrides[get_async_db] = override_get_async_db
+    token = create_access_token({"sub": "1", "permissions": ["hr", "admin"]})
+    try:
+        async with AsyncClient(app=user_app, base_url="http://test") as client:
+            response = await client.get(
+                "/users/departments/42", headers={"Authorization": f"Bearer {token}"}
+            )
+    finally:
+        user_app.dependency_overrides.clear()
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Department not found"}
+
+@pytest.mark.asyncio
+async def test_user_service_bulk_import(user_app, override_get_async_db):
+    """Bulk import picks the format from the Content-Type"""
+    from httpx import AsyncClient
+    from shared.auth.jwt_handler import create_access_token
+    from shared.database.base import get_async_db
+
+    user_app.dependency_overrides[get_async_db] = override_get_async_db
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '1', 'permissions': ['hr', 'admin']})}"}
+    body = "employee_id,first_name,last_name,email\nEMP1,An,Nguyen,an@example.com\n"
+    try:
+        async with AsyncClient(app=user_app, base_url="http://test") as client:
+            response = await client.post(
+                "/users/employees/bulk", content=body, headers={**headers, "Content-Type": "text/csv"}
+            )
+            unsupported = await client.post("/users/employees/bulk", content=body, headers=headers)
+    finally:
+        user_app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json() == {"total_rows": 1, "imported": 1, "failed": 0, "errors": [], "warnings": []}
+    assert unsupported.status_code == 422
+
+@pytest.mark.asyncio
+async def test_user_service_export_streams_csv(user_app, override_get_async_db):
+    """The export endpoint streams an attachment"""
+    from httpx import AsyncClient
+    from shared.auth.jwt_handler import create_access_token
+    from shared.database.base import get_async_db
+
+    user_app.dependency_overrides[get_async_db] = override_get_async_db
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '1', 'permissions': ['hr', 'admin']})}"}
+    try:
+        async with AsyncClient(app=user_app, base_url="http://test") as client:
+            response = await client.get("/users/employees/export?format=csv", headers=headers)
+    finally:
+        user_app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == "attachment; filename=employees.csv"
+    assert response.text.startswith("id,employee_id")
+
+@pytest.mark.asyncio
+async def test_user_service_metrics(user_app, override_get_async_db):
+    """/metrics labels requests by route template and counts their queries"""
+    from httpx import AsyncClient
+    from shared.auth.jwt_handler import create_access_token
+    from shared.database.base import get_async_db
+
+    user_app.dependency_overrides[get_async_db] = override_get_async_db
+    token = create_access_token({"sub": "1", "permissions": ["hr", "admin"]})
+    try:
+        async with AsyncClient(app=user_app, base_url="http://test") as client:
+            await client.get("/users/departments/42", headers={"Authorization": f"Bearer {token}"})
+            response = await client.get("/metrics")
+    finally:
+        user_app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    route = 'method="GET",route="/users/departments/{department_id}"'
+    assert f'hrsoft_http_requests_total{{service="user-service",{route},status="404"}}' in response.text
+    queries = next(
+        line for line in response.text.splitlines()
+        if line.startswith(f'hrsoft_http_request_db_queries_total{{service="user-service",{route}}}')
+    )
+    assert float(queries.rsplit(" ", 1)[1]) >= 1
+    assert 'hrsoft_cache_hits{service="user-service"}' in response.text
+
+@pytest.mark.asyncio
+async def test_user_service_employee_batch(user_app, override_get_async_db):
+    """The batch endpoint takes comma-separated IDs"""
+    from httpx import AsyncClient
+    from shared.auth.jwt_handler import create_access_token
+    from shared.database.base import get_async_db
+
+    user_app.dependency_overrides[get_async_db] = override_get_async_db
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '1', 'permissions': ['user']})}"}
+    try:
+        async with AsyncClient(app=user_app, base_url="http://test") as client:
+            response = await client.get("/users/employees:batch?ids=1,2", headers=headers)
+            invalid = await client.get("/users/employees:batch?ids=1,x", headers=headers)
+    finally:
+        user_app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json() == {"employees": [], "missing": [1, 2]}
+    assert invalid.status_code == 422
+
+def test_migrations_match_models(tmp_path):
+    """alembic upgrade head builds the schema the models describe"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'migrations.db'}"}
+    for command in (["upgrade", "head"], ["check"], ["downgrade", "base"]):
+        result = subprocess.run(
+            [sys.executable, "-m", "alembic", *command],
+            cwd=root, env=env, capture_output=True, text=True
+        )
+        assert result.returncode == 0, result.stderr + result.stdout
+
+def create_all_baseline(engine):
+    """The tables as the services' former create_all left them, before any migration"""
+    from sqlalchemy import JSON, Boolean, Column, Date, DateTime, ForeignKey, Integer, MetaData, String, Table, Text, func
+    metadata = MetaData()
+    def columns():
+        return [
+            Column("id", Integer, primary_key=True, index=True),
+            Column("created_at", DateTime(timezone=True), server_default=func.now()),
+            Column("updated_at", DateTime(timezone=True), server_default=func.now()),
+        ]
+    Table(
+        "users", metadata, *columns(),
+        Column("username", String(50), unique=True, index=True, nullable=False),
+        Column("email", String(100), unique=True, index=True, nullable=False),
+        Column("full_name", String(100), nullable=False),
+        Column("hashed_password", String(255), nullable=False),
+        Column("is_active", Boolean), Column("is_superuser", Boolean), Column("permissions", JSON),
+    )
+    Table(
+        "refresh_tokens", metadata, *columns(),
+        Column("token", String(500), unique=True, index=True, nullable=False),
+        Column("user_id", String(50), nullable=False),
+        Column("is_revoked", Boolean),
+    )
+    Table(
+        "employees", metadata, *columns(),
+        Column("employee_id", String(20), unique=True, index=True, nullable=False),
+        Column("first_name", String(50), nullable=False),
+        Column("last_name", String(50), nullable=False),
+        Column("email", String(100), unique=True, index=True, nullable=False),
+        Column("phone", String(20)), Column("date_of_birth", Date), Column("address", Text),
+        Column("department_id", Integer, ForeignKey("departments.id")),
+        Column("position", String(100)), Column("hire_date", Date), Column("salary", Integer),
+        Column("is_active", Boolean),
+        Column("manager_id", Integer, ForeignKey("employees.id")),
+    )
+    Table(
+        "departments", metadata, *columns(),
+        Column("name", String(100), unique=True, nullable=False),
+        Column("description", Text),
+        Column("manager_id", Integer, ForeignKey("employees.id")),
+        Column("budget", Integer), Column("is_active", Boolean),
+    )
+    Table(
+        "employee_profiles", metadata, *columns(),
+        Column("employee_id", Integer, ForeignKey("employees.id"), unique=True),
+        Column("bio", Text), Column("skills", Text),
+        Column("emergency_contact_name", String(100)), Column("emergency_contact_phone", String(20)),
+        Column("emergency_contact_relationship", String(50)),
+    )
+    metadata.create_all(engine)
+    return metadata
+
+def test_migrations_upgrade_create_all_baseline(tmp_path):
+    """A database from the former create_all is upgraded in place, keeping its data and refresh tokens valid"""
+    import hashlib
+    from datetime import datetime, timedelta, timezone
+    from sqlalchemy import text
+    from shared.auth.jwt_handler import create_refresh_token
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    url = f"sqlite:///{tmp_path / 'baseline.db'}"
+    engine = create_engine(url)
+    create_all_baseline(engine)
+    token = create_refresh_token({"sub": "1"})
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO refresh_tokens (token, user_id, is_revoked) VALUES (:token, '1', 1)"), {"token": token})
+        connection.execute(text("INSERT INTO departments (id, name, is_active) VALUES (1, 'Sales', 1)"))
+        connection.execute(text(
+            "INSERT INTO employees (employee_id, first_name, last_name, email, department_id, salary, is_active) "
+            "VALUES ('EMP00001', 'An', 'Nguyen', 'an@example.com', 1, 1000, 1)"
+        ))
+
+    env = {**os.environ, "DATABASE_URL": url}
+    for command in (["upgrade", "head"], ["check"]):
+        result = subprocess.run([sys.executable, "-m", "alembic", *command], cwd=root, env=env, capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr + result.stdout
+
+    with engine.connect() as connection:
+        row = connection.execute(text("SELECT token_hash, expires_at, is_revoked FROM refresh_tokens")).one()
+        assert connection.execute(text("SELECT employee_id, version FROM employees")).one() == ("EMP00001", 1)
+        assert connection.execute(text("SELECT count(*) FROM department_stats")).scalar() == 0
+    engine.dispose()
+    assert bytes(row.token_hash) == hashlib.sha256(token.encode()).digest() and row.is_revoked
+    expires_at = datetime.fromisoformat(str(row.expires_at)).replace(tzinfo=timezone.utc)
+    assert abs(expires_at - datetime.now(timezone.utc) - timedelta(days=get_settings().refresh_token_expire_days)) < timedelta(minutes=1)
+
+@pytest.mark.asyncio
+async def test_user_service_list_fast_path(user_app, override_get_async_db):
+    """List endpoints skip response validation but return what the models would"""
+    from datetime import datetime, timezone
+    from httpx import AsyncClient
+    from shared.auth.jwt_handler import create_access_token
+    from shared.database.base import get_async_db
+    from shared.utils.responses import FastJSONResponse
+    from tests.conftest import USER_SERVICE
+    schemas = USER_SERVICE["app.schemas.user"]
+
+    user_app.dependency_overrides[get_async_db] = override_get_async_db
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '1', 'permissions': ['hr', 'admin']})}"}
+    try:
+        async with AsyncClient(app=user_app, base_url="http://test") as client:
+            department = (await client.post("/users/departments/", json={"name": "Ops"}, headers=headers)).json()
+            for index, department_id in ((1, department["id"]), (2, None)):
+                await client.post("/users/employees/", headers=headers, json={
+                    "employee_id": f"EMP{index:05d}", "first_name": "An", "last_name": "Nguyen",
+                    "email": f"an{index}@example.com", "hire_date": "2024-01-02", "salary": 1000,
+                    "department_id": department_id,
+                })
+            employees = await client.get("/users/employees/", headers=headers)
+            departments = await client.get("/users/departments/", headers=headers)
+    finally:
+        user_app.dependency_overrides.clear()
+
+    assert employees.status_code == 200 and departments.status_code == 200
+    page = employees.json()
+    assert page == schemas.EmployeeListResponse(**page).model_dump(mode="json")
+    assert [employee["department"] and employee["department"]["name"] for employee in page["employees"]] == ["Ops", None]
+    assert departments.json() == [department]
+
+    moment = datetime(2024, 1, 2, 3, 4, 5, 6000, tzinfo=timezone.utc)
+    expected = schemas.DepartmentResponse(name="Ops", id=1, is_active=True, version=1, created_at=moment, updated_at=moment)
+    assert FastJSONResponse(expected.model_dump()).body == expected.model_dump_json().encode()
+
+@pytest.mark.asyncio
+async def test_user_service_conditional_get(user_app, override_get_async_db):
+    """Read endpoints send validators and answer 304 while the copy is current"""
+    from httpx import AsyncClient
+    from shared.cache.cache import cache
+    from shared.auth.jwt_handler import create_access_token
+    from shared.database.base import get_async_db
+
+    user_app.dependency_overrides[get_async_db] = override_get_async_db
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '1', 'permissions': ['hr', 'admin']})}"}
+    try:
+        async with AsyncClient(app=user_app, base_url="http://test") as client:
+            department = (await client.post("/users/departments/", json={"name": "Ops"}, headers=headers)).json()
+            employee = (await client.post("/users/employees/", headers=headers, json={
+                "employee_id": "EMP00001", "first_name": "An", "last_name": "Nguyen",
+                "email": "an@example.com", "department_id": department["id"],
+            })).json()
+
+            etags = {}
+            for url in ("/users/departments/", f"/users/departments/{department['id']}", f"/users/employees/{employee['id']}"):
+                response = await client.get(url, headers=headers)
+                assert response.status_code == 200
+                assert response.headers["cache-control"] == "private, no-cache"
+                etag, last_modified = response.headers["etag"], response.headers["last-modified"]
+                etags[url] = etag
+
+                current = await client.get(url, headers={**headers, "If-None-Match": f'"other", {etag}'})
+                assert current.status_code == 304 and current.headers["etag"] == etag
+                assert current.content == b""
+                assert (await client.get(url, headers={**headers, "If-Modified-Since": last_modified})).status_code == 304
+                # Without a cached copy the version comes from the database
+                await cache.invalidate_namespace("departments")
+                await cache.invalidate_namespace("employees")
+                assert (await client.get(url, headers={**headers, "If-None-Match": etag})).status_code == 304
+                assert (await client.get(url, headers={**headers, "If-None-Match": '"other"'})).status_code == 200
+
+            # A new department changes the list's version
+            await client.post("/users/departments/", json={"name": "Sales"}, headers=headers)
+            listed = await client.get("/users/departments/", headers={**headers, "If-None-Match": etags["/users/departments/"]})
+            assert listed.status_code == 200 and len(listed.json()) == 2
+            missing = await client.get("/users/departments/999", headers={**headers, "If-None-Match": "*"})
+            assert missing.status_code == 404
+    finally:
+        user_app.dependency_overrides.clear()
+
+@pytest.mark.asyncio
+async def test_user_service_attendance_ingestion(user_app, override_get_async_db, async_db_engine):
+    """Clock events are accepted into the buffer and readable once flushed"""
+    from httpx import AsyncClient
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    from shared.auth.jwt_handler import create_access_token
+    from shared.database.base import get_async_db
+    from tests.conftest import USER_SERVICE
+
+    attendance = USER_SERVICE["app.services.attendance"]
+    buffer = attendance.AttendanceBuffer(
+        async_sessionmaker(async_db_engine, expire_on_commit=False),
+        attendance.WorkSchedule.from_settings(get_settings()),
+        interval=0
+    )
+    user_app.dependency_overrides[get_async_db] = override_get_async_db
+    user_app.dependency_overrides[attendance.get_attendance_buffer] = lambda: buffer
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '1', 'permissions': ['hr', 'admin']})}"}
+    device = {"Authorization": f"Bearer {create_access_token({'sub': '2', 'permissions': ['attendance']})}"}
+    try:
+        async with AsyncClient(app=user_app, base_url="http://test") as client:
+            employee = (await client.post("/users/employees/", headers=headers, json={
+                "employee_id": "EMP00001", "first_name": "An", "last_name": "Nguyen", "email": "an@example.com",
+            })).json()
+
+            # Only time clocks post events, and only for employees that exist
+            clock_in = {"employee_id": employee["id"], "timestamp": "2026-10-16T01:45:00Z", "location": "Gate A"}
+            assert (await client.post("/attendance/clock-in", headers=headers, json=clock_in)).status_code == 403
+            missing = await client.post("/attendance/clock-in", headers=device, json={**clock_in, "employee_id": 999})
+            assert missing.status_code == 404
+
+            response = await client.post("/attendance/clock-in", headers=device, json=clock_in)
+            assert response.status_code == 202
+            assert response.json() == {"accepted": 1, "buffered": 1, "unknown_employees": []}
+            response = await client.post("/attendance/events", headers=device, json={"events": [
+                {"employee_id": employee["id"], "event": "out", "timestamp": "2026-10-16T11:15:00Z"},
+                {"employee_id": 999, "event": "in", "timestamp": "2026-10-16T02:00:00Z"},
+                {"employee_id": employee["id"], "event": "in", "timestamp": "2026-10-16T02:10:00Z"},
+            ]})
+            assert response.json() == {"accepted": 2, "buffered": 1, "unknown_employees": [999]}
+            assert (await client.get(f"/attendance/employees/{employee['id']}", headers=headers)).json() == []
+
+            flushed = await client.post("/attendance/flush", headers=headers)
+            assert flushed.json() == {"written": 1, "rejected": 0}
+            (record,) = (await client.get(f"/attendance/employees/{employee['id']}", headers=headers)).json()
+            assert record["attendance_date"] == "2026-10-16"
+            assert record["total_hours"] == 9.5 and record["late_minutes"] == 0
+    finally:
+        user_app.dependency_overrides.clear()
+
+@pytest.mark.asyncio
+async def test_user_service_payroll_run(user_app, override_get_async_db, monkeypatch):
+    """A payroll cycle is created, run and read back over HTTP"""
+    from httpx import AsyncClient
+    from shared.auth.jwt_handler import create_access_token
+    from shared.database.base import get_async_db
+
+    # Worker processes would open their own connections to another database
+    monkeypatch.setattr(get_settings(), "payroll_workers", 1)
+    user_app.dependency_overrides[get_async_db] = override_get_async_db
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '1', 'permissions': ['hr', 'admin']})}"}
+    try:
+        async with AsyncClient(app=user_app, base_url="http://test") as client:
+            employee = (await client.post("/users/employees/", headers=headers, json={
+                "employee_id": "EMP00001", "first_name": "An", "last_name": "Nguyen", "email": "an@example.com",
+                "salary": 1_000_000,
+            })).json()
+            response = await client.post("/payroll/components", headers=headers, json={
+                "name": "Social insurance", "code": "SI", "type": "DEDUCTION", "category": "INSURANCE",
+                "calculation_type": "PERCENTAGE", "default_percentage": 8, "is_mandatory": True,
+            })
+            assert response.status_code == 201
+            response = await client.post("/payroll/components", headers=headers, json={
+                "name": "Bonus", "code": "BONUS", "type": "EARNING", "category": "BONUS",
+                "calculation_type": "PERCENTAGE", "calculation_base": "GROSS_SALARY",
+            })
+            assert response.status_code == 422
+            cycle = (await client.post("/payroll/cycles", headers=headers, json={
+                "name": "October", "start_date": "2026-10-01", "end_date": "2026-10-31", "pay_date": "2026-11-05",
+            })).json()
+            assert cycle["status"] == "DRAFT"
+
+            run = (await client.post(f"/payroll/cycles/{cycle['id']}/run", headers=headers)).json()
+            assert run["status"] == "COMPLETED" and run["processed_by"] == 1
+            assert (run["total_gross_amount"], run["total_net_amount"]) == (1_000_000, 920_000)
+            records = (await client.get(f"/payroll/cycles/{cycle['id']}/records", headers=headers)).json()
+            assert records["total"] == 1 and records["records"][0]["insurance_amount"] == 80_000
+            payslip = (await client.get(f"/payroll/cycles/{cycle['id']}/employees/{employee['id']}", headers=headers)).json()
+            assert payslip["details"][0]["code"] == "SI" and payslip["details"][0]["rate_percentage"] == 8.0
+    finally:
+        user_app.dependency_overrides.clear()
+
+@pytest.mark.asyncio
+async def test_user_service_notifications(user_app, override_get_async_db, monkeypatch):
+    """Notifications are fanned out, counted and marked read over HTTP"""
+    from httpx import AsyncClient
+    from shared.auth.jwt_handler import create_access_token
+    from shared.database.base import get_async_db
+    from tests.conftest import USER_SERVICE
+
+    # Counts cached by other tests would belong to another database
+    notifications_module = USER_SERVICE["app.services.notifications"]
+    monkeypatch.setattr(notifications_module, "unread_counter", notifications_module.MemoryUnreadCounter())
+    user_app.dependency_overrides[get_async_db] = override_get_async_db
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '1', 'permissions': ['hr', 'admin']})}"}
+    try:
+        async with AsyncClient(app=user_app, base_url="http://test") as client:
+            employee = (await client.post("/users/employees/", headers=headers, json={
+                "employee_id": "EMP00001", "first_name": "An", "last_name": "Nguyen", "email": "an@example.com",
+            })).json()
+            response = await client.post("/notifications/", headers=headers, json={"title": "Hi", "message": "Nobody"})
+            assert response.status_code == 422
+            for title in ("Welcome", "Payslip ready"):
+                response = await client.post("/notifications/", headers=headers, json={
+                    "title": title, "message": "See the portal", "category": "PAYROLL", "employee_ids": [employee["id"]],
+                })
+                assert response.status_code == 201 and response.json() == {"created": 1}
+
+            url = f"/notifications/employees/{employee['id']}"
+            assert (await client.get(f"{url}/unread-count", headers=headers)).json() == {"unread": 2}
+            listing = (await client.get(url, headers=headers, params={"limit": 1})).json()
+            assert [n["title"] for n in listing["notifications"]] == ["Payslip ready"]
+            assert listing["notifications"][0]["sender_id"] == 1 and listing["next_before_id"] is not None
+            read = (await client.post(f"{url}/read", headers=headers, json={"ids": [listing["notifications"][0]["id"]]})).json()
+            assert read == {"marked": 1, "unread": 1}
+            assert (await client.post(f"{url}/read", headers=headers, json={})).json() == {"marked": 1, "unread": 0}
+    finally:
+        user_app.dependency_overrides.clear()
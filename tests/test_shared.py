@@ -0,0 +1,362 @@
+import asyncio
+import time
+import pytest
+
+from shared.auth.dependencies import require_hr
+from shared.auth.gateway import identity_headers
+from shared.auth.hashing import PasswordHashPool
+from shared.auth.jwt_handler import (
+    create_access_token, get_password_hash_async, verify_password_async, verify_token_cached, token_cache
+)
+from shared.auth.token_cache import TokenCache
+from shared.cache.backends import MemoryBackend
+from shared.cache.cache import ReadThroughCache
+from shared.config.settings import settings
+from shared.database.pool import InstrumentedQueuePool
+from shared.observability.exposition import render_prometheus
+from shared.observability.metrics import Histogram
+from shared.observability.middleware import UNMATCHED_ROUTE, MetricsMiddleware, RequestMetrics
+from shared.utils.exceptions import ServiceUnavailableError
+from shared.utils.pagination import Explain
+
+@pytest.mark.asyncio
+async def test_password_hash_roundtrip():
+    """Async hashing and verification run through the worker pool"""
+    hashed = await get_password_hash_async("s3cret-pass")
+    assert await verify_password_async("s3cret-pass", hashed)
+    assert not await verify_password_async("wrong-pass", hashed)
+
+@pytest.mark.asyncio
+async def test_password_hash_pool_rejects_when_full():
+    """Requests beyond workers + queue are rejected, not queued"""
+    pool = PasswordHashPool(max_workers=1, max_queue=1)
+    try:
+        running = [asyncio.ensure_future(pool.run(time.sleep, 0.3)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert pool.stats()["queue_depth"] == 1
+
+        with pytest.raises(ServiceUnavailableError):
+            await pool.run(time.sleep, 0)
+
+        await asyncio.gather(*running)
+        stats = pool.stats()
+        assert stats["completed"] == 2
+        assert stats["rejected"] == 1
+        assert stats["max_pending_seen"] == 2
+    finally:
+        pool.shutdown()
+
+def test_token_cache_hits_and_lru_bound():
+    """Verified claims are served from the cache and bounded by size"""
+    cache = TokenCache(max_size=2)
+    expires = time.time() + 60
+    for token in ("a", "b"):
+        cache.put(token, {"sub": token, "exp": expires})
+
+    assert cache.get("a")["sub"] == "a"
+    cache.put("c", {"sub": "c", "exp": expires})
+
+    assert cache.get("b") is None
+    assert cache.get("c")["sub"] == "c"
+    assert cache.stats()["evictions"] == 1
+    assert (cache.hits, cache.misses) == (2, 1)
+
+def test_token_cache_expires_at_exp():
+    """Entries are dropped once the token's exp has passed"""
+    cache = TokenCache(max_size=10)
+    cache.put("stale", {"sub": "1", "exp": time.time() - 1})
+    cache.put("no-exp", {"sub": "1"})
+
+    assert cache.get("stale") is None
+    assert cache.get("no-exp") is None
+    assert cache.stats()["expirations"] == 1
+
+def test_verify_token_cached():
+    """Valid tokens are cached after the first verification, invalid ones never are"""
+    token = create_access_token({"sub": "7", "permissions": ["user"]})
+    hits = token_cache.hits
+
+    assert verify_token_cached(token)["sub"] == "7"
+    assert verify_token_cached(token)["sub"] == "7"
+    assert token_cache.hits == hits + 1
+    assert verify_token_cached(token + "x") is None
+
+@pytest.mark.asyncio
+async def test_cache_coalesces_concurrent_misses():
+    """Concurrent misses for one key run the loader once"""
+    cache = ReadThroughCache(MemoryBackend())
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"value": calls}
+
+    results = await asyncio.gather(*[cache.get_or_load("items", "1", load) for _ in range(20)])
+
+    assert calls == 1
+    assert all(result == {"value": 1} for result in results)
+    assert await cache.get_or_load("items", "1", load) == {"value": 1}
+    assert cache.stats()["loads"] == 1
+
+@pytest.mark.asyncio
+async def test_cache_invalidation():
+    """Keys and whole namespaces can be invalidated"""
+    cache = ReadThroughCache(MemoryBackend())
+    version = 0
+
+    async def load():
+        return version
+
+    assert await cache.get_or_load("items", "a", load) == 0
+    version = 1
+    assert await cache.get_or_load("items", "a", load) == 0
+
+    await cache.invalidate("items", "a")
+    assert await cache.get_or_load("items", "a", load) == 1
+
+    version = 2
+    await cache.invalidate_namespace("items")
+    assert await cache.get_or_load("items", "a", load) == 2
+
+def test_incomplete_cache_backend_fails_when_built():
+    """A backend missing an operation is refused at construction, not mid-request"""
+    from shared.cache.backends import CacheBackend
+
+    class GetOnlyBackend(CacheBackend):
+        async def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnlyBackend()
+
+@pytest.mark.asyncio
+async def test_memory_backend_never_evicts_generations():
+    """A namespace generation outlives LRU eviction, so older entries stay unreachable"""
+    backend = MemoryBackend(max_entries=2)
+    cache = ReadThroughCache(backend)
+    await backend.set("hrsoft:items:0:a", '"stale"', 60)
+    await cache.invalidate_namespace("items")
+    # A late read of the old entry, then a write: a generation kept in the
+    # LRU would now be the least recently used entry, and evicted
+    await backend.get("hrsoft:items:0:a")
+    await backend.set("hrsoft:other:0:b", '"filler"', 60)
+
+    assert await backend.get("hrsoft:items:generation") == "1"
+    assert await cache.peek("items", "a") is None
+
+def test_histogram_buckets_and_quantiles():
+    """Observations land in cumulative le buckets"""
+    histogram = Histogram(buckets=(0.01, 0.1, 1.0))
+    for value in (0.005, 0.05, 0.05, 0.5, 5.0):
+        histogram.observe(value)
+
+    assert histogram.cumulative() == [(0.01, 1), (0.1, 3), (1.0, 4), (float("inf"), 5)]
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.99) == float("inf")
+    assert histogram.snapshot()["count"] == 5
+
+def test_instrumented_pool_metrics():
+    """The pool reports checkouts, waits and timeouts"""
+    from sqlalchemy import create_engine, exc, text
+
+    engine = create_engine(
+        "sqlite://", poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+    with engine.connect() as connection:
+        connection.execute(text("select 1"))
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    with engine.connect():
+        pass
+
+    stats = engine.pool.stats()
+    assert stats["checkouts"] == 2
+    assert stats["timeouts"] == 1
+    assert stats["connects"] == 1
+    assert stats["wait_seconds"]["count"] == 1
+    assert stats["checked_out"] == 0
+
+@pytest.mark.asyncio
+async def test_metrics_middleware_records_route_template():
+    """Requests are labelled by route template; unmatched paths share one label"""
+    from fastapi import FastAPI
+    from httpx import AsyncClient
+
+    app = FastAPI()
+    metrics = RequestMetrics()
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        await client.get("/items/1")
+        await client.get("/items/2")
+        await client.get("/missing")
+
+    assert metrics.requests[("GET", "/items/{item_id}", 200)] == 2
+    assert metrics.requests[("GET", UNMATCHED_ROUTE, 404)] == 1
+    assert metrics.in_flight == 0
+
+    text = render_prometheus("test", metrics, {"pool": lambda: {"size": 5, "wait_seconds": Histogram()}})
+    assert 'hrsoft_http_request_duration_seconds_count{service="test",method="GET",route="/items/{item_id}"} 2' in text
+    assert 'hrsoft_pool_size{service="test"} 5.0' in text
+    assert 'hrsoft_pool_wait_seconds_bucket{service="test",le="+Inf"} 0' in text
+
+def test_explain_keeps_search_text_bound():
+    """Row estimates EXPLAIN the query with its parameters bound, not inlined"""
+    from sqlalchemy import column, select, table
+    from sqlalchemy.dialects import postgresql
+    employees = table("employees", column("first_name"))
+    query = select(employees).where(employees.c.first_name.ilike("%'; DROP TABLE employees; --%"))
+    compiled = Explain(query).compile(dialect=postgresql.asyncpg.dialect())
+    assert str(compiled).startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert "DROP" not in str(compiled)
+    assert list(compiled.params.values()) == ["%'; DROP TABLE employees; --%"]
+
+def test_identity_headers_bounded_by_exp():
+    """The gateway may cache a token check up to the TTL, never past exp"""
+    headers = identity_headers({"sub": "3", "permissions": ["hr", "admin"], "exp": time.time() + 60}, 300)
+    assert headers["X-Auth-User-Id"] == "3"
+    assert headers["X-Auth-Permissions"] == "hr,admin"
+    assert 58 <= int(headers["X-Accel-Expires"]) <= 60
+
+    assert identity_headers({"sub": "3", "exp": time.time() + 3600}, 300)["X-Accel-Expires"] == "300"
+    assert identity_headers({"sub": "3", "exp": time.time() - 5}, 300)["X-Accel-Expires"] == "0"
+
+@pytest.mark.asyncio
+async def test_gateway_identity_headers_trusted_with_secret(monkeypatch):
+    """In gateway mode forwarded identities are used only with the shared secret"""
+    from fastapi import Depends, FastAPI
+    from httpx import AsyncClient
+
+    app = FastAPI()
+
+    @app.get("/whoami")
+    async def whoami(current_user: dict = Depends(require_hr)):
+        return {"user_id": current_user["user_id"]}
+
+    forwarded = {"X-Auth-User-Id": "42", "X-Auth-Permissions": "hr,admin", "X-Gateway-Secret": "s3cret"}
+    token = create_access_token({"sub": "7", "permissions": ["hr", "admin"]})
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        # JWT mode ignores the headers
+        assert (await client.get("/whoami", headers=forwarded)).status_code == 403
+
+        monkeypatch.setattr(settings, "auth_mode", "gateway")
+        monkeypatch.setattr(settings, "gateway_secret", "s3cret")
+        response = await client.get("/whoami", headers={**forwarded, "Authorization": "Bearer invalid"})
+        assert response.json() == {"user_id": "42"}
+
+        # Wrong secret: back to verifying the token
+        spoofed = {**forwarded, "X-Gateway-Secret": "guess"}
+        assert (await client.get("/whoami", headers=spoofed)).status_code == 403
+        assert (await client.get("/whoami", headers={**spoofed, "Authorization": "Bearer invalid"})).status_code == 401
+        response = await client.get("/whoami", headers={**spoofed, "Authorization": f"Bearer {token}"})
+        assert response.json() == {"user_id": "7"}
+
+        # Forwarded permissions still gate access
+        denied = {**forwarded, "X-Auth-Permissions": "hr"}
+        assert (await client.get("/whoami", headers=denied)).status_code == 403
+
+@pytest.mark.asyncio
+async def test_retention_plans_partitions_and_purges_unpartitioned(async_db_engine, monkeypatch):
+    """Months are planned around retention; without partitions expired rows are deleted in batches"""
+    from datetime import date, datetime, timezone
+    from sqlalchemy import func, insert, select
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    from shared.database import partitions
+    from shared.models.audit import AuditLog
+
+    create, expire = partitions.plan_partitions(
+        [date(2025, 9, 1), date(2025, 10, 1), date(2026, 10, 1)], date(2026, 10, 17), retention_months=12, premake_months=2
+    )
+    assert (create, expire) == ([date(2026, 11, 1), date(2026, 12, 1)], [date(2025, 9, 1)])
+    assert partitions.plan_partitions([date(2020, 1, 1)], date(2026, 12, 5), 0, 1) == ([date(2026, 12, 1), date(2027, 1, 1)], [])
+    assert partitions.partition_name("audit_logs", date(2026, 1, 1)) == "audit_logs_p2026_01"
+    assert partitions.is_partition("audit_logs_p2026_01") and partitions.is_partition("attendance_records_default")
+    assert not partitions.is_partition("audit_logs") and not partitions.is_partition("payroll_records_p2026_01")
+
+    session_factory = async_sessionmaker(async_db_engine, expire_on_commit=False)
+    async with session_factory() as db:
+        await db.execute(insert(AuditLog), [
+            {"table_name": "employees", "record_id": index, "action": "UPDATE",
+             "created_at": datetime(2025, 9 + index % 2, 28, tzinfo=timezone.utc)}
+            for index in range(7)
+        ])
+        await db.commit()
+
+    manager = partitions.PartitionManager(session_factory, [partitions.PartitionedTable("audit_logs", "created_at", True, 12)])
+    monkeypatch.setattr(partitions, "DELETE_BATCH_SIZE", 2)
+    (result,) = await manager.run(date(2026, 10, 17))
+    assert (result.table, result.created, result.dropped, result.deleted_rows) == ("audit_logs", [], [], 4)
+    async with session_factory() as db:
+        assert await db.scalar(select(func.count()).select_from(AuditLog)) == 3
+
+class RecordingSession:
+    """Stands in for a PostgreSQL session, recording the SQL a retention run sends"""
+
+    def __init__(self, partitions: list[str], months_in_default: set[str]):
+        self.partitions = partitions
+        self.months_in_default = months_in_default
+        self.statements = []
+
+    async def scalar(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append(sql)
+        if sql.startswith("SELECT EXISTS"):
+            return any(month in sql for month in self.months_in_default)
+        return True  # pg_try_advisory_xact_lock
+
+    async def scalars(self, statement, params=None):
+        self.statements.append(str(statement))
+        return type("Names", (), {"all": lambda _: self.partitions})()
+
+    async def execute(self, statement, params=None):
+        self.statements.append(str(statement) if params is None else (str(statement), params))
+        return type("Result", (), {"rowcount": 3})()
+
+    async def commit(self):
+        self.statements.append("COMMIT")
+
+@pytest.mark.asyncio
+async def test_retention_partition_ddl():
+    """The DDL a PostgreSQL run issues: new months, default rows moved out, expired months dropped"""
+    from datetime import date, datetime, timezone
+    from shared.database import partitions
+
+    manager = partitions.PartitionManager(lambda: None, [], premake_months=2)
+    audit_logs = partitions.PartitionedTable("audit_logs", "created_at", True, 12)
+    db = RecordingSession(["audit_logs_p2025_09", "audit_logs_p2026_10", "audit_logs_default"], {"2026-11-01"})
+    result = await manager._run_partitioned(db, audit_logs, date(2026, 10, 17))
+    assert result == partitions.RetentionResult(
+        "audit_logs", ["audit_logs_p2026_11", "audit_logs_p2026_12"], ["audit_logs_p2025_09"], 0, 3
+    )
+
+    november = "created_at >= '2026-11-01 00:00:00+00' AND created_at < '2026-12-01 00:00:00+00'"
+    assert [statement for statement in db.statements if not str(statement).startswith("SELECT")] == [
+        "CREATE TABLE audit_logs_p2026_11 (LIKE audit_logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)",
+        f"INSERT INTO audit_logs_p2026_11 SELECT * FROM audit_logs_default WHERE {november}",
+        f"DELETE FROM audit_logs_default WHERE {november}",
+        "ALTER TABLE audit_logs ATTACH PARTITION audit_logs_p2026_11 "
+        "FOR VALUES FROM ('2026-11-01 00:00:00+00') TO ('2026-12-01 00:00:00+00')",
+        "CREATE TABLE audit_logs_p2026_12 PARTITION OF audit_logs "
+        "FOR VALUES FROM ('2026-12-01 00:00:00+00') TO ('2027-01-01 00:00:00+00')",
+        "COMMIT",
+        "DROP TABLE audit_logs_p2025_09",
+        "COMMIT",
+        ("DELETE FROM audit_logs_default WHERE created_at < :cutoff", {"cutoff": datetime(2025, 10, 1, tzinfo=timezone.utc)}),
+        "COMMIT",
+    ]
+
+    # Date keys get date bounds; nothing expires with retention 0
+    attendance = partitions.PartitionedTable("attendance_records", "attendance_date", False, 0)
+    db = RecordingSession(["attendance_records_p2026_10", "attendance_records_p2026_11"], set())
+    await manager._run_partitioned(db, attendance, date(2026, 10, 17))
+    assert [statement for statement in db.statements if not str(statement).startswith("SELECT")] == [
+        "CREATE TABLE attendance_records_p2026_12 PARTITION OF attendance_records "
+        "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')",
+        "COMMIT",
+    ]
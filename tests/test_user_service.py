@@ -0,0 +1,787 @@
+import io
+import json
+import pytest
+from datetime import date, datetime, time
+from zoneinfo import ZoneInfo
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from shared.utils.exceptions import ConflictError, DuplicateError, NotFoundError, ServiceUnavailableError, ValidationError
+from tests.conftest import AUTH_SERVICE, USER_SERVICE
+
+UserService = USER_SERVICE["app.services.user_service"].UserService
+user_schemas = USER_SERVICE["app.schemas.user"]
+user_module = USER_SERVICE["app.services.employee_import"]
+attendance_module = USER_SERVICE["app.services.attendance"]
+payroll_module = USER_SERVICE["app.services.payroll"]
+payroll_schemas = USER_SERVICE["app.schemas.payroll"]
+notifications_module = USER_SERVICE["app.services.notifications"]
+notification_schemas = USER_SERVICE["app.schemas.notification"]
+
+def make_employee(index: int, **overrides) -> "user_schemas.EmployeeCreate":
+    data = {
+        "employee_id": f"EMP{index:05d}",
+        "first_name": f"First{index}",
+        "last_name": f"Last{index}",
+        "email": f"employee{index}@example.com",
+    }
+    data.update(overrides)
+    return user_schemas.EmployeeCreate(**data)
+
+@pytest.mark.asyncio
+async def test_create_employee_with_department(async_db_session):
+    """Created employees come back with their department loaded"""
+    user_service = UserService(async_db_session)
+    department = await user_service.create_department(user_schemas.DepartmentCreate(name="Engineering"))
+
+    employee = await user_service.create_employee(make_employee(1, department_id=department.id))
+
+    assert employee.department.name == "Engineering"
+    with pytest.raises(DuplicateError):
+        await user_service.create_employee(make_employee(1))
+
+@pytest.mark.asyncio
+async def test_list_employees_pagination_and_filters(async_db_session):
+    """Offset pagination reports totals and honours filters"""
+    user_service = UserService(async_db_session)
+    for index in range(1, 13):
+        await user_service.create_employee(make_employee(index))
+    await user_service.delete_employee(12)
+
+    page = await user_service.list_employees(page=2, page_size=5, is_active=True)
+
+    assert page.total == 11
+    assert page.total_pages == 3
+    assert [employee.employee_id for employee in page.employees] == [
+        f"EMP{index:05d}" for index in range(6, 11)
+    ]
+
+@pytest.mark.asyncio
+async def test_update_employee_and_detail(async_db_session):
+    """Updates are reflected in the employee detail view"""
+    user_service = UserService(async_db_session)
+    department = await user_service.create_department(user_schemas.DepartmentCreate(name="Finance"))
+    employee = await user_service.create_employee(make_employee(1))
+
+    updated = await user_service.update_employee(
+        employee.id, user_schemas.EmployeeUpdate(position="Analyst", department_id=department.id)
+    )
+    assert updated.position == "Analyst"
+    assert updated.department.name == "Finance"
+
+    detail = await user_service.get_employee_detail(employee.id)
+    assert detail.profile is None
+    with pytest.raises(NotFoundError):
+        await user_service.get_employee_detail(999)
+
+@pytest.mark.asyncio
+async def test_list_employees_cursor_pagination(async_db_session):
+    """Cursor mode walks every row exactly once in sort order"""
+    user_service = UserService(async_db_session)
+    for index, last_name in enumerate(["Nguyen", "Tran", "Le", "Nguyen", "Pham", "Tran", "Le"], start=1):
+        await user_service.create_employee(make_employee(index, last_name=last_name))
+
+    seen, cursor = [], None
+    while True:
+        page = await user_service.list_employees(
+            page_size=3, pagination="cursor", cursor=cursor, sort_by="last_name", count="none"
+        )
+        assert page.total is None and page.page is None
+        seen.extend((employee.last_name, employee.id) for employee in page.employees)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert seen == sorted(seen)
+    assert len(seen) == 7
+
+    with pytest.raises(ValidationError):
+        await user_service.list_employees(pagination="cursor", cursor="not-a-cursor")
+    first_page = await user_service.list_employees(page_size=3, pagination="cursor", sort_by="last_name")
+    with pytest.raises(ValidationError):
+        await user_service.list_employees(pagination="cursor", cursor=first_page.next_cursor, sort_by="id")
+
+@pytest.mark.asyncio
+async def test_search_employees_by_prefix(async_db_session):
+    """Search matches word prefixes across names, email and employee ID"""
+    user_service = UserService(async_db_session)
+    await user_service.create_employee(make_employee(1, first_name="Minh", last_name="Nguyen"))
+    await user_service.create_employee(make_employee(2, first_name="Lan", last_name="Tran"))
+    await user_service.create_employee(make_employee(3, first_name="Nguyet", last_name="Le"))
+
+    async def search(term):
+        page = await user_service.list_employees(search=term)
+        return sorted(employee.id for employee in page.employees)
+
+    assert await search("ngu") == [1, 3]
+    assert await search("nguyen mi") == [1]
+    assert await search("EMP00002") == [2]
+    assert await search("guyen") == []
+    with pytest.raises(ValidationError):
+        await user_service.list_employees(sort_by="relevance")
+
+def test_search_clause_on_postgresql_splits_emails():
+    """PostgreSQL searches match word prefixes of the split document, emails included"""
+    from sqlalchemy.dialects import postgresql
+    search_module = USER_SERVICE["app.services.employee_search"]
+    models = USER_SERVICE["app.models.user"]
+
+    def tsquery(search):
+        condition, rank = search_module.employee_search_clause("postgresql", search)
+        compiled = condition.compile(dialect=postgresql.dialect())
+        assert "employees.search_vector @@ to_tsquery('simple'::regconfig" in str(compiled) and rank is not None
+        return list(compiled.params.values())
+
+    assert tsquery("John.Doe@acme.com") == ["john:* & doe:* & acme:* & com:*"]
+    assert tsquery("acme") == ["acme:*"]
+    assert tsquery("nguyen mi") == ["nguyen:* & mi:*"]
+    assert tsquery("EMP-001 x_y") == ["emp:* & 001:* & x:* & y:*"]
+    assert search_module.employee_search_clause("postgresql", "@.") == (None, None)
+    # The indexed document is split at the same punctuation
+    assert "regexp_replace(email, '[@._+-]+', ' ', 'g')" in models.EMPLOYEE_SEARCH_DOCUMENT
+
+@pytest.mark.asyncio
+async def test_department_and_employee_reads_are_cached(async_db_session):
+    """Cached reads are served until a write invalidates them"""
+    cache = USER_SERVICE["app.services.user_service"].cache
+    user_service = UserService(async_db_session)
+    department = await user_service.create_department(user_schemas.DepartmentCreate(name="Sales"))
+    employee = await user_service.create_employee(make_employee(1, department_id=department.id))
+
+    await user_service.get_department(department.id)
+    await user_service.get_employee_detail(employee.id)
+    hits = cache.hits
+    assert (await user_service.get_department(department.id)).name == "Sales"
+    assert (await user_service.get_employee_detail(employee.id)).department.name == "Sales"
+    assert cache.hits == hits + 2
+
+    await user_service.update_department(department.id, user_schemas.DepartmentUpdate(name="Field Sales"))
+    assert (await user_service.get_department(department.id)).name == "Field Sales"
+    assert [dept.name for dept in await user_service.list_departments()] == ["Field Sales"]
+    assert (await user_service.get_employee_detail(employee.id)).department.name == "Field Sales"
+
+    await user_service.update_employee(employee.id, user_schemas.EmployeeUpdate(position="Lead"))
+    assert (await user_service.get_employee_detail(employee.id)).position == "Lead"
+
+async def stream(data: bytes, chunk_size: int = 7):
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+
+@pytest.mark.asyncio
+async def test_import_employees_csv(async_db_session):
+    """Bulk import inserts valid rows and reports the rest per row"""
+    user_service = UserService(async_db_session)
+    department = await user_service.create_department(user_schemas.DepartmentCreate(name="Support"))
+    await user_service.create_employee(make_employee(1))
+
+    data = (
+        "employee_id,first_name,last_name,email,department_id,manager_employee_id,address\n"
+        f"EMP00002,An,Nguyen,an@example.com,{department.id},EMP00003,\"12 Le Loi,\nDistrict 1\"\n"
+        "EMP00003,Binh,Tran,binh@example.com,,EMP00001,\n"
+        "EMP00001,Dup,Licate,dup@example.com,,,\n"
+        "EMP00004,Chi,Le,binh@example.com,,,\n"
+        "EMP00005,Dung,Pham,dung@example.com,999,,\n"
+        "EMP00006,Em,Vo,not-an-email,,,\n"
+    ).encode()
+    result = await user_service.import_employees(stream(data), "csv")
+
+    assert (result.total_rows, result.imported, result.failed) == (6, 2, 4)
+    errors = {error.row: error.errors[0] for error in result.errors}
+    assert errors[3] == "Employee ID already exists"
+    assert errors[4] == "Email is repeated in the import"
+    assert errors[5] == "Department not found"
+    assert errors[6].startswith("email:")
+
+    page = await user_service.list_employees(search="nguyen", count="none")
+    imported = page.employees[0]
+    assert imported.address == "12 Le Loi,\nDistrict 1"
+    assert imported.department.name == "Support"
+    assert imported.manager_id == (await user_service.list_employees(search="EMP00003")).employees[0].id
+
+@pytest.mark.asyncio
+async def test_import_manager_links_never_form_cycles(async_db_session):
+    """Forward manager references that would close a cycle are dropped and reported as warnings"""
+    user_service = UserService(async_db_session)
+    data = (
+        "employee_id,first_name,last_name,email,manager_employee_id\n"
+        "EMP00001,An,Nguyen,an@example.com,EMP00002\n"
+        "EMP00002,Binh,Tran,binh@example.com,EMP00001\n"
+        "EMP00003,Chi,Le,chi@example.com,EMP00003\n"
+        "EMP00004,Dung,Pham,dung@example.com,EMP09999\n"
+        "EMP00005,Em,Vo,em@example.com,EMP00006\n"
+        "EMP00006,Giang,Do,giang@example.com,\n"
+    ).encode()
+    importer = user_module.EmployeeImporter(async_db_session, batch_size=1)
+    result = await importer.run(stream(data), "csv")
+
+    # Imported rows with a dropped link are warnings, so errors match failed
+    assert (result.total_rows, result.imported, result.failed, result.errors) == (6, 6, 0, [])
+    assert {warning.row: warning.errors[0].split(";")[0] for warning in result.warnings} == {
+        1: "Manager is one of the employee's reports", 3: "Manager is one of the employee's reports", 4: "Manager not found",
+    }
+    managers = {
+        employee.employee_id: employee.manager_id
+        for employee in (await user_service.list_employees(page_size=10)).employees
+    }
+    ids = {employee.employee_id: employee.id for employee in (await user_service.list_employees(page_size=10)).employees}
+    assert managers == {
+        "EMP00001": None, "EMP00002": ids["EMP00001"], "EMP00003": None, "EMP00004": None,
+        "EMP00005": ids["EMP00006"], "EMP00006": None,
+    }
+    # Rows linked after insert get a new version, like any other manager
+    # change; EMP00002's manager was already in when it went in
+    assert importer.linked == [ids["EMP00005"]]
+    versions = {
+        employee.employee_id: employee.version
+        for employee in (await user_service.list_employees(page_size=10)).employees
+    }
+    assert versions == {"EMP00001": 1, "EMP00002": 1, "EMP00003": 1, "EMP00004": 1, "EMP00005": 2, "EMP00006": 1}
+
+@pytest.mark.asyncio
+async def test_import_employees_jsonl(async_db_session):
+    """JSONL rows are imported in batches and malformed lines are reported"""
+    user_service = UserService(async_db_session)
+    lines = [json.dumps(make_employee(index).dict(exclude_none=True)) for index in range(1, 26)]
+    lines.insert(3, "{not json")
+    importer = user_module.EmployeeImporter(async_db_session, batch_size=10)
+
+    result = await importer.run(stream("\n".join(lines).encode(), chunk_size=64), "jsonl")
+
+    assert (result.total_rows, result.imported, result.failed) == (26, 25, 1)
+    assert result.errors[0].row == 4
+    assert (await user_service.list_employees(count="exact")).total == 25
+
+async def collect(chunks) -> bytes:
+    return b"".join([chunk async for chunk in chunks])
+
+@pytest.mark.asyncio
+async def test_export_employees(async_db_session):
+    """Exports stream every matching row in each format"""
+    user_service = UserService(async_db_session)
+    department = await user_service.create_department(user_schemas.DepartmentCreate(name="Payroll"))
+    for index in range(1, 6):
+        await user_service.create_employee(make_employee(index, department_id=department.id, salary=index * 1000))
+    await user_service.delete_employee(5)
+
+    csv_rows = (await collect(await user_service.export_employees("csv", is_active=True))).decode().splitlines()
+    assert csv_rows[0].startswith("id,employee_id,first_name")
+    assert len(csv_rows) == 5
+    assert "Payroll" in csv_rows[1]
+
+    lines = (await collect(await user_service.export_employees("ndjson", search="first3"))).splitlines()
+    assert [json.loads(line)["employee_id"] for line in lines] == ["EMP00003"]
+
+    pq = pytest.importorskip("pyarrow.parquet")
+    table = pq.read_table(io.BytesIO(await collect(await user_service.export_employees("parquet"))))
+    assert table.num_rows == 5
+    assert table.column("salary").to_pylist() == [1000, 2000, 3000, 4000, 5000]
+
+@pytest.mark.asyncio
+async def test_get_employee_details_batch(async_db_session, async_db_engine):
+    """A batch of details costs three queries regardless of its size"""
+    from sqlalchemy import event
+
+    user_service = UserService(async_db_session)
+    department = await user_service.create_department(user_schemas.DepartmentCreate(name="Design"))
+    for index in range(1, 6):
+        await user_service.create_employee(make_employee(index, department_id=department.id))
+    await user_service.create_employee_profile(user_schemas.EmployeeProfileCreate(employee_id=2, bio="Lead"))
+
+    statements = []
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(async_db_engine.sync_engine, "before_cursor_execute", count)
+    try:
+        batch = await user_service.get_employee_details([3, 2, 99, 1, 4, 5, 2])
+    finally:
+        event.remove(async_db_engine.sync_engine, "before_cursor_execute", count)
+
+    assert len(statements) == 3
+    assert [employee.id for employee in batch.employees] == [3, 2, 1, 4, 5]
+    assert batch.missing == [99]
+    assert batch.employees[1].profile.bio == "Lead"
+    assert all(employee.department.name == "Design" for employee in batch.employees)
+
+    detail = await user_service._load_employee_detail(2)
+    assert detail == batch.employees[1]
+
+@pytest.mark.asyncio
+async def test_org_chart_reports_and_managers(async_db_session):
+    """Reports and reporting chains come from one recursive query"""
+    user_service = UserService(async_db_session)
+    # 1 -> (2, 3), 2 -> 4, 4 -> 5
+    await user_service.create_employee(make_employee(1))
+    for index, manager_id in [(2, 1), (3, 1), (4, 2), (5, 4)]:
+        await user_service.create_employee(make_employee(index, manager_id=manager_id))
+
+    reports = await user_service.get_reports(1)
+    assert [(node.id, node.depth) for node in reports.employees] == [(2, 1), (3, 1), (4, 2), (5, 3)]
+    direct = await user_service.get_reports(1, max_depth=1)
+    assert [node.id for node in direct.employees] == [2, 3]
+
+    managers = await user_service.get_managers(5)
+    assert [(node.id, node.depth) for node in managers.employees] == [(4, 1), (2, 2), (1, 3)]
+    assert (await user_service.get_managers(1)).total == 0
+    with pytest.raises(NotFoundError):
+        await user_service.get_reports(99)
+
+    # Moving a manager under one of their own reports is rejected
+    with pytest.raises(ValidationError):
+        await user_service.update_employee(2, user_schemas.EmployeeUpdate(manager_id=5))
+    moved = await user_service.update_employee(5, user_schemas.EmployeeUpdate(manager_id=3))
+    assert moved.manager_id == 3
+
+@pytest.mark.asyncio
+async def test_department_stats_summary_matches_live(async_db_session):
+    """The incrementally maintained summary agrees with the grouped aggregates"""
+    user_service = UserService(async_db_session)
+    sales = await user_service.create_department(user_schemas.DepartmentCreate(name="Sales"))
+    legal = await user_service.create_department(user_schemas.DepartmentCreate(name="Legal"))
+    for index, salary in enumerate([1000, 2000, 3000, 4000], start=1):
+        await user_service.create_employee(make_employee(index, department_id=sales.id, salary=salary))
+    await user_service.create_employee(make_employee(5, department_id=legal.id))
+
+    await user_service.update_employee(4, user_schemas.EmployeeUpdate(department_id=legal.id, salary=5000))
+    await user_service.update_employee(1, user_schemas.EmployeeUpdate(salary=1500))
+    await user_service.delete_employee(2)
+
+    summary = await user_service.get_department_stats()
+    live = await user_service.get_department_stats("live")
+    strip = lambda stats: [item.dict(exclude={"salary_p50", "salary_p90"}) for item in stats]
+    assert strip(summary) == strip(live)
+
+    by_name = {item.name: item for item in live}
+    assert (by_name["Sales"].headcount, by_name["Sales"].active_count) == (3, 2)
+    assert by_name["Sales"].salary_total == 4500
+    assert by_name["Sales"].salary_p50 == 2250
+    assert by_name["Legal"].salary_avg == 5000
+
+    await user_service.rebuild_department_stats()
+    assert strip(await user_service.get_department_stats()) == strip(live)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("update_returning", [True, False])
+async def test_updates_check_versions_and_uniqueness(async_db_session, async_db_engine, monkeypatch, update_returning):
+    """Updates bump the version, reject stale versions and rely on unique indexes.
+
+    Without UPDATE ... RETURNING, as on MySQL, the row is read back instead.
+    """
+    monkeypatch.setattr(async_db_engine.dialect, "update_returning", update_returning)
+    user_service = UserService(async_db_session)
+    sales = await user_service.create_department(user_schemas.DepartmentCreate(name="Sales"))
+    await user_service.create_department(user_schemas.DepartmentCreate(name="Legal"))
+    first = await user_service.create_employee(make_employee(1, department_id=sales.id))
+    await user_service.create_employee(make_employee(2))
+    assert (first.version, sales.version) == (1, 1)
+
+    updated = await user_service.update_employee(first.id, user_schemas.EmployeeUpdate(position="Lead", version=1))
+    assert (updated.position, updated.version, updated.department.name) == ("Lead", 2, "Sales")
+    with pytest.raises(ConflictError):
+        await user_service.update_employee(first.id, user_schemas.EmployeeUpdate(position="Head", version=1))
+    with pytest.raises(ConflictError):
+        await user_service.update_employee(first.id, user_schemas.EmployeeUpdate(salary=10, version=1))
+    with pytest.raises(NotFoundError):
+        await user_service.update_employee(99, user_schemas.EmployeeUpdate(position="Lead", version=1))
+    with pytest.raises(DuplicateError):
+        await user_service.update_employee(first.id, user_schemas.EmployeeUpdate(email="employee2@example.com"))
+    assert (await user_service.get_employee_detail(first.id)).position == "Lead"
+
+    renamed = await user_service.update_department(sales.id, user_schemas.DepartmentUpdate(name="Field Sales", version=1))
+    assert renamed.version == 2
+    with pytest.raises(ConflictError):
+        await user_service.update_department(sales.id, user_schemas.DepartmentUpdate(budget=5, version=1))
+    with pytest.raises(DuplicateError):
+        await user_service.update_department(sales.id, user_schemas.DepartmentUpdate(name="Legal"))
+    assert (await user_service.get_department(sales.id)).name == "Field Sales"
+
+@pytest.mark.asyncio
+async def test_attendance_buffer_batches_and_merges(async_db_session, async_db_engine):
+    """Events coalesce per employee-day; later flushes merge into stored days and fix their figures"""
+    user_service = UserService(async_db_session)
+    for index in (1, 2):
+        await user_service.create_employee(make_employee(index))
+    schedule = attendance_module.WorkSchedule(time(9), time(18), ZoneInfo("Asia/Ho_Chi_Minh"))
+    buffer = attendance_module.AttendanceBuffer(
+        async_sessionmaker(async_db_engine, expire_on_commit=False), schedule, interval=0, max_buffered=4
+    )
+
+    def at(hour: int, minute: int) -> datetime:
+        return datetime(2026, 10, 16, hour, minute, tzinfo=schedule.tz)
+
+    buffer.add([
+        (1, "in", at(9, 5), "Gate A", None, None),
+        (1, "in", at(8, 55), "Gate B", None, None),
+        (2, "in", at(9, 20), "Gate A", None, None),
+    ])
+    assert buffer.buffered == 2
+    # Every event may open a day, so a batch that could overfill the buffer is refused whole
+    with pytest.raises(ServiceUnavailableError):
+        buffer.add([(1, "out", at(18, 0), None, None, None)] * 3)
+    assert buffer.buffered == 2 and buffer.stats()["accepted"] == 3
+    assert await buffer.unknown_employees({1, 2, 99}) == {99}
+    assert await buffer.flush() == (2, 0)
+
+    # A delayed earlier check-in and check-outs arrive in the next batch
+    buffer.add([
+        (1, "out", at(18, 30), None, None, None),
+        (1, "in", at(9, 30), "Gate C", None, None),
+        (2, "in", at(8, 50), "Gate B", None, None),
+        (2, "out", at(17, 0), None, None, None),
+    ])
+    assert await buffer.flush() == (2, 0)
+
+    attendance_service = attendance_module.AttendanceService(async_db_session)
+    (first,) = await attendance_service.list_records(1)
+    assert first.attendance_date == date(2026, 10, 16)
+    assert (first.location, first.total_hours, first.overtime_hours, first.late_minutes) == ("Gate B", 9.58, 0.5, 0)
+    (second,) = await attendance_service.list_records(2, start=date(2026, 10, 16), end=date(2026, 10, 16))
+    assert (second.location, second.total_hours, second.late_minutes, second.early_leave_minutes) == ("Gate B", 8.17, 0, 60)
+    assert second.status == "PRESENT"
+    assert buffer.stats()["written"] == 4
+
+@pytest.mark.asyncio
+async def test_payroll_run_computes_cycle(async_db_session):
+    """A run prorates basic pay, pays overtime, applies components in order and can be repeated"""
+    from decimal import Decimal
+    AttendanceRecord = USER_SERVICE["app.models.attendance"].AttendanceRecord
+    leave_models = USER_SERVICE["app.models.leave"]
+
+    user_service = UserService(async_db_session)
+    engineering = await user_service.create_department(user_schemas.DepartmentCreate(name="Engineering"))
+    sales = await user_service.create_department(user_schemas.DepartmentCreate(name="Sales"))
+    first = await user_service.create_employee(make_employee(1, department_id=engineering.id, salary=2_200_000))
+    second = await user_service.create_employee(make_employee(2, department_id=sales.id, salary=2_200_000))
+    leaver = await user_service.create_employee(make_employee(3, department_id=sales.id, salary=2_200_000))
+    await user_service.delete_employee(leaver.id)
+
+    payroll_service = payroll_module.PayrollService(async_db_session)
+    component = payroll_schemas.SalaryComponentCreate
+    lunch = await payroll_service.create_component(component(
+        name="Lunch", code="LUNCH", type="EARNING", category="ALLOWANCE", default_value=100_000, is_mandatory=True
+    ))
+    bonus = await payroll_service.create_component(component(
+        name="Bonus", code="BONUS", type="EARNING", category="BONUS", calculation_type="PERCENTAGE",
+        default_percentage=Decimal("5")
+    ))
+    tax = await payroll_service.create_component(component(
+        name="Income tax", code="PIT", type="DEDUCTION", category="TAX", calculation_type="PERCENTAGE",
+        calculation_base="GROSS_SALARY", default_percentage=Decimal("10"), is_mandatory=True
+    ))
+    with pytest.raises(DuplicateError):
+        await payroll_service.create_component(component(name="Lunch", code="LUNCH", type="EARNING", category="ALLOWANCE"))
+
+    structure = payroll_schemas.SalaryStructureCreate
+    for data in (
+        structure(employee_id=first.id, salary_component_id=bonus.id, effective_date=date(2026, 1, 1)),
+        structure(employee_id=first.id, salary_component_id=bonus.id, percentage=Decimal("20"), effective_date=date(2026, 9, 1)),
+        structure(employee_id=second.id, salary_component_id=bonus.id, effective_date=date(2026, 1, 1), end_date=date(2026, 9, 30)),
+    ):
+        await payroll_service.create_structure(data)
+
+    # October 2026 has 22 working days
+    async_db_session.add_all([
+        AttendanceRecord(employee_id=first.id, attendance_date=date(2026, 10, 5), check_in_time=datetime(2026, 10, 5, 2),
+                         overtime_hours=Decimal("2.00")),
+        AttendanceRecord(employee_id=second.id, attendance_date=date(2026, 10, 6), status="ABSENT"),
+        AttendanceRecord(employee_id=second.id, attendance_date=date(2026, 10, 7), status="ON_LEAVE"),
+    ])
+    annual = leave_models.LeaveType(name="Annual", code="ANNUAL")
+    unpaid = leave_models.LeaveType(name="Unpaid", code="UNPAID", is_paid=False)
+    async_db_session.add_all([annual, unpaid])
+    await async_db_session.flush()
+    # The 7th is also marked ON_LEAVE and counts once; only the 30th of the
+    # unpaid leave is a working day in the cycle; pending leave is ignored
+    async_db_session.add_all([
+        leave_models.LeaveRequest(employee_id=second.id, leave_type_id=annual.id, start_date=date(2026, 10, 7),
+                                  end_date=date(2026, 10, 8), total_days=2, status="APPROVED"),
+        leave_models.LeaveRequest(employee_id=second.id, leave_type_id=unpaid.id, start_date=date(2026, 10, 30),
+                                  end_date=date(2026, 11, 3), total_days=3, status="APPROVED"),
+        leave_models.LeaveRequest(employee_id=first.id, leave_type_id=unpaid.id, start_date=date(2026, 10, 12),
+                                  end_date=date(2026, 10, 12), total_days=1, status="PENDING"),
+    ])
+    await async_db_session.commit()
+    cycle = await payroll_service.create_cycle(payroll_schemas.PayrollCycleCreate(
+        name="October", start_date=date(2026, 10, 1), end_date=date(2026, 10, 31), pay_date=date(2026, 11, 5)
+    ))
+
+    engine = payroll_module.PayrollEngine(async_db_session, payroll_module.PayrollPolicy(8, 150))
+    for _ in range(2):
+        result = await engine.run(cycle.id, processed_by=1)
+        assert result.status == "COMPLETED"
+        assert (result.total_employees, result.total_gross_amount) == (2, 4_877_500)
+        assert (result.total_deductions, result.total_net_amount) == (487_750, 4_389_750)
+
+    # Basic 2,200,000 + overtime 2h at 150% of 12,500 + lunch + 20% bonus; tax 10% of gross
+    payslip = await payroll_service.get_payslip(cycle.id, first.id)
+    assert (payslip.basic_salary, payslip.total_earnings, payslip.gross_salary) == (2_200_000, 577_500, 2_777_500)
+    assert (payslip.tax_amount, payslip.net_salary, payslip.worked_days, payslip.overtime_hours) == (277_750, 2_499_750, 1, 2)
+    assert [(detail.code, detail.amount, detail.calculation_base, detail.rate_percentage) for detail in payslip.details] == [
+        ("LUNCH", 100_000, None, None), ("BONUS", 440_000, 2_200_000, 20.0), ("PIT", 277_750, 2_777_500, 10.0),
+    ]
+    # An absence and a day of unpaid leave, 2 of 22 days, off the basic pay;
+    # the ended bonus no longer applies
+    payslip = await payroll_service.get_payslip(cycle.id, second.id)
+    assert (payslip.basic_salary, payslip.gross_salary, payslip.net_salary) == (2_000_000, 2_100_000, 1_890_000)
+    assert (payslip.absent_days, payslip.leave_days) == (2, 2)
+    assert (await payroll_service.list_records(cycle.id)).total == 2
+
+    with pytest.raises(NotFoundError):
+        await engine.run(cycle.id + 1)
+    assert payroll_module.plan_partitions([(1, 50), (2, 30), (3, 20), (None, 5)], 2) == [[1, None], [2, 3]]
+
+@pytest.mark.asyncio
+async def test_payroll_run_in_worker_processes(tmp_path, monkeypatch):
+    """Departments computed in separate processes add up to the in-process run"""
+    import os
+    from decimal import Decimal
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from shared.database.base import Base
+    from tests.conftest import SERVICES_DIR
+
+    # Spawned workers import the service and open the database file themselves
+    monkeypatch.syspath_prepend(os.path.join(SERVICES_DIR, "user-service"))
+    database_url = f"sqlite:///{tmp_path / 'payroll.db'}"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'payroll.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+            user_service = UserService(db)
+            for index, name in enumerate(("Engineering", "Sales", "Support")):
+                department = await user_service.create_department(user_schemas.DepartmentCreate(name=name))
+                for number in range(1, 4):
+                    await user_service.create_employee(make_employee(
+                        index * 10 + number, department_id=department.id, salary=1_000_000 * number
+                    ))
+            payroll_service = payroll_module.PayrollService(db)
+            await payroll_service.create_component(payroll_schemas.SalaryComponentCreate(
+                name="Income tax", code="PIT", type="DEDUCTION", category="TAX", calculation_type="PERCENTAGE",
+                calculation_base="GROSS_SALARY", default_percentage=Decimal("10"), is_mandatory=True
+            ))
+            cycle = await payroll_service.create_cycle(payroll_schemas.PayrollCycleCreate(
+                name="October", start_date=date(2026, 10, 1), end_date=date(2026, 10, 31), pay_date=date(2026, 11, 5)
+            ))
+
+            policy = payroll_module.PayrollPolicy(8, 150)
+            in_process = await payroll_module.PayrollEngine(db, policy).run(cycle.id)
+            engine_2 = payroll_module.PayrollEngine(db, policy, workers=2, database_url=database_url)
+            in_workers = await engine_2.run(cycle.id)
+            assert in_workers.status == "COMPLETED"
+            assert (in_workers.total_employees, in_workers.total_net_amount) == (9, 16_200_000)
+            assert (in_workers.total_gross_amount, in_workers.total_deductions) == (
+                in_process.total_gross_amount, in_process.total_deductions
+            )
+            assert (await payroll_service.list_records(cycle.id)).total == 9
+    finally:
+        await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_payroll_run_failure_marks_cycle_failed(async_db_session, monkeypatch):
+    """A failed or cancelled run leaves the cycle FAILED and rerunnable; a dead run's claim expires"""
+    import asyncio
+    from sqlalchemy import update
+    PayrollCycle = USER_SERVICE["app.models.payroll"].PayrollCycle
+
+    await UserService(async_db_session).create_employee(make_employee(1, salary=2_200_000))
+    payroll_service = payroll_module.PayrollService(async_db_session)
+    cycle = await payroll_service.create_cycle(payroll_schemas.PayrollCycleCreate(
+        name="October", start_date=date(2026, 10, 1), end_date=date(2026, 10, 31), pay_date=date(2026, 11, 5)
+    ))
+    engine = payroll_module.PayrollEngine(async_db_session, payroll_module.PayrollPolicy(8, 150))
+    run_partition = payroll_module.run_partition
+
+    for error in (RuntimeError("worker died"), asyncio.CancelledError()):
+        async def fail(db, *args):
+            await run_partition(db, *args)
+            raise error
+        monkeypatch.setattr(payroll_module, "run_partition", fail)
+        with pytest.raises(type(error)):
+            await engine.run(cycle.id)
+        assert (await payroll_service.get_cycle(cycle.id)).status == "FAILED"
+        assert (await payroll_service.list_records(cycle.id)).total == 0
+    monkeypatch.setattr(payroll_module, "run_partition", run_partition)
+
+    # Left PROCESSING by a run whose process died: refused until the claim is stale
+    await async_db_session.execute(update(PayrollCycle).where(PayrollCycle.id == cycle.id).values(status="PROCESSING"))
+    await async_db_session.commit()
+    with pytest.raises(ConflictError):
+        await engine.run(cycle.id)
+    engine.stale_after = -60
+    assert (await engine.run(cycle.id)).status == "COMPLETED"
+
+@pytest.mark.asyncio
+async def test_audit_log_captures_committed_changes(async_db_session, async_db_engine):
+    """Committed changes are logged with their diffs and actor; rolled back ones and unaudited tables are not"""
+    from sqlalchemy import select
+    from shared.audit import pipeline
+    from shared.models.audit import AuditLog
+    Department = USER_SERVICE["app.models.user"].Department
+    User = AUTH_SERVICE["app.models.auth"].User
+
+    writer = pipeline.AuditLogWriter(
+        async_sessionmaker(async_db_engine, expire_on_commit=False),
+        ["employees", "departments", "users"], interval=0, max_queued=5
+    )
+    writer.start()
+    try:
+        user_service = UserService(async_db_session)
+        sales = await user_service.create_department(user_schemas.DepartmentCreate(name="Sales", budget=100))
+        employee = await user_service.create_employee(make_employee(1, department_id=sales.id))
+        await user_service.update_employee(employee.id, user_schemas.EmployeeUpdate(position="Lead", version=1))
+
+        department = await async_db_session.get(Department, sales.id)
+        department.budget = 250
+        await async_db_session.commit()
+        department.budget = 300
+        await async_db_session.flush()
+        await async_db_session.rollback()
+
+        async_db_session.add(User(username="auditor", email="auditor@example.com", full_name="Auditor", hashed_password="secret-hash"))
+        await async_db_session.commit()
+        assert writer.queued == 5
+
+        # Past max_queued: the drop policy commits and counts the lost record
+        await user_service.delete_employee(employee.id)
+        assert (writer.queued, writer.dropped) == (5, 1)
+        writer.policy = "reject"
+        department.budget = 400
+        with pytest.raises(ServiceUnavailableError):
+            await async_db_session.commit()
+        await async_db_session.rollback()
+        assert writer.rejected == 1
+
+        assert await writer.flush() == 5
+    finally:
+        await writer.stop()
+
+    logs = (await async_db_session.scalars(select(AuditLog).order_by(AuditLog.id))).all()
+    assert [(log.table_name, log.action) for log in logs] == [
+        ("departments", "CREATE"), ("employees", "CREATE"), ("employees", "UPDATE"), ("departments", "UPDATE"),
+        ("users", "CREATE"),
+    ]
+    assert logs[0].new_values["name"] == "Sales" and "created_at" not in logs[0].new_values
+    assert logs[1].record_id == employee.id
+    # Statement updates log only the columns they changed, read before the update
+    assert (logs[2].old_values, logs[2].new_values) == ({"position": None, "version": 1}, {"position": "Lead", "version": 2})
+    assert (logs[3].old_values, logs[3].new_values) == ({"budget": 100}, {"budget": 250})
+    assert logs[4].new_values["hashed_password"] == "***"
+    assert writer.stats()["written"] == 5
+
+@pytest.mark.asyncio
+async def test_audit_log_covers_updates_without_returning_and_imports(async_db_session, async_db_engine, monkeypatch):
+    """UPDATEs read back on MySQL still log their changes; bulk imports log one summary per batch"""
+    from sqlalchemy import select
+    from shared.audit import pipeline
+    from shared.models.audit import AuditLog
+
+    monkeypatch.setattr(async_db_engine.dialect, "update_returning", False)
+    writer = pipeline.AuditLogWriter(async_sessionmaker(async_db_engine, expire_on_commit=False), ["departments", "employees"], interval=0)
+    writer.start()
+    try:
+        user_service = UserService(async_db_session)
+        sales = await user_service.create_department(user_schemas.DepartmentCreate(name="Sales", budget=100))
+        await user_service.update_department(sales.id, user_schemas.DepartmentUpdate(name="Sales", budget=250))
+
+        data = b"employee_id,first_name,last_name,email\nE1,An,Nguyen,an@example.com\nE2,Binh,Tran,binh@example.com\n"
+        await user_module.EmployeeImporter(async_db_session, batch_size=1).run(stream(data), "csv")
+        await writer.flush()
+    finally:
+        await writer.stop()
+
+    logs = (await async_db_session.scalars(select(AuditLog).order_by(AuditLog.id))).all()
+    assert [(log.table_name, log.action) for log in logs] == [
+        ("departments", "CREATE"), ("departments", "UPDATE"), ("employees", "IMPORT"), ("employees", "IMPORT"),
+    ]
+    # The unchanged name is left out
+    assert (logs[1].old_values, logs[1].new_values) == ({"budget": 100, "version": 1}, {"budget": 250, "version": 2})
+    assert [(log.record_id, log.new_values) for log in logs[2:]] == [
+        (0, {"rows": 1, "employee_ids": ["E1"]}), (0, {"rows": 1, "employee_ids": ["E2"]}),
+    ]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("returning", [True, False])
+async def test_notifications_fan_out_counts_and_read(async_db_session, async_db_engine, monkeypatch, returning):
+    """A fan-out reaches active recipients once, keeps cached counts and streams in step, and read marks in batches.
+
+    Without RETURNING, as on MySQL, inserted rows are read back and read marks selected first.
+    """
+    monkeypatch.setattr(async_db_engine.dialect, "insert_returning", returning)
+    monkeypatch.setattr(async_db_engine.dialect, "update_returning", returning)
+    Employee = USER_SERVICE["app.models.user"].Employee
+    user_service = UserService(async_db_session)
+    sales = await user_service.create_department(user_schemas.DepartmentCreate(name="Sales"))
+    support = await user_service.create_department(user_schemas.DepartmentCreate(name="Support"))
+    first = await user_service.create_employee(make_employee(1, department_id=sales.id))
+    second = await user_service.create_employee(make_employee(2, department_id=sales.id))
+    third = await user_service.create_employee(make_employee(3, department_id=support.id))
+    inactive = await user_service.create_employee(make_employee(4, department_id=sales.id))
+    (await async_db_session.get(Employee, inactive.id)).is_active = False
+    await async_db_session.commit()
+
+    counter = notifications_module.MemoryUnreadCounter(ttl=60)
+    hub = notifications_module.NotificationHub(max_queued=2)
+    service = notifications_module.NotificationService(async_db_session, counter, hub)
+    queue = hub.subscribe(first.id)
+    assert await service.unread_count(first.id) == 0
+
+    # A department plus an explicit id: listed twice, notified once
+    created = await service.fan_out(notification_schemas.NotificationCreate(
+        title="Town hall", message="Friday 10:00", department_ids=[sales.id], employee_ids=[first.id, third.id]
+    ), sender_id=7)
+    assert created.created == 3
+    # Cached counts follow the fan-out; uncached ones are counted when asked
+    assert await counter.get(first.id) == 1 and await counter.get(second.id) is None
+    assert [await service.unread_count(employee.id) for employee in (first, second, third, inactive)] == [1, 1, 1, 0]
+
+    await service.fan_out(notification_schemas.NotificationCreate(title="Payslips", message="Ready", all_employees=True))
+    page = await service.list_notifications(first.id, limit=1)
+    assert ([n.title for n in page.notifications], page.unread) == (["Payslips"], 2)
+    rest = await service.list_notifications(first.id, before_id=page.next_before_id)
+    assert ([n.title for n in rest.notifications], rest.notifications[0].sender_id, rest.next_before_id) == (["Town hall"], 7, None)
+
+    event_type, data, notification_id = queue.get_nowait()
+    assert (event_type, data["title"], notification_id) == ("notification", "Town hall", rest.notifications[0].id)
+
+    marked = await service.mark_read(first.id, [rest.notifications[0].id, page.notifications[0].id + 1000])
+    assert (marked.marked, marked.unread) == (1, 1)
+    # A third event queued against max_queued=2: the stream is told to reload instead
+    marked = await service.mark_read(first.id)
+    assert (marked.marked, marked.unread) == (1, 0)
+    assert (await service.mark_read(first.id)).marked == 0
+    assert hub.resyncs == 1
+
+    chunks = hub.stream(first.id, queue, 0, heartbeat=0.01)
+    assert await chunks.__anext__() == b'event: unread\ndata: {"unread":0}\n\n'
+    assert await chunks.__anext__() == b"event: resync\ndata: {}\n\n"
+    assert await chunks.__anext__() == b": keepalive\n\n"
+    await chunks.aclose()
+    assert hub.stats()["streams"] == 0
+
+@pytest.mark.asyncio
+async def test_unread_counts_recounted_after_failed_adjustment(async_db_session):
+    """Counts a fan-out could not adjust are dropped and recounted rather than left stale until expiry"""
+    class FailingCounter(notifications_module.MemoryUnreadCounter):
+        async def add(self, deltas):
+            raise ConnectionError("counter unavailable")
+
+    employee = await UserService(async_db_session).create_employee(make_employee(1))
+    counter = FailingCounter()
+    service = notifications_module.NotificationService(async_db_session, counter, notifications_module.NotificationHub())
+    assert await service.unread_count(employee.id) == 0
+    await service.fan_out(notification_schemas.NotificationCreate(title="Payslips", message="Ready", all_employees=True))
+    assert await counter.get(employee.id) is None and counter.errors == 1
+    assert await service.unread_count(employee.id) == 1
+
+def test_incomplete_unread_counter_fails_when_built():
+    """An unread counter without ``forget`` is refused at construction"""
+    class NoForgetCounter(notifications_module.UnreadCounter):
+        async def get(self, recipient_id):
+            return None
+
+        async def fill(self, recipient_id, count):
+            pass
+
+        async def add(self, deltas):
+            pass
+
+    with pytest.raises(TypeError):
+        NoForgetCounter()